@@ -8,6 +8,8 @@ import json
 from datetime import datetime, date
 from pathlib import Path
 
+from modules.log_stream import LogStreamAnalyzer, find_logs
+
 
 def analyze_bot_results():
     """Анализ результатов работы бота"""
@@ -16,38 +18,32 @@ def analyze_bot_results():
 
     # 1. Проверка логов
     print("\n📄 АНАЛИЗ ЛОГОВ:")
-    log_file = f"logs/trading_{datetime.now().strftime('%Y%m%d')}.log"
-
-    if os.path.exists(log_file):
-        with open(log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        total_lines = len(lines)
-        errors = len([l for l in lines if "ERROR" in l])
-        open_signals = len([l for l in lines if "Strategy result" in l and "OPEN" in l])
-        close_signals = len([l for l in lines if "Strategy result" in l and "CLOSE" in l])
-        cycles = len([l for l in lines if "Trading cycle started" in l])
-
-        print(f"   📝 Всего записей: {total_lines}")
-        print(f"   🔄 Торговых циклов: {cycles}")
-        print(f"   📈 OPEN сигналов: {open_signals}")
-        print(f"   📉 CLOSE сигналов: {close_signals}")
+    log_files = find_logs("logs")
+    today = datetime.now().strftime('%Y%m%d')
+    log_files = [path for path in log_files if path.stem == f"trading_{today}"]
+
+    if log_files:
+        summary = LogStreamAnalyzer(index_path="logs/.log_index.json").analyze(log_files)
+        errors = summary.levels['ERROR'] + summary.levels['CRITICAL']
+
+        print(f"   📝 Всего записей: {summary.records}")
+        print(f"   🔄 Торговых циклов: {summary.events['cycle_started']}")
+        print(f"   📈 OPEN сигналов: {summary.action_count('OPEN')}")
+        print(f"   📉 CLOSE сигналов: {summary.action_count('CLOSE')}")
         print(f"   ❌ Ошибок: {errors}")
 
         # Показываем последние сигналы
         print(f"\n🎯 ПОСЛЕДНИЕ СИГНАЛЫ:")
-        signal_lines = [l for l in lines if "Strategy result" in l][-10:]
-        for line in signal_lines:
-            print(f"   {line.strip()}")
+        for timestamp, symbol, action in list(summary.recent_signals)[-10:]:
+            print(f"   {timestamp} - {symbol}: {action}")
 
         # Показываем последние ошибки
         if errors > 0:
             print(f"\n🚨 ПОСЛЕДНИЕ ОШИБКИ:")
-            error_lines = [l for l in lines if "ERROR" in l][-5:]
-            for line in error_lines:
-                print(f"   {line.strip()}")
+            for timestamp, message in list(summary.recent_errors)[-5:]:
+                print(f"   {timestamp} - {message}")
     else:
-        print(f"   ❌ Лог файл не найден: {log_file}")
+        print(f"   ❌ Лог файл не найден: logs/trading_{today}.log")
 
     # 2. Проверка дневника
     print(f"\n📔 АНАЛИЗ ДНЕВНИКА:")
@@ -26,7 +26,40 @@ class TradingConfig:
         'max_retries': 3,
         'retry_delay': 5,
         'recv_window': 5000,
-        'rate_limit_buffer': 0.1  # 10% буфер для rate limit
+        'rate_limit_buffer': 0.1,  # 10% буфер для rate limit
+        'rate_limit_cooldown': 5.0  # Пауза после ошибки rate limit (сек)
+    }
+
+    # Лимиты запросов ByBit V5 по классам эндпоинтов (запросов в секунду)
+    RATE_LIMITS = {
+        'market': {'rate': 120, 'capacity': 120},  # Публичные данные: 600 запросов / 5 сек на IP
+        'account': {'rate': 50, 'capacity': 50},  # Баланс, позиции, статусы ордеров: 50/сек на UID
+        'trade': {'rate': 10, 'capacity': 10}  # Создание/изменение/отмена ордеров (linear): 10/сек на UID
+    }
+
+    # Конвейер ордеров OrderManager (отдельные потоки, не ждут получения рыночных данных)
+    ORDER_PIPELINE_SETTINGS = {
+        'workers': 4,  # Потоков для отправки ордеров
+        'result_timeout': 30,  # Ожидание ответа биржи PositionManager (сек)
+        'latency_window': 1000,  # Последних задержек подтверждения для перцентилей
+        'settle_coin': 'USDT',  # Расчетная монета для пакетного запроса статусов
+        'status_page_size': 50  # Ордеров на страницу realtime / history (максимум ByBit)
+    }
+
+    # Симуляция исполнения в TESTNET режиме OrderManager
+    SIMULATION_SETTINGS = {
+        'ticker_ttl': 2.0,  # Секунд, в течение которых цена из кэша тикеров считается свежей
+        'max_price_age': 300.0,  # Устаревшая цена допустима, если источник недоступен (сек)
+        'fill_model': {
+            'latency_ms': (20.0, 120.0),  # Задержка подтверждения (мин, макс), равномерно
+            'slippage': 'uniform',  # fixed / uniform / normal
+            'slippage_min': 0.0005,  # 0.05% (для uniform; для fixed - значение)
+            'slippage_max': 0.002,  # 0.2%
+            'slippage_std': 0.0007,  # Для normal: |N(0, std)|
+            'partial_fill_probability': 0.0,  # Вероятность частичного исполнения
+            'min_fill_ratio': 0.5,  # Минимальная исполненная доля при частичном исполнении
+            'seed': None
+        }
     }
 
     # Настройки риск-менеджмента
@@ -222,9 +255,12 @@ class TradingConfig:
             'overbought': 80
         },
         'support_resistance': {
-            'lookback_period': 50,
+            'lookback_period': 50,  # можно увеличивать до тысяч свечей
+            'extrema_window': 5,  # баров слева и справа от экстремума
+            'max_levels': 5,
             'min_touches': 2,
-            'tolerance': 0.001
+            'tolerance': 0.001,
+            'full_strength_touch_rate': 0.2  # Доля свечей lookback с касанием для силы уровня 1
         }
     }
 
@@ -275,15 +311,151 @@ class TradingConfig:
         'save_interval': 300,  # Сохранять данные каждые 5 минут
         'cleanup_interval': 3600,  # Очистка старых данных каждый час
         'max_log_size_mb': 100,  # Максимальный размер лог-файла
-        'max_history_days': 30  # Хранить историю 30 дней
+        'max_history_days': 30,  # Хранить историю 30 дней
+        'trade_window': 2000,  # Сделок PerformanceTracker в памяти при включенном хранилище (остальные в SQLite)
+        'order_history_window': 1000,  # Ордеров OrderManager в памяти, старые выгружаются в ledger_dir
+        'ledger_dir': 'data/ledger'
+    }
+
+    # Настройки параллельной обработки торговых пар
+    CONCURRENCY_SETTINGS = {
+        'enabled': False,  # Параллельный режим цикла (получение данных и анализ пар одновременно)
+        'max_workers': 4,  # Максимум потоков для обработки пар
+        'symbol_timeout': 60  # Срок на волну из max_workers пар (сек); общий срок цикла - на все волны
+    }
+
+    # Профилирование этапов торгового цикла (modules/cycle_profiler.py)
+    PROFILER_SETTINGS = {
+        'enabled': True,
+        'significant_bits': 7,  # Точность гистограмм: ошибка перцентилей не больше 1.6%
+        'max_seconds': 3600,  # Наибольшая записываемая длительность этапа
+        'exporters': ['json'],  # json и/или prometheus
+        'json_path': 'logs/cycle_profile.json',  # Перезаписывается после каждого цикла
+        'prometheus_host': '127.0.0.1',
+        'prometheus_port': 9108,  # GET /metrics
+        'slow_cycle_threshold': 30.0,  # Цикл дольше (сек) считается медленным
+        'sampler': None,  # None / cprofile / pyinstrument - профиль медленных циклов
+        'sample_interval': 0.001,  # Интервал выборки pyinstrument (сек)
+        'profile_dir': 'logs/profiles',
+        'max_profiles': 20  # Хранить последние N профилей
+    }
+
+    # Запуск бота: время от старта процесса до первого торгового цикла (utils/benchmark_startup.py)
+    STARTUP_SETTINGS = {
+        'strategy_validation': 'background',  # sync - до первого цикла (как раньше) / background / off
+        'connection_check': False,  # Проверочный запрос DataFetcher при запуске (иначе - первый запрос баланса)
+        'target_seconds': 3.0  # Цель benchmark_startup.py: импорт + инициализация TradingBot
+    }
+
+    # Риск портфеля: EWMA корреляции / ковариация пар и VaR (modules/portfolio_risk.py)
+    PORTFOLIO_RISK_SETTINGS = {
+        'enabled': True,  # False - только проверка направления по той же паре (как раньше)
+        'ewma_lambda': 0.94,  # Затухание EWMA (RiskMetrics)
+        'window': 500,  # Свечей на пару для пересчета при появлении новой пары
+        'min_observations': 30,  # Совместных свечей до учета корреляции пары
+        'max_correlation': None,  # None - STRATEGY_SETTINGS['max_correlation_threshold']
+        'var_confidence': 0.99,
+        'horizon_bars': 12,  # Горизонт VaR в свечах primary (12 x 5m = 1 час)
+        'max_var_fraction': 0.02,  # VaR портфеля после открытия - не больше доли баланса
+        'stale_bars': 3  # Пара без новых свечей дольше не задерживает обновление остальных
+    }
+
+    # Логирование через очередь и фоновый поток записи (modules/async_logging.py)
+    LOGGING_SETTINGS = {
+        'async': True,  # False - обработчики пишут в потоке вызова, как раньше
+        'quiet_console': os.getenv('QUIET_CONSOLE', 'False').lower() == 'true',  # Консоль: только WARNING+, без echo
+        'console_level': 'INFO',
+        'flush_every': 100  # Записей между сбросами буфера файла (и при опустевшей очереди)
+    }
+
+    # Дневник трейдинга (modules/trading_diary.py): журнал событий + периодические снимки дня
+    DIARY_SETTINGS = {
+        'diary_dir': 'data/diary',
+        'journal': True,  # False - перезапись JSON дня на каждое событие (как раньше)
+        'fsync_every': 16,  # fsync журнала после N событий
+        'fsync_interval': 1.0,  # ... или если с прошлого fsync прошло больше N секунд
+        'snapshot_every': 200  # Событий между снимками дня (также при завершении сессии и смене дня)
+    }
+
+    # Кэш свечей (инкрементальная загрузка вместо повторного получения всего окна)
+    CANDLE_CACHE_SETTINGS = {
+        'enabled': True,
+        'lookback_hours': 24,  # Глубина истории, передаваемой стратегии
+        'max_bars': 1000  # Максимум свечей на пару/интервал
+    }
+
+    # Старшие таймфреймы из одного ряда базовых свечей (modules/timeframe_aggregator.py)
+    TIMEFRAME_SETTINGS = {
+        'enabled': False,  # market_data['timeframes'] со всеми TIMEFRAMES вместо одного primary
+        'base_interval': '1',  # Единственный загружаемый / подписываемый интервал
+        'max_bars': 500,  # Свечей на пару/таймфрейм
+        'seed_from_history': True  # Однократная загрузка истории старших таймфреймов до базового окна
+    }
+
+    # Потоковые рыночные данные (websocket вместо опроса REST)
+    WEBSOCKET_SETTINGS = {
+        'enabled': False,
+        'orderbook_depth': 50,  # Глубина стакана в подписке (1, 50, 200, 500)
+        'stale_after': 30,  # Секунд без сообщений до перехода на REST и переподключения
+        'record_path': None  # JSONL файл для записи сообщений (для ReplayWebSocket)
+    }
+
+    # Хранилище исторических свечей (для валидации и бэктестов)
+    HISTORY_SETTINGS = {
+        'data_dir': 'data/history',  # Колоночные файлы по symbol/interval
+        'page_size': 1000  # Свечей на запрос (максимум ByBit)
+    }
+
+    # Бэктест (modules/backtester.py)
+    BACKTEST_SETTINGS = {
+        'initial_balance': 10000.0,
+        'window': 200,  # Свечей в окне, передаваемом strategy.execute (как limit get_kline)
+        'taker_fee': 0.00055,  # Комиссия тейкера ByBit (0.055%)
+        'slippage': 0.0002,  # Проскальзывание против сделки (0.02%)
+        'max_positions': 4,
+        'trailing_stop': True,
+        'record_equity': True,  # Кривая эквити по каждой свече
+        'quiet': True  # Логи стратегии только WARNING и выше во время прогона
+    }
+
+    # Локальный симулятор биржи вместо pybit HTTP (modules/exchange_simulator.py)
+    EXCHANGE_SIMULATOR_SETTINGS = {
+        'initial_balance': 10000.0,
+        'taker_fee': 0.00055,
+        'maker_fee': 0.0002,
+        'spread': 0.0002,  # Спред между лучшими bid и ask (доля цены)
+        'book_levels': 25,  # Уровней стакана с каждой стороны
+        'book_step': 0.0001,  # Шаг цены между уровнями (доля цены)
+        'level_volume': 0.02,  # Объем уровня как доля объема текущей свечи
+        'min_level_qty': 1.0,  # Минимальный объем уровня (свечи с нулевым объемом)
+        'warmup_bars': 200,  # Свечей истории, видимых до первого шага
+        'latency_ms': 0.0  # Задержка каждого запроса (нагрузочные тесты)
+    }
+
+    # Подбор параметров (modules/optimizer.py)
+    OPTIMIZER_SETTINGS = {
+        'workers': None,  # Процессов для бэктестов (None - по числу ядер)
+        'method': 'bayesian',  # grid / random / bayesian
+        'n_trials': 50,  # Испытаний для random / bayesian
+        'metric': 'sharpe_ratio',  # sharpe_ratio / sortino_ratio
+        'min_trades': 10,  # Меньше сделок - результат не участвует в рейтинге
+        'grid_points': 5,  # Значений на диапазон в grid
+        'bayesian_startup': 10,  # Случайных испытаний до построения модели
+        'bayesian_gamma': 0.25,  # Доля лучших испытаний для плотности l(x)
+        'bayesian_candidates': 64,  # Кандидатов на одну предложенную точку
+        'seed': 42
     }
 
     # Настройки базы данных (если используется)
     DATABASE_SETTINGS = {
-        'enabled': False,
+        'enabled': True,  # Сделки и эквити PerformanceTracker в SQLite (modules/performance_store.py)
         'type': 'sqlite',  # sqlite, postgresql, mysql
         'path': 'data/trading_bot.db',
-        'backup_interval': 3600  # Бэкап каждый час
+        'backup_interval': 3600,  # Бэкап каждый час
+        'wal': True,  # Журнал WAL: чтение отчетов не блокируется записью
+        'busy_timeout': 5000,  # Ожидание блокировки базы (мс)
+        'flush_every': 20,  # Сделок в пачке записи
+        'flush_interval': 5.0  # ... или секунд с прошлой записи
     }
 
     @classmethod
@@ -115,9 +115,21 @@ class ConfigLoader:
             TradingConfig.NOTIFICATIONS = self.user_config.NOTIFICATIONS
 
             # Дополнительные настройки
-            TradingConfig.PERFORMANCE_SETTINGS = self.user_config.DATA_SETTINGS
+            TradingConfig.PERFORMANCE_SETTINGS.update(self.user_config.DATA_SETTINGS)
             TradingConfig.CONNECTION_SETTINGS.update(self.user_config.SECURITY_SETTINGS)
 
+            # Параллельная обработка торговых пар
+            performance_settings = self.user_config.ADVANCED_SETTINGS.get('performance', {})
+            TradingConfig.CONCURRENCY_SETTINGS['enabled'] = performance_settings.get('parallel_processing', False)
+            TradingConfig.CONCURRENCY_SETTINGS['max_workers'] = performance_settings.get(
+                'max_workers', TradingConfig.CONCURRENCY_SETTINGS['max_workers'])
+            TradingConfig.WEBSOCKET_SETTINGS['enabled'] = performance_settings.get('websocket_feed', False)
+            TradingConfig.TIMEFRAME_SETTINGS['enabled'] = performance_settings.get('multi_timeframe', False)
+
+            # Режим бэктестинга
+            mode_settings = self.user_config.ADVANCED_SETTINGS.get('modes', {})
+            TradingConfig.STRATEGY_SETTINGS['backtest_mode'] = mode_settings.get('backtesting_mode', False)
+
             self.logger.info("User configuration applied successfully")
 
         except Exception as e:
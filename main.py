@@ -3,6 +3,8 @@ import os
 import sys
 import time
 import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
@@ -12,15 +14,31 @@ from config.trading_config import TradingConfig
 
 # Импорт модулей
 from modules.data_fetcher import DataFetcher
+from modules.rate_limiter import get_shared_rate_limiter
+from modules.candle_store import CandleStore
+from modules.market_data_feed import MarketDataFeed
+from modules.timeframe_aggregator import TimeframeAggregator
+from modules.indicator_engine import get_indicator_engine
+from modules.cycle_profiler import get_cycle_profiler
+from modules.log_stream import JsonLinesFormatter
+from modules.async_logging import get_log_pipeline, echo
 from modules.market_analyzer import MarketAnalyzer
+from modules.history_store import KlineHistoryStore
+from modules.backtester import Backtester
 from modules.risk_manager import RiskManager
+from modules.portfolio_risk import get_portfolio_risk_engine
 from modules.order_manager import OrderManager
+from modules.ticker_cache import TickerCache
 from modules.position_manager import PositionManager
 from modules.performance_tracker import PerformanceTracker
+from modules.performance_store import get_performance_store
 from modules.trading_diary import TradingDiary
 from strategies.strategy_validator import StrategyValidator
 from pybit.unified_trading import HTTP
 
+# Отсчет времени запуска после импорта модулей (время самих импортов - utils/benchmark_startup.py)
+_PROCESS_START = time.perf_counter()
+
 
 class TradingBot:
     """Основной класс торгового бота"""
@@ -39,6 +57,8 @@ class TradingBot:
 
             self.is_running = False
             self.cycle_count = 0
+            self.init_seconds = time.perf_counter() - _PROCESS_START  # Инициализация компонентов
+            self.startup_seconds = None  # ... до начала первого цикла
             self.last_heartbeat = datetime.now()
 
             # Настройка обработчиков сигналов для корректного завершения
@@ -52,13 +72,10 @@ class TradingBot:
             raise
 
     def _setup_logging(self) -> logging.Logger:
-        """Настройка системы логирования"""
+        """Настройка системы логирования (запись файлов и консоли в фоновом потоке)"""
         logger = logging.getLogger("trading_bot")
         logger.setLevel(logging.INFO)
 
-        # Очищаем существующие обработчики
-        logger.handlers.clear()
-
         # Создаем директорию для логов
         log_dir = "logs"
         os.makedirs(log_dir, exist_ok=True)
@@ -72,17 +89,18 @@ class TradingBot:
             datefmt="%Y-%m-%d %H:%M:%S"
         )
 
-        # Файловый обработчик
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_handler.setFormatter(formatter)
-        file_handler.setLevel(logging.INFO)
-        logger.addHandler(file_handler)
-
-        # Консольный обработчик
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        console_handler.setLevel(logging.INFO)
-        logger.addHandler(console_handler)
+        # Файловый лог, журнал событий JSON lines (для utils/log_analyzer.py) и консоль -
+        # существующие обработчики заменяются записью через очередь
+        pipeline = get_log_pipeline()
+        pipeline.attach(
+            logger,
+            pipeline.file_handler(log_file, formatter),
+            pipeline.file_handler(
+                os.path.join(log_dir, f"trading_{datetime.now().strftime('%Y%m%d')}.jsonl"), JsonLinesFormatter()),
+            pipeline.console_handler(formatter)
+        )
+        # Модульные логгеры пишут в корневой (logging.basicConfig) - его обработчики тоже за очередью
+        pipeline.attach_root()
 
         return logger
 
@@ -114,22 +132,60 @@ class TradingBot:
                 api_secret=TradingConfig.API_SECRET
             )
 
+            # Общий rate limiter для всех клиентов, работающих через api_client
+            self.rate_limiter = get_shared_rate_limiter()
+
             # Инициализация компонентов в правильном порядке
-            self.data_fetcher = DataFetcher(client=self.api_client)
+            self.data_fetcher = DataFetcher(client=self.api_client, rate_limiter=self.rate_limiter,
+                                            test_connection=TradingConfig.STARTUP_SETTINGS['connection_check'])
             self.logger.info("DataFetcher initialized")
 
+            # Кэш свечей: после первой загрузки подгружаются только новые свечи
+            self.candle_store = None
+            if TradingConfig.CANDLE_CACHE_SETTINGS.get('enabled', True):
+                self.candle_store = CandleStore(self.data_fetcher)
+                self.logger.info("CandleStore initialized")
+
+            # Все таймфреймы из одного ряда базовых свечей (одна загрузка / подписка на пару)
+            self.timeframe_aggregator = None
+            candle_interval = TradingConfig.TIMEFRAMES['primary']
+            if TradingConfig.TIMEFRAME_SETTINGS.get('enabled') and self.candle_store is not None:
+                self.timeframe_aggregator = TimeframeAggregator(
+                    list(TradingConfig.TIMEFRAMES.values()), history_fetcher=self.data_fetcher)
+                candle_interval = self.timeframe_aggregator.base_interval
+                self.logger.info("TimeframeAggregator initialized")
+
+            # Потоковые данные через websocket (свечи, тикеры, стакан)
+            self.market_feed = None
+            if TradingConfig.WEBSOCKET_SETTINGS.get('enabled') and self.candle_store is not None:
+                self.market_feed = MarketDataFeed(
+                    self.data_fetcher, self.candle_store,
+                    symbols=TradingConfig.TRADING_PAIRS,
+                    interval=candle_interval,
+                    wake_interval=TradingConfig.TIMEFRAMES['primary']
+                )
+                self.logger.info("MarketDataFeed initialized")
+
             self.market_analyzer = MarketAnalyzer(self.data_fetcher)
             self.logger.info("MarketAnalyzer initialized")
 
             self.risk_manager = RiskManager()
             self.logger.info("RiskManager initialized")
 
-            self.order_manager = OrderManager(self.api_client)
+            # Кэш тикеров для симуляции исполнения: поток (если есть) или общий DataFetcher
+            self.ticker_cache = TickerCache(self.market_feed or self.data_fetcher)
+            self.order_manager = OrderManager(self.api_client, rate_limiter=self.rate_limiter,
+                                              price_source=self.ticker_cache)
             self.logger.info("OrderManager initialized")
 
             self.position_manager = PositionManager(self.risk_manager, self.order_manager)
             self.logger.info("PositionManager initialized")
 
+            # Гистограммы этапов цикла: JSON снимок и/или Prometheus endpoint
+            self.profiler = get_cycle_profiler()
+            if self.profiler.enabled and 'prometheus' in self.profiler.settings['exporters']:
+                self.profiler.start_http_server()
+
             # Создаем стратегию на основе пользовательского выбора
             self.strategy = self.config_loader.create_strategy(self.market_analyzer, self.position_manager)
             if self.strategy is None:
@@ -138,12 +194,10 @@ class TradingBot:
 
             # Инициализация валидатора стратегий
             self.strategy_validator = StrategyValidator()
+            self.last_validation_result = None
             self.logger.info("StrategyValidator initialized")
 
-            # Валидация стратегии при запуске
-            self._validate_strategy_on_startup()
-
-            self.performance_tracker = PerformanceTracker()
+            self.performance_tracker = PerformanceTracker(store=get_performance_store())
             self.logger.info("PerformanceTracker initialized")
 
             # Инициализация дневника трейдинга
@@ -153,14 +207,35 @@ class TradingBot:
             self.position_manager.set_trading_diary(self.trading_diary)
             self.logger.info("TradingDiary initialized")
 
+            # Валидация стратегии при запуске: до первого цикла, в фоне или отключена
+            validation_mode = TradingConfig.STARTUP_SETTINGS.get('strategy_validation', 'sync')
+            if validation_mode == 'sync':
+                self._validate_strategy_on_startup()
+            elif validation_mode == 'background':
+                threading.Thread(target=self._validate_strategy_in_background, name="strategy-validation",
+                                 daemon=True).start()
+
             self.logger.info("All components initialized successfully")
 
         except Exception as e:
             self.logger.error(f"Error initializing components: {e}", exc_info=True)
             raise
 
-    def _validate_strategy_on_startup(self):
-        """Валидация стратегии при запуске бота"""
+    def _validate_strategy_in_background(self):
+        """
+        Фоновая валидация отдельного экземпляра стратегии
+
+        execute() меняет состояние стратегии (время последнего сигнала, статистику),
+        поэтому проверяется копия, созданная по той же конфигурации, а не торгующий экземпляр.
+        """
+        strategy = self.config_loader.create_strategy(self.market_analyzer, self.position_manager)
+        if strategy is None:
+            self.logger.warning("Strategy validation skipped - could not create validation instance")
+            return
+        self._validate_strategy_on_startup(strategy)
+
+    def _validate_strategy_on_startup(self, strategy=None):
+        """Валидация стратегии при запуске бота (по умолчанию - торгующего экземпляра)"""
         try:
             self.logger.info("Validating trading strategy...")
 
@@ -170,7 +245,7 @@ class TradingBot:
             if test_data:
                 # Запускаем валидацию
                 validation_result = self.strategy_validator.validate_strategy(
-                    strategy=self.strategy,
+                    strategy=strategy or self.strategy,
                     test_data=test_data,
                     strict_mode=False,  # Не строгий режим при запуске
                     performance_test=True
@@ -232,50 +307,91 @@ class TradingBot:
     def start(self):
         """Запуск торгового бота"""
         try:
+            if TradingConfig.STRATEGY_SETTINGS.get('backtest_mode', False):
+                self.logger.info("Backtest mode enabled, replaying stored history instead of live trading")
+                self.run_backtest()
+                return
+
             self.is_running = True
             self.logger.info("Starting trading bot...")
             print("\n🤖 Bot is running...")
             print("Press Ctrl+C to stop the bot gracefully")
 
+            if self.market_feed is not None:
+                if self.market_feed.start():
+                    print("📡 Market data stream connected, cycles follow candle closes")
+                else:
+                    print("⚠️ Market data stream unavailable, using REST polling")
+
             while self.is_running:
                 try:
                     cycle_start = datetime.now()
                     self.cycle_count += 1
 
-                    print(f"\n📊 Starting trading cycle #{self.cycle_count}...")
+                    echo("\n📊 Starting trading cycle #%d...", self.cycle_count)
+                    if self.cycle_count == 1:
+                        self.startup_seconds = time.perf_counter() - _PROCESS_START
+                        self.logger.info("First trading cycle started %.2fs after imports (init %.2fs)",
+                                         self.startup_seconds, self.init_seconds)
                     self.trading_cycle()
 
                     cycle_duration = (datetime.now() - cycle_start).total_seconds()
-                    print(f"✅ Trading cycle #{self.cycle_count} completed in {cycle_duration:.2f}s")
+                    echo("✅ Trading cycle #%d completed in %.2fs", self.cycle_count, cycle_duration)
 
                     # Обновляем heartbeat
                     self.last_heartbeat = datetime.now()
 
                     # Пауза между циклами
                     if self.is_running:
-                        time.sleep(TradingConfig.CYCLE_INTERVAL)
+                        self._wait_for_next_cycle()
 
                 except KeyboardInterrupt:
                     self.logger.info("Keyboard interrupt received")
                     break
                 except Exception as e:
-                    self.logger.error(f"Error in trading cycle #{self.cycle_count}: {e}", exc_info=True)
-                    print(f"❌ Error in cycle: {e}")
+                    self.logger.error("Error in trading cycle #%s: %s", self.cycle_count, e, exc_info=True)
+                    echo("❌ Error in cycle: %s", e)
                     time.sleep(60)  # Пауза при ошибке
 
         except Exception as e:
-            self.logger.error(f"Critical error in bot execution: {e}", exc_info=True)
+            self.logger.error("Critical error in bot execution: %s", e, exc_info=True)
             raise
         finally:
             self.stop()
 
+    def _wait_for_next_cycle(self):
+        """Ожидание следующего цикла: закрытие свечи в потоке или CYCLE_INTERVAL"""
+        if self.market_feed is None:
+            time.sleep(TradingConfig.CYCLE_INTERVAL)
+            return
+
+        self.market_feed.ensure_connected()
+        # Таймаут сохраняет регулярное сопровождение позиций между закрытиями свечей
+        closed_symbols = self.market_feed.wait_for_candle_close(TradingConfig.CYCLE_INTERVAL)
+        if closed_symbols:
+            self.logger.info("Candle closed for %s", ', '.join(closed_symbols))
+
     def trading_cycle(self):
-        """Основной торговый цикл"""
+        """Основной торговый цикл (с замером этапов в CycleProfiler)"""
+        with self.profiler.cycle(self.cycle_count):
+            self._run_trading_cycle()
+
+        cycle_stats = self.profiler.get_snapshot().get('cycle', {}).get('all')
+        if cycle_stats and cycle_stats['count']:
+            self.logger.info(
+                "Cycle latency: p50 %.0fms / p99 %.0fms / max %.0fms (n=%d, slow %d)",
+                cycle_stats['p50_ms'], cycle_stats['p99_ms'], cycle_stats['max_ms'], cycle_stats['count'],
+                self.profiler.slow_cycles)
+
+    def _run_trading_cycle(self):
+        """Баланс, обработка пар и статистика цикла"""
         cycle_start = datetime.now()
-        self.logger.info(f"Trading cycle started at {cycle_start.strftime('%H:%M:%S')}")
-        self.logger.info(f"Available trading pairs: {list(TradingConfig.TRADING_PAIRS.keys())}")
-        print(f"\n🕐 Trading cycle started at {cycle_start.strftime('%H:%M:%S')}")
-        print(f"📈 Available trading pairs: {list(TradingConfig.TRADING_PAIRS.keys())}")
+        stage_timings: Dict[str, float] = {}
+        self.logger.info("Trading cycle started at %s", cycle_start.strftime('%H:%M:%S'),
+                         extra={'event': 'cycle_started', 'cycle': self.cycle_count})
+        self.logger.info("Available trading pairs: %s", list(TradingConfig.TRADING_PAIRS))
+        echo("\n🕐 Trading cycle started at %s", cycle_start.strftime('%H:%M:%S'))
+        echo("📈 Available trading pairs: %s", list(TradingConfig.TRADING_PAIRS))
 
         # Получаем баланс один раз в начале цикла
         try:
@@ -285,203 +401,408 @@ class TradingBot:
             if account_balance is None or account_balance <= 0:
                 balance_info = self.config_loader.get_balance_info()
                 account_balance = balance_info['initial_balance']
-                self.logger.warning(f"Используем баланс из конфигурации: ${account_balance:.2f}")
+                self.logger.warning("Используем баланс из конфигурации: $%.2f", account_balance)
 
             # Проверяем минимальный баланс
             balance_info = self.config_loader.get_balance_info()
             if account_balance is not None:
                 self.logger.info(
-                    f"Account balance: ${account_balance:.2f}, Min threshold: ${balance_info['min_balance_threshold']:.2f}")
+                    "Account balance: $%.2f, Min threshold: $%.2f",
+                    account_balance, balance_info['min_balance_threshold'],
+                    extra={'event': 'balance', 'balance': account_balance})
             else:
                 self.logger.error("Failed to get account balance - API connection issue")
                 account_balance = 0.0
 
             if account_balance < balance_info['min_balance_threshold']:
                 self.logger.critical(
-                    f"Balance too low: ${account_balance:.2f} < ${balance_info['min_balance_threshold']:.2f}")
-                print(f"🚨 КРИТИЧЕСКОЕ ПРЕДУПРЕЖДЕНИЕ: Баланс слишком низкий!")
-                print(f"   Текущий: ${account_balance:.2f}")
-                print(f"   Минимальный: ${balance_info['min_balance_threshold']:.2f}")
+                    "Balance too low: $%.2f < $%.2f", account_balance, balance_info['min_balance_threshold'])
+                echo("🚨 КРИТИЧЕСКОЕ ПРЕДУПРЕЖДЕНИЕ: Баланс слишком низкий!")
+                echo("   Текущий: $%.2f", account_balance)
+                echo("   Минимальный: $%.2f", balance_info['min_balance_threshold'])
                 return
 
-            print(f"💰 Account balance: ${account_balance:.2f}")
+            echo("💰 Account balance: $%.2f", account_balance)
+            if TradingConfig.PORTFOLIO_RISK_SETTINGS.get('enabled', True):
+                get_portfolio_risk_engine().update_balance(account_balance)
 
             # Начинаем торговую сессию в дневнике
             self.trading_diary.start_trading_session(account_balance)
 
             # Простое логирование начала цикла
-            self.logger.info(f"Цикл #{self.cycle_count} начат с балансом ${account_balance:.2f}")
+            self.logger.info("Цикл #%d начат с балансом $%.2f", self.cycle_count, account_balance)
         except Exception as e:
-            self.logger.error(f"Error getting account balance: {e}")
-            print(f"❌ Error getting balance: {e}")
+            self.logger.error("Error getting account balance: %s", e)
+            echo("❌ Error getting balance: %s", e)
             account_balance = 0.0
 
+        stage_timings['balance'] = (datetime.now() - cycle_start).total_seconds()
+        self.profiler.record('balance', stage_timings['balance'])
+
+        # Ордера, ответ на которые не дождались в прошлых циклах: исполненные учитываются как позиции
+        for client_order_id, filled in self.position_manager.reconcile_pending_orders().items():
+            echo("🔁 Reconciled in-flight order %s: %s", client_order_id, "filled" if filled else "not filled")
+
+        if TradingConfig.CONCURRENCY_SETTINGS.get('enabled', False):
+            successful_pairs = self._process_pairs_concurrently(account_balance, stage_timings)
+        else:
+            successful_pairs = self._process_pairs_sequentially(account_balance, stage_timings)
+
+        cycle_duration = (datetime.now() - cycle_start).total_seconds()
+        stage_timings['total'] = cycle_duration
+        self.last_cycle_timings = stage_timings
+
+        self.logger.info(
+            "Processed %d/%d pairs in %.2fs", successful_pairs, len(TradingConfig.TRADING_PAIRS), cycle_duration,
+            extra={'event': 'cycle_finished', 'cycle': self.cycle_count, 'pairs': successful_pairs,
+                   'total_pairs': len(TradingConfig.TRADING_PAIRS), 'duration': round(cycle_duration, 3),
+                   'stages': {stage: round(duration, 3) for stage, duration in stage_timings.items()}})
+        echo("\n✅ Processed %d/%d pairs in %.2fs", successful_pairs, len(TradingConfig.TRADING_PAIRS), cycle_duration)
+
+        timings_str = ", ".join(f"{stage}={duration:.2f}s" for stage, duration in stage_timings.items())
+        self.logger.info("Cycle stage timings: %s", timings_str)
+        echo("⏱️  Stages: %s", timings_str)
+
+        if hasattr(self, 'rate_limiter'):
+            limiter_str = ", ".join(
+                f"{name}: {m['requests']} req, wait {m['total_wait_time']:.2f}s, hits {m['rate_limit_hits']}"
+                for name, m in self.rate_limiter.get_metrics().items()
+            )
+            self.logger.info("Rate limiter totals: %s", limiter_str)
+
+        order_latency = self.order_manager.get_latency_stats()
+        if order_latency:
+            latency_str = ", ".join(
+                f"{kind}: p50 {s['p50_ms']:.0f}ms / p90 {s['p90_ms']:.0f}ms / p99 {s['p99_ms']:.0f}ms (n={s['count']})"
+                for kind, s in order_latency.items()
+            )
+            self.logger.info("Order ack latency: %s", latency_str)
+
+        if self.order_manager.is_testnet:
+            ticker_stats = self.ticker_cache.get_stats()
+            self.logger.info("Ticker cache: hit rate %.1f%%, misses %d, stale %d",
+                             ticker_stats['hit_rate'] * 100, ticker_stats['misses'], ticker_stats['stale'])
+
+        if getattr(self, 'candle_store', None) is not None:
+            cache_stats = self.candle_store.get_stats()
+            self.logger.info(
+                "Candle cache: %d full / %d incremental fetches, %d bars fetched, %d bars cached",
+                cache_stats['full_fetches'], cache_stats['incremental_fetches'], cache_stats['bars_fetched'],
+                cache_stats['cached_bars'])
+
+        if getattr(self, 'timeframe_aggregator', None) is not None:
+            tf_stats = self.timeframe_aggregator.get_stats()
+            self.logger.info("Timeframes %s: %d base bars rolled up, %d higher bars closed, %d rebuilds",
+                             '/'.join(tf_stats['timeframes']), tf_stats['base_bars'], tf_stats['closed_bars'],
+                             tf_stats['seeds'])
+
+        engine_stats = get_indicator_engine().get_stats()
+        self.logger.info("Indicator engine: %d hits / %d computed, hit rate %.0f%%",
+                         engine_stats['hits'], engine_stats['misses'], engine_stats['hit_rate'] * 100)
+
+        # Простое логирование завершения цикла
+        self.logger.info("Торговый цикл #%d завершен: %d/%d пар за %.2fс",
+                         self.cycle_count, successful_pairs, len(TradingConfig.TRADING_PAIRS), cycle_duration)
+
+    def _process_pairs_sequentially(self, account_balance: float, stage_timings: Dict[str, float]) -> int:
+        """Последовательная обработка торговых пар"""
         successful_pairs = 0
+        stage_timings.setdefault('fetch', 0.0)
+        stage_timings.setdefault('strategy', 0.0)
+        stage_timings.setdefault('execution', 0.0)
 
         for symbol in TradingConfig.TRADING_PAIRS:
             try:
-                self.logger.info(f"Processing {symbol}...")
-                print(f"\n🔍 Processing {symbol}...")
-
-                # Получаем рыночные данные
-                market_data = self.get_market_data(symbol, account_balance)
-                if not market_data:
-                    self.logger.warning(f"No market data for {symbol}")
-                    print(f"⚠️  No market data for {symbol}")
+                self.logger.info("Processing %s...", symbol)
+                echo("\n🔍 Processing %s...", symbol)
+
+                evaluation = self._evaluate_symbol(symbol, account_balance)
+                stage_timings['fetch'] += evaluation['fetch_time']
+                stage_timings['strategy'] += evaluation['strategy_time']
+
+                if not evaluation['market_data']:
+                    self.logger.warning("No market data for %s", symbol)
+                    echo("⚠️  No market data for %s", symbol)
                     continue
 
-                # Выполняем стратегию
-                self.logger.info(f"Executing strategy for {symbol}")
-                result = self.strategy.execute(symbol, market_data)
-
-                # Добавляем детальное логирование результата стратегии
-                if result:
-                    action = result.get('action', 'UNKNOWN')
-                    direction = result.get('direction', 'UNKNOWN')
-                    confidence = result.get('confidence', 0)
-                    reasons = result.get('reasons', 'No reasons provided')
-
-                    self.logger.info(f"Strategy result for {symbol}: {action}")
-                    if action == 'OPEN':
-                        self.logger.info(f"  Direction: {direction}")
-                        self.logger.info(f"  Confidence: {confidence:.1%}")
-                        self.logger.info(f"  Entry Price: ${result.get('entry_price', 0):.4f}")
-                        self.logger.info(f"  Stop Loss: ${result.get('stop_loss', 0):.4f}")
-                        self.logger.info(f"  Take Profit: ${result.get('take_profit', 0):.4f}")
-                        self.logger.info(f"  Size: {result.get('size', 0)}")
-                        self.logger.info(f"  Reasons: {reasons}")
-                    elif action == 'CLOSE':
-                        self.logger.info(f"  Close reason: {result.get('reason', 'Unknown')}")
-                        self.logger.info(f"  Exit price: ${result.get('exit_price', 0):.4f}")
-                else:
-                    self.logger.info(f"No action for {symbol}")
-                    # Простое логирование без вызова несуществующего метода
-                    if hasattr(self.strategy, 'last_signal_time') and self.strategy.last_signal_time:
-                        time_since_last = (datetime.now() - self.strategy.last_signal_time).total_seconds()
-                        self.logger.debug(f"Time since last signal for {symbol}: {time_since_last:.0f}s")
-
-                if result:
-                    action = result.get('action', 'UNKNOWN')
-                    print(f"📋 Strategy result for {symbol}: {action}")
-
-                    if action == 'OPEN':
-                        direction = result.get('direction', 'UNKNOWN')
-                        confidence = result.get('confidence', 0)
-                        entry_price = result.get('entry_price', 0)
-                        print(f"   📈 {direction} signal with {confidence:.1%} confidence")
-                        print(f"   💰 Entry: ${entry_price:.4f}")
-                        print(f"   🛑 Stop: ${result.get('stop_loss', 0):.4f}")
-                        print(f"   🎯 Target: ${result.get('take_profit', 0):.4f}")
-                        print(f"   📊 Reasons: {result.get('reasons', 'N/A')}")
-
-                        # ПОПЫТКА ОТКРЫТЬ РЕАЛЬНУЮ ПОЗИЦИЮ
-                        try:
-                            position_opened = self.position_manager.open_position(symbol, result)
-                            if position_opened:
-                                print(f"   ✅ ПОЗИЦИЯ ОТКРЫТА для {symbol}")
-                                self.logger.info(f"POSITION SUCCESSFULLY OPENED for {symbol}")
-                            else:
-                                print(f"   ❌ ОШИБКА ОТКРЫТИЯ ПОЗИЦИИ для {symbol}")
-                                self.logger.error(f"FAILED TO OPEN POSITION for {symbol}")
-                        except Exception as e:
-                            print(f"   💥 КРИТИЧЕСКАЯ ОШИБКА при открытии {symbol}: {e}")
-                            self.logger.error(f"CRITICAL ERROR opening position for {symbol}: {e}")
-
-                    # Логируем в дневник
-                    self._log_to_diary(symbol, result)
-
-                    # Обновляем статистику стратегии
-                    if hasattr(self.strategy, 'update_stats') and result.get('pnl'):
-                        self.strategy.update_stats(result)
-
-                    self.update_performance(result)
-                else:
-                    self.logger.debug(f"No action for {symbol}")
-                    print(f"⏸️  No action for {symbol}")
-                    # Простое логирование без вызова несуществующего метода
-                    if hasattr(self.strategy, 'last_signal_time') and self.strategy.last_signal_time:
-                        time_since_last = (datetime.now() - self.strategy.last_signal_time).total_seconds()
-                        self.logger.debug(f"Time since last signal for {symbol}: {time_since_last:.0f}s")
+                execution_start = time.perf_counter()
+                self._handle_strategy_result(symbol, evaluation['result'])
+                stage_timings['execution'] += time.perf_counter() - execution_start
                 successful_pairs += 1
 
                 # Небольшая пауза между парами
                 time.sleep(1)
 
             except Exception as e:
-                self.logger.error(f"Error processing {symbol}: {e}", exc_info=True)
-                print(f"❌ Error processing {symbol}: {e}")
+                self.logger.error("Error processing %s: %s", symbol, e, exc_info=True)
+                echo("❌ Error processing %s: %s", symbol, e)
 
-        cycle_duration = (datetime.now() - cycle_start).total_seconds()
-        self.logger.info(
-            f"Processed {successful_pairs}/{len(TradingConfig.TRADING_PAIRS)} pairs in {cycle_duration:.2f}s")
-        print(f"\n✅ Processed {successful_pairs}/{len(TradingConfig.TRADING_PAIRS)} pairs in {cycle_duration:.2f}s")
+        return successful_pairs
 
-        # Простое логирование завершения цикла
-        self.logger.info(
-            f"Торговый цикл #{self.cycle_count} завершен: {successful_pairs}/{len(TradingConfig.TRADING_PAIRS)} пар за {cycle_duration:.2f}с")
+    def _process_pairs_concurrently(self, account_balance: float, stage_timings: Dict[str, float]) -> int:
+        """
+        Параллельная обработка торговых пар
+
+        Получение данных и выполнение стратегии идут в пуле потоков под общим
+        rate limit DataFetcher. Размещение ордеров выполняется последовательно
+        в основном потоке через PositionManager.
+        """
+        symbols = list(TradingConfig.TRADING_PAIRS.keys())
+        if not symbols:
+            return 0
+
+        max_workers = max(1, min(TradingConfig.CONCURRENCY_SETTINGS.get('max_workers', 4), len(symbols)))
+        symbol_timeout = TradingConfig.CONCURRENCY_SETTINGS.get('symbol_timeout', 60)
+
+        self.logger.info("Processing %d pairs concurrently with %d workers", len(symbols), max_workers)
+        echo("\n⚡ Parallel processing of %d pairs (%d workers)...", len(symbols), max_workers)
+
+        evaluations = {}
+        analysis_start = time.perf_counter()
+
+        # Общий срок на все пары: symbol_timeout на каждую волну из max_workers пар
+        deadline = symbol_timeout * -(-len(symbols) // max_workers)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pair")
+        try:
+            futures = {executor.submit(self._evaluate_symbol, symbol, account_balance): symbol
+                       for symbol in symbols}
+            done, not_done = wait(futures, timeout=deadline)
+        finally:
+            # Зависшие потоки не задерживают цикл: не начатые задачи отменяются, выполняемые не ожидаются
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for future in done:
+            symbol = futures[future]
+            try:
+                evaluations[symbol] = future.result()
+            except Exception as e:
+                self.logger.error("Error processing %s: %s", symbol, e, exc_info=True)
+                echo("❌ Error processing %s: %s", symbol, e)
+
+        pending = {futures[future] for future in not_done}
+        timed_out = [symbol for symbol in symbols if symbol in pending]
+        if timed_out:
+            self.logger.error("Timeout processing %s (cycle deadline %ss)", ', '.join(timed_out), deadline)
+            echo("❌ Timeout processing %s", ', '.join(timed_out))
+
+        stage_timings['analysis'] = time.perf_counter() - analysis_start
+        stage_timings['fetch'] = sum(e['fetch_time'] for e in evaluations.values())
+        stage_timings['strategy'] = sum(e['strategy_time'] for e in evaluations.values())
+
+        # Исполнение результатов - строго последовательно и в порядке конфигурации
+        successful_pairs = 0
+        execution_start = time.perf_counter()
+
+        for symbol in symbols:
+            evaluation = evaluations.get(symbol)
+            if evaluation is None:
+                continue
+
+            try:
+                echo("\n🔍 %s (fetch %.2fs, strategy %.2fs)",
+                     symbol, evaluation['fetch_time'], evaluation['strategy_time'])
+
+                if not evaluation['market_data']:
+                    self.logger.warning("No market data for %s", symbol)
+                    echo("⚠️  No market data for %s", symbol)
+                    continue
+
+                self._handle_strategy_result(symbol, evaluation['result'])
+                successful_pairs += 1
+
+            except Exception as e:
+                self.logger.error("Error processing %s: %s", symbol, e, exc_info=True)
+                echo("❌ Error processing %s: %s", symbol, e)
+
+        stage_timings['execution'] = time.perf_counter() - execution_start
+        return successful_pairs
+
+    def _evaluate_symbol(self, symbol: str, account_balance: float) -> Dict[str, Any]:
+        """Получение рыночных данных и выполнение стратегии для одной пары (без размещения ордеров)"""
+        fetch_start = time.perf_counter()
+        market_data = self.get_market_data(symbol, account_balance)
+        fetch_time = time.perf_counter() - fetch_start
+        self.profiler.record('fetch', fetch_time, symbol)
+
+        result = None
+        strategy_time = 0.0
+        if market_data:
+            self.logger.info("Executing strategy for %s", symbol)
+            strategy_start = time.perf_counter()
+            result = self.strategy.execute(symbol, market_data)
+            strategy_time = time.perf_counter() - strategy_start
+            self.profiler.record('strategy', strategy_time, symbol)
+
+        return {
+            'symbol': symbol,
+            'market_data': market_data,
+            'result': result,
+            'fetch_time': fetch_time,
+            'strategy_time': strategy_time
+        }
+
+    def _handle_strategy_result(self, symbol: str, result: Optional[Dict[str, Any]]) -> None:
+        """Обработка результата стратегии: логирование, открытие позиции, дневник и статистика"""
+        # Добавляем детальное логирование результата стратегии
+        if result:
+            action = result.get('action', 'UNKNOWN')
+            direction = result.get('direction', 'UNKNOWN')
+            confidence = result.get('confidence', 0)
+            reasons = result.get('reasons', 'No reasons provided')
+
+            self.logger.info("Strategy result for %s: %s", symbol, action,
+                             extra={'event': 'strategy_result', 'symbol': symbol, 'action': action,
+                                    'direction': direction, 'confidence': confidence})
+            if action == 'OPEN':
+                self.logger.info("  Direction: %s", direction)
+                self.logger.info("  Confidence: %.1f%%", confidence * 100)
+                self.logger.info("  Entry Price: $%.4f", result.get('entry_price', 0))
+                self.logger.info("  Stop Loss: $%.4f", result.get('stop_loss', 0))
+                self.logger.info("  Take Profit: $%.4f", result.get('take_profit', 0))
+                self.logger.info("  Size: %s", result.get('size', 0))
+                self.logger.info("  Reasons: %s", reasons)
+            elif action == 'CLOSE':
+                self.logger.info("  Close reason: %s", result.get('reason', 'Unknown'))
+                self.logger.info("  Exit price: $%.4f", result.get('exit_price', 0))
+        else:
+            self.logger.info("No action for %s", symbol, extra={'event': 'no_action', 'symbol': symbol})
+            # Простое логирование без вызова несуществующего метода
+            if hasattr(self.strategy, 'last_signal_time') and self.strategy.last_signal_time:
+                time_since_last = (datetime.now() - self.strategy.last_signal_time).total_seconds()
+                self.logger.debug("Time since last signal for %s: %.0fs", symbol, time_since_last)
+
+        if result:
+            action = result.get('action', 'UNKNOWN')
+            echo("📋 Strategy result for %s: %s", symbol, action)
+
+            if action == 'OPEN':
+                direction = result.get('direction', 'UNKNOWN')
+                confidence = result.get('confidence', 0)
+                entry_price = result.get('entry_price', 0)
+                echo("   📈 %s signal with %.1f%% confidence", direction, confidence * 100)
+                echo("   💰 Entry: $%.4f", entry_price)
+                echo("   🛑 Stop: $%.4f", result.get('stop_loss', 0))
+                echo("   🎯 Target: $%.4f", result.get('take_profit', 0))
+                echo("   📊 Reasons: %s", result.get('reasons', 'N/A'))
+
+                # ПОПЫТКА ОТКРЫТЬ РЕАЛЬНУЮ ПОЗИЦИЮ
+                try:
+                    position_opened = self.position_manager.open_position(symbol, result)
+                    if position_opened:
+                        echo("   ✅ ПОЗИЦИЯ ОТКРЫТА для %s", symbol)
+                        self.logger.info("POSITION SUCCESSFULLY OPENED for %s", symbol)
+                    else:
+                        echo("   ❌ ОШИБКА ОТКРЫТИЯ ПОЗИЦИИ для %s", symbol)
+                        self.logger.error("FAILED TO OPEN POSITION for %s", symbol)
+                except Exception as e:
+                    echo("   💥 КРИТИЧЕСКАЯ ОШИБКА при открытии %s: %s", symbol, e)
+                    self.logger.error("CRITICAL ERROR opening position for %s: %s", symbol, e)
+
+            # Логируем в дневник
+            self._log_to_diary(symbol, result)
+
+            # Обновляем статистику стратегии
+            if hasattr(self.strategy, 'update_stats') and result.get('pnl'):
+                self.strategy.update_stats(result)
+
+            self.update_performance(result)
+        else:
+            self.logger.debug("No action for %s", symbol)
+            echo("⏸️  No action for %s", symbol)
+            # Простое логирование без вызова несуществующего метода
+            if hasattr(self.strategy, 'last_signal_time') and self.strategy.last_signal_time:
+                time_since_last = (datetime.now() - self.strategy.last_signal_time).total_seconds()
+                self.logger.debug("Time since last signal for %s: %.0fs", symbol, time_since_last)
 
     def _log_to_diary(self, symbol: str, result: Dict[str, Any]) -> None:
         """Логирование результатов в дневник трейдинга"""
         try:
             action = result.get('action')
 
-            if action == 'OPEN':
-                # Логируем открытие позиции
-                self.trading_diary.log_position_opened(
-                    symbol=symbol,
-                    direction=result.get('direction', 'UNKNOWN'),
-                    size=result.get('size', 0.0),
-                    entry_price=result.get('entry_price', 0.0),
-                    stop_loss=result.get('stop_loss'),
-                    take_profit=result.get('take_profit')
-                )
-            elif action == 'CLOSE':
-                # Логируем закрытие позиции
-                self.trading_diary.log_position_closed(
-                    symbol=symbol,
-                    close_price=result.get('exit_price', result.get('current_price', 0.0)),
-                    pnl=result.get('pnl', 0.0),
-                    fees=result.get('fees', 0.0),
-                    close_reason=result.get('reason', 'strategy_signal')
-                )
+            with self.profiler.stage('diary', symbol):
+                if action == 'OPEN':
+                    # Логируем открытие позиции
+                    self.trading_diary.log_position_opened(
+                        symbol=symbol,
+                        direction=result.get('direction', 'UNKNOWN'),
+                        size=result.get('size', 0.0),
+                        entry_price=result.get('entry_price', 0.0),
+                        stop_loss=result.get('stop_loss'),
+                        take_profit=result.get('take_profit')
+                    )
+                elif action == 'CLOSE':
+                    # Логируем закрытие позиции
+                    self.trading_diary.log_position_closed(
+                        symbol=symbol,
+                        close_price=result.get('exit_price', result.get('current_price', 0.0)),
+                        pnl=result.get('pnl', 0.0),
+                        fees=result.get('fees', 0.0),
+                        close_reason=result.get('reason', 'strategy_signal')
+                    )
 
         except Exception as e:
-            self.logger.error(f"Error logging to diary: {e}")
+            self.logger.error("Error logging to diary: %s", e)
 
     def get_market_data(self, symbol: str, account_balance: float = None) -> Optional[Dict[str, Any]]:
         """Получение рыночных данных для символа"""
         try:
-            # Рассчитываем временные рамки
-            end_time = datetime.now()
-            start_time = end_time - timedelta(days=1)
-
-            # Получаем данные свечей
-            df = self.data_fetcher.get_kline(
-                symbol=symbol,
-                interval=TradingConfig.TIMEFRAMES['primary'],
-                start_time=int(start_time.timestamp()),
-                end_time=int(end_time.timestamp())
-            )
+            timeframes = None
+            if self.timeframe_aggregator is not None:
+                # Базовые свечи (поток или кэш), старшие таймфреймы сворачиваются из них
+                if self.market_feed is not None:
+                    base_df = self.market_feed.get_candles(symbol)
+                else:
+                    base_df = self.candle_store.get_candles(symbol, self.timeframe_aggregator.base_interval)
+                views = self.timeframe_aggregator.sync(symbol, base_df)
+                timeframes = {role: views.get(str(interval)) for role, interval in TradingConfig.TIMEFRAMES.items()}
+                df = timeframes.get('primary')
+            elif self.market_feed is not None:
+                # Свечи из потока (REST при разрыве или потере соединения)
+                df = self.market_feed.get_candles(symbol)
+            elif self.candle_store is not None:
+                # Инкрементальное обновление кэша свечей
+                df = self.candle_store.get_candles(symbol, TradingConfig.TIMEFRAMES['primary'])
+            else:
+                # Рассчитываем временные рамки
+                end_time = datetime.now()
+                start_time = end_time - timedelta(days=1)
+
+                # Получаем данные свечей
+                df = self.data_fetcher.get_kline(
+                    symbol=symbol,
+                    interval=TradingConfig.TIMEFRAMES['primary'],
+                    start_time=int(start_time.timestamp()),
+                    end_time=int(end_time.timestamp())
+                )
 
             if df is None or len(df) == 0:
-                self.logger.warning(f"No kline data for {symbol}")
+                self.logger.warning("No kline data for %s", symbol)
                 return None
 
+            # Новые закрытые свечи пары обновляют ковариацию портфеля (RiskManager._check_correlation)
+            if TradingConfig.PORTFOLIO_RISK_SETTINGS.get('enabled', True):
+                get_portfolio_risk_engine().observe(symbol, df)
+
             # Получаем баланс если не передан
             if account_balance is None:
                 account_balance = self.data_fetcher.get_account_balance()
                 if account_balance is None:
                     account_balance = 0.0
 
-            return {
+            market_data = {
                 "df": df,
                 "symbol": symbol,
                 "account_balance": account_balance,
                 "timestamp": datetime.now()
             }
+            if timeframes is not None:
+                # Свечи по ролям TIMEFRAMES: primary, trend, confirmation, long_term
+                market_data["timeframes"] = timeframes
+            return market_data
 
         except Exception as e:
-            self.logger.error(f"Error getting market data for {symbol}: {e}", exc_info=True)
+            self.logger.error("Error getting market data for %s: %s", symbol, e, exc_info=True)
             return None
 
     def update_positions(self, symbol: str):
@@ -489,29 +810,33 @@ class TradingBot:
         try:
             position = self.position_manager.get_position_status(symbol)
             if position:
-                current_price = self.data_fetcher.get_current_price(symbol)
+                if self.market_feed is not None:
+                    current_price = self.market_feed.get_last_price(symbol)
+                else:
+                    current_price = self.data_fetcher.get_current_price(symbol)
                 if current_price is not None:
+                    self.ticker_cache.update(symbol, current_price)
                     old_stop = position.get('stop_loss', 0)
                     self.position_manager.update_trailing_stop(symbol, current_price)
 
                     # Логируем изменения трейлинг-стопа
                     new_position = self.position_manager.get_position_status(symbol)
                     if new_position and new_position.get('stop_loss', 0) != old_stop:
-                        self.logger.info(
-                            f"Trailing stop updated for {symbol}: {old_stop:.4f} -> {new_position['stop_loss']:.4f}")
+                        self.logger.info("Trailing stop updated for %s: %.4f -> %.4f",
+                                         symbol, old_stop, new_position['stop_loss'])
 
         except Exception as e:
-            self.logger.error(f"Error updating positions for {symbol}: {e}", exc_info=True)
+            self.logger.error("Error updating positions for %s: %s", symbol, e, exc_info=True)
 
     def update_performance(self, result: Dict[str, Any]):
         """Обновление статистики производительности"""
         try:
             if result.get("action") == "CLOSE":
                 self.performance_tracker.log_trade(result)
-                self.logger.info(f"Trade logged: {result}")
+                self.logger.info("Trade logged: %s", result)
 
         except Exception as e:
-            self.logger.error(f"Error updating performance: {e}", exc_info=True)
+            self.logger.error("Error updating performance: %s", e, exc_info=True)
 
     def get_bot_status(self) -> Dict[str, Any]:
         """Получение статуса бота"""
@@ -522,7 +847,8 @@ class TradingBot:
             "uptime": datetime.now() - self.last_heartbeat if self.last_heartbeat else None,
             "trading_pairs": list(TradingConfig.TRADING_PAIRS.keys()),
             "strategy_name": self.strategy.name if hasattr(self.strategy, 'name') else "MultiIndicatorStrategy",
-            "last_validation": getattr(self, 'last_validation_result', None)
+            "last_validation": getattr(self, 'last_validation_result', None),
+            "startup_seconds": self.startup_seconds
         }
 
     def run_strategy_validation(self, strict_mode: bool = True) -> dict:
@@ -548,6 +874,34 @@ class TradingBot:
             self.logger.error(f"Error running strategy validation: {e}")
             return {'error': str(e)}
 
+    def run_backtest(self, days: int = 30) -> dict:
+        """Бэктест текущей стратегии на свечах из локального хранилища истории"""
+        try:
+            interval = TradingConfig.TIMEFRAMES['primary']
+            end_time = datetime.now()
+            start_time = end_time - timedelta(days=days)
+
+            candles = Backtester.load_candles(
+                KlineHistoryStore(), list(TradingConfig.TRADING_PAIRS.keys()), interval,
+                int(start_time.timestamp()), int(end_time.timestamp())
+            )
+            if not candles:
+                print("⚠️  No stored history for backtest. Run utils/download_history.py first")
+                return {'error': 'No stored history'}
+
+            print(f"🧪 Backtesting {self.strategy.name} on {', '.join(candles)} ({days} days, interval {interval})")
+            # Отдельный трекер в памяти: сделки бэктеста не попадают в базу реальных сделок
+            result = Backtester(self.strategy).run(candles)
+            if result.get('success'):
+                print(f"✅ Backtest: {result['trades']} trades, return {result['return_pct']:+.2f}%, "
+                      f"max drawdown {result['max_drawdown_pct']:.2f}%, "
+                      f"{result['bars']} bars in {result['duration']:.1f}s")
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Error running backtest: {e}", exc_info=True)
+            return {'error': str(e)}
+
     def get_strategy_performance(self) -> dict:
         """Получение статистики производительности стратегии"""
         try:
@@ -569,21 +923,22 @@ class TradingBot:
             self.logger.info("Stopping trading bot...")
             print("\n🛑 Stopping trading bot...")
 
-            # Закрываем все открытые позиции
+            if getattr(self, 'market_feed', None) is not None:
+                self.market_feed.stop()
+
+            # Закрываем все открытые позиции (ордера уходят одновременно через конвейер OrderManager)
             print("📤 Closing all open positions...")
             closed_positions = 0
 
-            for symbol in TradingConfig.TRADING_PAIRS:
-                try:
-                    position = self.position_manager.get_position_status(symbol)
-                    if position:
-                        self.logger.info(f"Closing position for {symbol}")
-                        self.position_manager.close_position(symbol, "bot_shutdown")
-                        closed_positions += 1
-                        print(f"✅ Closed position for {symbol}")
-                except Exception as e:
-                    self.logger.error(f"Error closing position for {symbol}: {e}")
-                    print(f"❌ Error closing position for {symbol}: {e}")
+            for symbol, closed in self.position_manager.close_all_positions("bot_shutdown").items():
+                if closed:
+                    closed_positions += 1
+                    print(f"✅ Closed position for {symbol}")
+                else:
+                    print(f"❌ Error closing position for {symbol}")
+
+            self.order_manager.shutdown()
+            self.profiler.stop()
 
             if closed_positions > 0:
                 print(f"📊 Closed {closed_positions} positions")
@@ -605,6 +960,7 @@ class TradingBot:
 
             print("🏁 Trading bot stopped successfully")
             self.logger.info("Trading bot stopped successfully")
+            get_log_pipeline().flush()  # Записать очередь логов до выхода процесса
 
         except Exception as e:
             self.logger.error(f"Error stopping bot: {e}", exc_info=True)
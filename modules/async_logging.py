@@ -0,0 +1,238 @@
+import atexit
+import logging
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, List, Optional
+from config.trading_config import TradingConfig
+
+
+class BatchingFileHandler(logging.FileHandler):
+    """
+    Файловый обработчик с пакетным сбросом буфера
+
+    Записи попадают в буфер файла, flush() выполняется раз в flush_every записей;
+    остаток сбрасывает force_flush() (поток записи вызывает его, когда очередь пуста).
+    """
+
+    def __init__(self, filename, flush_every: int = 100, encoding: str = 'utf-8'):
+        super().__init__(filename, encoding=encoding)
+        self.flush_every = max(1, flush_every)
+        self._unflushed = 0
+
+    def flush(self) -> None:
+        # StreamHandler.emit вызывает flush() после каждой записи
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.force_flush()
+
+    def force_flush(self) -> None:
+        self._unflushed = 0
+        super().flush()
+
+    def close(self) -> None:
+        self.force_flush()
+        super().close()
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler без форматирования в потоке вызова
+
+    Стандартный prepare() собирает сообщение (msg % args) и traceback до постановки в очередь;
+    здесь запись уходит как есть, вместе с именем логгера-маршрута, и форматируется
+    потоком записи. Аргументы логируются по ссылке - изменяемые объекты не стоит менять
+    сразу после вызова logger.info("%s", obj).
+    """
+
+    def __init__(self, log_queue, route: str):
+        super().__init__(log_queue)
+        self.route = route
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait((self.route, record))
+
+
+class _RoutingListener(QueueListener):
+    """Поток записи: раздает записи обработчикам своего логгера, сбрасывает буферы при пустой очереди"""
+
+    def __init__(self, log_queue, routes: Dict[str, List[logging.Handler]]):
+        super().__init__(log_queue)
+        self.routes = routes
+        self.handled = 0
+        self.errors = 0
+
+    def dequeue(self, block: bool):
+        if block and self.queue.empty():
+            self.flush_handlers()
+        return self.queue.get(block)
+
+    def handle(self, item) -> None:
+        route, record = item
+        if route is None:  # Метка LogPipeline.flush(): все записи до нее уже обработаны
+            self.flush_handlers()
+            record.set()
+            return
+        for handler in self.routes.get(route, ()):
+            if record.levelno >= handler.level:
+                try:
+                    handler.handle(record)
+                except Exception:
+                    self.errors += 1
+        self.handled += 1
+
+    def flush_handlers(self) -> None:
+        for handlers in list(self.routes.values()):
+            for handler in handlers:
+                try:
+                    if isinstance(handler, BatchingFileHandler):
+                        handler.force_flush()
+                    else:
+                        handler.flush()
+                except Exception:
+                    self.errors += 1
+
+
+class LogPipeline:
+    """
+    Неблокирующее логирование бота: QueueHandler -> очередь -> QueueListener
+
+    Логгер, подключенный через attach(), получает единственный обработчик LazyQueueHandler:
+    вызов logger.info() в торговом потоке только кладет запись в очередь. Файлы и консоль
+    пишет фоновый поток, буферы файлов сбрасываются пачками и когда очередь опустела.
+    В тихом режиме (quiet_console) консоль получает только WARNING и выше, а echo() ничего не выводит.
+    При async=False обработчики подключаются к логгерам напрямую, как раньше.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            settings: Переопределения TradingConfig.LOGGING_SETTINGS
+        """
+        self.settings = {**TradingConfig.LOGGING_SETTINGS, **(settings or {})}
+        self.is_async = self.settings['async']
+        self.quiet = self.settings['quiet_console']
+        self.console_level = logging.WARNING if self.quiet else logging.getLevelName(self.settings['console_level'])
+
+        self.queue = queue.SimpleQueue()
+        self.routes: Dict[str, List[logging.Handler]] = {}
+        self.listener = _RoutingListener(self.queue, self.routes)
+        self._lock = threading.Lock()
+        self._started = False
+
+        # Отдельный логгер вне иерархии logging: вывод echo() не попадает в файлы и корневой логгер
+        self._console = logging.Logger('trading_bot.console', logging.INFO)
+        self.attach(self._console, self.console_handler(logging.Formatter('%(message)s')))
+
+    def start(self) -> None:
+        with self._lock:
+            if self.is_async and not self._started:
+                self.listener.start()
+                self._started = True
+
+    def stop(self) -> None:
+        """Запись оставшихся сообщений и остановка потока записи"""
+        with self._lock:
+            if self._started:
+                self.listener.stop()  # Дожидается обработки всей очереди
+                self._started = False
+            self.listener.flush_handlers()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Ожидание записи всех сообщений, поставленных в очередь до вызова"""
+        if not self._started:
+            self.listener.flush_handlers()
+            return True
+        done = threading.Event()
+        self.queue.put_nowait((None, done))
+        return done.wait(timeout)
+
+    def file_handler(self, path, formatter: logging.Formatter, level: int = logging.INFO) -> logging.Handler:
+        """Файловый обработчик: пакетный сброс при асинхронной записи, обычный FileHandler иначе"""
+        if self.is_async:
+            handler = BatchingFileHandler(path, flush_every=self.settings['flush_every'])
+        else:
+            handler = logging.FileHandler(path, encoding='utf-8')
+        handler.setFormatter(formatter)
+        handler.setLevel(level)
+        return handler
+
+    def console_handler(self, formatter: logging.Formatter, stream=None) -> logging.Handler:
+        """Консольный обработчик с уровнем режима консоли"""
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(formatter)
+        handler.setLevel(self.console_level)
+        return handler
+
+    def attach(self, logger: logging.Logger, *handlers: logging.Handler) -> logging.Logger:
+        """Замена обработчиков логгера на запись через очередь"""
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+            if not isinstance(handler, QueueHandler):
+                handler.close()
+
+        if not self.is_async:
+            for handler in handlers:
+                logger.addHandler(handler)
+            return logger
+
+        with self._lock:
+            for handler in self.routes.get(logger.name, ()):
+                handler.close()
+            self.routes[logger.name] = list(handlers)
+        logger.addHandler(LazyQueueHandler(self.queue, logger.name))
+        self.start()
+        return logger
+
+    def attach_root(self) -> None:
+        """Перевод обработчиков корневого логгера (logging.basicConfig) на очередь"""
+        root = logging.getLogger()
+        handlers = [handler for handler in root.handlers if not isinstance(handler, QueueHandler)]
+        if not handlers:
+            return
+        for handler in handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(max(handler.level, self.console_level))
+        root.handlers = [handler for handler in root.handlers if handler not in handlers]
+        self.attach(root, *handlers)
+
+    def echo(self, message: str, *args) -> None:
+        """
+        Вывод в консоль вместо print() в торговом цикле
+
+        Строка собирается (message % args) и печатается потоком записи; в тихом режиме - ничего.
+        """
+        if not self.quiet:
+            self._console.info(message, *args)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'async': self.is_async,
+            'quiet': self.quiet,
+            'queued': self.queue.qsize(),
+            'handled': self.listener.handled,
+            'errors': self.listener.errors
+        }
+
+
+_shared_pipeline: Optional[LogPipeline] = None
+_shared_lock = threading.Lock()
+
+
+def get_log_pipeline() -> LogPipeline:
+    """Общий экземпляр LogPipeline процесса (очередь дописывается при выходе)"""
+    global _shared_pipeline
+    with _shared_lock:
+        if _shared_pipeline is None:
+            _shared_pipeline = LogPipeline()
+            atexit.register(_shared_pipeline.stop)
+        return _shared_pipeline
+
+
+def echo(message: str, *args) -> None:
+    """Консольный вывод через общий LogPipeline"""
+    get_log_pipeline().echo(message, *args)
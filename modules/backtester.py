@@ -0,0 +1,423 @@
+import logging
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Callable
+from config.trading_config import TradingConfig
+from modules.indicator_engine import get_indicator_engine
+from modules.performance_tracker import PerformanceTracker
+
+
+class BacktestOrderManager:
+    """
+    Симулятор OrderManager для бэктеста
+
+    Ордера исполняются мгновенно по цене, выставленной движком (set_price),
+    с проскальзыванием против сделки и комиссией тейкера.
+    """
+
+    def __init__(self, taker_fee: float, slippage: float):
+        self.logger = logging.getLogger(__name__)
+        self.taker_fee = taker_fee
+        self.slippage = slippage
+        self.prices: Dict[str, float] = {}
+        self.order_history: List[Dict[str, Any]] = []
+        self._order_seq = 0
+
+    def set_price(self, symbol: str, price: float) -> None:
+        """Цена, по которой исполнится следующий ордер символа"""
+        self.prices[symbol] = price
+
+    def _fill(self, symbol: str, side: str, quantity: float) -> Dict[str, Any]:
+        reference = self.prices[symbol]
+        price = reference * (1 + self.slippage) if side == 'BUY' else reference * (1 - self.slippage)
+        self._order_seq += 1
+        order = {
+            'success': True,
+            'order_id': f"bt-{self._order_seq}",
+            'symbol': symbol,
+            'side': side,
+            'quantity': quantity,
+            'price': price,
+            'fee': price * quantity * self.taker_fee,
+            'slippage_cost': abs(price - reference) * quantity
+        }
+        self.order_history.append(order)
+        return order
+
+    def place_order(self, symbol: str, side: str, quantity: float, price: float = None,
+                    stop_loss: float = None, take_profit: float = None, **kwargs) -> Optional[Dict[str, Any]]:
+        return self._fill(symbol, side, quantity)
+
+    def close_position(self, symbol: str, side: str, quantity: float) -> Optional[Dict[str, Any]]:
+        return self._fill(symbol, side, quantity)
+
+    def update_stop_loss(self, symbol: str, order_id: str, new_stop_loss: float) -> Optional[Dict[str, Any]]:
+        return {'success': True, 'order_id': order_id, 'stop_loss': new_stop_loss}
+
+    def cancel_order(self, symbol: str, order_id: str) -> bool:
+        return True
+
+    def get_open_orders(self, symbol: str = None) -> Dict[str, Dict[str, Any]]:
+        return {}
+
+
+class BacktestPositionManager:
+    """
+    Симулятор PositionManager для бэктеста
+
+    Повторяет интерфейс PositionManager, которым пользуются стратегии, но время
+    берется из движка (метка текущей свечи), а P&L считается по ценам исполнения.
+    """
+
+    def __init__(self, order_manager: BacktestOrderManager, max_positions: int,
+                 on_close: Callable[[Dict[str, Any]], None] = None):
+        self.logger = logging.getLogger(__name__)
+        self.order_manager = order_manager
+        self.max_positions = max_positions
+        self.on_close = on_close
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.current_time: Optional[datetime] = None
+
+    def open_position(self, symbol: str, signal: Dict[str, Any]) -> bool:
+        if symbol in self.positions or len(self.positions) >= self.max_positions:
+            return False
+        if signal.get('size', 0) <= 0 or signal.get('direction') not in ('BUY', 'SELL'):
+            return False
+
+        order = self.order_manager.place_order(symbol, signal['direction'], signal['size'])
+        self.positions[symbol] = {
+            'direction': signal['direction'],
+            'size': signal['size'],
+            'entry_price': order['price'],
+            'stop_loss': signal.get('stop_loss') or 0.0,
+            'take_profit': signal.get('take_profit') or 0.0,
+            'order_id': order['order_id'],
+            'open_time': self.current_time,
+            'leverage': TradingConfig.TRADING_PAIRS.get(symbol, {}).get('leverage', 1),
+            'atr': signal.get('atr', 0),
+            'trailing_stop_enabled': True,
+            'initial_stop_loss': signal.get('stop_loss') or 0.0,
+            'entry_fee': order['fee'],
+            'entry_slippage': order['slippage_cost']
+        }
+        return True
+
+    def close_position(self, symbol: str, reason: str, current_price: float = None) -> bool:
+        position = self.positions.get(symbol)
+        if position is None:
+            return False
+
+        if current_price is not None:
+            self.order_manager.set_price(symbol, current_price)
+        close_side = 'SELL' if position['direction'] == 'BUY' else 'BUY'
+        order = self.order_manager.close_position(symbol, close_side, position['size'])
+
+        direction = 1 if position['direction'] == 'BUY' else -1
+        pnl = (order['price'] - position['entry_price']) * position['size'] * direction
+        trade = {
+            'symbol': symbol,
+            'direction': position['direction'],
+            'size': position['size'],
+            'entry_price': position['entry_price'],
+            'exit_price': order['price'],
+            'pnl': pnl,
+            'fees': position['entry_fee'] + order['fee'],
+            'slippage': position['entry_slippage'] + order['slippage_cost'],
+            'entry_time': position['open_time'],
+            'exit_time': self.current_time,
+            'timestamp': self.current_time,
+            'duration': self.current_time - position['open_time'],
+            'close_reason': reason
+        }
+        del self.positions[symbol]
+
+        if self.on_close:
+            self.on_close(trade)
+        return True
+
+    def update_trailing_stop(self, symbol: str, current_price: float, strategy=None) -> None:
+        """Трейлинг-стоп: логика стратегии или 2x ATR, стоп двигается только в сторону прибыли"""
+        position = self.positions.get(symbol)
+        if position is None or not position.get('trailing_stop_enabled'):
+            return
+
+        if strategy is not None and hasattr(strategy, 'update_trailing_stop'):
+            new_stop = strategy.update_trailing_stop(position, current_price)
+        elif position.get('atr', 0) > 0:
+            distance = position['atr'] * 2.0
+            new_stop = current_price - distance if position['direction'] == 'BUY' else current_price + distance
+        else:
+            return
+
+        if not new_stop:
+            return
+        if position['direction'] == 'BUY' and new_stop > position['stop_loss']:
+            position['stop_loss'] = new_stop
+        elif position['direction'] == 'SELL' and (position['stop_loss'] <= 0 or new_stop < position['stop_loss']):
+            position['stop_loss'] = new_stop
+
+    def get_position_status(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.positions.get(symbol)
+
+    def get_all_positions(self) -> Dict[str, Dict[str, Any]]:
+        return self.positions.copy()
+
+    def has_position(self, symbol: str) -> bool:
+        return symbol in self.positions
+
+    def get_position_count(self) -> int:
+        return len(self.positions)
+
+    def validate_position_limits(self) -> bool:
+        return len(self.positions) < self.max_positions
+
+    def calculate_pnl(self, symbol: str, current_price: float) -> float:
+        position = self.positions.get(symbol)
+        if position is None:
+            return 0.0
+        direction = 1 if position['direction'] == 'BUY' else -1
+        return (current_price - position['entry_price']) * position['size'] * direction
+
+    def get_total_exposure(self) -> float:
+        return sum(p['entry_price'] * p['size'] for p in self.positions.values())
+
+
+class Backtester:
+    """
+    Событийный бэктест стратегий на исторических свечах
+
+    Свечи всех символов воспроизводятся по одной в порядке времени. На каждой свече:
+        1. исполняются ордера, решенные на предыдущей свече (по цене open);
+        2. проверяются стоп-лосс и тейк-профит по high/low (при касании обоих - стоп);
+        3. обновляется трейлинг-стоп по close;
+        4. вызывается strategy.execute() с окном последних `window` свечей.
+    Закрытые сделки записываются в PerformanceTracker.
+
+    Индикаторы с конечным окном (SMA, Bollinger, Stochastic, ...) берутся из
+    IndicatorEngine.preload(): они считаются один раз по всей истории символа.
+    Рекурсивные (EMA, RSI, MACD, ATR, ADX) считаются по окну на каждой свече, чтобы
+    значения совпадали с торговлей, поэтому их стоимость растет с размером окна.
+    Стратегии с векторным режимом (preload_signals) так же заранее считают сигналы.
+    """
+
+    def __init__(self, strategy, settings: Dict[str, Any] = None,
+                 performance_tracker: PerformanceTracker = None):
+        """
+        Args:
+            strategy: Экземпляр стратегии (BaseStrategy)
+            settings: Переопределения TradingConfig.BACKTEST_SETTINGS
+            performance_tracker: Трекер для результатов (по умолчанию новый)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.strategy = strategy
+        self.settings = {**TradingConfig.BACKTEST_SETTINGS, **(settings or {})}
+        self.performance_tracker = performance_tracker or PerformanceTracker()
+
+        self.order_manager = BacktestOrderManager(self.settings['taker_fee'], self.settings['slippage'])
+        self.position_manager = BacktestPositionManager(
+            self.order_manager, self.settings['max_positions'], on_close=self._on_trade_closed)
+        self.balance = float(self.settings['initial_balance'])
+        self.trades: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def load_candles(store, symbols: List[str], interval: str, start_time: int = None,
+                     end_time: int = None) -> Dict[str, pd.DataFrame]:
+        """Свечи из KlineHistoryStore для списка символов (пропускает символы без данных)"""
+        candles = {}
+        for symbol in symbols:
+            df = store.read(symbol, interval, start_time, end_time)
+            if df is not None and len(df) > 0:
+                candles[symbol] = df
+        return candles
+
+    @staticmethod
+    def _time_keys(timestamps: pd.Series) -> np.ndarray:
+        """Метки времени как int64 (нс для datetime) для общей шкалы событий"""
+        if pd.api.types.is_datetime64_any_dtype(timestamps):
+            return pd.DatetimeIndex(timestamps).as_unit('ns').asi8
+        return timestamps.to_numpy(dtype=np.int64)
+
+    def _on_trade_closed(self, trade: Dict[str, Any]) -> None:
+        self.balance += trade['pnl'] - trade['fees']
+        self.trades.append(trade)
+        self.performance_tracker.log_trade(trade)
+
+    def _check_exits(self, symbol: str, position: Dict[str, Any], bar_open: float,
+                     bar_high: float, bar_low: float) -> None:
+        """Стоп-лосс / тейк-профит внутри свечи (гэп через уровень исполняется по open)"""
+        stop, target = position['stop_loss'], position['take_profit']
+
+        if position['direction'] == 'BUY':
+            if stop > 0 and bar_low <= stop:
+                self.position_manager.close_position(symbol, 'stop_loss', min(bar_open, stop))
+            elif target > 0 and bar_high >= target:
+                self.position_manager.close_position(symbol, 'take_profit', max(bar_open, target))
+        else:
+            if stop > 0 and bar_high >= stop:
+                self.position_manager.close_position(symbol, 'stop_loss', max(bar_open, stop))
+            elif target > 0 and bar_low <= target:
+                self.position_manager.close_position(symbol, 'take_profit', min(bar_open, target))
+
+    def _execute_pending(self, symbol: str, action: Dict[str, Any], bar_open: float) -> None:
+        """Исполнение решения стратегии с предыдущей свечи по open текущей"""
+        self.order_manager.set_price(symbol, bar_open)
+        if action.get('action') == 'OPEN' and not self.position_manager.has_position(symbol):
+            signal = dict(action)
+            # Уровни переносятся на фактическую цену входа с сохранением расстояний
+            planned_entry = signal.get('entry_price') or bar_open
+            shift = bar_open - planned_entry
+            for level in ('stop_loss', 'take_profit'):
+                if signal.get(level):
+                    signal[level] = signal[level] + shift
+            self.position_manager.open_position(symbol, signal)
+        elif action.get('action') == 'CLOSE' and self.position_manager.has_position(symbol):
+            self.position_manager.close_position(symbol, action.get('reason', 'strategy_signal'))
+
+    def run(self, candles: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+        """
+        Запуск бэктеста
+
+        Args:
+            candles: {symbol: DataFrame [timestamp, open, high, low, close, volume]}
+
+        Returns:
+            Dict: Итоги (баланс, доходность, сделки, метрики PerformanceTracker)
+        """
+        started = time.perf_counter()
+        window = self.settings['window']
+        engine = get_indicator_engine()
+
+        frames, arrays = {}, {}
+        for symbol, df in candles.items():
+            if df is None or len(df) <= window:
+                self.logger.warning(f"Not enough candles for {symbol}: {0 if df is None else len(df)} <= {window}")
+                continue
+            df = df.sort_values('timestamp').reset_index(drop=True)
+            frames[symbol] = df
+            arrays[symbol] = {
+                'timestamp': df['timestamp'].tolist(),
+                'time_key': self._time_keys(df['timestamp']),
+                'open': df['open'].to_numpy(dtype=np.float64),
+                'high': df['high'].to_numpy(dtype=np.float64),
+                'low': df['low'].to_numpy(dtype=np.float64),
+                'close': df['close'].to_numpy(dtype=np.float64)
+            }
+
+        if not frames:
+            return {'success': False, 'error': 'No candles to replay'}
+
+        # Общая шкала времени: свечи всех символов по метке, при равных метках - в порядке символов
+        symbols = list(arrays)
+        time_keys = np.concatenate([arrays[s]['time_key'] for s in symbols])
+        symbol_ids = np.concatenate([np.full(len(arrays[s]['time_key']), n) for n, s in enumerate(symbols)])
+        bar_ids = np.concatenate([np.arange(len(arrays[s]['time_key'])) for s in symbols])
+        order = np.lexsort((symbol_ids, time_keys))
+        events = zip(symbol_ids[order].tolist(), bar_ids[order].tolist())
+
+        saved_position_manager = getattr(self.strategy, 'position_manager', None)
+        saved_signal_time = getattr(self.strategy, 'last_signal_time', None)
+        saved_clock = getattr(self.strategy, 'clock', None)
+        saved_level = self.strategy.logger.level if hasattr(self.strategy, 'logger') else None
+        self.strategy.position_manager = self.position_manager
+        self.strategy.last_signal_time = None
+        # Cooldown и время в позиции стратегия считает по времени симуляции
+        self.strategy.clock = lambda: self.position_manager.current_time
+        if saved_level is not None and self.settings['quiet']:
+            self.strategy.logger.setLevel(logging.WARNING)
+        self.performance_tracker.set_initial_balance(self.balance)
+
+        pending: Dict[str, Dict[str, Any]] = {}
+        equity_times, equity_values = [], []
+        last_close: Dict[str, float] = {}
+        bars = 0
+
+        try:
+            for symbol in frames:
+                engine.preload(symbol, frames[symbol])
+                # Стратегии с векторным режимом считают сигналы по всей истории один раз
+                self.strategy.preload_signals(symbol, frames[symbol])
+
+            for symbol_id, i in events:
+                symbol = symbols[symbol_id]
+                data = arrays[symbol]
+                ts = data['timestamp'][i]
+                bar_open, bar_high, bar_low, bar_close = (
+                    data['open'][i], data['high'][i], data['low'][i], data['close'][i])
+                bar_time = ts.to_pydatetime() if isinstance(ts, pd.Timestamp) else ts
+                self.position_manager.current_time = bar_time
+                bars += 1
+
+                action = pending.pop(symbol, None)
+                if action is not None:
+                    self._execute_pending(symbol, action, bar_open)
+
+                position = self.position_manager.get_position_status(symbol)
+                if position is not None:
+                    self._check_exits(symbol, position, bar_open, bar_high, bar_low)
+                    if self.position_manager.has_position(symbol) and self.settings['trailing_stop']:
+                        self.position_manager.update_trailing_stop(symbol, bar_close, self.strategy)
+
+                if i + 1 >= window and i + 1 < len(data['close']):
+                    market_data = {
+                        'df': frames[symbol].iloc[i + 1 - window:i + 1],
+                        # Окно - срез предзагруженной истории: стратегии не ищут его по меткам времени
+                        'bounds': (i + 1 - window, i + 1),
+                        'symbol': symbol,
+                        'account_balance': self.balance,
+                        'timestamp': bar_time
+                    }
+                    result = self.strategy.execute(symbol, market_data)
+                    if result and result.get('action') in ('OPEN', 'CLOSE'):
+                        pending[symbol] = result
+
+                last_close[symbol] = bar_close
+                if self.settings['record_equity']:
+                    unrealized = sum(self.position_manager.calculate_pnl(s, last_close[s])
+                                     for s in self.position_manager.positions)
+                    equity_times.append(bar_time)
+                    equity_values.append(self.balance + unrealized)
+
+            # Закрытие оставшихся позиций по последней цене
+            for symbol in list(self.position_manager.positions):
+                self.position_manager.close_position(symbol, 'end_of_backtest', last_close[symbol])
+
+        finally:
+            for symbol in frames:
+                engine.release(symbol)
+                self.strategy.release_signals(symbol)
+            self.strategy.position_manager = saved_position_manager
+            self.strategy.last_signal_time = saved_signal_time
+            if saved_clock is not None:
+                self.strategy.clock = saved_clock
+            if saved_level is not None:
+                self.strategy.logger.setLevel(saved_level)
+
+        duration = time.perf_counter() - started
+        initial_balance = float(self.settings['initial_balance'])
+        equity_curve = pd.DataFrame({'timestamp': equity_times, 'equity': equity_values})
+        max_drawdown = 0.0
+        if equity_values:
+            equity = np.asarray(equity_values)
+            peak = np.maximum.accumulate(equity)
+            max_drawdown = float(np.max((peak - equity) / peak) * 100)
+
+        self.logger.info(f"Backtest finished: {bars} bars, {len(self.trades)} trades, "
+                         f"balance ${self.balance:.2f} in {duration:.1f}s")
+
+        return {
+            'success': True,
+            'symbols': list(frames),
+            'bars': bars,
+            'trades': len(self.trades),
+            'initial_balance': initial_balance,
+            'final_balance': self.balance,
+            'return_pct': (self.balance - initial_balance) / initial_balance * 100,
+            'max_drawdown_pct': max_drawdown,
+            'fees': sum(trade['fees'] for trade in self.trades),
+            'metrics': self.performance_tracker.get_performance_metrics(),
+            'equity_curve': equity_curve,
+            'duration': duration,
+            'bars_per_second': bars / duration if duration > 0 else 0.0
+        }
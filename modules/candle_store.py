@@ -0,0 +1,240 @@
+import logging
+import threading
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, Tuple
+from config.trading_config import TradingConfig
+
+
+# Длительность интервалов ByBit в миллисекундах
+INTERVAL_MS = {
+    '1': 60_000,
+    '3': 3 * 60_000,
+    '5': 5 * 60_000,
+    '15': 15 * 60_000,
+    '30': 30 * 60_000,
+    '60': 60 * 60_000,
+    '120': 120 * 60_000,
+    '240': 240 * 60_000,
+    '360': 360 * 60_000,
+    '720': 720 * 60_000,
+    'D': 24 * 60 * 60_000,
+    'W': 7 * 24 * 60 * 60_000,
+    'M': 30 * 24 * 60 * 60_000  # Приблизительно: месячные свечи имеют разную длину
+}
+
+
+def interval_to_ms(interval: str) -> int:
+    """Длительность интервала ByBit в миллисекундах"""
+    interval = str(interval)
+    if interval in INTERVAL_MS:
+        return INTERVAL_MS[interval]
+    # Поддержка записи вида '1h' / '4h' из конфигурации
+    if interval.endswith('h') and interval[:-1].isdigit():
+        return int(interval[:-1]) * 60 * 60_000
+    raise ValueError(f"Unsupported interval: {interval}")
+
+
+class CandleStore:
+    """
+    Хранилище свечей в памяти по ключу (symbol, interval)
+
+    Первый запрос загружает окно истории целиком, последующие - только свечи,
+    начиная с последней сохраненной (она могла быть еще не закрыта). Новые свечи
+    сливаются с историей, окно обрезается по lookback, и стратегии получают
+    готовый DataFrame без повторной загрузки всего дня на каждом цикле.
+    """
+
+    COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+    def __init__(self, data_fetcher, lookback: timedelta = None, max_bars: int = None):
+        """
+        Args:
+            data_fetcher: DataFetcher для загрузки свечей
+            lookback: Глубина хранимой истории
+            max_bars: Максимум свечей на один ключ
+        """
+        self.logger = logging.getLogger(__name__)
+        self.data_fetcher = data_fetcher
+
+        settings = TradingConfig.CANDLE_CACHE_SETTINGS
+        self.lookback = lookback or timedelta(hours=settings.get('lookback_hours', 24))
+        self.max_bars = max_bars or settings.get('max_bars', 1000)
+
+        self._candles: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        # Статистика
+        self.stats = {
+            'full_fetches': 0,
+            'incremental_fetches': 0,
+            'bars_fetched': 0,
+            'gaps_detected': 0,
+            'fetch_errors': 0
+        }
+
+        self.logger.info(f"CandleStore initialized (lookback: {self.lookback}, max bars: {self.max_bars})")
+
+    def _get_key_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        """Блокировка для отдельного ключа (параллельные пары не ждут друг друга)"""
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def get_candles(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """
+        Получение актуальных свечей для символа и интервала
+
+        Args:
+            symbol: Торговая пара
+            interval: Интервал ByBit ('1', '5', '15', ...)
+
+        Returns:
+            DataFrame [timestamp, open, high, low, close, volume] или None
+        """
+        key = (symbol, str(interval))
+
+        with self._get_key_lock(key):
+            cached = self._candles.get(key)
+            now = datetime.now(timezone.utc)
+
+            if cached is None or cached.empty or self._is_stale(cached, now):
+                df = self._full_fetch(symbol, interval, now)
+            else:
+                df = self._incremental_fetch(symbol, interval, cached, now)
+
+            if df is None or df.empty:
+                return cached.copy() if cached is not None else None
+
+            self._candles[key] = df
+            return df.copy()
+
+    def _is_stale(self, df: pd.DataFrame, now: datetime) -> bool:
+        """История устарела целиком (например, бот был остановлен) - нужна полная загрузка"""
+        return df['timestamp'].iloc[-1] < now - self.lookback
+
+    def _full_fetch(self, symbol: str, interval: str, now: datetime) -> Optional[pd.DataFrame]:
+        """Полная загрузка окна истории"""
+        start_time = now - self.lookback
+        df = self.data_fetcher.get_kline(
+            symbol=symbol,
+            interval=interval,
+            start_time=int(start_time.timestamp()),
+            end_time=int(now.timestamp())
+        )
+
+        if df is None or df.empty:
+            self.stats['fetch_errors'] += 1
+            return None
+
+        self.stats['full_fetches'] += 1
+        self.stats['bars_fetched'] += len(df)
+        return self._trim(df[self.COLUMNS].reset_index(drop=True), now)
+
+    def _incremental_fetch(self, symbol: str, interval: str, cached: pd.DataFrame,
+                           now: datetime) -> Optional[pd.DataFrame]:
+        """Загрузка свечей начиная с последней сохраненной и слияние с историей"""
+        last_ts = cached['timestamp'].iloc[-1]
+
+        new_df = self.data_fetcher.get_kline(
+            symbol=symbol,
+            interval=interval,
+            start_time=int(last_ts.timestamp()),
+            end_time=int(now.timestamp())
+        )
+
+        if new_df is None or new_df.empty:
+            self.stats['fetch_errors'] += 1
+            return None
+
+        # Ответ ограничен limit свечей: если первая новая свеча позже последней сохраненной,
+        # между ними разрыв - перезагружаем окно целиком
+        if new_df['timestamp'].iloc[0] > last_ts:
+            self.stats['gaps_detected'] += 1
+            self.logger.warning(f"Gap detected in cached candles for {symbol} ({interval}), refetching window")
+            return self._full_fetch(symbol, interval, now)
+
+        self.stats['incremental_fetches'] += 1
+        self.stats['bars_fetched'] += len(new_df)
+
+        merged = self.merge(cached, new_df[self.COLUMNS])
+        return self._trim(merged, now)
+
+    @staticmethod
+    def merge(history: pd.DataFrame, new_bars: pd.DataFrame) -> pd.DataFrame:
+        """Слияние истории с новыми свечами: новые данные заменяют свечи с теми же и более поздними метками"""
+        if new_bars.empty:
+            return history
+        first_new = new_bars['timestamp'].iloc[0]
+        keep = history[history['timestamp'] < first_new]
+        return pd.concat([keep, new_bars], ignore_index=True)
+
+    def _trim(self, df: pd.DataFrame, now: datetime) -> pd.DataFrame:
+        """Обрезка истории по глубине и количеству свечей"""
+        df = df[df['timestamp'] >= now - self.lookback]
+        if len(df) > self.max_bars:
+            df = df.iloc[-self.max_bars:]
+        return df.reset_index(drop=True)
+
+    def get_cached(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """Свечи из кэша без обращения к API"""
+        key = (symbol, str(interval))
+        with self._get_key_lock(key):
+            cached = self._candles.get(key)
+            return cached.copy() if cached is not None else None
+
+    def apply_bar(self, symbol: str, interval: str, bar: Dict[str, Any]) -> bool:
+        """
+        Обновление кэша свечой из внешнего источника (websocket)
+
+        Args:
+            bar: Словарь с ключами timestamp, open, high, low, close, volume
+
+        Returns:
+            bool: True если свеча применена, False если между кэшем и свечой есть разрыв
+                  (кэш нужно догрузить через get_candles)
+        """
+        key = (symbol, str(interval))
+        step = pd.Timedelta(milliseconds=interval_to_ms(interval))
+
+        with self._get_key_lock(key):
+            cached = self._candles.get(key)
+            if cached is None or cached.empty:
+                return False
+
+            last_ts = cached['timestamp'].iloc[-1]
+            if bar['timestamp'] > last_ts + step:
+                return False
+            if bar['timestamp'] < last_ts:
+                # Запоздавшее обновление уже закрытой свечи
+                return True
+            if bar['timestamp'] == last_ts:
+                # Обновление формирующейся свечи на месте (наружу отдаются только копии)
+                cached.loc[cached.index[-1], self.COLUMNS[1:]] = [float(bar[c]) for c in self.COLUMNS[1:]]
+                return True
+
+            new_bar = pd.DataFrame([{column: bar[column] for column in self.COLUMNS}])
+            new_bar['timestamp'] = new_bar['timestamp'].astype(cached['timestamp'].dtype)
+            merged = self.merge(cached, new_bar)
+            self._candles[key] = self._trim(merged, datetime.now(timezone.utc))
+            return True
+
+    def invalidate(self, symbol: str = None, interval: str = None) -> None:
+        """Сброс кэша (для символа/интервала или целиком)"""
+        with self._lock:
+            if symbol is None:
+                self._candles.clear()
+                return
+            for key in list(self._candles.keys()):
+                if key[0] == symbol and (interval is None or key[1] == str(interval)):
+                    del self._candles[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика кэша"""
+        return {
+            **self.stats,
+            'cached_keys': len(self._candles),
+            'cached_bars': sum(len(df) for df in self._candles.values())
+        }
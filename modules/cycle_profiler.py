@@ -0,0 +1,358 @@
+import json
+import logging
+import os
+import threading
+import time
+import numpy as np
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from config.trading_config import TradingConfig
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек в стиле HdrHistogram
+
+    Значения хранятся в микросекундах в лог-линейных корзинах: до 2^sub_bits - по одной
+    корзине на микросекунду, дальше каждая степень двойки делится на 2^(sub_bits - 1)
+    корзин. Относительная ошибка перцентиля не больше 2^-(sub_bits - 1), запись - O(1),
+    память не зависит от числа измерений.
+    """
+
+    def __init__(self, max_seconds: float = 3600.0, sub_bits: int = 7):
+        """
+        Args:
+            max_seconds: Наибольшее записываемое значение (больше - в последнюю корзину)
+            sub_bits: Бит точности (7 - ошибка не больше 1.6%)
+        """
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.half = self.sub_count >> 1
+        self.max_value = int(max_seconds * 1_000_000)
+        self.counts = np.zeros(self._index(self.max_value) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        """Корзина для значения в микросекундах"""
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half + ((value >> shift) - self.half)
+
+    def _bucket_bounds(self, index: int) -> Tuple[int, int]:
+        """Диапазон значений корзины [lower, upper)"""
+        if index < self.sub_count:
+            return index, index + 1
+        shift = (index - self.sub_count) // self.half + 1
+        sub = (index - self.sub_count) % self.half + self.half
+        return sub << shift, (sub + 1) << shift
+
+    def record(self, seconds: float) -> None:
+        """Запись одного измерения"""
+        value = min(max(int(seconds * 1_000_000), 0), self.max_value)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Перцентиль в миллисекундах (середина корзины, не больше максимума)"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(np.ceil(q / 100 * self.count)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        lower, upper = self._bucket_bounds(index)
+        return min((lower + upper - 1) / 2, self.max) / 1000
+
+    def snapshot(self) -> Dict[str, float]:
+        """Сводка: число измерений, среднее, перцентили и максимум в миллисекундах"""
+        if self.count == 0:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count / 1000,
+            'min_ms': self.min / 1000,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'p999_ms': self.percentile(99.9),
+            'max_ms': self.max / 1000,
+            'sum_ms': self.total / 1000
+        }
+
+
+class CycleProfiler:
+    """
+    Профилирование этапов торгового цикла
+
+    Этапы (balance, fetch, indicators, strategy, risk, orders, diary, cycle) записываются
+    в гистограммы по ключу (этап, символ); 'all' - этапы уровня цикла. Этапы вложены:
+    strategy включает indicators. Запись идет только внутри cycle(), поэтому бэктесты
+    и утилиты, использующие те же модули, гистограммы не засоряют.
+
+    Снимок выгружается в JSON файл (перезапись после каждого цикла) и/или отдается
+    в текстовом формате Prometheus по HTTP. Медленные циклы (дольше slow_cycle_threshold)
+    сохраняются профилем cProfile или pyinstrument, если задан sampler. Профилировщик
+    видит только поток, в котором идет цикл (работа пула пар в параллельном режиме не
+    попадает в профиль, но попадает в гистограммы).
+    """
+
+    ALL = 'all'
+
+    def __init__(self, settings: Dict[str, Any] = None):
+        """
+        Args:
+            settings: Переопределения PROFILER_SETTINGS
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**TradingConfig.PROFILER_SETTINGS, **(settings or {})}
+        self.enabled = self.settings['enabled']
+
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._active = False
+        self.cycles = 0
+        self.slow_cycles = 0
+        self.last_cycle: Dict[str, Any] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # ------------------------------------------------------------------
+    # Запись
+    # ------------------------------------------------------------------
+
+    def record(self, stage: str, seconds: float, symbol: str = None) -> None:
+        """Запись длительности этапа (вне цикла игнорируется)"""
+        if not (self.enabled and self._active):
+            return
+        key = (stage, symbol or self.ALL)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = LatencyHistogram(self.settings['max_seconds'], self.settings['significant_bits'])
+                self._histograms[key] = histogram
+            histogram.record(seconds)
+
+    @contextmanager
+    def _timed(self, stage: str, symbol: str = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, symbol)
+
+    def stage(self, stage: str, symbol: str = None):
+        """Контекстный менеджер замера этапа"""
+        if not (self.enabled and self._active):
+            return nullcontext()
+        return self._timed(stage, symbol)
+
+    @contextmanager
+    def cycle(self, cycle_number: int = None):
+        """
+        Торговый цикл: включает запись этапов, по завершении - замер цикла,
+        профиль медленного цикла и выгрузка снимка
+        """
+        if not self.enabled:
+            yield
+            return
+
+        sampler = self._start_sampler()
+        self._active = True
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.record('cycle', duration)
+            self._active = False
+            self.cycles += 1
+            self.last_cycle = {'cycle': cycle_number, 'duration_s': round(duration, 4),
+                               'finished_at': datetime.now().isoformat()}
+
+            slow = duration > self.settings['slow_cycle_threshold']
+            if slow:
+                self.slow_cycles += 1
+                self.logger.warning(f"Slow trading cycle #{cycle_number}: {duration:.2f}s "
+                                    f"(threshold {self.settings['slow_cycle_threshold']}s)")
+            self._stop_sampler(sampler, cycle_number, save=slow)
+
+            if 'json' in self.settings['exporters']:
+                self.write_json()
+
+    # ------------------------------------------------------------------
+    # Профиль медленных циклов
+    # ------------------------------------------------------------------
+
+    def _start_sampler(self):
+        """Запуск профилировщика цикла (None если sampler не задан или недоступен)"""
+        sampler = self.settings['sampler']
+        if not sampler:
+            return None
+        if sampler == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                self.logger.warning("pyinstrument not installed, falling back to cProfile")
+            else:
+                profiler = Profiler(interval=self.settings['sample_interval'])
+                profiler.start()
+                return profiler
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _stop_sampler(self, profiler, cycle_number: Optional[int], save: bool) -> None:
+        """Остановка профилировщика и сохранение профиля медленного цикла"""
+        if profiler is None:
+            return
+        try:
+            if hasattr(profiler, 'disable'):
+                profiler.disable()
+            else:
+                profiler.stop()
+            if not save:
+                return
+
+            profile_dir = Path(self.settings['profile_dir'])
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            name = f"cycle_{cycle_number or self.cycles}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            if hasattr(profiler, 'dump_stats'):
+                path = profile_dir / f"{name}.prof"
+                profiler.dump_stats(str(path))
+            else:
+                path = profile_dir / f"{name}.html"
+                path.write_text(profiler.output_html(), encoding='utf-8')
+            self.logger.info(f"Slow cycle profile saved to {path}")
+
+            # Храним только последние max_profiles профилей
+            profiles = sorted(profile_dir.glob('cycle_*'), key=lambda p: p.stat().st_mtime)
+            for old in profiles[:-self.settings['max_profiles']]:
+                old.unlink()
+        except Exception as e:
+            self.logger.error(f"Error saving cycle profile: {e}")
+
+    # ------------------------------------------------------------------
+    # Выгрузка
+    # ------------------------------------------------------------------
+
+    def get_snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Сводка гистограмм: {stage: {symbol: {count, p50_ms, ...}}}"""
+        with self._lock:
+            snapshot: Dict[str, Dict[str, Dict[str, float]]] = {}
+            for (stage, symbol), histogram in sorted(self._histograms.items()):
+                snapshot.setdefault(stage, {})[symbol] = histogram.snapshot()
+        return snapshot
+
+    def write_json(self, path: str = None) -> bool:
+        """Атомарная перезапись JSON снимка"""
+        path = Path(path or self.settings['json_path'])
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {
+                'updated_at': datetime.now().isoformat(),
+                'cycles': self.cycles,
+                'slow_cycles': self.slow_cycles,
+                'last_cycle': self.last_cycle,
+                'stages': self.get_snapshot()
+            }
+            tmp_path = path.with_suffix(path.suffix + '.tmp')
+            tmp_path.write_text(json.dumps(payload, indent=2), encoding='utf-8')
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error writing cycle profile to {path}: {e}")
+            return False
+
+    def to_prometheus(self) -> str:
+        """Снимок в текстовом формате Prometheus (summary в секундах)"""
+        name = 'trading_bot_stage_latency_seconds'
+        lines = [f"# HELP {name} Trading cycle stage latency",
+                 f"# TYPE {name} summary"]
+        for stage, symbols in self.get_snapshot().items():
+            for symbol, stats in symbols.items():
+                if not stats['count']:
+                    continue
+                labels = f'stage="{stage}",symbol="{symbol}"'
+                for quantile, key in (('0.5', 'p50_ms'), ('0.9', 'p90_ms'), ('0.99', 'p99_ms'),
+                                      ('0.999', 'p999_ms')):
+                    lines.append(f'{name}{{{labels},quantile="{quantile}"}} {stats[key] / 1000:.6f}')
+                lines.append(f'{name}_sum{{{labels}}} {stats["sum_ms"] / 1000:.6f}')
+                lines.append(f'{name}_count{{{labels}}} {stats["count"]}')
+        lines += ["# HELP trading_bot_cycles_total Completed trading cycles",
+                  "# TYPE trading_bot_cycles_total counter",
+                  f"trading_bot_cycles_total {self.cycles}",
+                  "# HELP trading_bot_slow_cycles_total Cycles above slow_cycle_threshold",
+                  "# TYPE trading_bot_slow_cycles_total counter",
+                  f"trading_bot_slow_cycles_total {self.slow_cycles}"]
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port: int = None, host: str = None) -> bool:
+        """HTTP endpoint /metrics для Prometheus (поток-демон)"""
+        if self._server is not None:
+            return True
+        profiler = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = profiler.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host or self.settings['prometheus_host'],
+                                                self.settings['prometheus_port'] if port is None else port),
+                                               MetricsHandler)
+        except OSError as e:
+            self.logger.error(f"Failed to start metrics endpoint: {e}")
+            return False
+
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        self.logger.info(f"Prometheus metrics at http://{self._server.server_address[0]}:"
+                         f"{self._server.server_address[1]}/metrics")
+        return True
+
+    def stop(self) -> None:
+        """Остановка HTTP endpoint и финальная выгрузка JSON"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.enabled and 'json' in self.settings['exporters'] and self.cycles:
+            self.write_json()
+
+    def reset(self) -> None:
+        """Сброс гистограмм"""
+        with self._lock:
+            self._histograms.clear()
+        self.cycles = 0
+        self.slow_cycles = 0
+
+
+_shared_profiler: Optional[CycleProfiler] = None
+_shared_lock = threading.Lock()
+
+
+def get_cycle_profiler() -> CycleProfiler:
+    """Общий экземпляр CycleProfiler процесса"""
+    global _shared_profiler
+    with _shared_lock:
+        if _shared_profiler is None:
+            _shared_profiler = CycleProfiler()
+        return _shared_profiler
@@ -1,18 +1,29 @@
 import logging
 import time
+import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
 from pybit.unified_trading import HTTP
 from config.trading_config import TradingConfig
+from modules.rate_limiter import RateLimiter, get_shared_rate_limiter
 
 
 class DataFetcher:
-    def __init__(self, client: HTTP = None):
+    def __init__(self, client: HTTP = None, rate_limiter: RateLimiter = None, test_connection: bool = True):
+        """
+        Args:
+            client: Клиент ByBit (None - создать по TradingConfig)
+            rate_limiter: Общий rate limiter (None - общий экземпляр процесса)
+            test_connection: Проверочный запрос тикера при создании (False - ошибки подключения
+                проявятся при первом запросе данных)
+        """
         self.logger = logging.getLogger(__name__)
         self.retry_count = TradingConfig.MAX_RETRIES
         self.retry_delay = TradingConfig.RETRY_DELAY
-        self.rate_limit_delay = 1.0  # Задержка между запросами для избежания rate limit
+
+        # Общий rate limiter (token bucket по классам эндпоинтов), разделяемый с OrderManager
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
 
         if client is None:
             self.client = HTTP(
@@ -25,7 +36,9 @@ class DataFetcher:
             self.client = client
 
         self.testnet = TradingConfig.TESTNET
-        self.last_request_time = 0
+
+        if not test_connection:
+            return
 
         try:
             self.logger.info("Initializing ByBit client...")
@@ -34,16 +47,16 @@ class DataFetcher:
             self.logger.error(f"Failed to initialize DataFetcher: {str(e)}")
             raise
 
-    def _rate_limit_check(self):
-        """Проверка rate limit - добавляем задержку между запросами"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-
-        if time_since_last < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last
-            time.sleep(sleep_time)
+    def _rate_limit_check(self, endpoint_class: str = 'market'):
+        """Проверка rate limit - ожидание токена в общем лимитере для класса эндпоинтов"""
+        self.rate_limiter.acquire(endpoint_class)
 
-        self.last_request_time = time.time()
+    def _is_rate_limited(self, error: Any, endpoint_class: str = 'market') -> bool:
+        """Проверка ошибки на rate limit с уведомлением лимитера"""
+        if RateLimiter.is_rate_limit_error(error):
+            self.rate_limiter.report_rate_limited(endpoint_class)
+            return True
+        return False
 
     def _test_connection(self):
         """Тестирование подключения к ByBit"""
@@ -61,7 +74,8 @@ class DataFetcher:
             self.logger.error(f"Connection test failed: {e}")
             raise
 
-    def get_kline(self, symbol: str, interval: str, start_time: int, end_time: int) -> Optional[pd.DataFrame]:
+    def get_kline(self, symbol: str, interval: str, start_time: int, end_time: int,
+                  limit: int = 200) -> Optional[pd.DataFrame]:
         """
         Получение данных свечей и возврат в виде pandas DataFrame
 
@@ -69,6 +83,7 @@ class DataFetcher:
         :param interval: Интервал ('1', '5', '15', '30', '60', '240', 'D')
         :param start_time: Время начала в timestamp (секунды)
         :param end_time: Время окончания в timestamp (секунды)
+        :param limit: Максимум свечей в ответе (ByBit допускает до 1000)
         :return: DataFrame с колонками [open, high, low, close, volume] или None
         """
         # Валидация интервала
@@ -96,39 +111,22 @@ class DataFetcher:
                     interval=interval,
                     start=str(start_ms),
                     end=str(end_ms),
-                    limit=200
+                    limit=min(max(int(limit), 1), 1000)
                 )
 
                 if response.get('retCode') == 0 and response.get('result', {}).get('list'):
+                    self.rate_limiter.report_success('market')
                     klines = response['result']['list']
 
                     if not klines:
                         self.logger.warning(f"No kline data returned for {symbol}")
                         return None
 
-                    # Преобразование в DataFrame
-                    df_data = []
-                    for kline in klines:
-                        try:
-                            df_data.append({
-                                'timestamp': datetime.fromtimestamp(int(kline[0]) / 1000, tz=timezone.utc),
-                                'open': float(kline[1]),
-                                'high': float(kline[2]),
-                                'low': float(kline[3]),
-                                'close': float(kline[4]),
-                                'volume': float(kline[5])
-                            })
-                        except (ValueError, IndexError) as e:
-                            self.logger.warning(f"Error parsing kline data: {e}")
-                            continue
-
-                    if not df_data:
+                    df = self._parse_klines(klines)
+                    if df is None:
                         self.logger.warning(f"No valid kline data for {symbol}")
                         return None
 
-                    df = pd.DataFrame(df_data)
-                    df = df.sort_values('timestamp').reset_index(drop=True)
-
                     self.logger.info(f"Successfully fetched {len(df)} klines for {symbol}")
                     return df
 
@@ -136,19 +134,68 @@ class DataFetcher:
                     error_msg = response.get('retMsg', 'Unknown error')
                     self.logger.warning(f"Attempt {attempt + 1} failed for {symbol}: {error_msg}")
 
-                    # Если ошибка rate limit, увеличиваем задержку
-                    if 'rate limit' in error_msg.lower():
-                        time.sleep(self.retry_delay * 2)
-                    else:
+                    # Если ошибка rate limit, лимитер снижает скорость и выдерживает паузу сам
+                    if not self._is_rate_limited(f"{response.get('retCode')} {error_msg}", 'market'):
                         time.sleep(self.retry_delay)
 
             except Exception as e:
                 self.logger.error(f"Attempt {attempt + 1} error in get_kline for {symbol}: {e}")
-                time.sleep(self.retry_delay)
+                if not self._is_rate_limited(e, 'market'):
+                    time.sleep(self.retry_delay)
 
         self.logger.error(f"All {self.retry_count} attempts failed for {symbol}")
         return None
 
+    def _parse_klines(self, klines: List[List[str]]) -> Optional[pd.DataFrame]:
+        """
+        Преобразование списка свечей ByBit в DataFrame
+
+        ByBit возвращает свечи от новых к старым строками [start, open, high, low, close, volume, turnover].
+        Весь массив конвертируется за один проход NumPy, порядок восстанавливается разворотом.
+        """
+        try:
+            # Строки-числа конвертируются в float64 сразу, без промежуточного строкового массива
+            # (метки времени в мс точно представимы в float64)
+            raw = np.array(klines, dtype=np.float64)
+            if raw.ndim != 2 or raw.shape[1] < 6:
+                raise ValueError(f"unexpected kline payload shape {raw.shape}")
+
+            # Развернутое представление: старые свечи первыми
+            raw = raw[::-1]
+            timestamps = raw[:, 0].astype(np.int64)
+        except (ValueError, TypeError) as e:
+            # Некорректные строки в ответе - построчный разбор с пропуском ошибочных
+            self.logger.warning(f"Bulk kline parsing failed ({e}), falling back to row-by-row parsing")
+            return self._parse_klines_rowwise(klines)
+
+        # Страховка на случай изменения порядка в API
+        if len(timestamps) > 1 and not np.all(timestamps[1:] >= timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            raw, timestamps = raw[order], timestamps[order]
+
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(timestamps, unit='ms', utc=True),
+            'open': raw[:, 1],
+            'high': raw[:, 2],
+            'low': raw[:, 3],
+            'close': raw[:, 4],
+            'volume': raw[:, 5]
+        })
+
+    def _parse_klines_rowwise(self, klines: List[List[str]]) -> Optional[pd.DataFrame]:
+        """Построчный разбор свечей с пропуском некорректных строк"""
+        rows = []
+        for kline in klines:
+            try:
+                rows.append([int(kline[0])] + [float(value) for value in kline[1:6]])
+            except (ValueError, IndexError, TypeError) as e:
+                self.logger.warning(f"Error parsing kline data: {e}")
+
+        if not rows:
+            return None
+
+        return self._parse_klines(rows)
+
     def get_current_price(self, symbol: str) -> Optional[float]:
         """Получение текущей цены символа"""
         for attempt in range(self.retry_count):
@@ -158,15 +205,18 @@ class DataFetcher:
                 response = self.client.get_tickers(category="linear", symbol=symbol)
 
                 if response.get('retCode') == 0 and response.get('result', {}).get('list'):
+                    self.rate_limiter.report_success('market')
                     price = float(response['result']['list'][0]['lastPrice'])
                     self.logger.debug(f"Current price for {symbol}: {price}")
                     return price
                 else:
                     error_msg = response.get('retMsg', 'Unknown error')
                     self.logger.warning(f"Failed to get price for {symbol}: {error_msg}")
+                    self._is_rate_limited(f"{response.get('retCode')} {error_msg}", 'market')
 
             except Exception as e:
                 self.logger.error(f"Attempt {attempt + 1} error getting price for {symbol}: {e}")
+                self._is_rate_limited(e, 'market')
                 if attempt < self.retry_count - 1:
                     time.sleep(self.retry_delay)
 
@@ -177,11 +227,12 @@ class DataFetcher:
         """Получение баланса аккаунта"""
         for attempt in range(self.retry_count):
             try:
-                self._rate_limit_check()
+                self._rate_limit_check('account')
 
                 response = self.client.get_wallet_balance(accountType="UNIFIED", coin=coin)
 
                 if response.get('retCode') == 0 and response.get('result', {}).get('list'):
+                    self.rate_limiter.report_success('account')
                     wallet_list = response['result']['list']
 
                     if wallet_list and wallet_list[0].get('coin'):
@@ -199,6 +250,7 @@ class DataFetcher:
                 else:
                     error_msg = response.get('retMsg', 'Unknown error')
                     self.logger.warning(f"Failed to get balance: {error_msg}")
+                    self._is_rate_limited(f"{response.get('retCode')} {error_msg}", 'account')
 
                     # Для TESTNET возвращаем фиксированный баланс при ошибках
                     if self.testnet:
@@ -212,6 +264,7 @@ class DataFetcher:
 
             except Exception as e:
                 self.logger.error(f"Attempt {attempt + 1} error getting balance: {e}")
+                self._is_rate_limited(e, 'account')
                 if attempt < self.retry_count - 1:
                     time.sleep(self.retry_delay)
 
@@ -230,11 +283,12 @@ class DataFetcher:
         """Получение информации о позиции"""
         for attempt in range(self.retry_count):
             try:
-                self._rate_limit_check()
+                self._rate_limit_check('account')
 
                 response = self.client.get_positions(category="linear", symbol=symbol)
 
                 if response.get('retCode') == 0 and response.get('result', {}).get('list'):
+                    self.rate_limiter.report_success('account')
                     positions = response['result']['list']
 
                     for position in positions:
@@ -254,9 +308,11 @@ class DataFetcher:
                 else:
                     error_msg = response.get('retMsg', 'Unknown error')
                     self.logger.warning(f"Failed to get position info for {symbol}: {error_msg}")
+                    self._is_rate_limited(f"{response.get('retCode')} {error_msg}", 'account')
 
             except Exception as e:
                 self.logger.error(f"Attempt {attempt + 1} error getting position for {symbol}: {e}")
+                self._is_rate_limited(e, 'account')
                 if attempt < self.retry_count - 1:
                     time.sleep(self.retry_delay)
 
@@ -271,6 +327,7 @@ class DataFetcher:
             response = self.client.get_orderbook(category="linear", symbol=symbol, limit=limit)
 
             if response.get('retCode') == 0 and response.get('result'):
+                self.rate_limiter.report_success('market')
                 orderbook = response['result']
                 return {
                     'symbol': symbol,
@@ -306,6 +363,10 @@ class DataFetcher:
             self.logger.error(f"Error getting server time: {e}")
             return None
 
+    def get_rate_limit_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Метрики rate limiter: ожидание в очереди и использованные токены по классам эндпоинтов"""
+        return self.rate_limiter.get_metrics()
+
     def health_check(self) -> bool:
         """Проверка здоровья соединения"""
         try:
@@ -0,0 +1,666 @@
+import logging
+import threading
+import time
+import numpy as np
+import pandas as pd
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+from config.trading_config import TradingConfig
+from modules.candle_store import interval_to_ms
+from modules.history_store import KlineHistoryStore
+
+
+def _fmt(value: float) -> str:
+    """Число как строка, как в ответах ByBit"""
+    return str(float(value))
+
+
+class SimulatedExchange:
+    """
+    Локальная замена pybit HTTP для интеграционных и нагрузочных тестов
+
+    Реализует используемое ботом подмножество unified_trading.HTTP (get_kline, get_tickers,
+    get_orderbook, get_wallet_balance, get_positions, place_order, amend_order, cancel_order,
+    get_open_orders, get_order_history, get_server_time) и передается в DataFetcher(client=...)
+    и OrderManager(client).
+
+    Время биржи - свечи из истории или синтетические: видны свечи с началом не позже текущей,
+    цена - закрытие текущей свечи, advance() переводит часы на следующую свечу. Стакан строится
+    вокруг цены закрытия, рыночные ордера проходят по его уровням, лимитные встают в очередь
+    и исполняются по цене, когда свеча до нее доходит. Стоп-лосс и тейк-профит позиции
+    проверяются по high/low каждой новой свечи. Режим позиций - one-way.
+    """
+
+    OPEN_STATUSES = ('New', 'PartiallyFilled')
+
+    def __init__(self, candles: Dict[str, pd.DataFrame], interval: str, settings: Dict[str, Any] = None,
+                 start_time: int = None):
+        """
+        Args:
+            candles: Свечи по символам [timestamp, open, high, low, close, volume]
+            interval: Интервал свечей ByBit
+            settings: Переопределения EXCHANGE_SIMULATOR_SETTINGS
+            start_time: Время первой текущей свечи (сек или мс), по умолчанию после warmup_bars
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**TradingConfig.EXCHANGE_SIMULATOR_SETTINGS, **(settings or {})}
+        self.interval = str(interval)
+        self.interval_ms = interval_to_ms(self.interval)
+        self.testnet = False  # OrderManager отправляет ордера на "биржу", а не симулирует сам
+
+        self._timestamps: Dict[str, np.ndarray] = {}
+        self._bars: Dict[str, np.ndarray] = {}
+        for symbol, df in candles.items():
+            if df is None or len(df) == 0:
+                continue
+            self._timestamps[symbol] = KlineHistoryStore._to_ms(df['timestamp'])
+            self._bars[symbol] = df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=np.float64)
+        if not self._timestamps:
+            raise ValueError("No candles for simulated exchange")
+
+        first_ts = min(int(ts[0]) for ts in self._timestamps.values())
+        self.end_ms = max(int(ts[-1]) for ts in self._timestamps.values())
+        if start_time is None:
+            self.now_ms = min(first_ts + (self.settings['warmup_bars'] - 1) * self.interval_ms, self.end_ms)
+        else:
+            self.now_ms = KlineHistoryStore._to_ms_scalar(start_time)
+
+        self.balance = float(self.settings['initial_balance'])
+        self.fees = 0.0
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self._link_ids: Dict[str, str] = {}
+        self._order_seq = 0
+        self._lock = threading.RLock()
+        self.calls: Counter = Counter()
+        self.stats = {'orders': 0, 'fills': 0, 'rejected': 0, 'stop_triggers': 0}
+
+    # ------------------------------------------------------------------
+    # Источники данных
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_history(cls, store: KlineHistoryStore, symbols: List[str], interval: str,
+                     start_time: int = None, end_time: int = None,
+                     settings: Dict[str, Any] = None) -> 'SimulatedExchange':
+        """Биржа на свечах из локального хранилища (utils/download_history.py)"""
+        candles = {}
+        for symbol in symbols:
+            df = store.read(symbol, interval, start_time, end_time)
+            if df is not None and len(df) > 0:
+                candles[symbol] = df
+        return cls(candles, interval, settings)
+
+    @staticmethod
+    def synthetic_candles(count: int, interval: str = '5', start_price: float = 100.0,
+                          volatility: float = 0.004, seed: int = None,
+                          start: str = '2024-01-01') -> pd.DataFrame:
+        """Свечи по геометрическому случайному блужданию"""
+        rng = np.random.default_rng(seed)
+        close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, count)))
+        open_ = np.r_[start_price, close[:-1]]
+        wick = np.abs(rng.normal(0, volatility / 2, (2, count)))
+        return pd.DataFrame({
+            'timestamp': pd.date_range(start, periods=count, freq=pd.Timedelta(milliseconds=interval_to_ms(interval)),
+                                       tz='UTC'),
+            'open': open_,
+            'high': np.maximum(open_, close) * (1 + wick[0]),
+            'low': np.minimum(open_, close) * (1 - wick[1]),
+            'close': close,
+            'volume': rng.uniform(50, 500, count)
+        })
+
+    @property
+    def symbols(self) -> List[str]:
+        """Символы, для которых есть свечи"""
+        return list(self._timestamps)
+
+    # ------------------------------------------------------------------
+    # Часы биржи
+    # ------------------------------------------------------------------
+
+    def advance(self, bars: int = 1) -> bool:
+        """
+        Переход к следующей свече: исполнение лимитных ордеров и стопов по ее диапазону
+
+        Returns:
+            bool: Есть ли еще свечи впереди
+        """
+        with self._lock:
+            for _ in range(bars):
+                if self.now_ms >= self.end_ms:
+                    return False
+                self.now_ms += self.interval_ms
+                for symbol in self._timestamps:
+                    bar = self._bar_at(symbol, self.now_ms)
+                    if bar is not None:
+                        self._match_resting(symbol, bar)
+                        self._check_trading_stop(symbol, bar)
+            return self.now_ms < self.end_ms
+
+    def _index(self, symbol: str) -> int:
+        """Индекс текущей (последней видимой) свечи символа, -1 если свечей еще нет"""
+        return int(np.searchsorted(self._timestamps[symbol], self.now_ms, side='right')) - 1
+
+    def _bar_at(self, symbol: str, ts: int) -> Optional[np.ndarray]:
+        """Свеча с началом ровно в ts"""
+        timestamps = self._timestamps[symbol]
+        i = int(np.searchsorted(timestamps, ts))
+        if i < len(timestamps) and timestamps[i] == ts:
+            return self._bars[symbol][i]
+        return None
+
+    def _last_price(self, symbol: str) -> Optional[float]:
+        i = self._index(symbol)
+        return float(self._bars[symbol][i, 3]) if i >= 0 else None
+
+    def _book(self, symbol: str) -> Tuple[List[Tuple[float, float]], List[Tuple[float, float]]]:
+        """Синтетический стакан вокруг цены закрытия: (bids, asks) от лучшей цены"""
+        i = self._index(symbol)
+        mid = float(self._bars[symbol][i, 3])
+        level_qty = max(float(self._bars[symbol][i, 4]) * self.settings['level_volume'],
+                        self.settings['min_level_qty'])
+        half = self.settings['spread'] / 2
+        steps = np.arange(self.settings['book_levels']) * self.settings['book_step']
+        bids = [(float(p), level_qty) for p in mid * (1 - half - steps)]
+        asks = [(float(p), level_qty) for p in mid * (1 + half + steps)]
+        return bids, asks
+
+    # ------------------------------------------------------------------
+    # Ответы в формате ByBit V5
+    # ------------------------------------------------------------------
+
+    def _response(self, result: Any = None, code: int = 0, message: str = 'OK') -> Dict[str, Any]:
+        if code != 0:
+            self.stats['rejected'] += 1
+        return {'retCode': code, 'retMsg': message, 'result': result if result is not None else {},
+                'retExtInfo': {}, 'time': self.now_ms}
+
+    def _call(self, name: str) -> None:
+        """Учет вызова и искусственная задержка (вне блокировки)"""
+        with self._lock:
+            self.calls[name] += 1
+        if self.settings['latency_ms']:
+            time.sleep(self.settings['latency_ms'] / 1000)
+
+    def _unknown_symbol(self, symbol: Optional[str]) -> bool:
+        return symbol not in self._timestamps or self._index(symbol) < 0
+
+    # ------------------------------------------------------------------
+    # Рыночные данные
+    # ------------------------------------------------------------------
+
+    def get_server_time(self, **kwargs) -> Dict[str, Any]:
+        self._call('get_server_time')
+        with self._lock:
+            now = self.now_ms + self.interval_ms
+            return self._response({'timeSecond': str(now // 1000), 'timeNano': str(now * 1_000_000)})
+
+    def get_kline(self, category: str = 'linear', symbol: str = None, interval: str = None,
+                  start: int = None, end: int = None, limit: int = 200, **kwargs) -> Dict[str, Any]:
+        """Свечи от новых к старым; интервалы, кратные базовому, агрегируются"""
+        self._call('get_kline')
+        with self._lock:
+            if self._unknown_symbol(symbol):
+                return self._response(code=10001, message=f"Not supported symbols: {symbol}")
+
+            interval = str(interval or self.interval)
+            try:
+                step = interval_to_ms(interval)
+            except ValueError:
+                step = 0
+            if interval in ('W', 'M') or step < self.interval_ms or step % self.interval_ms:
+                return self._response(code=10001, message=f"Invalid interval: {interval}")
+
+            stop = self._index(symbol) + 1
+            timestamps = self._timestamps[symbol][:stop]
+            bars = self._bars[symbol][:stop]
+
+            if step != self.interval_ms:
+                buckets = timestamps - timestamps % step
+                timestamps, first = np.unique(buckets, return_index=True)
+                last = np.r_[first[1:], len(buckets)] - 1
+                bars = np.column_stack([
+                    bars[first, 0],
+                    np.maximum.reduceat(bars[:, 1], first),
+                    np.minimum.reduceat(bars[:, 2], first),
+                    bars[last, 3],
+                    np.add.reduceat(bars[:, 4], first)
+                ])
+
+            lo = 0 if start is None else int(np.searchsorted(timestamps, int(start), side='left'))
+            hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, int(end), side='right'))
+            lo = max(lo, hi - min(max(int(limit), 1), 1000))
+
+            rows = [[str(int(ts)), *(_fmt(v) for v in bar), _fmt(bar[3] * bar[4])]
+                    for ts, bar in zip(timestamps[lo:hi][::-1], bars[lo:hi][::-1])]
+            return self._response({'category': category, 'symbol': symbol, 'list': rows})
+
+    def _ticker(self, symbol: str) -> Dict[str, Any]:
+        bids, asks = self._book(symbol)
+        i = self._index(symbol)
+        day = max(0, i - 86_400_000 // self.interval_ms + 1)
+        window = self._bars[symbol][day:i + 1]
+        last = float(self._bars[symbol][i, 3])
+        prev = float(window[0, 0])
+        return {
+            'symbol': symbol,
+            'lastPrice': _fmt(last),
+            'markPrice': _fmt(last),
+            'indexPrice': _fmt(last),
+            'bid1Price': _fmt(bids[0][0]),
+            'bid1Size': _fmt(bids[0][1]),
+            'ask1Price': _fmt(asks[0][0]),
+            'ask1Size': _fmt(asks[0][1]),
+            'prevPrice24h': _fmt(prev),
+            'price24hPcnt': _fmt(last / prev - 1 if prev else 0.0),
+            'highPrice24h': _fmt(float(window[:, 1].max())),
+            'lowPrice24h': _fmt(float(window[:, 2].min())),
+            'volume24h': _fmt(float(window[:, 4].sum())),
+            'turnover24h': _fmt(float((window[:, 3] * window[:, 4]).sum()))
+        }
+
+    def get_tickers(self, category: str = 'linear', symbol: str = None, **kwargs) -> Dict[str, Any]:
+        self._call('get_tickers')
+        with self._lock:
+            if symbol is not None:
+                if self._unknown_symbol(symbol):
+                    return self._response(code=10001, message=f"Not supported symbols: {symbol}")
+                symbols = [symbol]
+            else:
+                symbols = [s for s in self._timestamps if self._index(s) >= 0]
+            return self._response({'category': category, 'list': [self._ticker(s) for s in symbols]})
+
+    def get_orderbook(self, category: str = 'linear', symbol: str = None, limit: int = 25,
+                      **kwargs) -> Dict[str, Any]:
+        self._call('get_orderbook')
+        with self._lock:
+            if self._unknown_symbol(symbol):
+                return self._response(code=10001, message=f"Not supported symbols: {symbol}")
+            bids, asks = self._book(symbol)
+            return self._response({
+                's': symbol,
+                'b': [[_fmt(p), _fmt(q)] for p, q in bids[:limit]],
+                'a': [[_fmt(p), _fmt(q)] for p, q in asks[:limit]],
+                'ts': self.now_ms,
+                'u': self.now_ms // self.interval_ms
+            })
+
+    # ------------------------------------------------------------------
+    # Аккаунт
+    # ------------------------------------------------------------------
+
+    def _unrealized_pnl(self, symbol: str) -> float:
+        position = self.positions.get(symbol)
+        if not position or position['size'] == 0:
+            return 0.0
+        return position['size'] * (self._last_price(symbol) - position['avg_price'])
+
+    def _used_margin(self) -> float:
+        """Маржа позиций и лимитных ордеров в очереди"""
+        margin = sum(abs(p['size']) * p['avg_price'] / p['leverage'] for p in self.positions.values())
+        for order in self.orders.values():
+            if order['orderStatus'] in self.OPEN_STATUSES and not order['reduceOnly']:
+                remaining = float(order['qty']) - float(order['cumExecQty'])
+                margin += remaining * float(order['price']) / self._leverage(order['symbol'])
+        return margin
+
+    def equity(self) -> float:
+        """Баланс с учетом нереализованного P&L"""
+        with self._lock:
+            return self.balance + sum(self._unrealized_pnl(s) for s in self.positions)
+
+    @staticmethod
+    def _leverage(symbol: str) -> float:
+        return float(TradingConfig.TRADING_PAIRS.get(symbol, {}).get('leverage', 1) or 1)
+
+    def get_wallet_balance(self, accountType: str = 'UNIFIED', coin: str = None, **kwargs) -> Dict[str, Any]:
+        self._call('get_wallet_balance')
+        with self._lock:
+            unrealized = sum(self._unrealized_pnl(s) for s in self.positions)
+            equity = self.balance + unrealized
+            available = equity - self._used_margin()
+            return self._response({'list': [{
+                'accountType': accountType,
+                'totalEquity': _fmt(equity),
+                'totalWalletBalance': _fmt(self.balance),
+                'totalAvailableBalance': _fmt(available),
+                'coin': [{
+                    'coin': 'USDT',
+                    'equity': _fmt(equity),
+                    'walletBalance': _fmt(self.balance),
+                    'unrealisedPnl': _fmt(unrealized),
+                    'availableToWithdraw': _fmt(max(available, 0.0)),
+                    'cumRealisedPnl': _fmt(self.balance - self.settings['initial_balance'])
+                }] if coin in (None, 'USDT') else []
+            }]})
+
+    def _position_entry(self, symbol: str) -> Dict[str, Any]:
+        position = self.positions.get(symbol) or {'size': 0.0, 'avg_price': 0.0, 'stop_loss': None,
+                                                  'take_profit': None, 'leverage': self._leverage(symbol)}
+        size = position['size']
+        mark = self._last_price(symbol) or 0.0
+        return {
+            'symbol': symbol,
+            'side': 'Buy' if size > 0 else 'Sell' if size < 0 else '',
+            'size': _fmt(abs(size)),
+            'avgPrice': _fmt(position['avg_price']),
+            'markPrice': _fmt(mark),
+            'positionValue': _fmt(abs(size) * position['avg_price']),
+            'unrealisedPnl': _fmt(self._unrealized_pnl(symbol)),
+            'leverage': _fmt(position['leverage']),
+            'stopLoss': _fmt(position['stop_loss']) if position['stop_loss'] else '',
+            'takeProfit': _fmt(position['take_profit']) if position['take_profit'] else '',
+            'positionIdx': 0
+        }
+
+    def get_positions(self, category: str = 'linear', symbol: str = None, **kwargs) -> Dict[str, Any]:
+        self._call('get_positions')
+        with self._lock:
+            if symbol is not None:
+                if symbol not in self._timestamps:
+                    return self._response(code=10001, message=f"Not supported symbols: {symbol}")
+                entries = [self._position_entry(symbol)]
+            else:
+                entries = [self._position_entry(s) for s, p in self.positions.items() if p['size'] != 0]
+            return self._response({'category': category, 'list': entries})
+
+    # ------------------------------------------------------------------
+    # Торговля
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize_side(side: str) -> Optional[str]:
+        side = str(side).capitalize()
+        return side if side in ('Buy', 'Sell') else None
+
+    def _new_order(self, symbol: str, side: str, order_type: str, qty: float, price: Optional[float],
+                   time_in_force: str, reduce_only: bool, link_id: str, **extra) -> Dict[str, Any]:
+        self._order_seq += 1
+        order_id = f"sim-{self._order_seq:08d}"
+        order = {
+            'orderId': order_id,
+            'orderLinkId': link_id or '',
+            'symbol': symbol,
+            'side': side,
+            'orderType': order_type,
+            'price': _fmt(price) if price else '0',
+            'qty': _fmt(qty),
+            'cumExecQty': '0',
+            'cumExecValue': '0',
+            'cumExecFee': '0',
+            'avgPrice': '0',
+            'orderStatus': 'New',
+            'timeInForce': time_in_force,
+            'reduceOnly': reduce_only,
+            'stopLoss': '',
+            'takeProfit': '',
+            'stopOrderType': '',
+            'createdTime': str(self.now_ms),
+            'updatedTime': str(self.now_ms),
+            **extra
+        }
+        self.orders[order_id] = order
+        if link_id:
+            self._link_ids[link_id] = order_id
+        self.stats['orders'] += 1
+        return order
+
+    def _find_order(self, order_id: str = None, order_link_id: str = None) -> Optional[Dict[str, Any]]:
+        if order_id is None and order_link_id:
+            order_id = self._link_ids.get(order_link_id)
+        return self.orders.get(order_id) if order_id else None
+
+    def _reduce_only_qty(self, symbol: str, side: str, qty: float) -> float:
+        """Объем reduce-only ордера не больше противоположной позиции"""
+        size = self.positions.get(symbol, {}).get('size', 0.0)
+        if (side == 'Sell' and size > 0) or (side == 'Buy' and size < 0):
+            return min(qty, abs(size))
+        return 0.0
+
+    def _apply_fill(self, order: Dict[str, Any], qty: float, price: float, fee_rate: float) -> None:
+        """Исполнение части ордера: позиция (one-way), баланс, комиссия, поля ордера"""
+        symbol = order['symbol']
+        position = self.positions.setdefault(symbol, {'size': 0.0, 'avg_price': 0.0, 'stop_loss': None,
+                                                      'take_profit': None, 'leverage': self._leverage(symbol)})
+        signed = qty if order['side'] == 'Buy' else -qty
+        fee = qty * price * fee_rate
+        self.balance -= fee
+        self.fees += fee
+
+        size = position['size']
+        if size == 0 or (size > 0) == (signed > 0):
+            new_size = size + signed
+            position['avg_price'] = (abs(size) * position['avg_price'] + qty * price) / abs(new_size)
+        else:
+            closed = min(abs(size), qty)
+            self.balance += closed * (price - position['avg_price']) * (1 if size > 0 else -1)
+            new_size = size + signed
+            if abs(new_size) < 1e-12:
+                new_size = 0.0
+                position.update(avg_price=0.0, stop_loss=None, take_profit=None)
+            elif (new_size > 0) != (size > 0):
+                position.update(avg_price=price, stop_loss=None, take_profit=None)
+        position['size'] = new_size
+
+        filled = float(order['cumExecQty']) + qty
+        value = float(order['cumExecValue']) + qty * price
+        order.update(cumExecQty=_fmt(filled), cumExecValue=_fmt(value), avgPrice=_fmt(value / filled),
+                     cumExecFee=_fmt(float(order['cumExecFee']) + fee), updatedTime=str(self.now_ms),
+                     orderStatus='Filled' if filled >= float(order['qty']) - 1e-12 else 'PartiallyFilled')
+        self.stats['fills'] += 1
+
+        # Стоп-лосс и тейк-профит из ордера становятся торговым стопом позиции
+        if position['size'] != 0:
+            if order.get('stopLoss'):
+                position['stop_loss'] = float(order['stopLoss'])
+            if order.get('takeProfit'):
+                position['take_profit'] = float(order['takeProfit'])
+
+    def _match_book(self, order: Dict[str, Any], qty: float, limit_price: Optional[float]) -> float:
+        """Исполнение по уровням стакана (тейкер), возвращает исполненный объем"""
+        bids, asks = self._book(order['symbol'])
+        levels = asks if order['side'] == 'Buy' else bids
+        remaining = qty
+        for price, level_qty in levels:
+            if remaining <= 1e-12:
+                break
+            if limit_price is not None and ((order['side'] == 'Buy' and price > limit_price) or
+                                            (order['side'] == 'Sell' and price < limit_price)):
+                break
+            take = min(level_qty, remaining)
+            self._apply_fill(order, take, price, self.settings['taker_fee'])
+            remaining -= take
+        return qty - remaining
+
+    def _match_resting(self, symbol: str, bar: np.ndarray) -> None:
+        """Лимитные ордера в очереди исполняются, если свеча дошла до цены (мейкер)"""
+        bar_open, high, low = bar[0], bar[1], bar[2]
+        for order in list(self.orders.values()):
+            if order['symbol'] != symbol or order['orderStatus'] not in self.OPEN_STATUSES:
+                continue
+            price = float(order['price'])
+            if order['side'] == 'Buy' and low <= price:
+                fill_price = min(price, bar_open)
+            elif order['side'] == 'Sell' and high >= price:
+                fill_price = max(price, bar_open)
+            else:
+                continue
+            qty = float(order['qty']) - float(order['cumExecQty'])
+            if order['reduceOnly']:
+                qty = self._reduce_only_qty(symbol, order['side'], qty)
+                if qty <= 0:
+                    order.update(orderStatus='Deactivated', updatedTime=str(self.now_ms))
+                    continue
+            self._apply_fill(order, qty, fill_price, self.settings['maker_fee'])
+
+    def _check_trading_stop(self, symbol: str, bar: np.ndarray) -> None:
+        """Срабатывание стоп-лосса / тейк-профита позиции внутри свечи (стоп проверяется первым)"""
+        position = self.positions.get(symbol)
+        if not position or position['size'] == 0:
+            return
+        bar_open, high, low = bar[0], bar[1], bar[2]
+        is_long = position['size'] > 0
+        stop, target = position['stop_loss'], position['take_profit']
+
+        exit_price, stop_type = None, None
+        if stop and (low <= stop if is_long else high >= stop):
+            exit_price = min(stop, bar_open) if is_long else max(stop, bar_open)
+            stop_type = 'StopLoss'
+        elif target and (high >= target if is_long else low <= target):
+            exit_price = max(target, bar_open) if is_long else min(target, bar_open)
+            stop_type = 'TakeProfit'
+        if exit_price is None:
+            return
+
+        qty = abs(position['size'])
+        order = self._new_order(symbol, 'Sell' if is_long else 'Buy', 'Market', qty, None, 'IOC', True, '',
+                                stopOrderType=stop_type)
+        self._apply_fill(order, qty, exit_price, self.settings['taker_fee'])
+        self.stats['stop_triggers'] += 1
+
+    def place_order(self, category: str = 'linear', symbol: str = None, side: str = None,
+                    orderType: str = 'Market', qty: str = None, price: str = None,
+                    timeInForce: str = None, reduceOnly: bool = False, orderLinkId: str = None,
+                    stopLoss: str = None, takeProfit: str = None, **kwargs) -> Dict[str, Any]:
+        self._call('place_order')
+        with self._lock:
+            if self._unknown_symbol(symbol):
+                return self._response(code=10001, message=f"Not supported symbols: {symbol}")
+            side = self._normalize_side(side)
+            if side is None:
+                return self._response(code=10001, message="params error: side invalid")
+            try:
+                qty = float(qty)
+                limit_price = float(price) if orderType == 'Limit' else None
+            except (TypeError, ValueError):
+                return self._response(code=10001, message="params error: qty or price invalid")
+            if qty <= 0 or (orderType == 'Limit' and not limit_price):
+                return self._response(code=10001, message="params error: qty or price invalid")
+            if orderLinkId and orderLinkId in self._link_ids:
+                return self._response(code=110072, message="OrderLinkedID is duplicate")
+
+            if reduceOnly:
+                qty = self._reduce_only_qty(symbol, side, qty)
+                if qty <= 0:
+                    return self._response(code=110017, message="Reduce-only order has same side with current position")
+            else:
+                reference = limit_price or self._last_price(symbol)
+                is_long = side == 'Buy'
+                if stopLoss and (float(stopLoss) >= reference if is_long else float(stopLoss) <= reference):
+                    return self._response(code=10001, message="StopLoss set on the wrong side of the base price")
+                if takeProfit and (float(takeProfit) <= reference if is_long else float(takeProfit) >= reference):
+                    return self._response(code=10001, message="TakeProfit set on the wrong side of the base price")
+
+                required = qty * reference / self._leverage(symbol) + qty * reference * self.settings['taker_fee']
+                if required > self.equity() - self._used_margin():
+                    return self._response(code=110007, message="ab not enough for new order")
+
+            time_in_force = timeInForce or ('IOC' if orderType == 'Market' else 'GTC')
+            order = self._new_order(symbol, side, orderType, qty, limit_price, time_in_force, bool(reduceOnly),
+                                    orderLinkId, stopLoss=str(stopLoss or ''), takeProfit=str(takeProfit or ''))
+
+            filled = self._match_book(order, qty, limit_price)
+            if filled < qty and (orderType == 'Market' or time_in_force in ('IOC', 'FOK')):
+                order['orderStatus'] = 'PartiallyFilledCanceled' if filled > 0 else 'Cancelled'
+
+            return self._response({'orderId': order['orderId'], 'orderLinkId': order['orderLinkId']})
+
+    def amend_order(self, category: str = 'linear', symbol: str = None, orderId: str = None,
+                    orderLinkId: str = None, qty: str = None, price: str = None,
+                    stopLoss: str = None, takeProfit: str = None, **kwargs) -> Dict[str, Any]:
+        """
+        Изменение ордера в очереди
+
+        Для уже исполненного ордера стоп-лосс и тейк-профит переносятся на позицию
+        (так OrderManager.update_stop_loss двигает трейлинг-стоп).
+        """
+        self._call('amend_order')
+        with self._lock:
+            order = self._find_order(orderId, orderLinkId)
+            if order is None or order['symbol'] != symbol:
+                return self._response(code=110001, message="order not exists or too late to amend")
+
+            if order['orderStatus'] in self.OPEN_STATUSES:
+                if qty is not None:
+                    order['qty'] = _fmt(float(qty))
+                if price is not None:
+                    order['price'] = _fmt(float(price))
+                if stopLoss is not None:
+                    order['stopLoss'] = str(stopLoss)
+                if takeProfit is not None:
+                    order['takeProfit'] = str(takeProfit)
+            else:
+                position = self.positions.get(symbol)
+                if not position or position['size'] == 0 or (stopLoss is None and takeProfit is None):
+                    return self._response(code=110001, message="order not exists or too late to amend")
+                if stopLoss is not None:
+                    position['stop_loss'] = float(stopLoss) or None
+                if takeProfit is not None:
+                    position['take_profit'] = float(takeProfit) or None
+
+            order['updatedTime'] = str(self.now_ms)
+            return self._response({'orderId': order['orderId'], 'orderLinkId': order['orderLinkId']})
+
+    def cancel_order(self, category: str = 'linear', symbol: str = None, orderId: str = None,
+                     orderLinkId: str = None, **kwargs) -> Dict[str, Any]:
+        self._call('cancel_order')
+        with self._lock:
+            order = self._find_order(orderId, orderLinkId)
+            if order is None or order['symbol'] != symbol or order['orderStatus'] not in self.OPEN_STATUSES:
+                return self._response(code=110001, message="order not exists or too late to cancel")
+            order.update(orderStatus='Cancelled', updatedTime=str(self.now_ms))
+            return self._response({'orderId': order['orderId'], 'orderLinkId': order['orderLinkId']})
+
+    def _order_page(self, orders: List[Dict[str, Any]], limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+        """Страница списка ордеров (от новых к старым) с nextPageCursor"""
+        orders = sorted(orders, key=lambda o: o['orderId'], reverse=True)
+        offset = int(cursor) if cursor else 0
+        limit = min(max(int(limit), 1), 50)
+        page = orders[offset:offset + limit]
+        next_cursor = str(offset + limit) if offset + limit < len(orders) else ''
+        return {'category': 'linear', 'list': [dict(o) for o in page], 'nextPageCursor': next_cursor}
+
+    def _filter_orders(self, symbol: str = None, orderId: str = None, orderLinkId: str = None,
+                       open_only: bool = False) -> List[Dict[str, Any]]:
+        if orderId or orderLinkId:
+            order = self._find_order(orderId, orderLinkId)
+            orders = [order] if order else []
+        else:
+            orders = list(self.orders.values())
+        return [o for o in orders
+                if (symbol is None or o['symbol'] == symbol) and
+                (not open_only or o['orderStatus'] in self.OPEN_STATUSES)]
+
+    def get_open_orders(self, category: str = 'linear', symbol: str = None, orderId: str = None,
+                        orderLinkId: str = None, limit: int = 20, cursor: str = None,
+                        **kwargs) -> Dict[str, Any]:
+        self._call('get_open_orders')
+        with self._lock:
+            orders = self._filter_orders(symbol, orderId, orderLinkId, open_only=True)
+            return self._response(self._order_page(orders, limit, cursor))
+
+    def get_order_history(self, category: str = 'linear', symbol: str = None, orderId: str = None,
+                          orderLinkId: str = None, limit: int = 20, cursor: str = None,
+                          **kwargs) -> Dict[str, Any]:
+        self._call('get_order_history')
+        with self._lock:
+            orders = self._filter_orders(symbol, orderId, orderLinkId)
+            return self._response(self._order_page(orders, limit, cursor))
+
+    # ------------------------------------------------------------------
+    # Статистика
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Вызовы по методам, ордера, исполнения и состояние счета"""
+        with self._lock:
+            return {
+                **self.stats,
+                'calls': dict(self.calls),
+                'balance': round(float(self.balance), 4),
+                'equity': round(float(self.equity()), 4),
+                'fees': round(float(self.fees), 4),
+                'open_positions': sum(1 for p in self.positions.values() if p['size'] != 0),
+                'now': pd.Timestamp(self.now_ms, unit='ms', tz='UTC')
+            }
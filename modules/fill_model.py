@@ -0,0 +1,74 @@
+import logging
+import numpy as np
+from typing import Dict, Any, Optional
+from config.trading_config import TradingConfig
+
+
+class FillModel:
+    """
+    Модель исполнения рыночного ордера для симуляции в TESTNET режиме
+
+    Любой объект с методом fill(symbol, side, quantity, price) -> Dict может заменить
+    эту модель в OrderManager (например, модель по стакану).
+    """
+
+    SLIPPAGE_DISTRIBUTIONS = ('fixed', 'uniform', 'normal')
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            settings: Параметры модели (по умолчанию SIMULATION_SETTINGS['fill_model'])
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**TradingConfig.SIMULATION_SETTINGS['fill_model'], **(settings or {})}
+
+        if self.settings['slippage'] not in self.SLIPPAGE_DISTRIBUTIONS:
+            raise ValueError(f"Unknown slippage distribution: {self.settings['slippage']}")
+
+        self.rng = np.random.default_rng(self.settings['seed'])
+
+    def _latency(self) -> float:
+        """Задержка подтверждения в секундах"""
+        low, high = self.settings['latency_ms']
+        return float(self.rng.uniform(low, high)) / 1000 if high > low else low / 1000
+
+    def _slippage(self) -> float:
+        """Проскальзывание как доля цены (всегда против сделки)"""
+        distribution = self.settings['slippage']
+        if distribution == 'fixed':
+            return self.settings['slippage_min']
+        if distribution == 'uniform':
+            return float(self.rng.uniform(self.settings['slippage_min'], self.settings['slippage_max']))
+        return float(abs(self.rng.normal(0.0, self.settings['slippage_std'])))
+
+    def _filled_quantity(self, quantity: float) -> float:
+        """Исполненный объем с учетом вероятности частичного исполнения"""
+        if self.rng.random() >= self.settings['partial_fill_probability']:
+            return quantity
+        ratio = self.rng.uniform(self.settings['min_fill_ratio'], 1.0)
+        return quantity * ratio
+
+    def fill(self, symbol: str, side: str, quantity: float, price: float) -> Dict[str, Any]:
+        """
+        Симуляция исполнения
+
+        Args:
+            symbol: Торговый символ
+            side: BUY или SELL
+            quantity: Запрошенный объем
+            price: Опорная цена (последняя цена тикера)
+
+        Returns:
+            Dict: price (цена исполнения), filled_qty, slippage, latency (сек), partial
+        """
+        slippage = self._slippage()
+        fill_price = price * (1 + slippage) if side == 'BUY' else price * (1 - slippage)
+        filled_qty = self._filled_quantity(quantity)
+
+        return {
+            'price': fill_price,
+            'filled_qty': filled_qty,
+            'slippage': slippage,
+            'latency': self._latency(),
+            'partial': filled_qty < quantity
+        }
@@ -0,0 +1,135 @@
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+import pandas as pd
+from config.trading_config import TradingConfig
+from modules.candle_store import interval_to_ms
+from modules.history_store import KlineHistoryStore
+
+
+class HistoricalDownloader:
+    """
+    Постраничная загрузка истории свечей в KlineHistoryStore
+
+    Диапазон проходится страницами по page_size свечей (до 1000 у ByBit) через
+    DataFetcher.get_kline, поэтому все запросы идут через общий rate limiter.
+    При повторном запуске загружаются только отсутствующие участки (resume):
+    начало/конец диапазона и пропуски внутри сохраненной истории.
+    """
+
+    def __init__(self, data_fetcher, store: KlineHistoryStore = None, page_size: int = None):
+        """
+        Args:
+            data_fetcher: DataFetcher для запросов к ByBit
+            store: Хранилище истории (по умолчанию в HISTORY_SETTINGS['data_dir'])
+            page_size: Свечей на один запрос
+        """
+        self.logger = logging.getLogger(__name__)
+        self.data_fetcher = data_fetcher
+        self.store = store or KlineHistoryStore()
+        self.page_size = min(max(int(page_size or TradingConfig.HISTORY_SETTINGS.get('page_size', 1000)), 1), 1000)
+
+    def download(self, symbol: str, interval: str, start_time: int, end_time: int = None,
+                 resume: bool = True) -> Dict[str, Any]:
+        """
+        Загрузка истории за диапазон
+
+        Args:
+            symbol: Торговая пара
+            interval: Интервал ByBit
+            start_time: Начало диапазона (секунды или мс)
+            end_time: Конец диапазона (секунды или мс), по умолчанию - последняя закрытая свеча
+            resume: Загружать только отсутствующие участки
+
+        Returns:
+            Dict: Итог загрузки (страницы, записанные свечи, оставшиеся пропуски)
+        """
+        started = time.time()
+        interval = str(interval)
+        step = interval_to_ms(interval)
+
+        # Незакрытая свеча не сохраняется - иначе resume считал бы ее загруженной
+        now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+        last_closed = (now_ms // step) * step - step
+        start_ms = self._to_ms(start_time)
+        end_ms = min(self._to_ms(end_time), last_closed) if end_time is not None else last_closed
+
+        if start_ms > end_ms:
+            return {'success': False, 'error': 'Empty range', 'symbol': symbol, 'interval': interval}
+
+        if resume:
+            ranges = self.store.find_gaps(symbol, interval, start_ms, end_ms)
+        else:
+            ranges = [(start_ms, end_ms)]
+
+        pages = 0
+        failed_pages = 0
+        bars_written = 0
+
+        for range_start, range_end in ranges:
+            self.logger.info(
+                f"Downloading {symbol} {interval} history: "
+                f"{self._format_ms(range_start)} - {self._format_ms(range_end)}")
+
+            for page_start, page_end in self._iter_pages(range_start, range_end, step):
+                df = self.data_fetcher.get_kline(
+                    symbol=symbol,
+                    interval=interval,
+                    start_time=page_start,
+                    end_time=page_end,
+                    limit=self.page_size
+                )
+                pages += 1
+
+                if df is None or df.empty:
+                    failed_pages += 1
+                    continue
+
+                df = df[(df['timestamp'] >= pd.Timestamp(page_start, unit='ms', tz='UTC')) &
+                        (df['timestamp'] <= pd.Timestamp(page_end, unit='ms', tz='UTC'))]
+                bars_written += self.store.write(symbol, interval, df)
+
+        remaining_gaps = self.store.find_gaps(symbol, interval, start_ms, end_ms)
+        duration = time.time() - started
+
+        self.logger.info(
+            f"History download for {symbol} {interval} finished: {bars_written} bars in {pages} pages, "
+            f"{failed_pages} empty/failed pages, {len(remaining_gaps)} gaps remaining ({duration:.1f}s)")
+
+        return {
+            'success': failed_pages == 0,
+            'symbol': symbol,
+            'interval': interval,
+            'pages': pages,
+            'failed_pages': failed_pages,
+            'bars_written': bars_written,
+            'remaining_gaps': remaining_gaps,
+            'duration': duration
+        }
+
+    def get_history(self, symbol: str, interval: str, start_time: int, end_time: int = None,
+                    download_missing: bool = True) -> Optional[pd.DataFrame]:
+        """Чтение истории из хранилища с догрузкой отсутствующих участков"""
+        if download_missing:
+            self.download(symbol, interval, start_time, end_time)
+        return self.store.read(symbol, interval, start_time, end_time)
+
+    def _iter_pages(self, range_start: int, range_end: int, step: int) -> List[Tuple[int, int]]:
+        """Разбиение диапазона на страницы по page_size свечей"""
+        pages = []
+        page_start = range_start
+        while page_start <= range_end:
+            page_end = min(range_end, page_start + (self.page_size - 1) * step)
+            pages.append((page_start, page_end))
+            page_start = page_end + step
+        return pages
+
+    @staticmethod
+    def _to_ms(value: int) -> int:
+        """Секунды или миллисекунды в миллисекунды"""
+        return int(value * 1000) if value < 1e12 else int(value)
+
+    @staticmethod
+    def _format_ms(value: int) -> str:
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
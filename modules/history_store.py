@@ -0,0 +1,251 @@
+import json
+import logging
+import os
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from config.trading_config import TradingConfig
+from modules.candle_store import interval_to_ms
+
+
+class KlineHistoryStore:
+    """
+    Колоночное хранилище исторических свечей на диске
+
+    Для каждой пары symbol/interval в отдельной директории хранятся:
+        timestamps.i8 - метки открытия свечей (int64, мс, по возрастанию)
+        ohlcv.f8      - open, high, low, close, volume (float64, n x 5)
+        meta.json     - количество свечей и границы диапазона
+
+    Файлы читаются через np.memmap, поиск диапазона - бинарный (searchsorted),
+    поэтому чтение любого окна не требует загрузки всей истории в память.
+    """
+
+    COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+    def __init__(self, base_dir: str = None):
+        """
+        Args:
+            base_dir: Корневая директория хранилища (по умолчанию HISTORY_SETTINGS['data_dir'])
+        """
+        self.logger = logging.getLogger(__name__)
+        self.base_dir = Path(base_dir or TradingConfig.HISTORY_SETTINGS['data_dir'])
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+
+    def _series_dir(self, symbol: str, interval: str) -> Path:
+        return self.base_dir / symbol / str(interval)
+
+    def _load_meta(self, symbol: str, interval: str) -> Dict[str, Any]:
+        meta_file = self._series_dir(symbol, interval) / 'meta.json'
+        if not meta_file.exists():
+            return {'count': 0, 'first_ts': None, 'last_ts': None}
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_meta(self, symbol: str, interval: str, count: int, first_ts: int, last_ts: int) -> None:
+        series_dir = self._series_dir(symbol, interval)
+        meta = {
+            'symbol': symbol,
+            'interval': str(interval),
+            'count': int(count),
+            'first_ts': int(first_ts),
+            'last_ts': int(last_ts)
+        }
+        tmp_file = series_dir / 'meta.json.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_file, series_dir / 'meta.json')
+
+    def get_info(self, symbol: str, interval: str) -> Dict[str, Any]:
+        """Количество свечей и границы сохраненного диапазона (мс)"""
+        with self._lock:
+            return self._load_meta(symbol, interval)
+
+    def _open_arrays(self, symbol: str, interval: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Отображение файлов серии в память (только чтение)"""
+        count = self._load_meta(symbol, interval)['count']
+        if count == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, 5), dtype=np.float64)
+
+        series_dir = self._series_dir(symbol, interval)
+        timestamps = np.memmap(series_dir / 'timestamps.i8', dtype=np.int64, mode='r', shape=(count,))
+        values = np.memmap(series_dir / 'ohlcv.f8', dtype=np.float64, mode='r', shape=(count, 5))
+        return timestamps, values
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Запись свечей в хранилище
+
+        Свечи позже последней сохраненной дописываются в конец файлов. Если новые данные
+        пересекаются с историей или предшествуют ей, серия сливается и перезаписывается.
+
+        Args:
+            symbol: Торговая пара
+            interval: Интервал ByBit
+            df: DataFrame с колонками [timestamp, open, high, low, close, volume]
+
+        Returns:
+            int: Количество новых свечей в хранилище
+        """
+        if df is None or df.empty:
+            return 0
+
+        new_ts = self._to_ms(df['timestamp'])
+        new_values = df[self.COLUMNS[1:]].to_numpy(dtype=np.float64)
+
+        # Новые данные по возрастанию и без дубликатов (при дубликатах побеждает последняя строка)
+        order = np.argsort(new_ts, kind='stable')
+        new_ts, new_values = new_ts[order], new_values[order]
+        keep = np.append(new_ts[1:] != new_ts[:-1], True)
+        new_ts, new_values = new_ts[keep], new_values[keep]
+
+        with self._lock:
+            series_dir = self._series_dir(symbol, interval)
+            series_dir.mkdir(parents=True, exist_ok=True)
+            meta = self._load_meta(symbol, interval)
+
+            if meta['count'] == 0 or new_ts[0] > meta['last_ts']:
+                self._append(series_dir, meta['count'], new_ts, new_values)
+                first_ts = meta['first_ts'] if meta['count'] else new_ts[0]
+                self._save_meta(symbol, interval, meta['count'] + len(new_ts), first_ts, new_ts[-1])
+                return len(new_ts)
+
+            return self._merge_rewrite(symbol, interval, new_ts, new_values)
+
+    @staticmethod
+    def _append(series_dir: Path, count: int, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Дозапись свечей в конец файлов серии"""
+        # Хвост после count (запись, прерванная до обновления meta) отбрасывается
+        with open(series_dir / 'timestamps.i8', 'ab') as f:
+            f.truncate(count * 8)
+            f.write(np.ascontiguousarray(timestamps, dtype=np.int64).tobytes())
+        with open(series_dir / 'ohlcv.f8', 'ab') as f:
+            f.truncate(count * 5 * 8)
+            f.write(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+
+    def _merge_rewrite(self, symbol: str, interval: str, new_ts: np.ndarray, new_values: np.ndarray) -> int:
+        """Слияние новых свечей с историей и атомарная перезапись серии"""
+        old_ts, old_values = self._open_arrays(symbol, interval)
+        old_count = len(old_ts)
+
+        all_ts = np.concatenate([np.asarray(old_ts), new_ts])
+        all_values = np.concatenate([np.asarray(old_values), new_values])
+        del old_ts, old_values
+
+        # Новые значения идут после старых - при совпадении меток побеждают они
+        order = np.argsort(all_ts, kind='stable')
+        all_ts, all_values = all_ts[order], all_values[order]
+        keep = np.append(all_ts[1:] != all_ts[:-1], True)
+        all_ts, all_values = all_ts[keep], all_values[keep]
+
+        series_dir = self._series_dir(symbol, interval)
+        for name, array in (('timestamps.i8', all_ts), ('ohlcv.f8', all_values)):
+            tmp_file = series_dir / f"{name}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(np.ascontiguousarray(array).tobytes())
+            os.replace(tmp_file, series_dir / name)
+
+        self._save_meta(symbol, interval, len(all_ts), all_ts[0], all_ts[-1])
+        return len(all_ts) - old_count
+
+    def read(self, symbol: str, interval: str, start_time: int = None,
+             end_time: int = None) -> Optional[pd.DataFrame]:
+        """
+        Чтение свечей за диапазон
+
+        Args:
+            symbol: Торговая пара
+            interval: Интервал ByBit
+            start_time: Начало диапазона (секунды или мс, включительно)
+            end_time: Конец диапазона (секунды или мс, включительно)
+
+        Returns:
+            DataFrame в формате DataFetcher.get_kline или None если данных нет
+        """
+        timestamps, values = self.read_arrays(symbol, interval, start_time, end_time)
+        if len(timestamps) == 0:
+            return None
+
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(np.asarray(timestamps), unit='ms', utc=True),
+            'open': values[:, 0],
+            'high': values[:, 1],
+            'low': values[:, 2],
+            'close': values[:, 3],
+            'volume': values[:, 4]
+        })
+
+    def read_arrays(self, symbol: str, interval: str, start_time: int = None,
+                    end_time: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Чтение диапазона без создания DataFrame
+
+        Returns:
+            (timestamps, ohlcv): копии срезов memmap (int64 мс, float64 n x 5)
+        """
+        with self._lock:
+            timestamps, values = self._open_arrays(symbol, interval)
+            if len(timestamps) == 0:
+                return timestamps, values
+
+            lo = 0 if start_time is None else int(np.searchsorted(timestamps, self._to_ms_scalar(start_time), 'left'))
+            hi = len(timestamps) if end_time is None else int(
+                np.searchsorted(timestamps, self._to_ms_scalar(end_time), 'right'))
+            return np.array(timestamps[lo:hi]), np.array(values[lo:hi])
+
+    def find_gaps(self, symbol: str, interval: str, start_time: int = None,
+                  end_time: int = None) -> List[Tuple[int, int]]:
+        """
+        Поиск пропущенных свечей
+
+        Returns:
+            Список диапазонов (first_missing_ms, last_missing_ms) внутри сохраненной истории
+            и на границах запрошенного диапазона
+        """
+        step = interval_to_ms(interval)
+        # Месячные свечи имеют разную длину - допускаем отклонение
+        tolerance = step * 0.1 if str(interval) == 'M' else 0
+
+        timestamps, _ = self.read_arrays(symbol, interval, start_time, end_time)
+        start_ms = self._to_ms_scalar(start_time) if start_time is not None else None
+        end_ms = self._to_ms_scalar(end_time) if end_time is not None else None
+
+        if len(timestamps) == 0:
+            if start_ms is not None and end_ms is not None and start_ms <= end_ms:
+                return [(start_ms, end_ms)]
+            return []
+
+        gaps = []
+        if start_ms is not None and timestamps[0] - start_ms >= step - tolerance:
+            gaps.append((start_ms, int(timestamps[0]) - step))
+
+        diffs = np.diff(timestamps)
+        for idx in np.flatnonzero(diffs > step + tolerance):
+            gaps.append((int(timestamps[idx]) + step, int(timestamps[idx + 1]) - step))
+
+        if end_ms is not None and end_ms - timestamps[-1] >= step - tolerance:
+            gaps.append((int(timestamps[-1]) + step, end_ms))
+
+        return gaps
+
+    def delete(self, symbol: str, interval: str) -> None:
+        """Удаление серии"""
+        with self._lock:
+            series_dir = self._series_dir(symbol, interval)
+            for name in ('timestamps.i8', 'ohlcv.f8', 'meta.json'):
+                file_path = series_dir / name
+                if file_path.exists():
+                    file_path.unlink()
+
+    @staticmethod
+    def _to_ms(timestamps: pd.Series) -> np.ndarray:
+        """Метки времени DataFrame в миллисекунды"""
+        return pd.to_datetime(timestamps, utc=True).dt.as_unit('ms').astype('int64').to_numpy()
+
+    @staticmethod
+    def _to_ms_scalar(value: int) -> int:
+        """Секунды или миллисекунды в миллисекунды (как в DataFetcher.get_kline)"""
+        return int(value * 1000) if value < 1e12 else int(value)
@@ -0,0 +1,527 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional, Tuple, Callable
+from modules.cycle_profiler import get_cycle_profiler
+
+# Попытка импорта ta (технический анализ)
+try:
+    import ta
+except ImportError:
+    logging.error("ta library not installed. Please install: pip install ta")
+    raise ImportError("Required 'ta' library not found")
+
+
+# ----------------------------------------------------------------------
+# Расчетные функции: (df, **params) -> {output: Series}
+# ----------------------------------------------------------------------
+
+def _ema(df: pd.DataFrame, window: int, column: str = 'close') -> Dict[str, pd.Series]:
+    return {'value': ta.trend.EMAIndicator(df[column], window=window).ema_indicator()}
+
+
+def _sma(df: pd.DataFrame, window: int, column: str = 'close') -> Dict[str, pd.Series]:
+    return {'value': df[column].rolling(window=window).mean()}
+
+
+def _rsi(df: pd.DataFrame, window: int = 14) -> Dict[str, pd.Series]:
+    # Формулы ta.momentum.RSIIndicator (побитово те же значения): рост и падение
+    # сглаживаются одним вызовом ewm по двум колонкам вместо цепочки операций над Series
+    close = df['close'].to_numpy(dtype=np.float64)
+    diff = np.concatenate(([np.nan], close[1:] - close[:-1]))
+    directions = pd.DataFrame({'up': np.where(diff > 0, diff, 0.0), 'down': -np.where(diff < 0, diff, 0.0)})
+    smoothed = directions.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    emaup, emadn = smoothed['up'].to_numpy(), smoothed['down'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(emadn == 0, 100, 100 - (100 / (1 + emaup / emadn)))
+    return {'value': pd.Series(rsi, index=df.index, name='rsi')}
+
+
+def _macd(df: pd.DataFrame, window_fast: int = 12, window_slow: int = 26,
+          window_sign: int = 9) -> Dict[str, pd.Series]:
+    macd = ta.trend.MACD(df['close'], window_fast=window_fast, window_slow=window_slow, window_sign=window_sign)
+    return {'macd': macd.macd(), 'signal': macd.macd_signal(), 'histogram': macd.macd_diff()}
+
+
+def _bollinger(df: pd.DataFrame, window: int = 20, window_dev: float = 2) -> Dict[str, pd.Series]:
+    bb = ta.volatility.BollingerBands(df['close'], window=window, window_dev=window_dev)
+    return {'upper': bb.bollinger_hband(), 'middle': bb.bollinger_mavg(), 'lower': bb.bollinger_lband()}
+
+
+def _atr(df: pd.DataFrame, window: int = 14) -> Dict[str, pd.Series]:
+    # Формулы ta.volatility.AverageTrueRange (побитово те же значения), но сглаживание Уайлдера
+    # идет циклом по float, а не по Series.iloc: ATR считается на каждом окне бэктеста
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    prev_close = np.concatenate(([np.nan], df['close'].to_numpy(dtype=np.float64)[:-1]))
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    atr = np.zeros(len(true_range))
+    atr[window - 1] = pd.Series(true_range[:window]).mean()
+    value = atr[window - 1]
+    for i, tr in enumerate(true_range[window:].tolist(), start=window):
+        value = (value * (window - 1) + tr) / float(window)
+        atr[i] = value
+    return {'value': pd.Series(atr, index=df.index, name='atr')}
+
+
+def _stochastic(df: pd.DataFrame, window: int = 14, smooth_window: int = 3) -> Dict[str, pd.Series]:
+    stoch = ta.momentum.StochasticOscillator(
+        high=df['high'], low=df['low'], close=df['close'], window=window, smooth_window=smooth_window)
+    return {'k': stoch.stoch(), 'd': stoch.stoch_signal()}
+
+
+def _adx(df: pd.DataFrame, window: int = 14) -> Dict[str, pd.Series]:
+    return {'value': ta.trend.ADXIndicator(df['high'], df['low'], df['close'], window=window).adx()}
+
+
+def _roc(df: pd.DataFrame, window: int = 12) -> Dict[str, pd.Series]:
+    return {'value': ta.momentum.ROCIndicator(df['close'], window=window).roc()}
+
+
+def _williams_r(df: pd.DataFrame, lbp: int = 14) -> Dict[str, pd.Series]:
+    return {'value': ta.momentum.WilliamsRIndicator(df['high'], df['low'], df['close'], lbp=lbp).williams_r()}
+
+
+INDICATORS: Dict[str, Callable[..., Dict[str, pd.Series]]] = {
+    'ema': _ema,
+    'sma': _sma,
+    'rsi': _rsi,
+    'macd': _macd,
+    'bollinger': _bollinger,
+    'atr': _atr,
+    'stochastic': _stochastic,
+    'adx': _adx,
+    'roc': _roc,
+    'williams_r': _williams_r
+}
+
+
+# Индикаторы с конечным окном: значение на баре зависит только от последних N свечей,
+# поэтому в окне оно совпадает со значением по полной истории, кроме первых баров окна
+# (число NaN в начале для каждого выхода). Рекурсивные индикаторы (EMA, RSI, MACD,
+# ATR, ADX) зависят от начала окна: срез полной истории для них не подходит.
+WINDOW_INDEPENDENT: Dict[str, Callable[..., Dict[str, int]]] = {
+    'sma': lambda window, column='close': {'value': window - 1},
+    'bollinger': lambda window=20, window_dev=2: dict.fromkeys(('upper', 'middle', 'lower'), window - 1),
+    'roc': lambda window=12: {'value': window},
+    'williams_r': lambda lbp=14: {'value': lbp - 1},
+    'stochastic': lambda window=14, smooth_window=3: {'k': window - 1, 'd': window + smooth_window - 2}
+}
+
+
+def is_window_independent(indicator: str) -> bool:
+    """Совпадает ли индикатор в окне свечей со срезом расчета по полной истории"""
+    return indicator in WINDOW_INDEPENDENT
+
+
+# ----------------------------------------------------------------------
+# Оконные ядра рекурсивных индикаторов: значения последней и предпоследней
+# свечи для каждого окна истории фиксированной длины, как если бы индикатор
+# считался по самому окну (расчет с начала окна). Рекурсия идет по позиции
+# внутри окна сразу для всех окон векторами numpy - те же операции над float,
+# что и в pandas ewm / _atr, поэтому значения побитово совпадают с расчетом по окну.
+# ----------------------------------------------------------------------
+
+class _WindowEWM:
+    """ewm(adjust=False).mean() pandas, начатый заново в каждом окне (вектор по всем окнам)"""
+
+    def __init__(self, first: np.ndarray, com: float, min_periods: int):
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - self.alpha
+        self.min_periods = min_periods
+        self.weighted = first.copy()
+        self.nobs = (first == first).astype(np.int64)
+        self.old_wt = np.ones(len(first))
+        # dense: все окна начаты и old_wt = 1 (шаг без пропусков сводится к одной формуле);
+        # ready: во всех окнах набрано min_periods наблюдений
+        self.dense = not np.isnan(first).any()
+        self.ready = False
+
+    def value(self) -> np.ndarray:
+        if not self.ready:
+            ready = self.nobs >= self.min_periods
+            if not ready.all():
+                return np.where(ready, self.weighted, np.nan)
+            self.ready = True
+        return self.weighted
+
+    def update(self, current: np.ndarray) -> None:
+        """Следующая позиция окна (формулы pandas._libs.window.aggregations.ewm)"""
+        if self.dense and not np.isnan(current).any():
+            # old_wt после наблюдения сбрасывается в 1, поэтому old_wt * factor = factor
+            mixed = (self.old_wt_factor * self.weighted + self.alpha * current) / (self.old_wt_factor + self.alpha)
+            self.weighted = np.where(self.weighted != current, mixed, self.weighted)
+            if not self.ready:
+                self.nobs += 1
+            return
+
+        is_observation = current == current
+        self.nobs += is_observation
+        started = self.weighted == self.weighted
+        old_wt = np.where(started, self.old_wt * self.old_wt_factor, self.old_wt)
+        mixed = (old_wt * self.weighted + self.alpha * current) / (old_wt + self.alpha)
+        weighted = np.where(started & is_observation & (self.weighted != current), mixed, self.weighted)
+        self.old_wt = np.where(started & is_observation, 1.0, old_wt)
+        self.weighted = np.where(~started & is_observation, current, weighted)
+        self.dense = bool((self.weighted == self.weighted).all() and (self.old_wt == 1.0).all())
+
+
+def _window_outputs(length: int, outputs: Dict[str, Tuple[np.ndarray, np.ndarray]]
+                    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Выравнивание по истории: элемент i - окно, заканчивающееся свечой i (NaN до первого полного окна)"""
+    aligned = {}
+    for name, pair in outputs.items():
+        aligned[name] = tuple(np.concatenate((np.full(length - 1, np.nan), values)) for values in pair)
+    return aligned
+
+
+def _ema_windows(df: pd.DataFrame, length: int, window: int,
+                 column: str = 'close') -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    values = df[column].to_numpy(dtype=np.float64)
+    count = len(values) - length + 1
+    ema = _WindowEWM(values[:count], (window - 1) / 2, window)
+    prev, last = None, ema.value()
+    for k in range(1, length):
+        ema.update(values[k:k + count])
+        if k >= length - 2:
+            prev, last = last, ema.value()
+    return _window_outputs(length, {'value': (last, prev)})
+
+
+def _rsi_windows(df: pd.DataFrame, length: int, window: int = 14) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    close = df['close'].to_numpy(dtype=np.float64)
+    count = len(close) - length + 1
+    diff = np.concatenate(([np.nan], close[1:] - close[:-1]))
+    up, down = np.where(diff > 0, diff, 0.0), -np.where(diff < 0, diff, 0.0)
+    com = (1 - 1 / window) / (1 / window)
+    # Первая свеча окна без предыдущей: рост 0.0 и падение -0.0, как в _rsi по окну
+    ema_up = _WindowEWM(np.zeros(count), com, window)
+    ema_down = _WindowEWM(np.full(count, -0.0), com, window)
+
+    def rsi(emaup: np.ndarray, emadn: np.ndarray) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(emadn == 0, 100, 100 - (100 / (1 + emaup / emadn)))
+
+    prev, last = None, rsi(ema_up.value(), ema_down.value())
+    for k in range(1, length):
+        ema_up.update(up[k:k + count])
+        ema_down.update(down[k:k + count])
+        if k >= length - 2:
+            prev, last = last, rsi(ema_up.value(), ema_down.value())
+    return _window_outputs(length, {'value': (last, prev)})
+
+
+def _macd_windows(df: pd.DataFrame, length: int, window_fast: int = 12, window_slow: int = 26,
+                  window_sign: int = 9) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    close = df['close'].to_numpy(dtype=np.float64)
+    count = len(close) - length + 1
+    fast = _WindowEWM(close[:count], (window_fast - 1) / 2, window_fast)
+    slow = _WindowEWM(close[:count], (window_slow - 1) / 2, window_slow)
+    macd = fast.value() - slow.value()
+    signal = _WindowEWM(macd, (window_sign - 1) / 2, window_sign)
+    history = [(macd, signal.value())]
+    for k in range(1, length):
+        current = close[k:k + count]
+        fast.update(current)
+        slow.update(current)
+        macd = fast.value() - slow.value()
+        signal.update(macd)
+        history = [history[-1], (macd, signal.value())]
+
+    outputs = {'macd': (history[-1][0], history[0][0]), 'signal': (history[-1][1], history[0][1])}
+    outputs['histogram'] = (outputs['macd'][0] - outputs['signal'][0], outputs['macd'][1] - outputs['signal'][1])
+    return _window_outputs(length, outputs)
+
+
+def _atr_windows(df: pd.DataFrame, length: int, window: int = 14) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    prev_close = np.concatenate(([np.nan], df['close'].to_numpy(dtype=np.float64)[:-1]))
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    count = len(true_range) - length + 1
+
+    if length < window:
+        raise ValueError(f"ATR window {window} is longer than candle window {length}")
+
+    # Первая свеча окна без предыдущего закрытия: true range = high - low
+    seed = np.lib.stride_tricks.sliding_window_view(true_range, window)[:count].copy()
+    seed[:, 0] = (high - low)[:count]
+    # Свечи до window - 1 равны 0, на window - 1 - среднее, как pd.Series(true_range[:window]).mean() в _atr
+    prev, last = np.zeros(count), seed.sum(axis=1) / window
+    for k in range(window, length):
+        prev, last = last, (last * (window - 1) + true_range[k:k + count]) / float(window)
+    return _window_outputs(length, {'value': (last, prev)})
+
+
+WINDOW_KERNELS: Dict[str, Callable[..., Dict[str, Tuple[np.ndarray, np.ndarray]]]] = {
+    'ema': _ema_windows,
+    'rsi': _rsi_windows,
+    'macd': _macd_windows,
+    'atr': _atr_windows
+}
+
+
+def _timestamp_keys(timestamps: pd.Series) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    Метки времени колонки timestamp как массив целых чисел и единица datetime
+
+    Значения берутся в собственной единице колонки без пересчета (пересчет
+    as_unit дороже поиска окна); окна сравниваются с историей при равной единице.
+    """
+    values = timestamps.array
+    if isinstance(values, pd.arrays.DatetimeArray):
+        return values.asi8, values.unit
+    return np.asarray(values), None
+
+
+class IndicatorEngine:
+    """
+    Общий движок технических индикаторов
+
+    Стратегии объявляют нужные колонки в виде
+        {'column': (indicator, params)} или {'column': (indicator, params, output)}
+    Каждая уникальная пара (indicator, params) считается один раз на символ и бар
+    и кэшируется по отпечатку последней свечи (метка времени + OHLCV, так как
+    формирующаяся свеча меняется внутри бара). Экземпляр из get_indicator_engine()
+    общий для всех стратегий и MarketAnalyzer.
+
+    Для бэктеста полную историю символа можно загрузить через preload(): индикаторы
+    с конечным окном (WINDOW_INDEPENDENT) считаются один раз по всей истории, а окна,
+    являющиеся срезами этой истории, получают срезы готовых рядов. Рекурсивные
+    индикаторы зависят от начала окна: для них window_values() один раз считает
+    оконными ядрами (WINDOW_KERNELS) значения по каждому окну, как в торговле.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._cache: Dict[Tuple, Tuple[Tuple, Dict[str, pd.Series]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+        # Предзагруженные истории: symbol -> {'df', 'timestamps', 'close', 'outputs'}
+        self._preloaded: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _fingerprint(df: pd.DataFrame) -> Tuple:
+        """Отпечаток окна свечей: размер, границы индекса и последняя свеча"""
+        last = df.iloc[-1]
+        last_ts = last['timestamp'] if 'timestamp' in df.columns else df.index[-1]
+        return (
+            len(df), df.index[0], df.index[-1], last_ts,
+            float(last['open']), float(last['high']), float(last['low']),
+            float(last['close']), float(last['volume'])
+        )
+
+    def preload(self, symbol: str, df: pd.DataFrame) -> None:
+        """
+        Загрузка полной истории символа (бэктест)
+
+        Args:
+            symbol: Символ
+            df: Полная история свечей с колонкой timestamp
+        """
+        with self._lock:
+            self._preloaded[symbol] = {
+                'df': df,
+                'timestamps': _timestamp_keys(df['timestamp']),
+                'close': df['close'].to_numpy(),
+                'outputs': {}
+            }
+
+    def release(self, symbol: str = None) -> None:
+        """Выгрузка предзагруженной истории (символа или всех)"""
+        with self._lock:
+            if symbol is None:
+                self._preloaded.clear()
+            else:
+                self._preloaded.pop(symbol, None)
+
+    def _preloaded_bounds(self, df: pd.DataFrame, symbol: str) -> Optional[Tuple[Dict[str, Any], int, int]]:
+        """Границы окна внутри предзагруженной истории (или None, если окно не является ее срезом)"""
+        preloaded = self._preloaded.get(symbol) if symbol is not None else None
+        if preloaded is None or 'timestamp' not in df.columns or len(df) == 0:
+            return None
+
+        timestamps, unit = preloaded['timestamps']
+        keys, window_unit = _timestamp_keys(df['timestamp'])
+        if window_unit != unit:
+            return None
+        first_ts, last_ts = keys[0], keys[-1]
+        stop = int(timestamps.searchsorted(last_ts, side='right'))
+        start = stop - len(df)
+        if start < 0 or timestamps[stop - 1] != last_ts or timestamps[start] != first_ts:
+            return None
+        # Последняя свеча окна должна совпадать с историей (формирующаяся свеча считается отдельно)
+        if preloaded['close'][stop - 1] != df['close'].array[-1]:
+            return None
+        return preloaded, start, stop
+
+    def locate(self, df: pd.DataFrame, symbol: str) -> Optional[Tuple[int, int]]:
+        """Положение окна в предзагруженной истории символа: (start, stop) или None"""
+        bounds = self._preloaded_bounds(df, symbol)
+        return None if bounds is None else (bounds[1], bounds[2])
+
+    def _preloaded_outputs(self, preloaded: Dict[str, Any], indicator: str,
+                           params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Выходы индикатора по всей предзагруженной истории (считаются один раз)"""
+        key = (indicator, tuple(sorted(params.items())))
+        outputs = preloaded['outputs'].get(key)
+        if outputs is None:
+            result = INDICATORS[indicator](preloaded['df'], **params)
+            outputs = {name: series.to_numpy() for name, series in result.items()}
+            preloaded['outputs'][key] = outputs
+            self.stats['misses'] += 1
+        else:
+            self.stats['hits'] += 1
+        return outputs
+
+    def window_values(self, symbol: str, indicator: str, params: Dict[str, Any],
+                      length: int) -> Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+        """
+        Рекурсивный индикатор по всем окнам предзагруженной истории (бэктест)
+
+        Args:
+            symbol: Символ
+            indicator: Имя индикатора из WINDOW_KERNELS
+            params: Параметры индикатора
+            length: Длина окна свечей
+
+        Returns:
+            Dict: {output: (last, prev)}, где last[i] и prev[i] - значения последней и
+            предпоследней свечи при расчете по окну из length свечей, заканчивающемуся
+            свечой i; None если история не загружена или у индикатора нет ядра
+        """
+        kernel = WINDOW_KERNELS.get(indicator)
+        with self._lock:
+            preloaded = self._preloaded.get(symbol) if symbol is not None else None
+            if kernel is None or preloaded is None or not 2 <= length <= len(preloaded['df']):
+                return None
+
+            key = ('windows', length, indicator, tuple(sorted(params.items())))
+            if key in preloaded['outputs']:
+                self.stats['hits'] += 1
+                return preloaded['outputs'][key]
+            try:
+                outputs = kernel(preloaded['df'], length, **params)
+            except ValueError as e:
+                self.logger.debug("No window kernel values for %s %s: %s", indicator, params, e)
+                outputs = None
+            preloaded['outputs'][key] = outputs
+            self.stats['misses'] += 1
+            return outputs
+
+    def get(self, df: pd.DataFrame, indicator: str, params: Dict[str, Any] = None,
+            symbol: str = None) -> Dict[str, pd.Series]:
+        """
+        Выходы одного индикатора (с кэшированием)
+
+        Args:
+            df: Свечи [open, high, low, close, volume]
+            indicator: Имя индикатора из INDICATORS
+            params: Параметры индикатора
+            symbol: Символ (ключ кэша)
+
+        Returns:
+            Dict[str, Series]: Выходы индикатора ('value' для однозначных)
+        """
+        return self._get(df, indicator, params or {}, symbol, {})
+
+    def _get(self, df: pd.DataFrame, indicator: str, params: Dict[str, Any], symbol: Optional[str],
+             window: Dict[str, Any]) -> Dict[str, pd.Series]:
+        """get() с общими для всех индикаторов окна границами в истории и отпечатком (window)"""
+        if indicator not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {indicator}")
+
+        bounds = None
+        if is_window_independent(indicator):
+            if 'bounds' not in window:
+                window['bounds'] = self._preloaded_bounds(df, symbol)
+            bounds = window['bounds']
+        if bounds is not None:
+            preloaded, start, stop = bounds
+            with self._lock:
+                outputs = self._preloaded_outputs(preloaded, indicator, params)
+            warmup = WINDOW_INDEPENDENT[indicator](**params)
+            result = {}
+            for name, values in outputs.items():
+                sliced = values[start:stop].copy()
+                sliced[:warmup[name]] = np.nan  # В окне первые бары еще без полного периода
+                result[name] = pd.Series(sliced, index=df.index)
+            return result
+
+        key = (symbol, indicator, tuple(sorted(params.items())))
+        if 'fingerprint' not in window:
+            window['fingerprint'] = self._fingerprint(df)
+        fingerprint = window['fingerprint']
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self.stats['hits'] += 1
+                return cached[1]
+
+        result = INDICATORS[indicator](df, **params)
+
+        with self._lock:
+            self._cache[key] = (fingerprint, result)
+            self.stats['misses'] += 1
+        return result
+
+    def compute(self, df: pd.DataFrame, specs: Dict[str, Tuple], symbol: str = None) -> Dict[str, pd.Series]:
+        """
+        Расчет объявленных колонок
+
+        Args:
+            df: Свечи
+            specs: {'column': (indicator, params[, output])}
+            symbol: Символ (ключ кэша)
+
+        Returns:
+            Dict[str, Series]: Колонки по объявлению
+        """
+        columns = {}
+        window = {}  # Границы окна в истории и отпечаток считаются один раз на все колонки
+        for column, spec in specs.items():
+            indicator, params = spec[0], spec[1]
+            output = spec[2] if len(spec) > 2 else 'value'
+            columns[column] = self._get(df, indicator, params, symbol, window)[output]
+        return columns
+
+    def attach(self, df: pd.DataFrame, specs: Dict[str, Tuple], symbol: str = None) -> pd.DataFrame:
+        """Новый DataFrame со свечами и объявленными колонками индикаторов"""
+        with get_cycle_profiler().stage('indicators', symbol):
+            return df.assign(**self.compute(df, specs, symbol))
+
+    def clear(self, symbol: str = None) -> None:
+        """Очистка кэша (для символа или целиком)"""
+        with self._lock:
+            if symbol is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == symbol]:
+                    del self._cache[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика кэша"""
+        with self._lock:
+            total = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._cache),
+                'hit_rate': self.stats['hits'] / total if total else 0.0
+            }
+
+
+_shared_engine: Optional[IndicatorEngine] = None
+_shared_lock = threading.Lock()
+
+
+def get_indicator_engine() -> IndicatorEngine:
+    """Общий экземпляр IndicatorEngine для всех стратегий процесса"""
+    global _shared_engine
+    with _shared_lock:
+        if _shared_engine is None:
+            _shared_engine = IndicatorEngine()
+        return _shared_engine
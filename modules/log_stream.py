@@ -0,0 +1,352 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Атрибуты LogRecord, которые не являются полями события
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Строка человекочитаемого лога: "2024-01-01 12:00:00 - trading_bot - INFO - сообщение"
+_TEXT_LINE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})(?:,\d+)? - (\S+) - ([A-Z]+) - (.*)$')
+
+# Сообщения старых текстовых логов -> события
+_TEXT_EVENTS = [
+    (re.compile(r'Trading cycle started'), 'cycle_started', ()),
+    (re.compile(r'Processed (\d+)/(\d+) pairs in ([\d.]+)s'), 'cycle_finished',
+     (('pairs', int), ('total_pairs', int), ('duration', float))),
+    (re.compile(r'Strategy result for (\S+): (\w+)'), 'strategy_result', (('symbol', str), ('action', str))),
+    (re.compile(r'No action for (\S+)'), 'no_action', (('symbol', str),)),
+    (re.compile(r'Account balance: \$([\d.]+)'), 'balance', (('balance', float),)),
+]
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Запись лога одной строкой JSON
+
+    Поля: ts (epoch), time, level, logger, message и все поля из extra
+    (logger.info("...", extra={'event': 'cycle_finished', 'duration': 1.2})).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            'ts': round(record.created, 3),
+            'time': datetime.fromtimestamp(record.created).strftime(TIME_FORMAT),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                event[key] = value
+        if record.exc_info:
+            event['exc'] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+def parse_text_line(line: str) -> Optional[Dict[str, Any]]:
+    """Событие из строки текстового лога (None для продолжений многострочных записей)"""
+    match = _TEXT_LINE.match(line.rstrip('\r\n'))
+    if not match:
+        return None
+
+    time_str, logger_name, level, message = match.groups()
+    event = {'time': time_str, 'level': level, 'logger': logger_name, 'message': message}
+    for pattern, name, groups in _TEXT_EVENTS:
+        found = pattern.search(message)
+        if found:
+            event['event'] = name
+            for (field, cast), value in zip(groups, found.groups()):
+                event[field] = cast(value)
+            break
+    return event
+
+
+def parse_line(line: bytes, is_json: bool) -> Optional[Dict[str, Any]]:
+    """Событие из строки лога (JSON lines или текст)"""
+    text = line.decode('utf-8', errors='replace')
+    if not is_json:
+        return parse_text_line(text)
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def find_logs(log_dir: str = 'logs') -> List[Path]:
+    """Логи бота по датам; для даты с журналом событий .jsonl текстовый .log пропускается"""
+    by_date: Dict[str, Path] = {}
+    for path in sorted(Path(log_dir).glob('trading_*.log')) + sorted(Path(log_dir).glob('trading_*.jsonl')):
+        by_date[path.stem] = path  # .jsonl перезаписывает .log той же даты
+    return [by_date[key] for key in sorted(by_date)]
+
+
+class LogSummary:
+    """
+    Агрегаты по событиям лога в ограниченной памяти
+
+    Хранятся только счетчики, суммы и последние max_recent ошибок/сигналов,
+    поэтому размер не зависит от длины лога. Сводки отдельных файлов складываются merge().
+    """
+
+    FAST_CYCLE = 10.0  # Сек
+    SLOW_CYCLE = 30.0
+
+    def __init__(self, max_recent: int = 20):
+        self.max_recent = max_recent
+        self.records = 0
+        self.levels = Counter()
+        self.events = Counter()
+        self.error_types = Counter()
+        self.symbol_actions: Dict[str, Counter] = {}
+        self.cycle_count = 0
+        self.cycle_sum = 0.0
+        self.cycle_min: Optional[float] = None
+        self.cycle_max: Optional[float] = None
+        self.fast_cycles = 0
+        self.slow_cycles = 0
+        self.last_balance: Optional[float] = None
+        self.first_open_time: Optional[str] = None
+        self.last_open_time: Optional[str] = None
+        self.recent_errors = deque(maxlen=max_recent)
+        self.recent_signals = deque(maxlen=max_recent)
+
+    @staticmethod
+    def classify_error(message: str) -> str:
+        lowered = message.lower()
+        if 'account balance' in lowered:
+            return 'Account Balance Error'
+        if 'api' in lowered:
+            return 'API Error'
+        if 'connection' in lowered:
+            return 'Connection Error'
+        return 'Other Error'
+
+    def update(self, event: Dict[str, Any]) -> None:
+        """Учет одного события"""
+        self.records += 1
+        level = event.get('level', 'INFO')
+        self.levels[level] += 1
+        message = event.get('message', '')
+
+        if level in ('ERROR', 'CRITICAL'):
+            self.error_types[self.classify_error(message)] += 1
+            self.recent_errors.append((event.get('time'), message))
+
+        name = event.get('event')
+        if not name:
+            return
+        self.events[name] += 1
+
+        if name == 'cycle_finished':
+            duration = float(event.get('duration', 0.0))
+            self.cycle_count += 1
+            self.cycle_sum += duration
+            self.cycle_min = duration if self.cycle_min is None else min(self.cycle_min, duration)
+            self.cycle_max = duration if self.cycle_max is None else max(self.cycle_max, duration)
+            if duration < self.FAST_CYCLE:
+                self.fast_cycles += 1
+            elif duration > self.SLOW_CYCLE:
+                self.slow_cycles += 1
+        elif name in ('strategy_result', 'no_action'):
+            action = event.get('action', 'NONE') if name == 'strategy_result' else 'NONE'
+            symbol = event.get('symbol', 'UNKNOWN')
+            self.symbol_actions.setdefault(symbol, Counter())[action] += 1
+            if action != 'NONE':
+                self.recent_signals.append((event.get('time'), symbol, action))
+            if action == 'OPEN':
+                self.first_open_time = self.first_open_time or event.get('time')
+                self.last_open_time = event.get('time')
+        elif name == 'balance':
+            self.last_balance = float(event['balance'])
+
+    def merge(self, other: 'LogSummary') -> 'LogSummary':
+        """Добавление сводки более позднего файла"""
+        self.records += other.records
+        self.levels.update(other.levels)
+        self.events.update(other.events)
+        self.error_types.update(other.error_types)
+        for symbol, actions in other.symbol_actions.items():
+            self.symbol_actions.setdefault(symbol, Counter()).update(actions)
+        self.cycle_count += other.cycle_count
+        self.cycle_sum += other.cycle_sum
+        for attr, pick in (('cycle_min', min), ('cycle_max', max)):
+            values = [v for v in (getattr(self, attr), getattr(other, attr)) if v is not None]
+            setattr(self, attr, pick(values) if values else None)
+        self.fast_cycles += other.fast_cycles
+        self.slow_cycles += other.slow_cycles
+        if other.last_balance is not None:
+            self.last_balance = other.last_balance
+        self.first_open_time = self.first_open_time or other.first_open_time
+        self.last_open_time = other.last_open_time or self.last_open_time
+        self.recent_errors.extend(other.recent_errors)
+        self.recent_signals.extend(other.recent_signals)
+        return self
+
+    def action_count(self, action: str) -> int:
+        return sum(actions[action] for actions in self.symbol_actions.values())
+
+    @property
+    def avg_cycle(self) -> Optional[float]:
+        return self.cycle_sum / self.cycle_count if self.cycle_count else None
+
+    def signal_frequency(self) -> Optional[float]:
+        """OPEN сигналов в минуту между первым и последним"""
+        if not self.first_open_time or self.first_open_time == self.last_open_time:
+            return None
+        span = (datetime.strptime(self.last_open_time, TIME_FORMAT) -
+                datetime.strptime(self.first_open_time, TIME_FORMAT)).total_seconds()
+        return self.action_count('OPEN') / (span / 60) if span > 0 else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        state = {key: value for key, value in vars(self).items()}
+        for key in ('recent_errors', 'recent_signals'):
+            state[key] = [list(item) for item in state[key]]
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'LogSummary':
+        summary = cls(state.get('max_recent', 20))
+        for key, value in state.items():
+            if key in ('levels', 'events', 'error_types'):
+                value = Counter(value)
+            elif key == 'symbol_actions':
+                value = {symbol: Counter(actions) for symbol, actions in value.items()}
+            elif key in ('recent_errors', 'recent_signals'):
+                value = deque((tuple(item) for item in value), maxlen=summary.max_recent)
+            setattr(summary, key, value)
+        return summary
+
+
+class LogStreamAnalyzer:
+    """
+    Однопроходный потоковый анализ логов бота
+
+    Файл читается последовательно с сохраненного байтового смещения, в сводку попадают
+    только полные строки (недописанная последняя строка будет прочитана в следующий раз).
+    Индекс index_path хранит для каждого файла смещение, отпечаток начала файла и сводку,
+    поэтому повторный анализ растущего лога читает только новые байты. Память ограничена
+    размером LogSummary независимо от размера и количества файлов.
+    """
+
+    FINGERPRINT_BYTES = 4096
+
+    def __init__(self, index_path: str = None, max_recent: int = 20):
+        """
+        Args:
+            index_path: JSON индекс смещений (None - без инкрементального анализа)
+            max_recent: Последних ошибок/сигналов в сводке
+        """
+        self.logger = logging.getLogger(__name__)
+        self.index_path = Path(index_path) if index_path else None
+        self.max_recent = max_recent
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict[str, Any]:
+        if self.index_path is None or not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Log index unreadable, starting over: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        if self.index_path is None:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def _fingerprint(self, path: Path, length: int) -> str:
+        """Хэш начала файла (ротация/перезапись файла с тем же именем сбрасывает индекс)"""
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read(min(length, self.FINGERPRINT_BYTES))).hexdigest()
+
+    @staticmethod
+    def scan(path, offset: int = 0) -> Iterator[Tuple[Optional[Dict[str, Any]], int]]:
+        """(событие, смещение после строки) для полных строк начиная с offset"""
+        path = Path(path)
+        is_json = path.suffix == '.jsonl'
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                yield parse_line(line, is_json), offset
+
+    def analyze_file(self, path, incremental: bool = True) -> LogSummary:
+        """Сводка по одному файлу (продолжение с сохраненного смещения, если файл тот же)"""
+        path = Path(path)
+        key = str(path.resolve())
+        entry = self._index.get(key) if incremental else None
+
+        summary, offset = LogSummary(self.max_recent), 0
+        size = path.stat().st_size
+        if entry and entry['offset'] <= size and entry['fingerprint'] == self._fingerprint(path, entry['offset']):
+            summary, offset = LogSummary.from_dict(entry['summary']), entry['offset']
+
+        for event, offset_after in self.scan(path, offset):
+            if event is not None:
+                summary.update(event)
+            offset = offset_after
+
+        self._index[key] = {'offset': offset, 'fingerprint': self._fingerprint(path, offset),
+                            'summary': summary.to_dict()}
+        return summary
+
+    def analyze(self, paths, incremental: bool = True) -> LogSummary:
+        """Общая сводка по файлам в хронологическом порядке"""
+        total = LogSummary(self.max_recent)
+        for path in paths:
+            total.merge(self.analyze_file(path, incremental))
+        self._save_index()
+        return total
+
+    @staticmethod
+    def tail(path, count: int = 50, block_size: int = 65536) -> List[Dict[str, Any]]:
+        """Последние count событий: файл читается блоками с конца"""
+        path = Path(path)
+        is_json = path.suffix == '.jsonl'
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            # +1 строка: первая прочитанная строка может быть неполной
+            while position > 0 and data.count(b'\n') <= count:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+
+        lines = data.split(b'\n')
+        if position > 0:
+            lines = lines[1:]
+        events = [parse_line(line, is_json) for line in lines if line.strip()]
+        return [event for event in events if event is not None][-count:]
+
+    @staticmethod
+    def follow(path, poll_interval: float = 1.0, from_end: bool = True) -> Iterator[Dict[str, Any]]:
+        """Новые события растущего лога (как tail -f)"""
+        path = Path(path)
+        offset = path.stat().st_size if from_end else 0
+        while True:
+            if path.stat().st_size < offset:
+                offset = 0  # Файл пересоздан
+            for event, offset_after in LogStreamAnalyzer.scan(path, offset):
+                offset = offset_after
+                if event is not None:
+                    yield event
+            time.sleep(poll_interval)
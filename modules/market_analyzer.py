@@ -4,13 +4,7 @@ import numpy as np
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from config.trading_config import TradingConfig
-
-# Попытка импорта ta (технический анализ)
-try:
-    import ta
-except ImportError:
-    logging.error("ta library not installed. Please install: pip install ta")
-    raise ImportError("Required 'ta' library not found")
+from modules.indicator_engine import get_indicator_engine
 
 
 class MarketAnalyzer:
@@ -27,9 +21,40 @@ class MarketAnalyzer:
         self.cache = {}
         self.cache_timeout = 60  # секунд
 
+        # Общий движок индикаторов (те же расчеты, что и у стратегий)
+        self.indicator_engine = get_indicator_engine()
+
         self.logger.info("MarketAnalyzer initialized with config parameters")
 
-    def calculate_indicators(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    def get_indicator_specs(self) -> Dict[str, Tuple]:
+        """Колонки индикаторов по TradingConfig.INDICATORS"""
+        params = self.indicator_params
+        macd_params = {
+            'window_fast': params['macd']['fast'],
+            'window_slow': params['macd']['slow'],
+            'window_sign': params['macd']['signal']
+        }
+        bb_params = {'window': params['bollinger']['period'], 'window_dev': params['bollinger']['std']}
+        stoch_params = {'window': params['stochastic']['k_period'], 'smooth_window': params['stochastic']['smooth_k']}
+        return {
+            'ema_fast': ('ema', {'window': params['ema']['fast']}),
+            'ema_medium': ('ema', {'window': params['ema']['medium']}),
+            'ema_slow': ('ema', {'window': params['ema']['slow']}),
+            'ema_trend': ('ema', {'window': params['ema']['trend']}),
+            'rsi': ('rsi', {'window': params['rsi']['period']}),
+            'macd': ('macd', macd_params, 'macd'),
+            'macd_signal': ('macd', macd_params, 'signal'),
+            'macd_histogram': ('macd', macd_params, 'histogram'),
+            'bb_upper': ('bollinger', bb_params, 'upper'),
+            'bb_lower': ('bollinger', bb_params, 'lower'),
+            'bb_middle': ('bollinger', bb_params, 'middle'),
+            'volume_sma': ('sma', {'column': 'volume', 'window': params['volume']['sma_period']}),
+            'atr': ('atr', {'window': params['atr']['period']}),
+            'stoch_k': ('stochastic', stoch_params, 'k'),
+            'stoch_d': ('stochastic', stoch_params, 'd')
+        }
+
+    def calculate_indicators(self, df: pd.DataFrame, symbol: str = None) -> Optional[pd.DataFrame]:
         """Расчет всех технических индикаторов для DataFrame"""
         if df is None or df.empty:
             self.logger.error("Empty or None dataframe provided")
@@ -40,76 +65,17 @@ class MarketAnalyzer:
             return None
 
         try:
-            # Создаем копию для безопасности
-            df_calc = df.copy()
-
             # Проверяем наличие необходимых колонок
             required_cols = ['open', 'high', 'low', 'close', 'volume']
-            if not all(col in df_calc.columns for col in required_cols):
-                self.logger.error(f"Missing required columns. Expected: {required_cols}, Got: {list(df_calc.columns)}")
+            if not all(col in df.columns for col in required_cols):
+                self.logger.error(f"Missing required columns. Expected: {required_cols}, Got: {list(df.columns)}")
                 return None
 
-            # EMA индикаторы
-            ema_params = self.indicator_params['ema']
-            df_calc['ema_fast'] = ta.trend.EMAIndicator(df_calc['close'], window=ema_params['fast']).ema_indicator()
-            df_calc['ema_medium'] = ta.trend.EMAIndicator(df_calc['close'], window=ema_params['medium']).ema_indicator()
-            df_calc['ema_slow'] = ta.trend.EMAIndicator(df_calc['close'], window=ema_params['slow']).ema_indicator()
-            df_calc['ema_trend'] = ta.trend.EMAIndicator(df_calc['close'], window=ema_params['trend']).ema_indicator()
-
-            # RSI
-            rsi_params = self.indicator_params['rsi']
-            df_calc['rsi'] = ta.momentum.RSIIndicator(df_calc['close'], window=rsi_params['period']).rsi()
-
-            # MACD
-            macd_params = self.indicator_params['macd']
-            macd_indicator = ta.trend.MACD(
-                df_calc['close'],
-                window_fast=macd_params['fast'],
-                window_slow=macd_params['slow'],
-                window_sign=macd_params['signal']
-            )
-            df_calc['macd'] = macd_indicator.macd()
-            df_calc['macd_signal'] = macd_indicator.macd_signal()
-            df_calc['macd_histogram'] = macd_indicator.macd_diff()
-
-            # Bollinger Bands
-            bb_params = self.indicator_params['bollinger']
-            bollinger = ta.volatility.BollingerBands(
-                df_calc['close'],
-                window=bb_params['period'],
-                window_dev=bb_params['std']
-            )
-            df_calc['bb_upper'] = bollinger.bollinger_hband()
-            df_calc['bb_lower'] = bollinger.bollinger_lband()
-            df_calc['bb_middle'] = bollinger.bollinger_mavg()
+            # Индикаторы из общего движка (кэш на символ и бар); attach возвращает новый DataFrame
+            df_calc = self.indicator_engine.attach(df, self.get_indicator_specs(), symbol)
             df_calc['bb_width'] = (df_calc['bb_upper'] - df_calc['bb_lower']) / df_calc['bb_middle']
-
-            # Volume indicators
-            volume_params = self.indicator_params['volume']
-            df_calc['volume_sma'] = df_calc['volume'].rolling(window=volume_params['sma_period']).mean()
             df_calc['volume_ratio'] = df_calc['volume'] / df_calc['volume_sma']
 
-            # ATR
-            atr_params = self.indicator_params['atr']
-            df_calc['atr'] = ta.volatility.AverageTrueRange(
-                high=df_calc['high'],
-                low=df_calc['low'],
-                close=df_calc['close'],
-                window=atr_params['period']
-            ).average_true_range()
-
-            # Stochastic
-            stoch_params = self.indicator_params['stochastic']
-            stoch = ta.momentum.StochasticOscillator(
-                high=df_calc['high'],
-                low=df_calc['low'],
-                close=df_calc['close'],
-                window=stoch_params['k_period'],
-                smooth_window=stoch_params['smooth_k']
-            )
-            df_calc['stoch_k'] = stoch.stoch()
-            df_calc['stoch_d'] = stoch.stoch_signal()
-
             # Дополнительные индикаторы
             df_calc['price_change'] = df_calc['close'].pct_change()
             df_calc['volatility'] = df_calc['price_change'].rolling(window=20).std()
@@ -119,7 +85,7 @@ class MarketAnalyzer:
             if nan_count > 0:
                 self.logger.warning(f"Found {nan_count} NaN values after indicator calculation")
                 # Заполняем NaN значения методом forward fill
-                df_calc = df_calc.fillna(method='ffill').fillna(method='bfill')
+                df_calc = df_calc.ffill().bfill()
 
             self.logger.debug(f"Successfully calculated indicators for {len(df_calc)} rows")
             return df_calc
@@ -268,87 +234,95 @@ class MarketAnalyzer:
             self.logger.error(f"Error in volume analysis: {e}")
             return 'UNKNOWN'
 
-    def _find_support_resistance(self, df: pd.DataFrame, lookback: int = 50) -> List[Dict[str, Any]]:
-        """Поиск уровней поддержки и сопротивления"""
+    def _find_support_resistance(self, df: pd.DataFrame, lookback: int = None) -> List[Dict[str, Any]]:
+        """
+        Поиск уровней поддержки и сопротивления
+
+        Локальные экстремумы ищутся центрированными скользящими min/max (O(n)),
+        касания уровней считаются бинарным поиском по отсортированным ценам,
+        поэтому lookback может составлять тысячи свечей. Сила нормируется на длину
+        lookback, при равной силе выше более свежие уровни.
+
+        Args:
+            df: Свечи
+            lookback: Число последних свечей (по умолчанию из TradingConfig.INDICATORS)
+
+        Returns:
+            List[Dict]: Топ уровней по силе
+        """
+        sr_params = self.indicator_params['support_resistance']
+        lookback = lookback or sr_params['lookback_period']
         if df.empty or len(df) < lookback:
             return []
 
         try:
-            levels = []
-            window = 5
+            window = sr_params['extrema_window']
+            tolerance = sr_params['tolerance']
 
             # Ограничиваем анализ последними данными
             recent_df = df.tail(lookback)
+            lows = recent_df['low'].to_numpy(dtype=np.float64)
+            highs = recent_df['high'].to_numpy(dtype=np.float64)
+
+            # Бар - экстремум, если он равен min/max окна [i - window, i + window]
+            span = 2 * window + 1
+            rolling_min = recent_df['low'].rolling(span, center=True, min_periods=span).min().to_numpy()
+            rolling_max = recent_df['high'].rolling(span, center=True, min_periods=span).max().to_numpy()
+            support_idx = np.flatnonzero(lows <= rolling_min)
+            resistance_idx = np.flatnonzero(highs >= rolling_max)
+
+            support_prices = lows[support_idx]
+            resistance_prices = highs[resistance_idx]
+            # Сила 1 - касания на full_strength_touch_rate доле свечей (10 касаний на 50 свечах)
+            full_touches = max(lookback * sr_params.get('full_strength_touch_rate', 0.2), 1.0)
+            support_strength = self._calculate_level_strength(lows, support_prices, tolerance, full_touches)
+            resistance_strength = self._calculate_level_strength(highs, resistance_prices, tolerance, full_touches)
+
+            # При равной силе - сначала свежие бары, на одном баре поддержка раньше сопротивления
+            candidates = [(i, 0, 'SUPPORT', price, strength)
+                          for i, price, strength in zip(support_idx, support_prices, support_strength)]
+            candidates += [(i, 1, 'RESISTANCE', price, strength)
+                           for i, price, strength in zip(resistance_idx, resistance_prices, resistance_strength)]
+            candidates.sort(key=lambda x: (-x[0], x[1]))
+            candidates.sort(key=lambda x: x[4], reverse=True)
 
-            for i in range(window, len(recent_df) - window):
-                current_idx = i
-
-                # Проверка на локальный минимум (поддержка)
-                if self._is_local_minimum(recent_df, current_idx, window):
-                    levels.append({
-                        'type': 'SUPPORT',
-                        'price': recent_df['low'].iloc[current_idx],
-                        'strength': self._calculate_level_strength(recent_df, recent_df['low'].iloc[current_idx],
-                                                                   'SUPPORT'),
-                        'timestamp': recent_df.index[current_idx] if hasattr(recent_df.index[current_idx],
-                                                                             'timestamp') else datetime.now()
-                    })
-
-                # Проверка на локальный максимум (сопротивление)
-                if self._is_local_maximum(recent_df, current_idx, window):
-                    levels.append({
-                        'type': 'RESISTANCE',
-                        'price': recent_df['high'].iloc[current_idx],
-                        'strength': self._calculate_level_strength(recent_df, recent_df['high'].iloc[current_idx],
-                                                                   'RESISTANCE'),
-                        'timestamp': recent_df.index[current_idx] if hasattr(recent_df.index[current_idx],
-                                                                             'timestamp') else datetime.now()
-                    })
-
-            # Сортируем по силе уровня и возвращаем топ-5
-            levels.sort(key=lambda x: x['strength'], reverse=True)
-            return levels[:5]
+            levels = []
+            for i, _, level_type, price, strength in candidates[:sr_params['max_levels']]:
+                index_value = recent_df.index[i]
+                levels.append({
+                    'type': level_type,
+                    'price': float(price),
+                    'strength': float(strength),
+                    'timestamp': index_value if hasattr(index_value, 'timestamp') else datetime.now()
+                })
+            return levels
 
         except Exception as e:
             self.logger.error(f"Error finding support/resistance: {e}")
             return []
 
-    def _is_local_minimum(self, df: pd.DataFrame, idx: int, window: int) -> bool:
-        """Проверка на локальный минимум"""
-        try:
-            current_low = df['low'].iloc[idx]
-            left_lows = df['low'].iloc[idx - window:idx]
-            right_lows = df['low'].iloc[idx + 1:idx + window + 1]
-
-            return (current_low <= left_lows.min()) and (current_low <= right_lows.min())
-        except:
-            return False
-
-    def _is_local_maximum(self, df: pd.DataFrame, idx: int, window: int) -> bool:
-        """Проверка на локальный максимум"""
-        try:
-            current_high = df['high'].iloc[idx]
-            left_highs = df['high'].iloc[idx - window:idx]
-            right_highs = df['high'].iloc[idx + 1:idx + window + 1]
-
-            return (current_high >= left_highs.max()) and (current_high >= right_highs.max())
-        except:
-            return False
-
-    def _calculate_level_strength(self, df: pd.DataFrame, price: float, level_type: str) -> float:
-        """Расчет силы уровня поддержки/сопротивления"""
-        try:
-            touches = 0
-            tolerance = 0.001  # 0.1% толерантность
-
-            if level_type == 'SUPPORT':
-                touches = len(df[abs(df['low'] - price) / price <= tolerance])
-            else:  # RESISTANCE
-                touches = len(df[abs(df['high'] - price) / price <= tolerance])
-
-            return min(touches / 10.0, 1.0)  # Нормализуем от 0 до 1
-        except:
-            return 0.0
+    @staticmethod
+    def _calculate_level_strength(prices: np.ndarray, levels: np.ndarray, tolerance: float = 0.001,
+                                  full_touches: float = 10.0) -> np.ndarray:
+        """
+        Сила уровней по числу касаний (цена в пределах tolerance от уровня)
+
+        Args:
+            prices: Цены low (поддержка) или high (сопротивление)
+            levels: Цены уровней
+            tolerance: Относительный допуск касания
+            full_touches: Число касаний, соответствующее силе 1
+
+        Returns:
+            np.ndarray: Сила уровней от 0 до 1
+        """
+        if len(levels) == 0:
+            return np.zeros(0)
+        sorted_prices = np.sort(prices[~np.isnan(prices)])
+        band = np.abs(levels) * tolerance
+        touches = (np.searchsorted(sorted_prices, levels + band, side='right')
+                   - np.searchsorted(sorted_prices, levels - band, side='left'))
+        return np.minimum(touches / full_touches, 1.0)  # Нормализуем от 0 до 1
 
     def _determine_market_phase(self, df: pd.DataFrame) -> str:
         """Определение фазы рынка"""
@@ -477,7 +451,7 @@ class MarketAnalyzer:
                 return {'error': 'No data available'}
 
             # Рассчитываем индикаторы
-            df_with_indicators = self.calculate_indicators(df)
+            df_with_indicators = self.calculate_indicators(df, symbol)
             if df_with_indicators is None:
                 return {'error': 'Failed to calculate indicators'}
 
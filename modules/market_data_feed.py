@@ -0,0 +1,319 @@
+import json
+import logging
+import threading
+import time
+import pandas as pd
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Callable
+from config.trading_config import TradingConfig
+from modules.candle_store import interval_to_ms
+
+
+class MarketDataFeed:
+    """
+    Потоковые рыночные данные через websocket ByBit
+
+    Держит в памяти по каждому символу свечи (через CandleStore), тикер и стакан,
+    обновляемые push-сообщениями pybit WebSocket. Закрытие свечи (confirm=True)
+    будит ожидающий торговый цикл. Если поток не обновлялся дольше stale_after
+    или соединение потеряно, данные берутся через DataFetcher (REST), а после
+    переподключения свечи догружаются через CandleStore.get_candles.
+    """
+
+    def __init__(self, data_fetcher, candle_store, symbols: List[str], interval: str,
+                 ws_factory: Callable = None, orderbook_depth: int = None, stale_after: float = None,
+                 record_path: str = None, wake_interval: str = None):
+        """
+        Args:
+            data_fetcher: DataFetcher для REST fallback
+            candle_store: CandleStore с историей свечей
+            symbols: Торговые пары
+            interval: Интервал свечей ByBit
+            ws_factory: Фабрика websocket клиента (по умолчанию pybit WebSocket, linear)
+            orderbook_depth: Глубина стакана в подписке (1, 50, 200, 500)
+            stale_after: Через сколько секунд без сообщений поток считается устаревшим
+            record_path: JSONL файл для записи сообщений (для последующего воспроизведения)
+            wake_interval: Будить цикл только при закрытии свечи этого (старшего) интервала
+        """
+        self.logger = logging.getLogger(__name__)
+        settings = TradingConfig.WEBSOCKET_SETTINGS
+
+        self.data_fetcher = data_fetcher
+        self.candle_store = candle_store
+        self.symbols = list(symbols)
+        self.interval = str(interval)
+        self.ws_factory = ws_factory or self._default_ws_factory
+        self.orderbook_depth = orderbook_depth or settings.get('orderbook_depth', 50)
+        self.stale_after = stale_after or settings.get('stale_after', 30)
+        self.record_path = record_path if record_path is not None else settings.get('record_path')
+        self.wake_step = interval_to_ms(wake_interval or self.interval)
+        self.interval_step = interval_to_ms(self.interval)
+
+        self.ws = None
+        self.tickers: Dict[str, Dict[str, Any]] = {}
+        self.orderbooks: Dict[str, Dict[str, Any]] = {}
+        self.last_message_time = 0.0
+
+        self._lock = threading.Lock()
+        self._record_lock = threading.Lock()
+        self._close_condition = threading.Condition()
+        self._closed_symbols = set()
+        self._needs_backfill = set(self.symbols)
+        self._running = False
+
+        self.stats = {
+            'messages': 0,
+            'kline_messages': 0,
+            'candle_closes': 0,
+            'reconnects': 0,
+            'backfills': 0,
+            'rest_fallbacks': 0
+        }
+
+    @staticmethod
+    def _default_ws_factory():
+        from pybit.unified_trading import WebSocket
+        return WebSocket(testnet=TradingConfig.TESTNET, channel_type="linear")
+
+    # ------------------------------------------------------------------
+    # Подключение
+    # ------------------------------------------------------------------
+
+    def start(self) -> bool:
+        """Начальная загрузка свечей и подключение к потоку"""
+        self._running = True
+        for symbol in self.symbols:
+            self._backfill(symbol)
+
+        try:
+            self._connect()
+            self.logger.info(f"Market data feed started for {len(self.symbols)} symbols ({self.interval})")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to start market data feed, using REST polling: {e}")
+            self.ws = None
+            return False
+
+    def stop(self) -> None:
+        """Отключение от потока и освобождение ожидающих"""
+        self._running = False
+        self._disconnect()
+        with self._close_condition:
+            self._close_condition.notify_all()
+        self.logger.info("Market data feed stopped")
+
+    def _connect(self) -> None:
+        """Создание websocket клиента и подписка на потоки"""
+        ws = self.ws_factory()
+        ws.kline_stream(interval=self.interval, symbol=self.symbols, callback=self._on_kline)
+        ws.ticker_stream(symbol=self.symbols, callback=self._on_ticker)
+        if self.orderbook_depth:
+            ws.orderbook_stream(depth=self.orderbook_depth, symbol=self.symbols, callback=self._on_orderbook)
+        self.ws = ws
+        self.last_message_time = time.monotonic()
+
+    def _disconnect(self) -> None:
+        ws, self.ws = self.ws, None
+        if ws is not None:
+            try:
+                ws.exit()
+            except Exception as e:
+                self.logger.debug(f"Error closing websocket: {e}")
+
+    def is_healthy(self) -> bool:
+        """Соединение активно и сообщения приходят"""
+        ws = self.ws
+        if ws is None:
+            return False
+        try:
+            connected = ws.is_connected()
+        except Exception:
+            connected = False
+        return connected and time.monotonic() - self.last_message_time < self.stale_after
+
+    def ensure_connected(self) -> bool:
+        """Переподключение при потере соединения или устаревшем потоке"""
+        if not self._running or self.is_healthy():
+            return self.is_healthy()
+
+        self.logger.warning("Market data feed is disconnected or stale, reconnecting...")
+        self._disconnect()
+        with self._lock:
+            self._needs_backfill.update(self.symbols)
+
+        try:
+            self._connect()
+            self.stats['reconnects'] += 1
+            self.logger.info("Market data feed reconnected")
+            return True
+        except Exception as e:
+            self.logger.error(f"Market data feed reconnect failed: {e}")
+            self.ws = None
+            return False
+
+    # ------------------------------------------------------------------
+    # Обработка сообщений (вызывается из потока websocket)
+    # ------------------------------------------------------------------
+
+    def _touch(self, message: Dict[str, Any]) -> None:
+        self.last_message_time = time.monotonic()
+        self.stats['messages'] += 1
+        if self.record_path:
+            self._record(message)
+
+    def _record(self, message: Dict[str, Any]) -> None:
+        """Запись сообщения в JSONL для воспроизведения через ReplayWebSocket"""
+        try:
+            with self._record_lock:
+                with open(self.record_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(message, default=str) + '\n')
+        except Exception as e:
+            self.logger.warning(f"Failed to record market data message: {e}")
+            self.record_path = None
+
+    def _on_kline(self, message: Dict[str, Any]) -> None:
+        self._touch(message)
+        self.stats['kline_messages'] += 1
+        symbol = message.get('topic', '').split('.')[-1]
+
+        try:
+            for item in message.get('data', []):
+                bar = {
+                    'timestamp': pd.Timestamp(int(item['start']), unit='ms', tz='UTC'),
+                    'open': float(item['open']),
+                    'high': float(item['high']),
+                    'low': float(item['low']),
+                    'close': float(item['close']),
+                    'volume': float(item['volume'])
+                }
+
+                with self._lock:
+                    pending_backfill = symbol in self._needs_backfill
+                if pending_backfill or not self.candle_store.apply_bar(symbol, self.interval, bar):
+                    # Разрыв в истории - догрузка выполняется при следующем запросе свечей
+                    with self._lock:
+                        self._needs_backfill.add(symbol)
+
+                if item.get('confirm'):
+                    self.stats['candle_closes'] += 1
+                    # Базовая свеча закрывает интервал wake_interval (например, 1m свеча 10:04 - 5m 10:00)
+                    if self.wake_step != self.interval_step and (int(item['start']) + self.interval_step) % self.wake_step:
+                        continue
+                    with self._close_condition:
+                        self._closed_symbols.add(symbol)
+                        self._close_condition.notify_all()
+
+        except (KeyError, ValueError, TypeError) as e:
+            self.logger.warning(f"Malformed kline message for {symbol}: {e}")
+
+    def _on_ticker(self, message: Dict[str, Any]) -> None:
+        self._touch(message)
+        data = message.get('data') or {}
+        symbol = data.get('symbol') or message.get('topic', '').split('.')[-1]
+        with self._lock:
+            self.tickers[symbol] = {'data': dict(data), 'received': time.monotonic()}
+
+    def _on_orderbook(self, message: Dict[str, Any]) -> None:
+        self._touch(message)
+        data = message.get('data') or {}
+        symbol = data.get('s') or message.get('topic', '').split('.')[-1]
+        with self._lock:
+            self.orderbooks[symbol] = {
+                'bids': list(data.get('b', [])),
+                'asks': list(data.get('a', [])),
+                'ts': message.get('ts'),
+                'received': time.monotonic()
+            }
+
+    # ------------------------------------------------------------------
+    # Доступ к данным
+    # ------------------------------------------------------------------
+
+    def wait_for_candle_close(self, timeout: float) -> List[str]:
+        """
+        Ожидание закрытия свечи
+
+        Returns:
+            List[str]: Символы, по которым закрылась свеча (пустой список по таймауту)
+        """
+        with self._close_condition:
+            if not self._closed_symbols and self._running:
+                self._close_condition.wait(timeout)
+            closed = sorted(self._closed_symbols)
+            self._closed_symbols.clear()
+        return closed
+
+    def _backfill(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Догрузка свечей через REST (CandleStore -> DataFetcher)"""
+        df = self.candle_store.get_candles(symbol, self.interval)
+        if df is not None:
+            with self._lock:
+                self._needs_backfill.discard(symbol)
+            self.stats['backfills'] += 1
+        return df
+
+    def get_candles(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Свечи символа: из потока, либо через REST при разрыве или потере соединения"""
+        with self._lock:
+            pending_backfill = symbol in self._needs_backfill
+
+        if pending_backfill:
+            return self._backfill(symbol)
+
+        if not self.is_healthy():
+            self.stats['rest_fallbacks'] += 1
+            return self.candle_store.get_candles(symbol, self.interval)
+
+        df = self.candle_store.get_cached(symbol, self.interval)
+        if df is None:
+            return self._backfill(symbol)
+        return df
+
+    def get_ticker(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Последний тикер из потока (None если устарел)"""
+        with self._lock:
+            ticker = self.tickers.get(symbol)
+        if ticker is None or time.monotonic() - ticker['received'] > self.stale_after:
+            return None
+        return dict(ticker['data'])
+
+    def get_last_price(self, symbol: str) -> Optional[float]:
+        """Последняя цена: из потока или через REST"""
+        ticker = self.get_ticker(symbol)
+        if ticker and ticker.get('lastPrice'):
+            try:
+                return float(ticker['lastPrice'])
+            except (TypeError, ValueError):
+                pass
+
+        self.stats['rest_fallbacks'] += 1
+        return self.data_fetcher.get_current_price(symbol)
+
+    def get_orderbook(self, symbol: str, depth: int = 25) -> Optional[Dict[str, Any]]:
+        """Стакан в формате DataFetcher.get_order_book: из потока или через REST"""
+        with self._lock:
+            book = self.orderbooks.get(symbol)
+
+        if book is None or time.monotonic() - book['received'] > self.stale_after:
+            self.stats['rest_fallbacks'] += 1
+            return self.data_fetcher.get_order_book(symbol, limit=depth)
+
+        # Дельты pybit добавляют уровни в конец списка - упорядочиваем при чтении
+        bids = sorted(([float(p), float(q)] for p, q in book['bids']), key=lambda level: -level[0])
+        asks = sorted(([float(p), float(q)] for p, q in book['asks']), key=lambda level: level[0])
+        return {
+            'symbol': symbol,
+            'bids': bids[:depth],
+            'asks': asks[:depth],
+            'timestamp': datetime.fromtimestamp(book['ts'] / 1000, tz=timezone.utc) if book['ts']
+            else datetime.now(timezone.utc)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика потока"""
+        return {
+            **self.stats,
+            'healthy': self.is_healthy(),
+            'seconds_since_message': round(time.monotonic() - self.last_message_time, 1)
+            if self.last_message_time else None
+        }
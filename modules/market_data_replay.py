@@ -0,0 +1,150 @@
+import json
+import logging
+import threading
+import time
+import pandas as pd
+from typing import Dict, Any, List, Callable, Optional
+from modules.candle_store import interval_to_ms
+
+
+class ReplayWebSocket:
+    """
+    Локальная замена pybit WebSocket для тестов и отладки
+
+    Реализует используемое MarketDataFeed подмножество интерфейса
+    (kline_stream, ticker_stream, orderbook_stream, is_connected, exit)
+    и воспроизводит сообщения из списка, JSONL записи MarketDataFeed
+    или сгенерированные из DataFrame свечей. Передается в MarketDataFeed
+    через ws_factory.
+    """
+
+    def __init__(self, messages: List[Dict[str, Any]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.messages = list(messages or [])
+        self.callbacks: Dict[str, Callable] = {}
+        self.connected = True
+        self.published = 0
+
+    # ------------------------------------------------------------------
+    # Интерфейс pybit WebSocket
+    # ------------------------------------------------------------------
+
+    def _subscribe(self, topic: str, symbol, callback: Callable) -> None:
+        symbols = symbol if isinstance(symbol, (list, tuple)) else [symbol]
+        for sym in symbols:
+            self.callbacks[topic.format(symbol=sym)] = callback
+
+    def kline_stream(self, interval, symbol, callback: Callable) -> None:
+        self._subscribe(f"kline.{interval}." + "{symbol}", symbol, callback)
+
+    def ticker_stream(self, symbol, callback: Callable) -> None:
+        self._subscribe("tickers.{symbol}", symbol, callback)
+
+    def orderbook_stream(self, depth: int, symbol, callback: Callable) -> None:
+        self._subscribe(f"orderbook.{depth}." + "{symbol}", symbol, callback)
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    def exit(self) -> None:
+        self.connected = False
+
+    # ------------------------------------------------------------------
+    # Воспроизведение
+    # ------------------------------------------------------------------
+
+    def disconnect(self) -> None:
+        """Имитация обрыва соединения"""
+        self.connected = False
+
+    def publish(self, message: Dict[str, Any]) -> bool:
+        """Доставка одного сообщения подписчику топика"""
+        if not self.connected:
+            return False
+        callback = self.callbacks.get(message.get('topic'))
+        if callback is None:
+            return False
+        callback(message)
+        self.published += 1
+        return True
+
+    def replay(self, speed: float = 0.0, limit: int = None) -> int:
+        """
+        Воспроизведение накопленных сообщений
+
+        Args:
+            speed: Множитель скорости относительно поля ts (0 - без пауз)
+            limit: Максимум сообщений за вызов
+
+        Returns:
+            int: Количество доставленных сообщений
+        """
+        delivered = 0
+        previous_ts = None
+        while self.messages and (limit is None or delivered < limit) and self.connected:
+            message = self.messages.pop(0)
+            ts = message.get('ts')
+            if speed > 0 and previous_ts is not None and ts is not None:
+                time.sleep(max(0.0, (ts - previous_ts) / 1000 / speed))
+            previous_ts = ts
+            if self.publish(message):
+                delivered += 1
+        return delivered
+
+    def replay_in_background(self, speed: float = 1.0) -> threading.Thread:
+        """Воспроизведение в отдельном потоке (как push-сообщения настоящего websocket)"""
+        thread = threading.Thread(target=self.replay, kwargs={'speed': speed}, daemon=True)
+        thread.start()
+        return thread
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> 'ReplayWebSocket':
+        """Загрузка сообщений, записанных MarketDataFeed (record_path)"""
+        messages = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    messages.append(json.loads(line))
+        return cls(messages)
+
+    @staticmethod
+    def klines_to_messages(df: pd.DataFrame, symbol: str, interval: str,
+                           with_tickers: bool = True) -> List[Dict[str, Any]]:
+        """
+        Сообщения websocket из DataFrame свечей
+
+        Для каждой свечи формируется промежуточное обновление (confirm=False)
+        и закрытие (confirm=True), плюс тикер с ценой закрытия.
+        """
+        step = interval_to_ms(interval)
+        starts = df['timestamp'].dt.as_unit('ms').astype('int64').to_numpy()
+        messages = []
+
+        for start, row in zip(starts, df[['open', 'high', 'low', 'close', 'volume']].itertuples(index=False)):
+            start = int(start)
+            bar = {
+                'start': start, 'end': start + step - 1, 'interval': str(interval),
+                'open': str(row.open), 'high': str(row.high), 'low': str(row.low),
+                'close': str(row.close), 'volume': str(row.volume), 'turnover': '0'
+            }
+            mid_ts = start + step // 2
+            close_ts = start + step - 1
+            messages.append({'topic': f"kline.{interval}.{symbol}", 'type': 'snapshot', 'ts': mid_ts,
+                             'data': [{**bar, 'close': str(row.open), 'confirm': False, 'timestamp': mid_ts}]})
+            messages.append({'topic': f"kline.{interval}.{symbol}", 'type': 'snapshot', 'ts': close_ts,
+                             'data': [{**bar, 'confirm': True, 'timestamp': close_ts}]})
+            if with_tickers:
+                messages.append({'topic': f"tickers.{symbol}", 'type': 'snapshot', 'ts': close_ts,
+                                 'data': {'symbol': symbol, 'lastPrice': str(row.close)}})
+
+        return messages
+
+    @classmethod
+    def from_klines(cls, frames: Dict[str, pd.DataFrame], interval: str) -> 'ReplayWebSocket':
+        """Поток из свечей нескольких символов, упорядоченный по времени"""
+        messages = []
+        for symbol, df in frames.items():
+            messages.extend(cls.klines_to_messages(df, symbol, interval))
+        messages.sort(key=lambda message: message['ts'])
+        return cls(messages)
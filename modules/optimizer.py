@@ -0,0 +1,387 @@
+import copy
+import itertools
+import logging
+import math
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Tuple
+from config.trading_config import TradingConfig
+
+# Состояние процесса-воркера: свечи, подключенные из общей памяти, и параметры прогона
+_worker_state: Dict[str, Any] = {}
+
+
+def _set_path(config: Dict[str, Any], path: str, value: Any, name: str = 'strategy') -> None:
+    """
+    Установка значения по пути вида 'rsi_settings.period'
+
+    Путь должен существовать в конфигурации на каждом уровне: опечатка
+    ('rsi_settings.perod') иначе молча добавила бы ключ, который стратегия не читает.
+    """
+    *parents, leaf = path.split('.')
+    node = config
+    for key in parents:
+        node = node.get(key) if isinstance(node, dict) else None
+    if not isinstance(node, dict) or leaf not in node:
+        raise ValueError(f"{name} has no tunable parameter '{path}'")
+    node[leaf] = value
+
+
+def apply_params(base_config: Dict[str, Any], params: Dict[str, Any],
+                 name: str = 'strategy') -> Dict[str, Any]:
+    """Копия конфигурации с подставленными параметрами испытания (ValueError для неизвестного пути)"""
+    config = copy.deepcopy(base_config)
+    for path, value in params.items():
+        _set_path(config, path, value, name)
+    return config
+
+
+def apply_strategy_params(strategy, params: Dict[str, Any]) -> None:
+    """
+    Подстановка параметров испытания в созданную встроенную стратегию
+
+    Встроенные стратегии задают настраиваемые параметры атрибутами экземпляра
+    в __init__ (RSI_PERIOD, STOP_LOSS_PCT, ...), поэтому такой параметр
+    устанавливается на экземпляр. Путь в config допускается только если
+    он целиком есть в конфигурации стратегии; прочие параметры ни на что
+    не влияют, и испытание отклоняется (ValueError).
+    """
+    for path, value in params.items():
+        if '.' not in path and path.isupper() and hasattr(strategy, path):
+            current = getattr(strategy, path)
+            if isinstance(current, int) and not isinstance(current, bool):
+                value = int(round(value))
+            setattr(strategy, path, value)
+        else:
+            _set_path(strategy.config, path, value, strategy.name)
+
+
+def _init_worker(blocks: Dict[str, Tuple[str, int]], strategy_name: str,
+                 base_config: Dict[str, Any], settings: Dict[str, Any]) -> None:
+    """Инициализатор воркера: подключение к общей памяти без копирования свечей через pickle"""
+    candles, handles = {}, []
+    for symbol, (name, count) in blocks.items():
+        shm = shared_memory.SharedMemory(name=name)
+        handles.append(shm)
+        timestamps = np.ndarray((count,), dtype=np.int64, buffer=shm.buf)
+        values = np.ndarray((count, 5), dtype=np.float64, buffer=shm.buf, offset=count * 8)
+        candles[symbol] = pd.DataFrame({
+            'timestamp': pd.to_datetime(timestamps, unit='ms', utc=True),
+            'open': values[:, 0],
+            'high': values[:, 1],
+            'low': values[:, 2],
+            'close': values[:, 3],
+            'volume': values[:, 4]
+        })
+    _worker_state.update({
+        'candles': candles,
+        'handles': handles,
+        'strategy_name': strategy_name,
+        'base_config': base_config,
+        'settings': settings
+    })
+
+
+def _run_trial(trial_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Один бэктест в процессе-воркере"""
+    from modules.backtester import Backtester
+    from modules.market_analyzer import MarketAnalyzer
+    from strategies.strategy_factory import StrategyFactory
+
+    result = {'trial': trial_id, 'params': params, 'success': False}
+    try:
+        strategy_name = _worker_state['strategy_name']
+        user_config = None
+        if strategy_name == 'custom':
+            user_config = {'CUSTOM_STRATEGY_CONFIG': apply_params(_worker_state['base_config'], params, 'custom')}
+        strategy = StrategyFactory().create_strategy(strategy_name, MarketAnalyzer(data_fetcher=None),
+                                                     None, user_config)
+        if strategy is None:
+            result['error'] = f"Cannot create strategy {strategy_name}"
+            return result
+        if strategy_name != 'custom':
+            apply_strategy_params(strategy, params)
+
+        summary = Backtester(strategy, _worker_state['settings']).run(_worker_state['candles'])
+        if not summary.get('success'):
+            result['error'] = summary.get('error')
+            return result
+
+        metrics = summary['metrics']
+        result.update({
+            'success': True,
+            'trades': summary['trades'],
+            'return_pct': summary['return_pct'],
+            'max_drawdown_pct': summary['max_drawdown_pct'],
+            'sharpe_ratio': metrics.get('sharpe_ratio', 0.0),
+            'sortino_ratio': metrics.get('sortino_ratio', 0.0),
+            'win_rate': metrics.get('win_rate', 0.0),
+            'profit_factor': metrics.get('profit_factor', 0.0),
+            'duration': summary['duration']
+        })
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+class ParameterOptimizer:
+    """
+    Параллельный подбор параметров стратегии бэктестами
+
+    Пространство поиска задается путями в конфигурации стратегии
+    (для custom - в CUSTOM_STRATEGY_CONFIG):
+        {'rsi_settings.period': [10, 14, 21],             # список - дискретные значения
+         'atr_settings.stop_loss_multiplier': (1.5, 3.0)} # кортеж - диапазон (int если границы int)
+    Для встроенных стратегий - именами атрибутов экземпляра (apply_strategy_params):
+        {'RSI_PERIOD': [10, 14], 'STOP_LOSS_PCT': (0.01, 0.03)}
+
+    Методы: grid (полный перебор, диапазоны делятся на grid_points значений),
+    random и bayesian (TPE: кандидаты выбираются по отношению плотностей
+    лучших и остальных испытаний). Бэктесты выполняются в ProcessPoolExecutor;
+    свечи один раз копируются в общую память, воркеры подключаются к ней по имени.
+    Результаты ранжируются по метрике PerformanceTracker (sharpe_ratio / sortino_ratio).
+    """
+
+    def __init__(self, strategy_name: str, base_config: Dict[str, Any] = None,
+                 backtest_settings: Dict[str, Any] = None, settings: Dict[str, Any] = None):
+        """
+        Args:
+            strategy_name: Название стратегии (как в StrategyFactory)
+            base_config: Исходная конфигурация (для custom - CUSTOM_STRATEGY_CONFIG)
+            backtest_settings: Переопределения TradingConfig.BACKTEST_SETTINGS
+            settings: Переопределения TradingConfig.OPTIMIZER_SETTINGS
+        """
+        self.logger = logging.getLogger(__name__)
+        self.strategy_name = strategy_name
+        self.base_config = copy.deepcopy(base_config or {})
+        self.backtest_settings = {**TradingConfig.BACKTEST_SETTINGS, 'record_equity': False,
+                                  **(backtest_settings or {})}
+        self.settings = {**TradingConfig.OPTIMIZER_SETTINGS, **(settings or {})}
+        self.rng = np.random.default_rng(self.settings['seed'])
+
+    # ------------------------------------------------------------------
+    # Пространство поиска
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _is_range(spec) -> bool:
+        return isinstance(spec, tuple) and len(spec) == 2
+
+    @staticmethod
+    def _is_int_range(spec) -> bool:
+        return all(isinstance(bound, int) for bound in spec)
+
+    def grid(self, space: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Все комбинации значений"""
+        axes = []
+        for spec in space.values():
+            if self._is_range(spec):
+                values = np.linspace(spec[0], spec[1], self.settings['grid_points'])
+                axes.append(sorted({int(round(v)) for v in values}) if self._is_int_range(spec)
+                            else [float(v) for v in values])
+            else:
+                axes.append(list(spec))
+        return [dict(zip(space, combo)) for combo in itertools.product(*axes)]
+
+    def _sample(self, spec):
+        if self._is_range(spec):
+            if self._is_int_range(spec):
+                return int(self.rng.integers(spec[0], spec[1] + 1))
+            return float(self.rng.uniform(spec[0], spec[1]))
+        return spec[int(self.rng.integers(len(spec)))]
+
+    def random(self, space: Dict[str, Any], count: int) -> List[Dict[str, Any]]:
+        """Случайные комбинации (равномерно по диапазонам и спискам)"""
+        return [{path: self._sample(spec) for path, spec in space.items()} for _ in range(count)]
+
+    def _log_density(self, spec, observed: List[Any], value) -> float:
+        """Логарифм плотности Парзена с равномерной априорной составляющей"""
+        if not self._is_range(spec):
+            counts = np.ones(len(spec))
+            for obs in observed:
+                counts[spec.index(obs)] += 1
+            return math.log(counts[spec.index(value)] / counts.sum())
+
+        low, high = spec
+        width = float(high - low) or 1.0
+        prior = 1.0 / width
+        if not observed:
+            return math.log(prior)
+        obs = np.asarray(observed, dtype=np.float64)
+        sigma = width / max(len(obs), 1) ** 0.5 / 2
+        kernels = np.exp(-0.5 * ((value - obs) / sigma) ** 2) / (sigma * math.sqrt(2 * math.pi))
+        return math.log((kernels.sum() + prior) / (len(obs) + 1))
+
+    def _sample_near(self, spec, observed: List[Any]):
+        """Кандидат из окрестности лучших испытаний"""
+        if not observed or self.rng.random() < 1.0 / (len(observed) + 1):
+            return self._sample(spec)
+        center = observed[int(self.rng.integers(len(observed)))]
+        if not self._is_range(spec):
+            return center
+        low, high = spec
+        sigma = (high - low) / len(observed) ** 0.5 / 2
+        value = float(np.clip(self.rng.normal(center, sigma), low, high))
+        return int(round(value)) if self._is_int_range(spec) else value
+
+    def bayesian(self, space: Dict[str, Any], history: List[Tuple[Dict[str, Any], float]],
+                 count: int) -> List[Dict[str, Any]]:
+        """
+        Предложение следующих точек (Tree-structured Parzen Estimator)
+
+        Args:
+            history: [(params, score)] завершенных испытаний
+            count: Количество точек
+
+        Returns:
+            List: Точки с максимальным отношением l(x)/g(x)
+        """
+        if len(history) < self.settings['bayesian_startup']:
+            return self.random(space, count)
+
+        ranked = sorted(history, key=lambda item: item[1], reverse=True)
+        n_good = max(1, int(math.ceil(self.settings['bayesian_gamma'] * len(ranked))))
+        good, bad = ranked[:n_good], ranked[n_good:]
+
+        candidates = []
+        for _ in range(self.settings['bayesian_candidates']):
+            params = {path: self._sample_near(spec, [p[path] for p, _ in good]) for path, spec in space.items()}
+            score = sum(self._log_density(spec, [p[path] for p, _ in good], params[path])
+                        - self._log_density(spec, [p[path] for p, _ in bad], params[path])
+                        for path, spec in space.items())
+            candidates.append((score, params))
+
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        tried = [p for p, _ in history]
+        suggestions = []
+        for _, params in candidates:
+            if params not in tried and params not in suggestions:
+                suggestions.append(params)
+            if len(suggestions) == count:
+                break
+        # Все кандидаты уже проверены - добираем случайными точками
+        return suggestions + self.random(space, count - len(suggestions))
+
+    # ------------------------------------------------------------------
+    # Запуск
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _share_candles(candles: Dict[str, pd.DataFrame]) -> Tuple[Dict[str, Tuple[str, int]], List]:
+        """Копирование свечей в блоки общей памяти: int64 метки (мс) + float64 OHLCV (n x 5)"""
+        blocks, handles = {}, []
+        try:
+            for symbol, df in candles.items():
+                count = len(df)
+                shm = shared_memory.SharedMemory(create=True, size=max(count * 8 * 6, 1))
+                handles.append(shm)
+                timestamps = np.ndarray((count,), dtype=np.int64, buffer=shm.buf)
+                values = np.ndarray((count, 5), dtype=np.float64, buffer=shm.buf, offset=count * 8)
+                timestamps[:] = pd.DatetimeIndex(df['timestamp']).as_unit('ms').asi8
+                values[:] = df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=np.float64)
+                del timestamps, values
+                blocks[symbol] = (shm.name, count)
+        except Exception:
+            ParameterOptimizer._release_candles(handles)
+            raise
+        return blocks, handles
+
+    @staticmethod
+    def _release_candles(handles: List) -> None:
+        for shm in handles:
+            shm.close()
+            shm.unlink()
+
+    def score(self, result: Dict[str, Any]) -> float:
+        """Значение целевой метрики; неудачные прогоны и мало сделок - в конец рейтинга"""
+        if not result.get('success') or result.get('trades', 0) < self.settings['min_trades']:
+            return float('-inf')
+        return float(result.get(self.settings['metric'], 0.0))
+
+    def rank(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Сортировка по метрике, при равенстве - по доходности"""
+        return sorted(results, key=lambda r: (self.score(r), r.get('return_pct', float('-inf'))), reverse=True)
+
+    def optimize(self, candles: Dict[str, pd.DataFrame], space: Dict[str, Any], method: str = None,
+                 n_trials: int = None) -> Dict[str, Any]:
+        """
+        Подбор параметров
+
+        Args:
+            candles: {symbol: DataFrame [timestamp, open, high, low, close, volume]}
+            space: Пространство поиска (см. описание класса)
+            method: grid / random / bayesian (по умолчанию из настроек)
+            n_trials: Количество испытаний для random / bayesian
+
+        Returns:
+            Dict: Ранжированные результаты и лучшие параметры
+        """
+        method = method or self.settings['method']
+        n_trials = n_trials or self.settings['n_trials']
+        if method not in ('grid', 'random', 'bayesian'):
+            return {'success': False, 'error': f"Unknown method: {method}"}
+        if not candles or not space:
+            return {'success': False, 'error': 'Empty candles or search space'}
+
+        workers = self.settings['workers'] or os.cpu_count() or 1
+        started = time.perf_counter()
+        results: List[Dict[str, Any]] = []
+
+        blocks, handles = self._share_candles(candles)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(blocks, self.strategy_name, self.base_config,
+                                               self.backtest_settings)) as executor:
+                if method == 'bayesian':
+                    # Пачки по числу воркеров: модель обновляется после каждой пачки
+                    while len(results) < n_trials:
+                        history = [(r['params'], self._finite_score(r)) for r in results]
+                        batch = self.bayesian(space, history, min(workers, n_trials - len(results)))
+                        results.extend(self._run_batch(executor, batch, len(results)))
+                else:
+                    trials = self.grid(space) if method == 'grid' else self.random(space, n_trials)
+                    results.extend(self._run_batch(executor, trials, 0))
+        finally:
+            self._release_candles(handles)
+
+        ranked = self.rank(results)
+        failed = sum(1 for r in results if not r['success'])
+        duration = time.perf_counter() - started
+        self.logger.info(f"Optimization finished: {len(results)} trials ({failed} failed), "
+                         f"{method}, {workers} workers, {duration:.1f}s")
+
+        best = ranked[0] if ranked and self.score(ranked[0]) > float('-inf') else None
+        return {
+            'success': True,
+            'method': method,
+            'metric': self.settings['metric'],
+            'trials': len(results),
+            'failed': failed,
+            'workers': workers,
+            'duration': duration,
+            'best_params': best['params'] if best else None,
+            'best': best,
+            'results': ranked
+        }
+
+    def _finite_score(self, result: Dict[str, Any]) -> float:
+        # TPE сравнивает испытания между собой: -inf заменяется числом ниже любого результата
+        score = self.score(result)
+        return score if math.isfinite(score) else -1e12
+
+    def _run_batch(self, executor, trials: List[Dict[str, Any]], first_id: int) -> List[Dict[str, Any]]:
+        futures = [executor.submit(_run_trial, first_id + n, params) for n, params in enumerate(trials)]
+        results = []
+        for future in as_completed(futures):
+            result = future.result()
+            if not result['success']:
+                self.logger.warning(f"Trial {result['trial']} failed: {result.get('error')}")
+            else:
+                self.logger.debug(f"Trial {result['trial']}: {result['params']} -> "
+                                  f"{self.settings['metric']}={result.get(self.settings['metric'])}")
+            results.append(result)
+        return sorted(results, key=lambda r: r['trial'])
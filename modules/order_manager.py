@@ -1,26 +1,67 @@
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional, List
 from datetime import datetime
 from config.trading_config import TradingConfig
 from pybit.unified_trading import HTTP
-import time
+from modules.rate_limiter import RateLimiter, get_shared_rate_limiter
+from modules.ticker_cache import TickerCache
+from modules.fill_model import FillModel
+from modules.trade_ledger import TradeLedger, OrderRecord
+from modules.async_logging import get_log_pipeline
 
 
 class OrderManager:
     """Менеджер ордеров для управления торговыми операциями"""
 
-    def __init__(self, client: HTTP):
-        """Инициализация менеджера ордеров"""
+    def __init__(self, client: HTTP, rate_limiter: RateLimiter = None,
+                 price_source: TickerCache = None, fill_model: FillModel = None):
+        """
+        Инициализация менеджера ордеров
+
+        Args:
+            client: HTTP клиент ByBit
+            rate_limiter: Общий rate limiter
+            price_source: Кэш цен для симуляции в TESTNET (по умолчанию - поверх DataFetcher на том же клиенте)
+            fill_model: Модель исполнения для симуляции в TESTNET
+        """
         self.client = client
         self.logger = logging.getLogger(__name__)
         self.open_orders = {}  # Словарь открытых ордеров
-        self.order_history = []  # История ордеров
-        self.rate_limit_delay = 1.0  # Задержка между запросами
-        self.last_request_time = 0
+        # История ордеров: последние order_history_window в памяти, старые - в ledger_dir
+        performance_settings = TradingConfig.PERFORMANCE_SETTINGS
+        self.order_history = TradeLedger(
+            OrderRecord, window=performance_settings['order_history_window'],
+            spill_path=f"{performance_settings['ledger_dir']}/order_history.jsonl",
+            count_fields=('status', 'simulated'))
+
+        # Общий с DataFetcher rate limiter (одна HTTP сессия - один бюджет запросов)
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
 
         # Проверяем режим работы
         self.is_testnet = getattr(client, 'testnet', True)
 
+        # Симуляция исполнения: источник цен создается один раз (лениво), а не на каждый ордер
+        self._price_source = price_source
+        self._price_source_lock = threading.Lock()
+        self.fill_model = fill_model or FillModel()
+
+        # Конвейер ордеров: отдельные потоки и реестр ордеров в полете по client order ID
+        self.pipeline_settings = TradingConfig.ORDER_PIPELINE_SETTINGS
+        self._order_executor = ThreadPoolExecutor(max_workers=self.pipeline_settings['workers'],
+                                                  thread_name_prefix="order")
+        self._pipeline_lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._intent_orders: Dict[str, str] = {}  # намерение (close:BTCUSDT) -> client order ID в полете
+        self._order_seq = 0
+        self._id_base = format(int(time.time() * 1000), 'x')
+        self._latencies: Dict[str, deque] = {}
+        self.pipeline_stats = {'submitted': 0, 'duplicates': 0, 'failed': 0}
+
         # Настройка логирования
         self.logger.setLevel(logging.INFO)
 
@@ -32,42 +73,82 @@ class OrderManager:
             # Если не удается создать logs, продолжаем без файлового логирования
             pass
 
-        # Добавляем обработчик для файла если его нет
+        # Добавляем обработчик для файла если его нет (запись в фоновом потоке LogPipeline)
         if not self.logger.handlers:
-            handler = logging.FileHandler('logs/orders.log', encoding='utf-8')
-            handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-            self.logger.addHandler(handler)
-
-        self.logger.info(f"OrderManager initialized successfully (testnet: {self.is_testnet})")
+            pipeline = get_log_pipeline()
+            pipeline.attach(self.logger, pipeline.file_handler(
+                'logs/orders.log', logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')))
+
+        self.logger.info("OrderManager initialized successfully (testnet: %s)", self.is_testnet)
+
+    def _rate_limit_check(self, endpoint_class: str = 'trade'):
+        """Проверка rate limit - ожидание токена в общем лимитере для класса эндпоинтов"""
+        self.rate_limiter.acquire(endpoint_class)
+
+    def _report_response(self, response: Dict[str, Any], endpoint_class: str = 'trade') -> None:
+        """Уведомление лимитера об ответе биржи: успех восстанавливает скорость, rate limit - снижает"""
+        if response.get('retCode') == 0:
+            self.rate_limiter.report_success(endpoint_class)
+            return
+        error = f"{response.get('retCode')} {response.get('retMsg', '')}"
+        if RateLimiter.is_rate_limit_error(error):
+            self.rate_limiter.report_rate_limited(endpoint_class)
+
+    @property
+    def price_source(self) -> TickerCache:
+        """Источник цен для симуляции (DataFetcher создается один раз на общем клиенте)"""
+        if self._price_source is None:
+            with self._price_source_lock:
+                if self._price_source is None:
+                    from modules.data_fetcher import DataFetcher
+                    fetcher = DataFetcher(client=self.client, rate_limiter=self.rate_limiter)
+                    self._price_source = TickerCache(fetcher)
+        return self._price_source
+
+    def _simulate_fill(self, symbol: str, side: str, quantity: float,
+                       allow_partial: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Симуляция исполнения рыночного ордера по текущей цене
+
+        Returns:
+            Dict: Результат fill_model.fill или None, если цена недоступна
+        """
+        try:
+            reference_price = self.price_source.get_price(symbol)
+        except Exception as e:
+            self.logger.error("Price source unavailable for %s: %s", symbol, e)
+            reference_price = None
 
-    def _rate_limit_check(self):
-        """Проверка rate limit - добавляем задержку между запросами"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+        if not reference_price:
+            self.logger.error("No price available to simulate fill for %s", symbol)
+            return None
 
-        if time_since_last < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last
-            time.sleep(sleep_time)
+        fill = self.fill_model.fill(symbol, side, quantity, reference_price)
+        if not allow_partial:
+            fill = {**fill, 'filled_qty': quantity, 'partial': False}
 
-        self.last_request_time = time.time()
+        # Задержка подтверждения биржи (поток конвейера ордеров, не торговый цикл)
+        if fill.get('latency'):
+            time.sleep(fill['latency'])
+        return fill
 
     def place_order(self, symbol: str, side: str, quantity: float,
                     price: float = None, stop_loss: float = None,
-                    take_profit: float = None) -> Optional[Dict[str, Any]]:
+                    take_profit: float = None, client_order_id: str = None) -> Optional[Dict[str, Any]]:
         """Размещение нового ордера с поддержкой TESTNET симуляции"""
         try:
-            self.logger.info(f"🔄 ATTEMPTING TO PLACE ORDER for {symbol}")
-            self.logger.info(f"   Symbol: {symbol}")
-            self.logger.info(f"   Side: {side}")
-            self.logger.info(f"   Quantity: {quantity}")
-            self.logger.info(f"   Price: {price}")
-            self.logger.info(f"   Stop Loss: {stop_loss}")
-            self.logger.info(f"   Take Profit: {take_profit}")
-            self.logger.info(f"   Testnet Mode: {self.is_testnet}")
+            self.logger.info("🔄 ATTEMPTING TO PLACE ORDER for %s", symbol)
+            self.logger.info("   Symbol: %s", symbol)
+            self.logger.info("   Side: %s", side)
+            self.logger.info("   Quantity: %s", quantity)
+            self.logger.info("   Price: %s", price)
+            self.logger.info("   Stop Loss: %s", stop_loss)
+            self.logger.info("   Take Profit: %s", take_profit)
+            self.logger.info("   Testnet Mode: %s", self.is_testnet)
 
             # КРИТИЧЕСКАЯ ПРОВЕРКА: валидация параметров
             if quantity <= 0:
-                self.logger.error(f"Invalid quantity: {quantity}")
+                self.logger.error("Invalid quantity: %s", quantity)
                 return {
                     'success': False,
                     'error': f'Invalid quantity: {quantity}'
@@ -75,7 +156,7 @@ class OrderManager:
 
             # Проверка символа
             if not symbol or len(symbol) < 6:
-                self.logger.error(f"Invalid symbol: {symbol}")
+                self.logger.error("Invalid symbol: %s", symbol)
                 return {
                     'success': False,
                     'error': f'Invalid symbol: {symbol}'
@@ -83,7 +164,7 @@ class OrderManager:
 
             # Проверка направления
             if side not in ['BUY', 'SELL']:
-                self.logger.error(f"Invalid side: {side}")
+                self.logger.error("Invalid side: %s", side)
                 return {
                     'success': False,
                     'error': f'Invalid side: {side}'
@@ -93,48 +174,17 @@ class OrderManager:
 
             # В TESTNET режиме симулируем успешное размещение
             if self.is_testnet:
-                self.logger.info(f"🧪 TESTNET MODE: Simulating order placement for {symbol}")
+                self.logger.info("🧪 TESTNET MODE: Simulating order placement for %s", symbol)
 
-                # Получаем реальную цену для симуляции
-                try:
-                    # Получаем реальную цену через API
-                    from modules.data_fetcher import DataFetcher
-                    df = DataFetcher()
-                    real_price = df.get_current_price(symbol)
-
-                    if real_price and real_price > 0:
-                        price = real_price
-                        self.logger.info(f"   Используем реальную цену: ${price:.4f}")
-                    else:
-                        # Fallback цены
-                        fallback_prices = {
-                            'ETHUSDT': 2500.0,
-                            'BTCUSDT': 58000.0,
-                            'SOLUSDT': 140.0,
-                            'XRPUSDT': 0.55
-                        }
-                        price = fallback_prices.get(symbol, 100.0)
-                        self.logger.info(f"   Используем fallback цену: ${price:.4f}")
-
-                    # Добавляем небольшое проскальзывание для реализма
-                    import random
-                    slippage = random.uniform(0.0005, 0.002)  # 0.05%-0.2% проскальзывание
-                    if side == 'BUY':
-                        price *= (1 + slippage)
-                    else:
-                        price *= (1 - slippage)
-
-                    self.logger.info(f"   Цена с проскальзыванием: ${price:.4f}")
-
-                except Exception as e:
-                    self.logger.warning(f"Could not get real price, using fallback: {e}")
-                    fallback_prices = {
-                        'ETHUSDT': 2500.0,
-                        'BTCUSDT': 58000.0,
-                        'SOLUSDT': 140.0,
-                        'XRPUSDT': 0.55
+                # Цена из общего кэша тикеров и исполнение по модели (проскальзывание, частичное исполнение)
+                fill = self._simulate_fill(symbol, side, quantity)
+                if fill is None:
+                    return {
+                        'success': False,
+                        'error': f'No price available for {symbol}'
                     }
-                    price = fallback_prices.get(symbol, 100.0)
+                price = fill['price']
+                self.logger.info("   Цена исполнения: $%.4f (slippage %.4f%%)", price, fill['slippage'] * 100)
 
                 # Создаем симулированный ответ
                 order_id = f"TESTNET_{symbol}_{int(datetime.now().timestamp())}"
@@ -149,26 +199,30 @@ class OrderManager:
                     'order_type': "Market",
                     'stop_loss': stop_loss,
                     'take_profit': take_profit,
-                    'status': 'FILLED',  # В testnet сразу исполняем
+                    'status': 'PARTIALLY_FILLED_CANCELED' if fill['partial'] else 'FILLED',  # Остаток IOC отменяется
+                    'filled_qty': fill['filled_qty'],
                     'timestamp': datetime.now().isoformat(),
+                    'client_order_id': client_order_id,
                     'simulated': True
                 }
 
                 self.open_orders[order_id] = order_info
-                self.order_history.append(order_info.copy())
+                self.order_history.append(order_info)
 
-                self.logger.info(f"✅ TESTNET ORDER PLACED SUCCESSFULLY: {order_id}")
-                self.logger.info(f"   Order ID: {order_id}")
-                self.logger.info(f"   Status: SIMULATED_FILLED")
-                self.logger.info(f"   Price used: ${price:.4f}")
-                self.logger.info(f"   Quantity: {quantity}")
+                self.logger.info("✅ TESTNET ORDER PLACED SUCCESSFULLY: %s", order_id)
+                self.logger.info("   Order ID: %s", order_id)
+                self.logger.info("   Status: SIMULATED_FILLED")
+                self.logger.info("   Price used: $%.4f", price)
+                self.logger.info("   Quantity: %s (filled %s)", quantity, fill['filled_qty'])
 
                 return {
                     'success': True,
                     'order_id': order_id,
+                    'client_order_id': client_order_id,
                     'symbol': symbol,
                     'side': side,
                     'quantity': quantity,
+                    'filled_qty': fill['filled_qty'],
                     'price': price,
                     'simulated': True
                 }
@@ -178,7 +232,7 @@ class OrderManager:
                 # Получаем конфигурацию символа
                 symbol_config = TradingConfig.TRADING_PAIRS.get(symbol, {})
                 if not symbol_config:
-                    self.logger.error(f"No configuration found for {symbol}")
+                    self.logger.error("No configuration found for %s", symbol)
                     return {
                         'success': False,
                         'error': f'No configuration for {symbol}'
@@ -202,6 +256,8 @@ class OrderManager:
                     "reduceOnly": False,
                     "closeOnTrigger": False
                 }
+                if client_order_id:
+                    order_params["orderLinkId"] = client_order_id
 
                 # Добавляем цену для лимитного ордера
                 if price is not None:
@@ -216,10 +272,11 @@ class OrderManager:
                 if take_profit is not None:
                     order_params["takeProfit"] = str(take_profit)
 
-                self.logger.info(f"🔄 PLACING REAL ORDER for {symbol}: {order_params}")
+                self.logger.info("🔄 PLACING REAL ORDER for %s: %s", symbol, order_params)
 
                 # Размещение основного ордера
                 response = self.client.place_order(**order_params)
+                self._report_response(response, 'trade')
 
                 if response.get('retCode') == 0 and response.get('result'):
                     order_id = response['result']['orderId']
@@ -236,17 +293,19 @@ class OrderManager:
                         'take_profit': take_profit,
                         'status': 'NEW',
                         'timestamp': datetime.now().isoformat(),
+                        'client_order_id': client_order_id,
                         'simulated': False
                     }
 
                     self.open_orders[order_id] = order_info
-                    self.order_history.append(order_info.copy())
+                    self.order_history.append(order_info)
 
-                    self.logger.info(f"✅ REAL ORDER PLACED SUCCESSFULLY: {order_id}")
+                    self.logger.info("✅ REAL ORDER PLACED SUCCESSFULLY: %s", order_id)
 
                     return {
                         'success': True,
                         'order_id': order_id,
+                        'client_order_id': client_order_id,
                         'symbol': symbol,
                         'side': side,
                         'quantity': quantity,
@@ -255,67 +314,84 @@ class OrderManager:
                     }
                 else:
                     error_msg = response.get('retMsg', 'Unknown error')
-                    self.logger.error(f"❌ FAILED TO PLACE REAL ORDER for {symbol}: {error_msg}")
+                    self.logger.error("❌ FAILED TO PLACE REAL ORDER for %s: %s", symbol, error_msg)
                     return {
                         'success': False,
                         'error': error_msg
                     }
 
         except Exception as e:
-            self.logger.error(f"💥 CRITICAL ERROR placing order for {symbol}: {e}", exc_info=True)
+            self.logger.error("💥 CRITICAL ERROR placing order for %s: %s", symbol, e, exc_info=True)
             return {
                 'success': False,
                 'error': str(e)
             }
 
-    def close_position(self, symbol: str, side: str, quantity: float) -> Optional[Dict[str, Any]]:
+    def close_position(self, symbol: str, side: str, quantity: float,
+                       client_order_id: str = None) -> Optional[Dict[str, Any]]:
         """Закрытие позиции с поддержкой TESTNET симуляции"""
         try:
-            self.logger.info(f"🔄 ATTEMPTING TO CLOSE POSITION for {symbol}")
-            self.logger.info(f"   Side: {side}")
-            self.logger.info(f"   Quantity: {quantity}")
-            self.logger.info(f"   Testnet Mode: {self.is_testnet}")
+            self.logger.info("🔄 ATTEMPTING TO CLOSE POSITION for %s", symbol)
+            self.logger.info("   Side: %s", side)
+            self.logger.info("   Quantity: %s", quantity)
+            self.logger.info("   Testnet Mode: %s", self.is_testnet)
 
             self._rate_limit_check()
 
             # В TESTNET режиме симулируем закрытие
             if self.is_testnet:
-                self.logger.info(f"🧪 TESTNET MODE: Simulating position close for {symbol}")
+                self.logger.info("🧪 TESTNET MODE: Simulating position close for %s", symbol)
+
+                # Закрытие reduce-only исполняется целиком
+                fill = self._simulate_fill(symbol, side, quantity, allow_partial=False)
+                if fill is None:
+                    return {
+                        'success': False,
+                        'error': f'No price available for {symbol}'
+                    }
 
                 order_id = f"TESTNET_CLOSE_{symbol}_{int(datetime.now().timestamp())}"
 
-                self.logger.info(f"✅ TESTNET POSITION CLOSED SUCCESSFULLY: {order_id}")
+                self.logger.info("✅ TESTNET POSITION CLOSED SUCCESSFULLY: %s @ $%.4f", order_id, fill['price'])
 
                 return {
                     'success': True,
                     'order_id': order_id,
+                    'client_order_id': client_order_id,
                     'symbol': symbol,
                     'side': side,
                     'quantity': quantity,
+                    'price': fill['price'],
                     'simulated': True
                 }
 
             # Реальное закрытие позиции
             else:
-                response = self.client.place_order(
-                    category="linear",
-                    symbol=symbol,
-                    side=side,
-                    orderType="Market",
-                    qty=str(quantity),
-                    timeInForce="IOC",
-                    reduceOnly=True,
-                    closeOnTrigger=False
-                )
+                close_params = {
+                    "category": "linear",
+                    "symbol": symbol,
+                    "side": side,
+                    "orderType": "Market",
+                    "qty": str(quantity),
+                    "timeInForce": "IOC",
+                    "reduceOnly": True,
+                    "closeOnTrigger": False
+                }
+                if client_order_id:
+                    close_params["orderLinkId"] = client_order_id
+
+                response = self.client.place_order(**close_params)
+                self._report_response(response, 'trade')
 
                 if response.get('retCode') == 0 and response.get('result'):
                     order_id = response['result']['orderId']
 
-                    self.logger.info(f"✅ REAL POSITION CLOSED SUCCESSFULLY: {order_id}")
+                    self.logger.info("✅ REAL POSITION CLOSED SUCCESSFULLY: %s", order_id)
 
                     return {
                         'success': True,
                         'order_id': order_id,
+                        'client_order_id': client_order_id,
                         'symbol': symbol,
                         'side': side,
                         'quantity': quantity,
@@ -323,14 +399,14 @@ class OrderManager:
                     }
                 else:
                     error_msg = response.get('retMsg', 'Unknown error')
-                    self.logger.error(f"❌ FAILED TO CLOSE REAL POSITION for {symbol}: {error_msg}")
+                    self.logger.error("❌ FAILED TO CLOSE REAL POSITION for %s: %s", symbol, error_msg)
                     return {
                         'success': False,
                         'error': error_msg
                     }
 
         except Exception as e:
-            self.logger.error(f"💥 CRITICAL ERROR closing position for {symbol}: {e}", exc_info=True)
+            self.logger.error("💥 CRITICAL ERROR closing position for %s: %s", symbol, e, exc_info=True)
             return {
                 'success': False,
                 'error': str(e)
@@ -339,19 +415,19 @@ class OrderManager:
     def update_stop_loss(self, symbol: str, order_id: str, new_stop_loss: float) -> Optional[Dict[str, Any]]:
         """Обновление стоп-лосса с поддержкой TESTNET"""
         try:
-            self.logger.info(f"🔄 UPDATING STOP LOSS for {symbol}: {new_stop_loss}")
+            self.logger.info("🔄 UPDATING STOP LOSS for %s: %s", symbol, new_stop_loss)
 
             self._rate_limit_check()
 
             # В TESTNET режиме симулируем обновление
             if self.is_testnet:
-                self.logger.info(f"🧪 TESTNET MODE: Simulating stop loss update for {symbol}")
+                self.logger.info("🧪 TESTNET MODE: Simulating stop loss update for %s", symbol)
 
                 # Обновляем локальную информацию
                 if order_id in self.open_orders:
                     self.open_orders[order_id]['stop_loss'] = new_stop_loss
 
-                self.logger.info(f"✅ TESTNET STOP LOSS UPDATED: {new_stop_loss}")
+                self.logger.info("✅ TESTNET STOP LOSS UPDATED: %s", new_stop_loss)
 
                 return {
                     'success': True,
@@ -373,13 +449,14 @@ class OrderManager:
                     orderId=order_id,
                     stopLoss=str(new_stop_loss)
                 )
+                self._report_response(response, 'trade')
 
                 if response.get('retCode') == 0:
                     # Обновляем локальную информацию
                     if order_id in self.open_orders:
                         self.open_orders[order_id]['stop_loss'] = new_stop_loss
 
-                    self.logger.info(f"✅ REAL STOP LOSS UPDATED for {symbol}: {new_stop_loss}")
+                    self.logger.info("✅ REAL STOP LOSS UPDATED for %s: %s", symbol, new_stop_loss)
 
                     return {
                         'success': True,
@@ -389,14 +466,14 @@ class OrderManager:
                     }
                 else:
                     error_msg = response.get('retMsg', 'Unknown error')
-                    self.logger.error(f"❌ FAILED TO UPDATE REAL STOP LOSS for {symbol}: {error_msg}")
+                    self.logger.error("❌ FAILED TO UPDATE REAL STOP LOSS for %s: %s", symbol, error_msg)
                     return {
                         'success': False,
                         'error': error_msg
                     }
 
         except Exception as e:
-            self.logger.error(f"💥 CRITICAL ERROR updating stop loss for {symbol}: {e}", exc_info=True)
+            self.logger.error("💥 CRITICAL ERROR updating stop loss for %s: %s", symbol, e, exc_info=True)
             return {
                 'success': False,
                 'error': str(e)
@@ -405,20 +482,20 @@ class OrderManager:
     def cancel_order(self, symbol: str, order_id: str) -> bool:
         """Отмена ордера с поддержкой TESTNET"""
         try:
-            self.logger.info(f"🔄 CANCELLING ORDER {order_id} for {symbol}")
+            self.logger.info("🔄 CANCELLING ORDER %s for %s", order_id, symbol)
 
             self._rate_limit_check()
 
             # В TESTNET режиме симулируем отмену
             if self.is_testnet:
-                self.logger.info(f"🧪 TESTNET MODE: Simulating order cancellation")
+                self.logger.info("🧪 TESTNET MODE: Simulating order cancellation")
 
                 # Удаляем из открытых ордеров
                 if order_id in self.open_orders:
                     self.open_orders[order_id]['status'] = 'CANCELLED'
                     del self.open_orders[order_id]
 
-                self.logger.info(f"✅ TESTNET ORDER CANCELLED: {order_id}")
+                self.logger.info("✅ TESTNET ORDER CANCELLED: %s", order_id)
                 return True
 
             # Реальная отмена ордера
@@ -428,6 +505,7 @@ class OrderManager:
                     symbol=symbol,
                     orderId=order_id
                 )
+                self._report_response(response, 'trade')
 
                 if response.get('retCode') == 0:
                     # Удаляем из открытых ордеров
@@ -435,15 +513,15 @@ class OrderManager:
                         self.open_orders[order_id]['status'] = 'CANCELLED'
                         del self.open_orders[order_id]
 
-                    self.logger.info(f"✅ REAL ORDER CANCELLED: {order_id}")
+                    self.logger.info("✅ REAL ORDER CANCELLED: %s", order_id)
                     return True
                 else:
                     error_msg = response.get('retMsg', 'Unknown error')
-                    self.logger.error(f"❌ FAILED TO CANCEL REAL ORDER {order_id}: {error_msg}")
+                    self.logger.error("❌ FAILED TO CANCEL REAL ORDER %s: %s", order_id, error_msg)
                     return False
 
         except Exception as e:
-            self.logger.error(f"💥 CRITICAL ERROR cancelling order {order_id}: {e}", exc_info=True)
+            self.logger.error("💥 CRITICAL ERROR cancelling order %s: %s", order_id, e, exc_info=True)
             return False
 
     def get_order_status(self, symbol: str, order_id: str) -> Optional[Dict[str, Any]]:
@@ -459,8 +537,8 @@ class OrderManager:
                         'side': order_info['side'],
                         'quantity': order_info['quantity'],
                         'price': order_info['price'],
-                        'status': 'FILLED',  # В testnet всегда исполнено
-                        'filled_qty': order_info['quantity'],
+                        'status': order_info['status'],
+                        'filled_qty': order_info.get('filled_qty', order_info['quantity']),
                         'avg_price': order_info['price'] or 0,
                         'simulated': True
                     }
@@ -468,13 +546,14 @@ class OrderManager:
 
             # Реальный запрос статуса
             else:
-                self._rate_limit_check()
+                self._rate_limit_check('account')
 
                 response = self.client.get_open_orders(
                     category="linear",
                     symbol=symbol,
                     orderId=order_id
                 )
+                self._report_response(response, 'account')
 
                 if response.get('retCode') == 0 and response.get('result', {}).get('list'):
                     order_data = response['result']['list'][0]
@@ -494,46 +573,261 @@ class OrderManager:
                     return None
 
         except Exception as e:
-            self.logger.error(f"Error getting order status for {order_id}: {e}")
+            self.logger.error("Error getting order status for %s: %s", order_id, e)
             return None
 
+    def find_order(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Поиск ордера на бирже по client order ID (orderLinkId)
+
+        Используется для сверки ордеров, ответ на которые не дождались:
+        сначала среди активных ордеров, затем в истории.
+
+        Returns:
+            Статус ордера; status 'NotFound', если биржа ордер не знает;
+            None, если запрос к бирже не удался (статус неизвестен)
+        """
+        try:
+            if self.is_testnet:
+                for order_info in reversed(self.open_orders.values()):
+                    if order_info.get('client_order_id') == client_order_id:
+                        return {
+                            'order_id': order_info['order_id'],
+                            'client_order_id': client_order_id,
+                            'symbol': order_info['symbol'],
+                            'status': order_info['status'],
+                            'filled_qty': order_info.get('filled_qty', order_info['quantity']),
+                            'avg_price': order_info['price'] or 0,
+                            'simulated': True
+                        }
+                return self._order_not_found(symbol, client_order_id)
+
+            for fetch in (self.client.get_open_orders, self.client.get_order_history):
+                self._rate_limit_check('account')
+                response = fetch(category="linear", symbol=symbol, orderLinkId=client_order_id)
+                self._report_response(response, 'account')
+                if response.get('retCode') != 0:
+                    self.logger.warning("Order lookup failed for %s: %s", client_order_id, response.get('retMsg'))
+                    return None
+
+                orders = response.get('result', {}).get('list') or []
+                if orders:
+                    order_data = orders[0]
+                    return {
+                        'order_id': order_data.get('orderId'),
+                        'client_order_id': client_order_id,
+                        'symbol': order_data.get('symbol'),
+                        'status': order_data.get('orderStatus'),
+                        'filled_qty': float(order_data.get('cumExecQty') or 0),
+                        'avg_price': float(order_data.get('avgPrice') or 0),
+                        'simulated': False
+                    }
+            return self._order_not_found(symbol, client_order_id)
+
+        except Exception as e:
+            self.logger.error("Error looking up order %s: %s", client_order_id, e)
+            return None
+
+    @staticmethod
+    def _order_not_found(symbol: str, client_order_id: str) -> Dict[str, Any]:
+        return {'order_id': None, 'client_order_id': client_order_id, 'symbol': symbol,
+                'status': 'NotFound', 'filled_qty': 0.0, 'avg_price': 0.0}
+
     def get_open_orders(self, symbol: str = None) -> Dict[str, Dict[str, Any]]:
         """Получение всех открытых ордеров"""
         if symbol:
             return {k: v for k, v in self.open_orders.items() if v['symbol'] == symbol}
         return self.open_orders.copy()
 
+    # ------------------------------------------------------------------
+    # Асинхронный конвейер ордеров
+    # ------------------------------------------------------------------
+
+    def _new_client_order_id(self, kind: str, symbol: str) -> str:
+        """Уникальный orderLinkId (до 36 символов, как требует ByBit)"""
+        self._order_seq += 1
+        return f"{kind}-{symbol}-{self._id_base}-{self._order_seq}"[:36]
+
+    def _submit(self, kind: str, intent: str, client_order_id: Optional[str], func, **kwargs) -> Future:
+        """
+        Постановка операции в конвейер
+
+        Повторная отправка с client order ID, который еще в полете, отклоняется.
+        Без явного ID используется ID текущего ордера с тем же намерением
+        (например, close:BTCUSDT), поэтому дубли закрытия одной позиции не уходят на биржу.
+        """
+        submitted_at = time.perf_counter()
+        with self._pipeline_lock:
+            client_order_id = (client_order_id or self._intent_orders.get(intent)
+                               or self._new_client_order_id(kind, kwargs.get('symbol', '')))
+            if client_order_id in self._in_flight:
+                self.pipeline_stats['duplicates'] += 1
+                self.logger.warning("Duplicate %s rejected: %s is already in flight", kind, client_order_id)
+                future = Future()
+                future.set_result({
+                    'success': False,
+                    'error': f'Duplicate order in flight: {client_order_id}',
+                    'duplicate': True,
+                    'client_order_id': client_order_id
+                })
+                future.client_order_id = client_order_id
+                return future
+
+            if kind != 'amend':
+                kwargs['client_order_id'] = client_order_id
+            future = self._order_executor.submit(self._run_pipelined, kind, submitted_at, func, kwargs)
+            future.client_order_id = client_order_id  # Для сверки с биржей, если ответ не дождались
+            self._in_flight[client_order_id] = future
+            self._intent_orders[intent] = client_order_id
+            self.pipeline_stats['submitted'] += 1
+
+        future.add_done_callback(lambda _: self._complete(client_order_id, intent))
+        return future
+
+    def _run_pipelined(self, kind: str, submitted_at: float, func, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Выполнение операции в потоке конвейера с замером задержки подтверждения"""
+        result = func(**kwargs)
+        self._record_latency(kind, time.perf_counter() - submitted_at)
+        if not result or not result.get('success'):
+            with self._pipeline_lock:
+                self.pipeline_stats['failed'] += 1
+        return result
+
+    def _complete(self, client_order_id: str, intent: str) -> None:
+        with self._pipeline_lock:
+            self._in_flight.pop(client_order_id, None)
+            if self._intent_orders.get(intent) == client_order_id:
+                del self._intent_orders[intent]
+
+    def _record_latency(self, kind: str, seconds: float) -> None:
+        with self._pipeline_lock:
+            window = self._latencies.get(kind)
+            if window is None:
+                window = self._latencies[kind] = deque(maxlen=self.pipeline_settings['latency_window'])
+            window.append(seconds)
+
+    def submit_order(self, symbol: str, side: str, quantity: float, price: float = None,
+                     stop_loss: float = None, take_profit: float = None,
+                     client_order_id: str = None) -> Future:
+        """Асинхронное размещение ордера (Future с результатом place_order)"""
+        return self._submit('open', f"open:{symbol}", client_order_id, self.place_order,
+                            symbol=symbol, side=side, quantity=quantity, price=price,
+                            stop_loss=stop_loss, take_profit=take_profit)
+
+    def submit_close(self, symbol: str, side: str, quantity: float, client_order_id: str = None) -> Future:
+        """Асинхронное закрытие позиции (Future с результатом close_position)"""
+        return self._submit('close', f"close:{symbol}", client_order_id, self.close_position,
+                            symbol=symbol, side=side, quantity=quantity)
+
+    def submit_stop_update(self, symbol: str, order_id: str, new_stop_loss: float) -> Future:
+        """Асинхронное обновление стоп-лосса (Future с результатом update_stop_loss)"""
+        return self._submit('amend', f"amend:{symbol}:{order_id}", None, self.update_stop_loss,
+                            symbol=symbol, order_id=order_id, new_stop_loss=new_stop_loss)
+
+    def get_in_flight(self) -> List[str]:
+        """Client order ID операций, ожидающих ответа биржи"""
+        with self._pipeline_lock:
+            return list(self._in_flight)
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Перцентили задержки подтверждения (мс) по типам операций: от постановки до ответа биржи"""
+        with self._pipeline_lock:
+            snapshot = {kind: np.array(window) for kind, window in self._latencies.items() if window}
+
+        stats = {}
+        for kind, values in snapshot.items():
+            p50, p90, p99 = np.percentile(values, [50, 90, 99]) * 1000
+            stats[kind] = {
+                'count': int(len(values)),
+                'p50_ms': float(p50),
+                'p90_ms': float(p90),
+                'p99_ms': float(p99),
+                'max_ms': float(values.max() * 1000)
+            }
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Остановка конвейера (ожидание отправленных операций)"""
+        self._order_executor.shutdown(wait=wait)
+
+    def _fetch_realtime_statuses(self, order_ids: List[str]) -> Dict[str, str]:
+        """
+        Статусы ордеров пакетными запросами
+
+        Активные ордера читаются постранично из /v5/order/realtime одним списком,
+        не найденные среди активных - из последней страницы /v5/order/history.
+        Число запросов зависит от количества страниц, а не от числа ордеров.
+        """
+        wanted = set(order_ids)
+        statuses: Dict[str, str] = {}
+        page_size = self.pipeline_settings['status_page_size']
+
+        cursor = None
+        while True:
+            self._rate_limit_check('account')
+            params = {'category': 'linear', 'settleCoin': self.pipeline_settings['settle_coin'], 'limit': page_size}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get_open_orders(**params)
+            self._report_response(response, 'account')
+            if response.get('retCode') != 0:
+                raise RuntimeError(f"get_open_orders failed: {response.get('retMsg')}")
+
+            result = response.get('result', {})
+            for order in result.get('list', []):
+                if order.get('orderId') in wanted:
+                    statuses[order['orderId']] = order.get('orderStatus')
+            cursor = result.get('nextPageCursor')
+            if not cursor or len(statuses) == len(wanted):
+                break
+
+        if len(statuses) < len(wanted):
+            self._rate_limit_check('account')
+            response = self.client.get_order_history(category='linear', limit=page_size)
+            self._report_response(response, 'account')
+            if response.get('retCode') == 0:
+                for order in response.get('result', {}).get('list', []):
+                    if order.get('orderId') in wanted and order['orderId'] not in statuses:
+                        statuses[order['orderId']] = order.get('orderStatus')
+
+        return statuses
+
     def update_orders_status(self):
-        """Обновление статуса всех открытых ордеров"""
+        """Обновление статуса всех открытых ордеров (реальный режим - пакетными запросами)"""
         try:
             orders_to_remove = []
 
-            for order_id, order_info in self.open_orders.items():
-                try:
+            if self.is_testnet:
+                statuses = {}
+                for order_id, order_info in self.open_orders.items():
                     status = self.get_order_status(order_info['symbol'], order_id)
+                    statuses[order_id] = status['status'] if status else None
+            else:
+                statuses = self._fetch_realtime_statuses(list(self.open_orders))
 
-                    if status is None:
-                        # Ордер не найден - возможно исполнен или отменен
-                        orders_to_remove.append(order_id)
-                    else:
-                        # Обновляем статус
-                        self.open_orders[order_id]['status'] = status['status']
+            for order_id in list(self.open_orders):
+                status = statuses.get(order_id)
 
-                        # Если ордер исполнен или отменен, удаляем из открытых
-                        if status['status'] in ['Filled', 'Cancelled', 'Rejected', 'FILLED']:
-                            orders_to_remove.append(order_id)
+                if status is None:
+                    # Ордер не найден - возможно исполнен или отменен
+                    orders_to_remove.append(order_id)
+                else:
+                    # Обновляем статус
+                    self.open_orders[order_id]['status'] = status
 
-                except Exception as e:
-                    self.logger.error(f"Error updating status for order {order_id}: {e}")
+                    # Если ордер исполнен или отменен, удаляем из открытых
+                    if status in ['Filled', 'Cancelled', 'Rejected', 'Deactivated', 'PartiallyFilledCanceled',
+                                  'FILLED', 'PARTIALLY_FILLED_CANCELED']:
+                        orders_to_remove.append(order_id)
 
             # Удаляем исполненные/отмененные ордера
             for order_id in orders_to_remove:
                 if order_id in self.open_orders:
-                    self.logger.info(f"🗑️ Removing completed order: {order_id}")
+                    self.logger.info("🗑️ Removing completed order: %s", order_id)
                     del self.open_orders[order_id]
 
         except Exception as e:
-            self.logger.error(f"Error updating orders status: {e}")
+            self.logger.error("Error updating orders status: %s", e)
 
     def cancel_all_orders(self, symbol: str = None) -> Dict[str, bool]:
         """Отмена всех открытых ордеров"""
@@ -553,19 +847,19 @@ class OrderManager:
                 results[order_id] = result
 
                 if result:
-                    self.logger.info(f"✅ Cancelled order {order_id}")
+                    self.logger.info("✅ Cancelled order %s", order_id)
                 else:
-                    self.logger.warning(f"❌ Failed to cancel order {order_id}")
+                    self.logger.warning("❌ Failed to cancel order %s", order_id)
 
             except Exception as e:
-                self.logger.error(f"Error cancelling order {order_id}: {e}")
+                self.logger.error("Error cancelling order %s: %s", order_id, e)
                 results[order_id] = False
 
         return results
 
     def get_order_history(self, limit: int = 50) -> list:
-        """Получение истории ордеров"""
-        return self.order_history[-limit:] if self.order_history else []
+        """Получение истории ордеров (последние limit из окна в памяти)"""
+        return [record.to_dict() for record in self.order_history[-limit:]] if self.order_history else []
 
     def get_orders_summary(self) -> Dict[str, Any]:
         """Получение сводки по ордерам"""
@@ -573,11 +867,8 @@ class OrderManager:
             total_orders = len(self.order_history)
             open_orders_count = len(self.open_orders)
 
-            # Подсчет по статусам
-            status_counts = {}
-            for order in self.order_history:
-                status = order.get('status', 'UNKNOWN')
-                status_counts[status] = status_counts.get(status, 0) + 1
+            # Подсчет по статусам (счетчики ведутся по всей истории, включая выгруженную)
+            status_counts = self.order_history.counts('status')
 
             return {
                 'total_orders': total_orders,
@@ -588,7 +879,7 @@ class OrderManager:
             }
 
         except Exception as e:
-            self.logger.error(f"Error getting orders summary: {e}")
+            self.logger.error("Error getting orders summary: %s", e)
             return {}
 
     def health_check(self) -> bool:
@@ -600,8 +891,9 @@ class OrderManager:
                 return True
 
             # Реальная проверка для продакшена
-            self._rate_limit_check()
+            self._rate_limit_check('account')
             response = self.client.get_wallet_balance(accountType="UNIFIED")
+            self._report_response(response, 'account')
 
             if response.get('retCode') == 0:
                 self.logger.info("OrderManager health check: OK (REAL)")
@@ -611,14 +903,18 @@ class OrderManager:
                 return False
 
         except Exception as e:
-            self.logger.error(f"OrderManager health check error: {e}")
+            self.logger.error("OrderManager health check error: %s", e)
             return False
 
+    def get_rate_limit_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Метрики общего rate limiter"""
+        return self.rate_limiter.get_metrics()
+
     def get_testnet_status(self) -> Dict[str, Any]:
         """Получение статуса TESTNET режима"""
         return {
             'is_testnet': self.is_testnet,
-            'total_simulated_orders': len([o for o in self.order_history if o.get('simulated', False)]),
-            'total_real_orders': len([o for o in self.order_history if not o.get('simulated', True)]),
+            'total_simulated_orders': self.order_history.counts('simulated').get(True, 0),
+            'total_real_orders': self.order_history.counts('simulated').get(False, 0),
             'open_orders_count': len(self.open_orders)
         }
\ No newline at end of file
@@ -0,0 +1,287 @@
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import pandas as pd
+from config.trading_config import TradingConfig
+
+
+class PerformanceStore:
+    """
+    SQLite хранилище сделок, кривой эквити и статистики по символам для PerformanceTracker
+
+    База в режиме WAL: запись пачками (executemany в одной транзакции) не блокирует чтение
+    отчетов. Индексы по symbol/времени позволяют считать метрики запросами по диапазону
+    вместо загрузки всей истории.
+    """
+
+    TRADE_COLUMNS = ['id', 'symbol', 'direction', 'entry_price', 'exit_price', 'size', 'pnl', 'net_pnl',
+                     'fees', 'slippage', 'roi', 'position_value', 'duration', 'ts', 'timestamp',
+                     'entry_time', 'exit_time']
+    EQUITY_COLUMNS = ['trade_id', 'ts', 'timestamp', 'balance', 'pnl', 'cumulative_pnl']
+    SYMBOL_COLUMNS = ['symbol', 'trades', 'wins', 'losses', 'total_pnl', 'volume', 'best_trade', 'worst_trade']
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY,
+            symbol TEXT NOT NULL,
+            direction TEXT,
+            entry_price REAL,
+            exit_price REAL,
+            size REAL,
+            pnl REAL,
+            net_pnl REAL,
+            fees REAL,
+            slippage REAL,
+            roi REAL,
+            position_value REAL,
+            duration REAL,
+            ts REAL NOT NULL,
+            timestamp TEXT NOT NULL,
+            entry_time TEXT,
+            exit_time TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_trades_symbol_ts ON trades(symbol, ts);
+        CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades(ts);
+
+        CREATE TABLE IF NOT EXISTS equity (
+            trade_id INTEGER PRIMARY KEY,
+            ts REAL NOT NULL,
+            timestamp TEXT NOT NULL,
+            balance REAL,
+            pnl REAL,
+            cumulative_pnl REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_equity_ts ON equity(ts);
+
+        CREATE TABLE IF NOT EXISTS symbol_performance (
+            symbol TEXT PRIMARY KEY,
+            trades INTEGER,
+            wins INTEGER,
+            losses INTEGER,
+            total_pnl REAL,
+            volume REAL,
+            best_trade REAL,
+            worst_trade REAL
+        );
+
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path: str = None, settings: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            path: Файл базы (по умолчанию DATABASE_SETTINGS['path'])
+            settings: Переопределения TradingConfig.DATABASE_SETTINGS
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**TradingConfig.DATABASE_SETTINGS, **(settings or {})}
+        self.path = Path(path or self.settings['path'])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False,
+                                     timeout=self.settings['busy_timeout'] / 1000)
+        self._conn.row_factory = sqlite3.Row
+        if self.settings['wal']:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # В WAL synchronous=NORMAL не теряет целостность, fsync только на checkpoint
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+
+        self.logger.info(f"PerformanceStore opened: {self.path}")
+
+    @staticmethod
+    def _time_fields(value) -> tuple:
+        """(epoch секунды, ISO строка) для datetime / pd.Timestamp / строки"""
+        stamp = pd.Timestamp(value).floor('us')
+        return stamp.timestamp(), stamp.isoformat()
+
+    @staticmethod
+    def _duration_seconds(value) -> float:
+        try:
+            return float(pd.Timedelta(value).total_seconds())
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _trade_row(self, trade: Dict[str, Any]) -> tuple:
+        ts, timestamp = self._time_fields(trade['timestamp'])
+        return (
+            int(trade['id']), trade['symbol'], trade.get('direction'),
+            float(trade['entry_price']), float(trade['exit_price']), float(trade['size']),
+            float(trade['pnl']), float(trade['net_pnl']), float(trade['fees']), float(trade['slippage']),
+            float(trade['roi']), float(trade['position_value']), self._duration_seconds(trade.get('duration')),
+            ts, timestamp,
+            self._time_fields(trade.get('entry_time', trade['timestamp']))[1],
+            self._time_fields(trade.get('exit_time', trade['timestamp']))[1]
+        )
+
+    def _equity_row(self, point: Dict[str, Any]) -> tuple:
+        ts, timestamp = self._time_fields(point['timestamp'])
+        return (int(point['trade_id']), ts, timestamp, float(point['balance']), float(point['pnl']),
+                float(point['cumulative_pnl']))
+
+    def write(self, trades: List[Dict[str, Any]], equity_points: List[Dict[str, Any]] = None,
+              symbol_performance: Dict[str, Dict[str, Any]] = None) -> bool:
+        """
+        Запись пачки сделок, точек эквити и статистики символов одной транзакцией
+
+        Сделки и точки эквити идентифицируются id сделки, повторная запись заменяет строку.
+        """
+        try:
+            trade_rows = [self._trade_row(t) for t in trades]
+            equity_rows = [self._equity_row(p) for p in equity_points or []]
+            symbol_rows = [(symbol, int(p['trades']), int(p['wins']), int(p['losses']), float(p['total_pnl']),
+                            float(p['volume']), float(p['best_trade']), float(p['worst_trade']))
+                           for symbol, p in (symbol_performance or {}).items()]
+
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO trades ({', '.join(self.TRADE_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(self.TRADE_COLUMNS))})", trade_rows)
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO equity ({', '.join(self.EQUITY_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(self.EQUITY_COLUMNS))})", equity_rows)
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO symbol_performance ({', '.join(self.SYMBOL_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(self.SYMBOL_COLUMNS))})", symbol_rows)
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error writing performance data: {e}")
+            return False
+
+    def _where(self, symbol: str = None, since: datetime = None, until: datetime = None) -> tuple:
+        clauses, params = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(self._time_fields(since)[0])
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(self._time_fields(until)[0])
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def load_trades(self, symbol: str = None, since: datetime = None,
+                    until: datetime = None) -> List[Dict[str, Any]]:
+        """Сделки в порядке id (формат записей PerformanceTracker.trades)"""
+        where, params = self._where(symbol, since, until)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.TRADE_COLUMNS)} FROM trades{where} ORDER BY id", params).fetchall()
+
+        trades = []
+        for row in rows:
+            trade = dict(row)
+            del trade['ts']
+            trade['timestamp'] = datetime.fromisoformat(trade['timestamp'])
+            trade['entry_time'] = datetime.fromisoformat(trade['entry_time'])
+            trade['exit_time'] = datetime.fromisoformat(trade['exit_time'])
+            trade['duration'] = timedelta(seconds=trade['duration'] or 0.0)
+            trades.append(trade)
+        return trades
+
+    def load_equity_curve(self) -> List[Dict[str, Any]]:
+        """Точки кривой эквити в порядке сделок"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT trade_id, timestamp, balance, pnl, cumulative_pnl FROM equity ORDER BY trade_id").fetchall()
+        return [{**dict(row), 'timestamp': datetime.fromisoformat(row['timestamp'])} for row in rows]
+
+    def load_symbol_performance(self) -> Dict[str, Dict[str, Any]]:
+        """Статистика по символам"""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(self.SYMBOL_COLUMNS)} FROM symbol_performance").fetchall()
+        return {row['symbol']: {k: row[k] for k in self.SYMBOL_COLUMNS[1:]} for row in rows}
+
+    def get_summary(self, symbol: str = None, since: datetime = None, until: datetime = None) -> Dict[str, Any]:
+        """
+        Агрегаты по сделкам диапазона (по индексу symbol/ts, без загрузки сделок)
+
+        Returns:
+            trades, wins, losses, net_pnl, gross_profit, gross_loss, fees, volume, best_trade, worst_trade
+        """
+        where, params = self._where(symbol, since, until)
+        with self._lock:
+            row = self._conn.execute(f"""
+                SELECT COUNT(*) AS trades,
+                       COALESCE(SUM(net_pnl > 0), 0) AS wins,
+                       COALESCE(SUM(net_pnl <= 0), 0) AS losses,
+                       COALESCE(SUM(net_pnl), 0.0) AS net_pnl,
+                       COALESCE(SUM(CASE WHEN net_pnl > 0 THEN net_pnl END), 0.0) AS gross_profit,
+                       COALESCE(SUM(CASE WHEN net_pnl < 0 THEN net_pnl END), 0.0) AS gross_loss,
+                       COALESCE(SUM(fees), 0.0) AS fees,
+                       COALESCE(SUM(position_value), 0.0) AS volume,
+                       COALESCE(MAX(net_pnl), 0.0) AS best_trade,
+                       COALESCE(MIN(net_pnl), 0.0) AS worst_trade
+                FROM trades{where}
+            """, params).fetchone()
+        return dict(row)
+
+    def get_daily_stats(self, since: datetime = None) -> Dict[Any, Dict[str, Any]]:
+        """Дневная статистика (ключ - дата, как PerformanceTracker.daily_stats)"""
+        where, params = self._where(since=since)
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT substr(timestamp, 1, 10) AS day,
+                       SUM(net_pnl) AS pnl,
+                       COUNT(*) AS trades,
+                       SUM(net_pnl > 0) AS wins,
+                       SUM(net_pnl <= 0) AS losses,
+                       SUM(position_value) AS volume,
+                       SUM(fees) AS fees
+                FROM trades{where}
+                GROUP BY day ORDER BY day
+            """, params).fetchall()
+        return {datetime.strptime(row['day'], '%Y-%m-%d').date(): {k: row[k] for k in row.keys() if k != 'day'}
+                for row in rows}
+
+    def set_meta(self, key: str, value: Any) -> None:
+        """Служебное значение (JSON)"""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               (key, json.dumps(value, default=str)))
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row['value']) if row else default
+
+    def count_trades(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def clear(self) -> None:
+        """Удаление всех сделок и статистики"""
+        with self._lock, self._conn:
+            for table in ('trades', 'equity', 'symbol_performance', 'meta'):
+                self._conn.execute(f"DELETE FROM {table}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared_store: Optional[PerformanceStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_performance_store() -> Optional[PerformanceStore]:
+    """Общее хранилище процесса (None, если DATABASE_SETTINGS выключены или тип не sqlite)"""
+    global _shared_store
+    settings = TradingConfig.DATABASE_SETTINGS
+    if not settings['enabled'] or settings['type'] != 'sqlite':
+        return None
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = PerformanceStore()
+        return _shared_store
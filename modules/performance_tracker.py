@@ -1,21 +1,39 @@
 import logging
 import os
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import pandas as pd
 import numpy as np
+from config.trading_config import TradingConfig
+from modules.trade_ledger import TradeLedger, TradeRecord
 
 
 class PerformanceTracker:
-    """Трекер производительности торгового бота с расширенной аналитикой"""
+    """
+    Трекер производительности торгового бота с расширенной аналитикой
 
-    def __init__(self):
-        """Инициализация трекера производительности"""
+    Метрики считаются накопительно: каждая сделка обновляет счетчики, суммы, Welford
+    среднее/дисперсию доходности (и отрицательной части для Сортино) и текущий пик эквити,
+    поэтому и запись сделки, и чтение метрик - O(1) независимо от длины истории.
+    """
+
+    RISK_FREE_RATE = 0.02  # Годовая безрисковая ставка для Шарпа/Сортино
+
+    def __init__(self, store=None):
+        """
+        Инициализация трекера производительности
+
+        Args:
+            store: PerformanceStore для хранения сделок в SQLite (None - только в памяти,
+                   как в бэктестах). История из хранилища загружается сразу.
+        """
         self.logger = logging.getLogger(__name__)
 
-        # Основные данные
-        self.trades: List[Dict] = []
+        # Основные данные (с хранилищем в памяти только последние trade_window сделок)
+        window = TradingConfig.PERFORMANCE_SETTINGS['trade_window'] if store is not None else None
+        self.trades = TradeLedger(TradeRecord, window=window)
         self.equity_curve: List[Dict] = []
         self.daily_stats: Dict = {}
 
@@ -38,6 +56,9 @@ class PerformanceTracker:
         # Анализ по символам
         self.symbol_performance: Dict[str, Dict] = {}
 
+        # Накопители метрик
+        self._reset_accumulators()
+
         # Настройка директории для сохранения
         self.data_dir = os.path.join("data", "performance")
         try:
@@ -49,6 +70,15 @@ class PerformanceTracker:
             os.makedirs(self.data_dir, exist_ok=True)
             self.logger.info(f"Using alternative directory: {self.data_dir}")
 
+        # Хранилище: новые сделки копятся и пишутся пачками
+        self.store = store
+        self._pending_trades: List[Dict] = []
+        self._pending_equity: List[Dict] = []
+        self._dirty_symbols = set()
+        self._last_flush = time.monotonic()
+        if self.store is not None:
+            self.load_from_store()
+
         self.logger.info("PerformanceTracker initialized")
 
     def set_initial_balance(self, balance: float):
@@ -84,24 +114,24 @@ class PerformanceTracker:
             roi = (pnl / position_value * 100) if position_value > 0 else 0
             net_pnl = pnl - fees
 
-            trade = {
-                'id': len(self.trades) + 1,
-                'symbol': symbol,
-                'entry_price': entry_price,
-                'exit_price': exit_price,
-                'size': size,
-                'direction': direction,
-                'pnl': pnl,
-                'net_pnl': net_pnl,
-                'fees': fees,
-                'slippage': slippage,
-                'roi': roi,
-                'position_value': position_value,
-                'duration': duration,
-                'timestamp': timestamp,
-                'entry_time': trade_data.get('entry_time', timestamp),
-                'exit_time': trade_data.get('exit_time', timestamp)
-            }
+            trade = TradeRecord(
+                id=len(self.trades) + 1,
+                symbol=symbol,
+                entry_price=entry_price,
+                exit_price=exit_price,
+                size=size,
+                direction=direction,
+                pnl=pnl,
+                net_pnl=net_pnl,
+                fees=fees,
+                slippage=slippage,
+                roi=roi,
+                position_value=position_value,
+                duration=duration,
+                timestamp=timestamp,
+                entry_time=trade_data.get('entry_time', timestamp),
+                exit_time=trade_data.get('exit_time', timestamp)
+            )
 
             self.trades.append(trade)
             self.total_pnl += net_pnl
@@ -112,6 +142,14 @@ class PerformanceTracker:
             self._update_equity_curve(trade)
             self._update_symbol_performance(trade)
 
+            if self.store is not None:
+                self._pending_trades.append(trade)
+                self._pending_equity.append(self.equity_curve[-1])
+                self._dirty_symbols.add(symbol)
+                if (len(self._pending_trades) >= self.store.settings['flush_every'] or
+                        time.monotonic() - self._last_flush >= self.store.settings['flush_interval']):
+                    self.flush()
+
             self.logger.info(f"Trade logged: {symbol} {direction} PnL: ${net_pnl:.2f}")
 
         except Exception as e:
@@ -122,6 +160,8 @@ class PerformanceTracker:
         try:
             pnl = trade['net_pnl']
 
+            self._accumulate(trade)
+
             # Обновление лучшей/худшей сделки
             self.best_trade = max(self.best_trade, pnl)
             self.worst_trade = min(self.worst_trade, pnl)
@@ -159,9 +199,6 @@ class PerformanceTracker:
             else:
                 daily['losses'] += 1
 
-            # Расчет просадки
-            self._calculate_drawdown()
-
         except Exception as e:
             self.logger.error(f"Error updating statistics: {e}")
 
@@ -176,6 +213,7 @@ class PerformanceTracker:
                 'trade_id': trade['id']
             }
             self.equity_curve.append(equity_point)
+            self._update_drawdown(equity_point)
 
         except Exception as e:
             self.logger.error(f"Error updating equity curve: {e}")
@@ -213,30 +251,74 @@ class PerformanceTracker:
         except Exception as e:
             self.logger.error(f"Error updating symbol performance: {e}")
 
-    def _calculate_drawdown(self) -> None:
-        """Расчет максимальной просадки"""
+    def _reset_accumulators(self) -> None:
+        """Обнуление накопительных метрик"""
+        self._winning_trades = 0
+        self._negative_trades = 0
+        self._gross_profit = 0.0
+        self._gross_loss = 0.0
+        self._total_fees = 0.0
+        self._total_volume = 0.0
+        self._duration_seconds = 0.0
+        self._duration_count = 0
+
+        # Welford по ROI сделок и по отрицательной избыточной доходности (Сортино)
+        self._roi_count = 0
+        self._roi_mean = 0.0
+        self._roi_m2 = 0.0
+        self._downside_count = 0
+        self._downside_mean = 0.0
+        self._downside_m2 = 0.0
+
+        # Текущий пик эквити для просадки
+        self._equity_peak: Optional[float] = None
+        self._equity_peak_time = None
+
+    def _accumulate(self, trade: Dict) -> None:
+        """Обновление накопителей метрик сделкой"""
+        pnl = trade['net_pnl']
+        if pnl > 0:
+            self._winning_trades += 1
+            self._gross_profit += pnl
+        elif pnl < 0:
+            self._negative_trades += 1
+            self._gross_loss += pnl
+
+        self._total_fees += trade['fees']
+        self._total_volume += trade['position_value']
+        if isinstance(trade['duration'], timedelta):
+            self._duration_seconds += trade['duration'].total_seconds()
+            self._duration_count += 1
+
+        roi = trade['roi']
+        self._roi_count += 1
+        delta = roi - self._roi_mean
+        self._roi_mean += delta / self._roi_count
+        self._roi_m2 += delta * (roi - self._roi_mean)
+
+        excess = roi - self.RISK_FREE_RATE / 252
+        if excess < 0:
+            self._downside_count += 1
+            delta = excess - self._downside_mean
+            self._downside_mean += delta / self._downside_count
+            self._downside_m2 += delta * (excess - self._downside_mean)
+
+    def _update_drawdown(self, point: Dict) -> None:
+        """Обновление максимальной просадки новой точкой эквити"""
         try:
-            if not self.equity_curve:
+            balance = point['balance']
+            if self._equity_peak is None or balance >= self._equity_peak:
+                self._equity_peak = balance
+                self._equity_peak_time = point['timestamp']
                 return
 
-            balances = [point['balance'] for point in self.equity_curve]
-            peak = np.maximum.accumulate(balances)
-            drawdown = (peak - balances) / peak * 100
-
-            max_dd_idx = np.argmax(drawdown)
-            self.max_drawdown = float(drawdown[max_dd_idx])
-
-            # Расчет продолжительности просадки
-            if max_dd_idx > 0:
-                peak_time = None
-                for i in range(max_dd_idx, -1, -1):
-                    if balances[i] == peak[max_dd_idx]:
-                        peak_time = self.equity_curve[i]['timestamp']
-                        break
+            if self._equity_peak <= 0:
+                return
 
-                if peak_time:
-                    recovery_time = self.equity_curve[max_dd_idx]['timestamp']
-                    self.max_drawdown_duration = recovery_time - peak_time
+            drawdown = (self._equity_peak - balance) / self._equity_peak * 100
+            if drawdown > self.max_drawdown:
+                self.max_drawdown = float(drawdown)
+                self.max_drawdown_duration = point['timestamp'] - self._equity_peak_time
 
         except Exception as e:
             self.logger.error(f"Error calculating drawdown: {e}")
@@ -248,13 +330,13 @@ class PerformanceTracker:
                 return self._get_empty_metrics()
 
             total_trades = len(self.trades)
-            winning_trades = len([t for t in self.trades if t['net_pnl'] > 0])
+            winning_trades = self._winning_trades
             losing_trades = total_trades - winning_trades
 
             # Базовые метрики
             win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-            avg_win = np.mean([t['net_pnl'] for t in self.trades if t['net_pnl'] > 0]) if winning_trades > 0 else 0
-            avg_loss = np.mean([t['net_pnl'] for t in self.trades if t['net_pnl'] < 0]) if losing_trades > 0 else 0
+            avg_win = self._gross_profit / winning_trades if winning_trades > 0 else 0
+            avg_loss = self._gross_loss / self._negative_trades if self._negative_trades > 0 else 0
 
             # Коэффициенты
             profit_factor = abs(avg_win * winning_trades / (
@@ -306,8 +388,8 @@ class PerformanceTracker:
                 'trades_per_day': round(total_trades / max(trading_duration.days, 1), 2),
 
                 # Дополнительные метрики
-                'total_fees': round(sum(t['fees'] for t in self.trades), 2),
-                'total_volume': round(sum(t['position_value'] for t in self.trades), 2),
+                'total_fees': round(self._total_fees, 2),
+                'total_volume': round(self._total_volume, 2),
                 'avg_trade_duration': str(self._calculate_avg_trade_duration()),
 
                 'last_update': datetime.now().isoformat()
@@ -319,38 +401,43 @@ class PerformanceTracker:
             self.logger.error(f"Error calculating performance metrics: {e}")
             return self._get_empty_metrics()
 
-    def _calculate_sharpe_ratio(self, risk_free_rate: float = 0.02) -> float:
-        """Расчет коэффициента Шарпа"""
+    def _calculate_sharpe_ratio(self, risk_free_rate: float = RISK_FREE_RATE) -> float:
+        """Расчет коэффициента Шарпа по ROI сделок"""
         try:
-            if len(self.trades) < 2:
+            if self._roi_count < 2:
                 return 0.0
 
-            returns = pd.Series([t['roi'] for t in self.trades])
-            excess_returns = returns - (risk_free_rate / 252)
-
-            if excess_returns.std() == 0:
+            # Сдвиг на безрисковую ставку не меняет дисперсию
+            std = np.sqrt(self._roi_m2 / (self._roi_count - 1))
+            if std == 0:
                 return 0.0
 
-            return float(np.sqrt(252) * (excess_returns.mean() / excess_returns.std()))
+            return float(np.sqrt(252) * ((self._roi_mean - risk_free_rate / 252) / std))
 
         except Exception as e:
             self.logger.error(f"Error calculating Sharpe ratio: {e}")
             return 0.0
 
-    def _calculate_sortino_ratio(self, risk_free_rate: float = 0.02) -> float:
-        """Расчет коэффициента Сортино"""
+    def _calculate_sortino_ratio(self, risk_free_rate: float = RISK_FREE_RATE) -> float:
+        """Расчет коэффициента Сортино по ROI сделок"""
         try:
-            if len(self.trades) < 2:
+            if self._roi_count < 2:
                 return 0.0
 
-            returns = pd.Series([t['roi'] for t in self.trades])
-            excess_returns = returns - (risk_free_rate / 252)
-            downside_returns = excess_returns[excess_returns < 0]
+            if risk_free_rate == self.RISK_FREE_RATE:
+                downside_count, downside_m2 = self._downside_count, self._downside_m2
+            else:
+                # Накопитель ведется для RISK_FREE_RATE, другая ставка - полный пересчет
+                downside = self.trades.column('roi') - risk_free_rate / 252
+                downside = downside[downside < 0]
+                downside_count = len(downside)
+                downside_m2 = float(((downside - downside.mean()) ** 2).sum()) if downside_count else 0.0
 
-            if len(downside_returns) == 0 or downside_returns.std() == 0:
+            if downside_count < 2 or downside_m2 == 0:
                 return 0.0
 
-            return float(np.sqrt(252) * (excess_returns.mean() / downside_returns.std()))
+            downside_std = np.sqrt(downside_m2 / (downside_count - 1))
+            return float(np.sqrt(252) * ((self._roi_mean - risk_free_rate / 252) / downside_std))
 
         except Exception as e:
             self.logger.error(f"Error calculating Sortino ratio: {e}")
@@ -358,18 +445,9 @@ class PerformanceTracker:
 
     def _calculate_avg_trade_duration(self) -> timedelta:
         """Расчет средней продолжительности сделки"""
-        try:
-            durations = [t['duration'] for t in self.trades if isinstance(t['duration'], timedelta)]
-            if not durations:
-                return timedelta(0)
-
-            total_seconds = sum(d.total_seconds() for d in durations)
-            avg_seconds = total_seconds / len(durations)
-            return timedelta(seconds=avg_seconds)
-
-        except Exception as e:
-            self.logger.error(f"Error calculating average trade duration: {e}")
+        if not self._duration_count:
             return timedelta(0)
+        return timedelta(seconds=self._duration_seconds / self._duration_count)
 
     def get_daily_report(self) -> pd.DataFrame:
         """Получение ежедневного отчета"""
@@ -422,14 +500,93 @@ class PerformanceTracker:
             self.logger.error(f"Error generating equity curve DataFrame: {e}")
             return pd.DataFrame()
 
+    def flush(self) -> bool:
+        """Запись накопленных сделок, точек эквити и статистики символов в хранилище"""
+        if self.store is None or not self._pending_trades:
+            return True
+
+        symbols = {symbol: self.symbol_performance[symbol] for symbol in self._dirty_symbols}
+        if not self.store.write(self._pending_trades, self._pending_equity, symbols):
+            return False
+
+        self.logger.debug(f"Flushed {len(self._pending_trades)} trades to performance store")
+        self._pending_trades = []
+        self._pending_equity = []
+        self._dirty_symbols.clear()
+        self._last_flush = time.monotonic()
+        return True
+
+    def load_from_store(self) -> int:
+        """
+        Восстановление состояния из хранилища (при запуске)
+
+        Сделки, эквити и статистика символов читаются таблицами, дневная статистика
+        считается запросом; серии, экстремумы и просадка - одним проходом.
+
+        Returns:
+            Количество загруженных сделок
+        """
+        try:
+            trades = self.store.load_trades()
+            self.trades.clear()
+            self.equity_curve = self.store.load_equity_curve()
+            self.symbol_performance = self.store.load_symbol_performance()
+            self.daily_stats = self.store.get_daily_stats()
+
+            net_pnls = [t['net_pnl'] for t in trades]
+            self.total_pnl = float(sum(net_pnls))
+            self.best_trade = max([0.0] + net_pnls)
+            self.worst_trade = min([0.0] + net_pnls)
+
+            self.consecutive_wins = self.consecutive_losses = 0
+            self.max_consecutive_wins = self.max_consecutive_losses = 0
+            self.max_drawdown = 0.0
+            self.max_drawdown_duration = timedelta(0)
+            self._reset_accumulators()
+            for trade in trades:
+                self.trades.append(trade)
+                self._accumulate(trade)
+                if trade['net_pnl'] > 0:
+                    self.consecutive_wins += 1
+                    self.consecutive_losses = 0
+                    self.max_consecutive_wins = max(self.max_consecutive_wins, self.consecutive_wins)
+                else:
+                    self.consecutive_losses += 1
+                    self.consecutive_wins = 0
+                    self.max_consecutive_losses = max(self.max_consecutive_losses, self.consecutive_losses)
+
+            for point in self.equity_curve:
+                self._update_drawdown(point)
+            if self.equity_curve:
+                self.current_balance = self.equity_curve[-1]['balance']
+
+            if self.trades:
+                self.logger.info(f"Loaded {len(self.trades)} trades from performance store")
+            return len(self.trades)
+
+        except Exception as e:
+            self.logger.error(f"Error loading performance store: {e}")
+            return 0
+
     def save_performance_data(self, filename_prefix: str = "performance") -> None:
-        """Сохранение данных о производительности"""
+        """
+        Сохранение данных о производительности
+
+        С хранилищем - запись накопленных сделок и последних метрик в базу,
+        без хранилища - файлы CSV/JSON с меткой времени.
+        """
         try:
+            if self.store is not None:
+                self.flush()
+                self.store.set_meta(f"{filename_prefix}_metrics", self.get_performance_metrics())
+                self.logger.info(f"Performance data saved to {self.store.path}")
+                return
+
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
             # Сохранение сделок
             if self.trades:
-                trades_df = pd.DataFrame(self.trades)
+                trades_df = self.trades.to_frame()
                 trades_file = os.path.join(self.data_dir, f"{filename_prefix}_trades_{timestamp}.csv")
                 trades_df.to_csv(trades_file, index=False)
                 self.logger.info(f"Trades data saved to {trades_file}")
@@ -459,7 +616,7 @@ class PerformanceTracker:
             self.logger.error(f"Error saving performance data: {e}")
 
     def load_performance_data(self, trades_file: str) -> bool:
-        """Загрузка данных о производительности из файла"""
+        """Загрузка сделок из CSV файла (импорт старых performance_trades_*.csv)"""
         try:
             if not os.path.exists(trades_file):
                 self.logger.warning(f"File {trades_file} not found")
@@ -468,9 +625,9 @@ class PerformanceTracker:
             trades_df = pd.read_csv(trades_file)
             trades_df['timestamp'] = pd.to_datetime(trades_df['timestamp'])
 
-            for _, row in trades_df.iterrows():
-                trade_data = row.to_dict()
+            for trade_data in trades_df.to_dict('records'):
                 self.log_trade(trade_data)
+            self.flush()
 
             self.logger.info(f"Loaded {len(trades_df)} trades from {trades_file}")
             return True
@@ -497,6 +654,13 @@ class PerformanceTracker:
             self.consecutive_losses = 0
             self.max_consecutive_wins = 0
             self.max_consecutive_losses = 0
+            self._reset_accumulators()
+
+            self._pending_trades = []
+            self._pending_equity = []
+            self._dirty_symbols.clear()
+            if self.store is not None:
+                self.store.clear()
 
             self.start_time = datetime.now()
             self.logger.info("Performance data reset")
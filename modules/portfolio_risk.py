@@ -0,0 +1,371 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from statistics import NormalDist
+from typing import Dict, Any, List, Optional
+from config.trading_config import TradingConfig
+
+
+def direction_sign(direction: str) -> float:
+    """Знак экспозиции: BUY / LONG -> +1, SELL / SHORT -> -1"""
+    return 1.0 if str(direction).upper() in ('BUY', 'LONG') else -1.0
+
+
+class PortfolioRiskEngine:
+    """
+    Риск портфеля: EWMA ковариация доходностей всех торговых пар и VaR позиций
+
+    По каждой паре хранится окно цен закрытия (window свечей). Каждая свеча, закрытая по
+    всем парам, обновляет ковариацию за O(n^2) без пересчета окна (RiskMetrics, нулевое
+    среднее): S = lambda*S + (1-lambda)*r*r^T и такие же веса W по парам символов с данными,
+    ковариация C = S / W. Пропуски свечей у отдельных пар не сбивают оценку остальных.
+    Окно пересчитывается целиком (одним матричным умножением) только при появлении новой пары.
+
+    Проверка заявки (check_order) - несколько векторных операций NumPy над текущими
+    экспозициями: корреляция кандидата с открытыми позициями с учетом направления,
+    VaR портфеля до и после, маржинальный и инкрементальный VaR.
+    """
+
+    def __init__(self, symbols: List[str] = None, settings: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            symbols: Торговые пары (новые пары добавляются при первом наблюдении)
+            settings: Переопределения TradingConfig.PORTFOLIO_RISK_SETTINGS
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**TradingConfig.PORTFOLIO_RISK_SETTINGS, **(settings or {})}
+        self.decay = float(self.settings['ewma_lambda'])
+        self.window = int(self.settings['window'])
+        self.min_observations = int(self.settings['min_observations'])
+        self.z_score = NormalDist().inv_cdf(self.settings['var_confidence'])
+
+        self.symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._closes: Dict[str, OrderedDict] = {}  # symbol -> {timestamp_ms: close}, последние window свечей
+        self._steps: Dict[str, int] = {}  # Интервал свечей пары (мс)
+
+        n = 0
+        self._sums = np.zeros((n, n))  # Взвешенные суммы r_i * r_j
+        self._weights = np.zeros((n, n))  # Суммарные веса наблюдений пары
+        self._counts = np.zeros((n, n))  # Количество совместных наблюдений
+        self._cov = np.zeros((n, n))
+        self._corr = np.zeros((n, n))
+        self._last_close = np.zeros(n)  # Цена на последней учтенной свече (nan - нет данных)
+        self._exposure = np.zeros(n)  # Стоимость открытых позиций со знаком направления
+        self._last_ts: Optional[int] = None  # Последняя свеча, учтенная в ковариации
+        self._needs_rebuild = False
+        self.balance = 0.0
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'bars': 0,
+            'rebuilds': 0,
+            'checks': 0,
+            'rejected': 0
+        }
+
+        for symbol in symbols or []:
+            self._add_symbol(symbol)
+
+    # ------------------------------------------------------------------
+    # Символы и позиции
+    # ------------------------------------------------------------------
+
+    def _add_symbol(self, symbol: str) -> int:
+        """Новая пара: расширение матриц (вызывается под блокировкой или из __init__)"""
+        index = self._index.get(symbol)
+        if index is not None:
+            return index
+
+        index = len(self.symbols)
+        self.symbols.append(symbol)
+        self._index[symbol] = index
+        self._closes[symbol] = OrderedDict()
+        for name in ('_sums', '_weights', '_counts', '_cov', '_corr'):
+            setattr(self, name, np.pad(getattr(self, name), ((0, 1), (0, 1))))
+        self._last_close = np.append(self._last_close, np.nan)
+        self._exposure = np.append(self._exposure, 0.0)
+        return index
+
+    def set_position(self, symbol: str, direction: str, notional: float) -> None:
+        """Открытая позиция: стоимость (size * entry_price) и направление"""
+        with self._lock:
+            self._exposure[self._add_symbol(symbol)] = direction_sign(direction) * abs(float(notional))
+
+    def clear_position(self, symbol: str) -> None:
+        """Позиция закрыта"""
+        with self._lock:
+            index = self._index.get(symbol)
+            if index is not None:
+                self._exposure[index] = 0.0
+
+    def update_balance(self, balance: Optional[float]) -> None:
+        """Баланс счета для лимита VaR (доля баланса)"""
+        if balance is not None and balance > 0:
+            self.balance = float(balance)
+
+    # ------------------------------------------------------------------
+    # Обновление ковариации
+    # ------------------------------------------------------------------
+
+    def observe(self, symbol: str, df: Optional[pd.DataFrame], closed_only: bool = True) -> int:
+        """
+        Свечи пары из торгового цикла (get_market_data)
+
+        Запоминаются только свечи новее последней сохраненной; ковариация обновляется по
+        свечам, которые уже закрыты у всех активных пар.
+
+        Args:
+            df: DataFrame [timestamp, close, ...]
+            closed_only: Последняя строка df - формирующаяся свеча, она не учитывается
+
+        Returns:
+            int: Количество новых свечей пары
+        """
+        if df is None or len(df) < 2:
+            return 0
+        tail = df.iloc[-(self.window + 1):]
+        if closed_only:
+            tail = tail.iloc[:-1]
+        stamps = pd.DatetimeIndex(pd.to_datetime(tail['timestamp'], utc=True)).as_unit('ms').asi8
+        closes = tail['close'].to_numpy(dtype=float)
+
+        with self._lock:
+            is_new = symbol not in self._index or not self._closes[symbol]
+            self._add_symbol(symbol)
+            stored = self._closes[symbol]
+            latest = next(reversed(stored)) if stored else None
+
+            added, first_added = 0, None
+            for ts, close in zip(stamps.tolist(), closes.tolist()):
+                if (latest is None or ts > latest) and close > 0:
+                    stored[ts] = close
+                    added += 1
+                    first_added = ts if first_added is None else first_added
+            while len(stored) > self.window:
+                stored.popitem(last=False)
+            if len(stamps) >= 2:
+                self._steps[symbol] = int(stamps[-1] - stamps[-2])
+
+            # Новая пара или догнавшая остальных отстающая: свечи до последней учтенной - пересчет окна
+            if added and (is_new or (self._last_ts is not None and first_added <= self._last_ts)):
+                self._needs_rebuild = True
+            if added:
+                self._roll()
+            return added
+
+    def _active_symbols(self) -> List[str]:
+        """Пары с актуальными данными (отстающие больше stale_bars свечей не задерживают обновление)"""
+        latest = {symbol: next(reversed(closes)) for symbol, closes in self._closes.items()
+                  if closes and symbol in self._steps}
+        if not latest:
+            return []
+        newest = max(latest.values())
+        return [symbol for symbol, ts in latest.items()
+                if newest - ts <= self.settings['stale_bars'] * self._steps[symbol]]
+
+    def _roll(self) -> None:
+        """Учет свечей, закрытых у всех активных пар"""
+        active = self._active_symbols()
+        if not active:
+            return
+        complete_ts = min(next(reversed(self._closes[symbol])) for symbol in active)
+
+        if self._needs_rebuild or self._last_ts is None:
+            self._rebuild(complete_ts)
+            return
+        if complete_ts <= self._last_ts:
+            return
+
+        pending = self._pending_stamps(active, complete_ts)
+        n = len(self.symbols)
+        for ts in pending:
+            prices = np.full(n, np.nan)
+            for symbol in active:
+                close = self._closes[symbol].get(ts)
+                if close is not None:
+                    prices[self._index[symbol]] = close
+            self._update(prices)
+            self._last_ts = ts
+        self._refresh()
+
+    def _pending_stamps(self, active: List[str], complete_ts: int) -> List[int]:
+        """Метки свечей после последней учтенной (с конца окна каждой пары)"""
+        stamps = set()
+        for symbol in active:
+            for ts in reversed(self._closes[symbol]):
+                if ts <= self._last_ts:
+                    break
+                if ts <= complete_ts:
+                    stamps.add(ts)
+        return sorted(stamps)
+
+    def _update(self, prices: np.ndarray) -> None:
+        """Одна свеча: O(n^2) векторное обновление EWMA"""
+        valid = ~np.isnan(prices) & ~np.isnan(self._last_close)
+        returns = np.where(valid, np.log(np.where(valid, prices, 1.0) / np.where(valid, self._last_close, 1.0)), 0.0)
+        mask = valid.astype(float)
+
+        decay, gain = self.decay, 1.0 - self.decay
+        self._sums *= decay
+        self._sums += gain * np.outer(returns, returns)
+        self._weights *= decay
+        self._weights += gain * np.outer(mask, mask)
+        self._counts += np.outer(mask, mask)
+
+        seen = ~np.isnan(prices)
+        self._last_close[seen] = prices[seen]
+        self.stats['bars'] += 1
+
+    def _rebuild(self, complete_ts: int) -> None:
+        """Пересчет по всему окну: веса EWMA (1-lambda)*lambda^k и одно матричное умножение"""
+        frame = pd.DataFrame({symbol: pd.Series(self._closes[symbol], dtype=float) for symbol in self.symbols})
+        frame = frame.sort_index()
+        frame = frame[frame.index <= complete_ts]
+
+        self._needs_rebuild = False
+        if len(frame) < 2:
+            return
+
+        prices = frame.to_numpy(dtype=float)
+        returns = np.log(prices[1:] / prices[:-1])  # nan, если нет одной из цен
+        mask = (~np.isnan(returns)).astype(float)
+        returns = np.nan_to_num(returns, nan=0.0)
+
+        weights = (1.0 - self.decay) * self.decay ** np.arange(len(returns) - 1, -1, -1, dtype=float)
+        self._sums = (returns * weights[:, None]).T @ returns
+        self._weights = (mask * weights[:, None]).T @ mask
+        self._counts = mask.T @ mask
+
+        last_close = frame.ffill().iloc[-1].to_numpy(dtype=float, copy=True)
+        self._last_close = last_close
+        self._last_ts = int(frame.index[-1])
+        self.stats['bars'] += len(returns)
+        self.stats['rebuilds'] += 1
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Ковариация и корреляция из накопленных сумм"""
+        self._cov = np.divide(self._sums, self._weights, out=np.zeros_like(self._sums), where=self._weights > 0)
+        std = np.sqrt(np.clip(np.diag(self._cov), 0.0, None))
+        outer = np.outer(std, std)
+        corr = np.divide(self._cov, outer, out=np.zeros_like(self._cov), where=outer > 0)
+        corr[self._counts < self.min_observations] = 0.0  # Мало совместных наблюдений - связь неизвестна
+        self._corr = np.clip(corr, -1.0, 1.0)
+
+    # ------------------------------------------------------------------
+    # Проверка заявки
+    # ------------------------------------------------------------------
+
+    def check_order(self, symbol: str, direction: str, notional: float,
+                    max_correlation: float = None) -> Dict[str, Any]:
+        """
+        Риск портфеля после открытия позиции
+
+        Args:
+            symbol: Пара кандидата
+            direction: BUY / SELL
+            notional: Стоимость позиции (size * entry_price)
+            max_correlation: Порог корреляции (по умолчанию max_correlation_threshold стратегии)
+
+        Returns:
+            Dict: allowed, reason, max_correlation, correlated_with, portfolio_var, portfolio_var_after,
+                  incremental_var, marginal_var (VaR на единицу стоимости кандидата)
+        """
+        threshold = max_correlation
+        if threshold is None:
+            threshold = self.settings.get('max_correlation') or \
+                TradingConfig.STRATEGY_SETTINGS.get('max_correlation_threshold', 0.8)
+        sign = direction_sign(direction)
+        horizon = self.z_score * np.sqrt(self.settings['horizon_bars'])
+
+        with self._lock:
+            self.stats['checks'] += 1
+            index = self._add_symbol(symbol)
+            exposure = self._exposure.copy()
+            exposure[index] = 0.0  # Позиция по той же паре не считается коррелированной сама с собой
+            cov, corr = self._cov, self._corr
+
+            # Корреляция с учетом направлений: та же сторона коррелированной пары - концентрация,
+            # противоположная - хедж
+            held = exposure != 0.0
+            directional = corr[index] * np.sign(exposure) * sign
+            directional[~held] = -np.inf
+            peer = int(np.argmax(directional)) if held.any() else -1
+            peer_corr = float(directional[peer]) if peer >= 0 else 0.0
+
+            candidate = np.zeros_like(exposure)
+            candidate[index] = sign * abs(float(notional))
+            after = exposure + candidate
+            cov_exposure = cov @ exposure
+            var_before = float(np.sqrt(max(exposure @ cov_exposure, 0.0)))
+            var_after = float(np.sqrt(max(after @ (cov_exposure + cov @ candidate), 0.0)))
+            # Рост VaR на единицу стоимости кандидата (при пустом портфеле - собственная волатильность)
+            if var_before > 0:
+                marginal = float(sign * cov_exposure[index] / var_before)
+            else:
+                marginal = float(np.sqrt(max(cov[index, index], 0.0)))
+            balance = self.balance
+
+        result = {
+            'allowed': True,
+            'reason': None,
+            'max_correlation': round(peer_corr, 4),
+            'correlated_with': self.symbols[peer] if peer >= 0 else None,
+            'portfolio_var': var_before * horizon,
+            'portfolio_var_after': var_after * horizon,
+            'incremental_var': (var_after - var_before) * horizon,
+            'marginal_var': marginal * horizon
+        }
+
+        if peer >= 0 and peer_corr > threshold:
+            result['allowed'] = False
+            result['reason'] = f"correlation {peer_corr:.2f} with {self.symbols[peer]} above {threshold:.2f}"
+        elif balance > 0 and result['incremental_var'] > 0 and \
+                result['portfolio_var_after'] > self.settings['max_var_fraction'] * balance:
+            result['allowed'] = False
+            result['reason'] = (f"portfolio VaR {result['portfolio_var_after']:.2f} above "
+                                f"{self.settings['max_var_fraction']:.1%} of balance")
+
+        if not result['allowed']:
+            self.stats['rejected'] += 1
+        return result
+
+    # ------------------------------------------------------------------
+    # Отчеты
+    # ------------------------------------------------------------------
+
+    def get_correlation_matrix(self) -> pd.DataFrame:
+        """Текущая матрица корреляций (0 для пар с недостаточной историей)"""
+        with self._lock:
+            return pd.DataFrame(self._corr.copy(), index=self.symbols, columns=self.symbols)
+
+    def get_covariance_matrix(self) -> pd.DataFrame:
+        """Текущая EWMA ковариация логарифмических доходностей за одну свечу"""
+        with self._lock:
+            return pd.DataFrame(self._cov.copy(), index=self.symbols, columns=self.symbols)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            gross = float(np.abs(self._exposure).sum())
+        return {
+            **self.stats,
+            'symbols': len(self.symbols),
+            'gross_exposure': gross,
+            'last_bar': pd.Timestamp(self._last_ts, unit='ms', tz='UTC').isoformat() if self._last_ts else None
+        }
+
+
+_shared_engine: Optional[PortfolioRiskEngine] = None
+_shared_lock = threading.Lock()
+
+
+def get_portfolio_risk_engine() -> PortfolioRiskEngine:
+    """Общий экземпляр PortfolioRiskEngine процесса (торговый цикл, PositionManager, RiskManager)"""
+    global _shared_engine
+    with _shared_lock:
+        if _shared_engine is None:
+            _shared_engine = PortfolioRiskEngine(list(TradingConfig.TRADING_PAIRS))
+        return _shared_engine
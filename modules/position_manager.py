@@ -1,17 +1,31 @@
 import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
 from typing import Dict, Any, Optional
 from datetime import datetime
 from config.trading_config import TradingConfig
+from modules.cycle_profiler import get_cycle_profiler
+from modules.async_logging import get_log_pipeline
+from modules.portfolio_risk import get_portfolio_risk_engine
 
 
 class PositionManager:
     """Менеджер позиций для управления торговыми позициями"""
 
+    # Статусы ордера, после которых он на бирже больше не исполняется (без '_', в верхнем регистре)
+    FINAL_ORDER_STATUSES = {'FILLED', 'PARTIALLYFILLEDCANCELED', 'CANCELLED', 'REJECTED', 'DEACTIVATED', 'NOTFOUND'}
+
     def __init__(self, risk_manager, order_manager, trading_diary=None):
         self.risk_manager = risk_manager
         self.order_manager = order_manager
         self.trading_diary = trading_diary  # Добавляем дневник трейдинга
         self.positions = {}  # Хранение текущих позиций
+        # Ордера, ответ на которые не дождались: client order ID -> Future и контекст для сверки
+        self.pending_orders: Dict[str, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        self.profiler = get_cycle_profiler()  # Замеры этапов risk / orders торгового цикла
+        self.portfolio_risk = get_portfolio_risk_engine()  # Экспозиции открытых позиций для риска портфеля
 
         # Настройка логгера
         self.logger = logging.getLogger(__name__)
@@ -25,11 +39,11 @@ class PositionManager:
             # Если не удается создать logs, продолжаем без файлового логирования
             pass
 
-        # Добавляем обработчик для вывода в файл
+        # Добавляем обработчик для вывода в файл (запись в фоновом потоке LogPipeline)
         if not self.logger.handlers:
-            handler = logging.FileHandler('logs/positions.log', encoding='utf-8')
-            handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-            self.logger.addHandler(handler)
+            pipeline = get_log_pipeline()
+            pipeline.attach(self.logger, pipeline.file_handler(
+                'logs/positions.log', logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')))
 
         self.logger.info("PositionManager initialized")
 
@@ -40,129 +54,288 @@ class PositionManager:
     def open_position(self, symbol: str, signal: Dict[str, Any]) -> bool:
         """Открытие новой позиции (синхронная версия)"""
         try:
-            self.logger.info(f"🎯 ATTEMPTING TO OPEN POSITION for {symbol}")
-            self.logger.info(f"   Signal: {signal}")
+            self.logger.info("🎯 ATTEMPTING TO OPEN POSITION for %s", symbol)
+            self.logger.info("   Signal: %s", signal)
 
             # Проверяем, нет ли уже открытой позиции по этому символу
             if symbol in self.positions:
-                self.logger.warning(f"Position already exists for {symbol}")
+                self.logger.warning("Position already exists for %s", symbol)
+                return False
+            if self._has_pending(symbol, 'place_order'):
+                self.logger.warning("Order for %s is still in flight, waiting for reconciliation", symbol)
                 return False
 
             # Проверка риск-менеджмента
-            if not self.risk_manager.validate_position(symbol, signal):
-                self.logger.warning(f"Risk check failed for {symbol}")
+            with self.profiler.stage('risk', symbol):
+                risk_ok = self.risk_manager.validate_position(symbol, signal)
+            if not risk_ok:
+                self.logger.warning("Risk check failed for %s", symbol)
                 return False
 
             # Получаем параметры позиции из конфигурации
             symbol_config = TradingConfig.TRADING_PAIRS.get(symbol, {})
             if not symbol_config:
-                self.logger.error(f"No configuration found for {symbol}")
+                self.logger.error("No configuration found for %s", symbol)
                 return False
 
             # КРИТИЧЕСКАЯ ПРОВЕРКА: валидация сигнала
             required_fields = ['direction', 'size', 'entry_price']
             for field in required_fields:
                 if field not in signal:
-                    self.logger.error(f"Missing required field in signal: {field}")
+                    self.logger.error("Missing required field in signal: %s", field)
                     return False
 
             # Проверка размера
             if signal['size'] <= 0:
-                self.logger.error(f"Invalid signal size: {signal['size']}")
+                self.logger.error("Invalid signal size: %s", signal['size'])
                 return False
 
             # Проверка цены
             if signal.get('entry_price', 0) <= 0:
-                self.logger.error(f"Invalid entry price: {signal.get('entry_price')}")
+                self.logger.error("Invalid entry price: %s", signal.get('entry_price'))
                 return False
 
             # Проверка размера позиции
             if signal['size'] < symbol_config.get('min_position', 0):
-                self.logger.warning(
-                    f"Position size too small for {symbol}: {signal['size']} < {symbol_config.get('min_position', 0)}")
+                self.logger.warning("Position size too small for %s: %s < %s",
+                                    symbol, signal['size'], symbol_config.get('min_position', 0))
                 return False
 
             if signal['size'] > symbol_config.get('max_position', float('inf')):
-                self.logger.warning(
-                    f"Position size too large for {symbol}: {signal['size']} > {symbol_config.get('max_position', float('inf'))}")
+                self.logger.warning("Position size too large for %s: %s > %s",
+                                    symbol, signal['size'], symbol_config.get('max_position', float('inf')))
                 return False
 
-            self.logger.info(f"✅ All validations passed for {symbol}")
+            self.logger.info("✅ All validations passed for %s", symbol)
 
-            # Размещение ордера (синхронная версия)
-            self.logger.info(f"📞 Calling order_manager.place_order for {symbol}")
-            order_result = self.order_manager.place_order(
+            # Размещение ордера через конвейер OrderManager (повторный вход по символу в полете отклоняется)
+            self.logger.info("📞 Submitting order to order_manager pipeline for %s", symbol)
+            order_result = self._await_order(self.order_manager.submit_order(
                 symbol=symbol,
                 side=signal['direction'],
                 quantity=signal['size'],
                 price=signal.get('entry_price'),
                 stop_loss=signal.get('stop_loss'),
                 take_profit=signal.get('take_profit')
-            )
+            ), symbol, 'place_order', context={'signal': signal})
 
-            self.logger.info(f"📋 Order placement result for {symbol}: {order_result}")
+            self.logger.info("📋 Order placement result for %s: %s", symbol, order_result)
 
-            if order_result and order_result.get('success', False):
-                # Сохранение информации о позиции
-                self.positions[symbol] = {
-                    'direction': signal['direction'],
-                    'size': signal['size'],
-                    'entry_price': signal.get('entry_price', 0),
-                    'stop_loss': signal.get('stop_loss', 0),
-                    'take_profit': signal.get('take_profit', 0),
-                    'order_id': order_result.get('order_id', ''),
-                    'open_time': datetime.now().isoformat(),
-                    'leverage': symbol_config.get('leverage', 1),
-                    'atr': signal.get('atr', 0),  # Сохраняем ATR для трейлинг-стопа
-                    'trailing_stop_enabled': True,
-                    'initial_stop_loss': signal.get('stop_loss', 0)
-                }
-
-                # Логируем в дневник трейдинга
-                if self.trading_diary:
-                    self.logger.info(f"📔 Logging to trading diary for {symbol}")
-                    self.trading_diary.log_position_opened(
-                        symbol=symbol,
-                        direction=signal['direction'],
-                        size=signal['size'],
-                        entry_price=signal.get('entry_price', 0),
-                        stop_loss=signal.get('stop_loss'),
-                        take_profit=signal.get('take_profit')
-                    )
-                else:
-                    self.logger.warning(f"Trading diary not available for {symbol}")
+            if order_result and order_result.get('pending'):
+                # Ордер еще может исполниться - позиция будет учтена при сверке
+                self.logger.warning("⏳ Order for %s is still in flight (%s), position will be recorded on fill",
+                                    symbol, order_result.get('client_order_id'))
+                return True
 
-                self.logger.info(f"Successfully opened position for {symbol}: {self.positions[symbol]}")
+            if order_result and order_result.get('success', False):
+                self._record_open(symbol, signal, order_result)
                 return True
 
             # Детальное логирование ошибки
             error_msg = order_result.get('error', 'Unknown error') if order_result else 'No result returned'
-            self.logger.error(f"❌ FAILED TO PLACE ORDER for {symbol}")
-            self.logger.error(f"   Error: {error_msg}")
-            self.logger.error(f"   Order result: {order_result}")
+            self.logger.error("❌ FAILED TO PLACE ORDER for %s", symbol)
+            self.logger.error("   Error: %s", error_msg)
+            self.logger.error("   Order result: %s", order_result)
             return False
 
         except Exception as e:
-            self.logger.error(f"💥 CRITICAL ERROR opening position for {symbol}: {e}", exc_info=True)
+            self.logger.error("💥 CRITICAL ERROR opening position for %s: %s", symbol, e, exc_info=True)
             return False
 
+    def _record_open(self, symbol: str, signal: Dict[str, Any], order_result: Dict[str, Any]) -> None:
+        """Учет открытой позиции по ответу биржи: позиция, риск портфеля, дневник"""
+        symbol_config = TradingConfig.TRADING_PAIRS.get(symbol, {})
+
+        # Сохранение информации о позиции
+        self.positions[symbol] = {
+            'direction': signal['direction'],
+            'size': order_result.get('filled_qty', signal['size']),  # Частичное исполнение
+            'entry_price': signal.get('entry_price', 0),
+            'stop_loss': signal.get('stop_loss', 0),
+            'take_profit': signal.get('take_profit', 0),
+            'order_id': order_result.get('order_id', ''),
+            'open_time': datetime.now().isoformat(),
+            'leverage': symbol_config.get('leverage', 1),
+            'atr': signal.get('atr', 0),  # Сохраняем ATR для трейлинг-стопа
+            'trailing_stop_enabled': True,
+            'initial_stop_loss': signal.get('stop_loss', 0)
+        }
+        self.portfolio_risk.set_position(symbol, signal['direction'],
+                                         self.positions[symbol]['size'] * signal['entry_price'])
+
+        # Логируем в дневник трейдинга
+        if self.trading_diary:
+            self.logger.info("📔 Logging to trading diary for %s", symbol)
+            self.trading_diary.log_position_opened(
+                symbol=symbol,
+                direction=signal['direction'],
+                size=signal['size'],
+                entry_price=signal.get('entry_price', 0),
+                stop_loss=signal.get('stop_loss'),
+                take_profit=signal.get('take_profit')
+            )
+        else:
+            self.logger.warning("Trading diary not available for %s", symbol)
+
+        self.logger.info("Successfully opened position for %s: %s", symbol, self.positions[symbol])
+
+    def _await_order(self, future: Future, symbol: str, operation: str,
+                     context: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        Ожидание ответа конвейера ордеров
+
+        Если ответ не пришел за result_timeout, ордер с контекстом остается на сверке
+        (reconcile_pending_orders) и возвращается результат с pending=True: ордер еще
+        может исполниться на бирже, поэтому считать его неудачным нельзя.
+        """
+        try:
+            with self.profiler.stage('orders', symbol):
+                return future.result(timeout=TradingConfig.ORDER_PIPELINE_SETTINGS['result_timeout'])
+        except FuturesTimeoutError:
+            client_order_id = getattr(future, 'client_order_id', None)
+            if context is None or client_order_id is None:
+                self.logger.error("Timeout waiting for %s result for %s", operation, symbol)
+                return None
+
+            with self._pending_lock:
+                self.pending_orders[client_order_id] = {
+                    'future': future,
+                    'symbol': symbol,
+                    'operation': operation,
+                    'context': context,
+                    'since': time.monotonic()
+                }
+            self.logger.warning("Timeout waiting for %s result for %s, "
+                                "order %s is still in flight - will reconcile", operation, symbol, client_order_id)
+            return {
+                'success': False,
+                'pending': True,
+                'client_order_id': client_order_id,
+                'error': 'Order still in flight'
+            }
+
+    def _has_pending(self, symbol: str, operation: str) -> bool:
+        with self._pending_lock:
+            return any(entry['symbol'] == symbol and entry['operation'] == operation
+                       for entry in self.pending_orders.values())
+
+    def reconcile_pending_orders(self) -> Dict[str, bool]:
+        """
+        Сверка ордеров, ответ на которые не дождались
+
+        Завершившийся Future с успехом учитывается как обычный ответ. Иначе статус
+        ордера запрашивается на бирже по client order ID: ошибка сети в конвейере
+        не означает, что ордер не дошел до биржи. Исполненный ордер открывает или
+        закрывает позицию, отмененный/не найденный - снимается со сверки.
+
+        Returns:
+            Dict[str, bool]: client order ID -> успех по ордерам, сверка которых завершена
+        """
+        with self._pending_lock:
+            pending = list(self.pending_orders.items())
+
+        results = {}
+        for client_order_id, entry in pending:
+            try:
+                result = self._resolve_pending(client_order_id, entry)
+                if result is None:
+                    continue  # Статус еще неизвестен - проверим в следующем цикле
+
+                with self._pending_lock:
+                    if self.pending_orders.pop(client_order_id, None) is None:
+                        continue
+                results[client_order_id] = self._apply_reconciled(entry, result)
+            except Exception as e:
+                self.logger.error("Error reconciling order %s: %s", client_order_id, e, exc_info=True)
+
+        return results
+
+    def _resolve_pending(self, client_order_id: str, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Итоговый результат ордера на сверке или None, если ордер еще может исполниться"""
+        future = entry['future']
+        if future.done():
+            result = future.result()
+            if result and result.get('success'):
+                return result
+
+        order = self.order_manager.find_order(entry['symbol'], client_order_id)
+        if order is None:
+            return None
+
+        status = str(order.get('status') or '').replace('_', '').upper()
+        if status not in self.FINAL_ORDER_STATUSES:
+            return None
+        if status == 'NOTFOUND' and not future.done():
+            return None  # Запрос еще не дошел до биржи
+
+        if order.get('filled_qty', 0) > 0:
+            result = {
+                'success': True,
+                'order_id': order.get('order_id'),
+                'client_order_id': client_order_id,
+                'filled_qty': order['filled_qty'],
+                'reconciled': True
+            }
+            if order.get('avg_price'):
+                result['price'] = order['avg_price']
+            return result
+
+        return {
+            'success': False,
+            'client_order_id': client_order_id,
+            'error': f"Order {client_order_id} {order.get('status')}"
+        }
+
+    def _apply_reconciled(self, entry: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        """Учет результата сверки: открытие или закрытие позиции"""
+        symbol = entry['symbol']
+        context = entry['context']
+
+        if entry['operation'] == 'close_position':
+            return self._finish_close(symbol, context['reason'], context.get('current_price'), result)
+
+        if result.get('success'):
+            self.logger.info("✅ In-flight order %s for %s filled", result.get('client_order_id'), symbol)
+            self._record_open(symbol, context['signal'], result)
+            return True
+
+        self.logger.error("❌ In-flight order for %s did not fill: %s", symbol, result.get('error'))
+        return False
+
+    def _submit_close(self, symbol: str) -> Future:
+        """Отправка закрытия позиции в конвейер (противоположная сторона, весь объем)"""
+        position = self.positions[symbol]
+        close_side = 'SELL' if position['direction'] == 'BUY' else 'BUY'
+        return self.order_manager.submit_close(symbol=symbol, side=close_side, quantity=position['size'])
+
     def close_position(self, symbol: str, reason: str, current_price: float = None) -> bool:
-        """Закрытие существующей позиции (синхронная версия)"""
+        """Закрытие существующей позиции (ожидает ответ биржи)"""
         try:
             if symbol not in self.positions:
-                self.logger.warning(f"No position found to close for {symbol}")
+                self.logger.warning("No position found to close for %s", symbol)
                 return False
 
-            position = self.positions[symbol]
+            if self._has_pending(symbol, 'close_position'):
+                self.logger.warning("Close order for %s is still in flight, waiting for reconciliation", symbol)
+                return False
 
-            # Определяем противоположную сторону для закрытия
-            close_side = 'SELL' if position['direction'] == 'BUY' else 'BUY'
+            close_result = self._await_order(self._submit_close(symbol), symbol, 'close_position',
+                                             context={'reason': reason, 'current_price': current_price})
+            return self._finish_close(symbol, reason, current_price, close_result)
 
-            close_result = self.order_manager.close_position(
-                symbol=symbol,
-                side=close_side,
-                quantity=position['size']
-            )
+        except Exception as e:
+            self.logger.error("Error closing position for %s: %s", symbol, e, exc_info=True)
+            return False
+
+    def _finish_close(self, symbol: str, reason: str, current_price: Optional[float],
+                      close_result: Optional[Dict[str, Any]]) -> bool:
+        """Учет результата закрытия: P&L, дневник, удаление позиции"""
+        try:
+            if close_result and close_result.get('pending'):
+                # Позиция остается открытой, пока сверка не подтвердит исполнение закрытия
+                self.logger.warning("Close order for %s is still in flight (%s), position kept until reconciled",
+                                    symbol, close_result.get('client_order_id'))
+                return False
 
             if close_result and close_result.get('success', False):
                 # Получаем цену закрытия
@@ -192,17 +365,18 @@ class PositionManager:
                         close_reason=reason
                     )
 
-                self.logger.info(f"Successfully closed position for {symbol}: {position_info}")
+                self.logger.info("Successfully closed position for %s: %s", symbol, position_info)
 
                 # Удаляем позицию из словаря
                 del self.positions[symbol]
+                self.portfolio_risk.clear_position(symbol)
                 return True
 
-            self.logger.error(f"Failed to close position for {symbol}: {close_result}")
+            self.logger.error("Failed to close position for %s: %s", symbol, close_result)
             return False
 
         except Exception as e:
-            self.logger.error(f"Error closing position for {symbol}: {e}", exc_info=True)
+            self.logger.error("Error closing position for %s: %s", symbol, e, exc_info=True)
             return False
 
     def update_trailing_stop(self, symbol: str, current_price: float):
@@ -227,19 +401,19 @@ class PositionManager:
             # Обновляем стоп только если он изменился и движется в правильном направлении
             if new_stop != position['stop_loss']:
                 if self._should_update_stop_loss(position, new_stop):
-                    update_result = self.order_manager.update_stop_loss(
+                    update_result = self._await_order(self.order_manager.submit_stop_update(
                         symbol=symbol,
                         order_id=position['order_id'],
                         new_stop_loss=new_stop
-                    )
+                    ), symbol, 'update_stop_loss')
 
                     if update_result and update_result.get('success', False):
                         old_stop = position['stop_loss']
                         self.positions[symbol]['stop_loss'] = new_stop
-                        self.logger.info(f"Updated trailing stop for {symbol}: {old_stop:.4f} -> {new_stop:.4f}")
+                        self.logger.info("Updated trailing stop for %s: %.4f -> %.4f", symbol, old_stop, new_stop)
 
         except Exception as e:
-            self.logger.error(f"Error updating trailing stop for {symbol}: {e}", exc_info=True)
+            self.logger.error("Error updating trailing stop for %s: %s", symbol, e, exc_info=True)
 
     def _calculate_simple_trailing_stop(self, position: Dict[str, Any], current_price: float) -> float:
         """Простой расчет трейлинг-стопа на основе ATR"""
@@ -259,7 +433,7 @@ class PositionManager:
                 return min(new_stop, position['stop_loss'])  # Стоп может только опускаться
 
         except Exception as e:
-            self.logger.error(f"Error calculating simple trailing stop: {e}")
+            self.logger.error("Error calculating simple trailing stop: %s", e)
             return position['stop_loss']
 
     def _should_update_stop_loss(self, position: Dict[str, Any], new_stop: float) -> bool:
@@ -294,7 +468,7 @@ class PositionManager:
 
             # Валидация цен
             if entry_price <= 0 or current_price <= 0:
-                self.logger.error(f"Неверные цены для {symbol}: entry={entry_price}, current={current_price}")
+                self.logger.error("Неверные цены для %s: entry=%s, current=%s", symbol, entry_price, current_price)
                 return 0.0
 
             # ИСПРАВЛЕННЫЙ расчет PnL для TESTNET с реалистичными значениями
@@ -305,10 +479,10 @@ class PositionManager:
             price_change_pct = random.uniform(-0.03, 0.03)  # От -3% до +3%
             simulated_exit_price = entry_price * (1 + price_change_pct)
 
-            self.logger.info(f"TESTNET PnL расчет для {symbol}:")
-            self.logger.info(f"   Цена входа: ${entry_price:.4f}")
-            self.logger.info(f"   Симулированная цена выхода: ${simulated_exit_price:.4f}")
-            self.logger.info(f"   Изменение: {price_change_pct * 100:+.2f}%")
+            self.logger.info("TESTNET PnL расчет для %s:", symbol)
+            self.logger.info("   Цена входа: $%.4f", entry_price)
+            self.logger.info("   Симулированная цена выхода: $%.4f", simulated_exit_price)
+            self.logger.info("   Изменение: %+.2f%%", price_change_pct * 100)
 
             if position['direction'] == "BUY":
                 pnl = (simulated_exit_price - entry_price) * size * leverage
@@ -323,17 +497,17 @@ class PositionManager:
             # Разумные ограничения на PnL для TESTNET
             max_reasonable_pnl = 50.0  # Максимум $50 PnL
             if abs(pnl) > max_reasonable_pnl:
-                self.logger.warning(f"Большой PnL для {symbol}: ${pnl:.2f}, ограничиваем")
+                self.logger.warning("Большой PnL для %s: $%.2f, ограничиваем", symbol, pnl)
                 pnl = max(-max_reasonable_pnl, min(pnl, max_reasonable_pnl))
 
-            self.logger.info(f"💰 Финальный PnL для {symbol}: ${pnl:.2f}")
-            self.logger.info(f"   Комиссии: ${fees:.2f}")
-            self.logger.info(f"   Чистый PnL: ${pnl:.2f}")
+            self.logger.info("💰 Финальный PnL для %s: $%.2f", symbol, pnl)
+            self.logger.info("   Комиссии: $%.2f", fees)
+            self.logger.info("   Чистый PnL: $%.2f", pnl)
 
             return round(pnl, 8)
 
         except Exception as e:
-            self.logger.error(f"Error calculating PnL for {symbol}: {e}")
+            self.logger.error("Error calculating PnL for %s: %s", symbol, e)
             return 0.0
 
     def get_position_metrics(self, symbol: str, current_price: float) -> Dict[str, Any]:
@@ -365,7 +539,7 @@ class PositionManager:
             }
 
         except Exception as e:
-            self.logger.error(f"Error getting position metrics for {symbol}: {e}")
+            self.logger.error("Error getting position metrics for %s: %s", symbol, e)
             return {}
 
     def get_total_exposure(self) -> float:
@@ -377,7 +551,7 @@ class PositionManager:
                 total_exposure += position_value
             return total_exposure
         except Exception as e:
-            self.logger.error(f"Error calculating total exposure: {e}")
+            self.logger.error("Error calculating total exposure: %s", e)
             return 0.0
 
     def get_positions_summary(self) -> Dict[str, Any]:
@@ -413,21 +587,30 @@ class PositionManager:
             }
 
         except Exception as e:
-            self.logger.error(f"Error getting positions summary: {e}")
+            self.logger.error("Error getting positions summary: %s", e)
             return {'total_positions': 0, 'total_exposure': 0.0, 'positions': []}
 
     def close_all_positions(self, reason: str = "manual_close") -> Dict[str, bool]:
-        """Закрытие всех открытых позиций"""
+        """Закрытие всех открытых позиций (ордера отправляются одновременно, затем учитываются ответы)"""
         results = {}
-        symbols_to_close = list(self.positions.keys())
+        pending = {}
+
+        for symbol in list(self.positions.keys()):
+            try:
+                pending[symbol] = self._submit_close(symbol)
+            except Exception as e:
+                self.logger.error("Error submitting close for %s: %s", symbol, e)
+                results[symbol] = False
 
-        for symbol in symbols_to_close:
+        for symbol, future in pending.items():
             try:
-                result = self.close_position(symbol, reason)
+                close_result = self._await_order(future, symbol, 'close_position',
+                                                 context={'reason': reason, 'current_price': None})
+                result = self._finish_close(symbol, reason, None, close_result)
                 results[symbol] = result
-                self.logger.info(f"Close position {symbol}: {'Success' if result else 'Failed'}")
+                self.logger.info("Close position %s: %s", symbol, 'Success' if result else 'Failed')
             except Exception as e:
-                self.logger.error(f"Error closing position {symbol}: {e}")
+                self.logger.error("Error closing position %s: %s", symbol, e)
                 results[symbol] = False
 
         return results
@@ -439,13 +622,13 @@ class PositionManager:
             current_positions = len(self.positions)
 
             if current_positions >= max_positions:
-                self.logger.warning(f"Maximum positions limit reached: {current_positions}/{max_positions}")
+                self.logger.warning("Maximum positions limit reached: %s/%s", current_positions, max_positions)
                 return False
 
             return True
 
         except Exception as e:
-            self.logger.error(f"Error validating position limits: {e}")
+            self.logger.error("Error validating position limits: %s", e)
             return False
 
     def has_position(self, symbol: str) -> bool:
@@ -468,9 +651,9 @@ class PositionManager:
                 for key, value in kwargs.items():
                     if key in self.positions[symbol]:
                         self.positions[symbol][key] = value
-                        self.logger.debug(f"Updated {key} for {symbol}: {value}")
+                        self.logger.debug("Updated %s for %s: %s", key, symbol, value)
         except Exception as e:
-            self.logger.error(f"Error updating position info for {symbol}: {e}")
+            self.logger.error("Error updating position info for %s: %s", symbol, e)
 
     def get_unrealized_pnl(self, current_prices: Dict[str, float]) -> Dict[str, float]:
         """Получение нереализованной прибыли/убытка по всем позициям"""
@@ -482,7 +665,7 @@ class PositionManager:
                     unrealized_pnl[symbol] = pnl
             return unrealized_pnl
         except Exception as e:
-            self.logger.error(f"Error calculating unrealized PnL: {e}")
+            self.logger.error("Error calculating unrealized PnL: %s", e)
             return {}
 
     def get_total_unrealized_pnl(self, current_prices: Dict[str, float]) -> float:
@@ -491,5 +674,5 @@ class PositionManager:
             unrealized_pnl = self.get_unrealized_pnl(current_prices)
             return sum(unrealized_pnl.values())
         except Exception as e:
-            self.logger.error(f"Error calculating total unrealized PnL: {e}")
+            self.logger.error("Error calculating total unrealized PnL: %s", e)
             return 0.0
\ No newline at end of file
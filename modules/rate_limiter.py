@@ -0,0 +1,214 @@
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional
+from config.trading_config import TradingConfig
+
+
+class TokenBucket:
+    """Token bucket для одного класса эндпоинтов с адаптацией к ошибкам rate limit"""
+
+    def __init__(self, name: str, rate: float, capacity: float, min_rate: float = None,
+                 recovery_step: float = None):
+        """
+        Args:
+            name: Класс эндпоинтов (market, account, trade)
+            rate: Скорость пополнения (токенов в секунду)
+            capacity: Максимальный запас токенов (burst)
+            min_rate: Минимальная скорость после снижения из-за ошибок
+            recovery_step: Прирост скорости после каждого успешного запроса
+        """
+        self.name = name
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.min_rate = float(min_rate) if min_rate else max(self.max_rate * 0.1, 0.2)
+        self.recovery_step = float(recovery_step) if recovery_step else max(self.max_rate * 0.02, 0.05)
+
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.penalty_until = 0.0
+
+        # Метрики
+        self.requests = 0
+        self.tokens_used = 0.0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.waited_requests = 0
+        self.rate_limit_hits = 0
+
+    def _refill(self, now: float) -> None:
+        """Пополнение токенов с момента последнего обращения"""
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Резервирование токенов (вызывается под блокировкой)
+
+        Returns:
+            float: Сколько секунд нужно подождать до выполнения запроса
+        """
+        now = time.monotonic()
+        self._refill(now)
+
+        # Токены могут уходить в минус - это очередь ожидающих запросов
+        self.tokens -= tokens
+        wait = 0.0
+        if self.tokens < 0:
+            wait = -self.tokens / self.rate
+
+        # После ошибки rate limit не отправляем запросы до окончания штрафа
+        if self.penalty_until > now:
+            wait = max(wait, self.penalty_until - now)
+
+        self.requests += 1
+        self.tokens_used += tokens
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        if wait > 0:
+            self.waited_requests += 1
+
+        return wait
+
+    def on_rate_limited(self, cooldown: float) -> None:
+        """Мультипликативное снижение скорости после ошибки rate limit"""
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = min(self.tokens, 0.0)
+        self.penalty_until = max(self.penalty_until, now + cooldown)
+        self.rate_limit_hits += 1
+
+    def on_success(self) -> None:
+        """Аддитивное восстановление скорости после успешного запроса"""
+        if self.rate < self.max_rate:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Метрики бакета"""
+        return {
+            'rate': round(self.rate, 3),
+            'max_rate': self.max_rate,
+            'capacity': self.capacity,
+            'available_tokens': round(self.tokens, 3),
+            'requests': self.requests,
+            'tokens_used': round(self.tokens_used, 3),
+            'total_wait_time': round(self.total_wait, 4),
+            'avg_wait_time': round(self.total_wait / self.requests, 4) if self.requests else 0.0,
+            'max_wait_time': round(self.max_wait, 4),
+            'waited_requests': self.waited_requests,
+            'rate_limit_hits': self.rate_limit_hits
+        }
+
+
+class RateLimiter:
+    """
+    Общий rate limiter для всех клиентов ByBit API
+
+    Один экземпляр используется DataFetcher и OrderManager, которые работают
+    через одну HTTP сессию. Лимиты задаются по классам эндпоинтов
+    (TradingConfig.RATE_LIMITS) и автоматически снижаются при ошибках rate limit.
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, float]] = None, buffer: float = None,
+                 cooldown: float = None):
+        """
+        Args:
+            limits: Лимиты по классам эндпоинтов {'market': {'rate': .., 'capacity': ..}, ...}
+            buffer: Доля запаса от лимитов биржи (0.1 = используем 90% лимита)
+            cooldown: Пауза для класса эндпоинтов после ошибки rate limit (сек)
+        """
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        connection_settings = TradingConfig.CONNECTION_SETTINGS
+        limits = limits if limits is not None else TradingConfig.RATE_LIMITS
+        if buffer is None:
+            buffer = connection_settings.get('api_rate_limit_buffer',
+                                             connection_settings.get('rate_limit_buffer', 0.1))
+        buffer = min(max(buffer, 0.0), 0.9)
+        self.cooldown = cooldown if cooldown is not None else connection_settings.get('rate_limit_cooldown', 5.0)
+
+        self.buckets: Dict[str, TokenBucket] = {}
+        for endpoint_class, params in limits.items():
+            rate = params['rate'] * (1 - buffer)
+            capacity = max(1.0, params.get('capacity', params['rate']) * (1 - buffer))
+            self.buckets[endpoint_class] = TokenBucket(
+                endpoint_class, rate, capacity,
+                min_rate=params.get('min_rate'),
+                recovery_step=params.get('recovery_step')
+            )
+
+        self.logger.info(
+            "RateLimiter initialized: " +
+            ", ".join(f"{name}={bucket.rate:.1f}/s" for name, bucket in self.buckets.items())
+        )
+
+    def _get_bucket(self, endpoint_class: str) -> TokenBucket:
+        """Получение бакета по классу эндпоинтов (неизвестные классы считаются market)"""
+        bucket = self.buckets.get(endpoint_class)
+        if bucket is None:
+            bucket = self.buckets.get('market') or next(iter(self.buckets.values()))
+        return bucket
+
+    def acquire(self, endpoint_class: str = 'market', tokens: float = 1.0) -> float:
+        """
+        Ожидание разрешения на запрос
+
+        Args:
+            endpoint_class: Класс эндпоинта (market, account, trade)
+            tokens: Стоимость запроса в токенах
+
+        Returns:
+            float: Время ожидания в очереди (секунды)
+        """
+        with self._lock:
+            wait = self._get_bucket(endpoint_class).reserve(tokens)
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def report_rate_limited(self, endpoint_class: str = 'market') -> None:
+        """Сообщить об ошибке rate limit от биржи"""
+        with self._lock:
+            bucket = self._get_bucket(endpoint_class)
+            bucket.on_rate_limited(self.cooldown)
+            new_rate = bucket.rate
+
+        self.logger.warning(f"Rate limit hit for '{endpoint_class}' endpoints, "
+                            f"rate reduced to {new_rate:.2f}/s, cooldown {self.cooldown:.1f}s")
+
+    def report_success(self, endpoint_class: str = 'market') -> None:
+        """Сообщить об успешном запросе (постепенное восстановление скорости)"""
+        with self._lock:
+            self._get_bucket(endpoint_class).on_success()
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Метрики по всем классам эндпоинтов"""
+        with self._lock:
+            return {name: bucket.get_metrics() for name, bucket in self.buckets.items()}
+
+    @staticmethod
+    def is_rate_limit_error(error: Any) -> bool:
+        """Проверка, является ли ошибка превышением rate limit"""
+        message = str(error).lower()
+        return ('rate limit' in message or 'too many visits' in message or
+                '10006' in message or '10018' in message)
+
+
+_shared_rate_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """Общий экземпляр RateLimiter для всех клиентов процесса"""
+    global _shared_rate_limiter
+    with _shared_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = RateLimiter()
+        return _shared_rate_limiter
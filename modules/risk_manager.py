@@ -2,6 +2,7 @@ import logging
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 from config.trading_config import TradingConfig
+from modules.portfolio_risk import get_portfolio_risk_engine
 
 from trading_bot.modules import data_fetcher
 
@@ -19,6 +20,7 @@ class RiskManager:
 
         # Отслеживание позиций
         self.positions = {}
+        self.portfolio_risk = get_portfolio_risk_engine()  # Корреляции и VaR всех торговых пар
         self.max_drawdown = 0.0
         self.peak_balance = 0.0
 
@@ -318,6 +320,24 @@ class RiskManager:
                 self.logger.warning(f"Conflicting position direction for {symbol}")
                 return False
 
+        if not TradingConfig.PORTFOLIO_RISK_SETTINGS.get('enabled', True):
+            return True
+
+        # Корреляция с открытыми позициями и VaR портфеля после открытия
+        size = signal.get('size', 0)
+        entry_price = signal.get('entry_price', 0)
+        if size <= 0 or entry_price <= 0:
+            return True
+
+        check = self.portfolio_risk.check_order(symbol, signal.get('direction'), size * entry_price)
+        if not check['allowed']:
+            self.logger.warning(f"Portfolio risk check failed for {symbol}: {check['reason']}")
+            return False
+
+        self.logger.info(
+            f"Portfolio risk for {symbol}: max correlation {check['max_correlation']:.2f} "
+            f"({check['correlated_with'] or 'no open positions'}), "
+            f"VaR ${check['portfolio_var']:.2f} -> ${check['portfolio_var_after']:.2f}")
         return True
 
     def _check_drawdown_limits(self) -> bool:
@@ -0,0 +1,312 @@
+import math
+import numpy as np
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+from config.trading_config import TradingConfig
+
+NAN = float('nan')
+
+
+class _RingBuffer:
+    """Кольцевой буфер фиксированного размера на numpy массиве"""
+
+    __slots__ = ('values', 'size', 'count', 'pos')
+
+    def __init__(self, size: int):
+        self.values = np.full(size, np.nan, dtype=np.float64)
+        self.size = size
+        self.count = 0
+        self.pos = 0
+
+    def push(self, value: float) -> Optional[float]:
+        """Добавление значения; возвращает вытесненное значение (или None)"""
+        evicted = float(self.values[self.pos]) if self.count == self.size else None
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        return evicted
+
+
+class StreamingEMA:
+    """EMA с обновлением O(1); совпадает с ta.trend.EMAIndicator (ewm adjust=False, min_periods=window)"""
+
+    __slots__ = ('window', 'alpha', 'count', 'ema', 'value')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self.count = 0
+        self.ema = NAN
+        self.value = NAN
+
+    def update(self, price: float) -> float:
+        self.count += 1
+        if self.count == 1:
+            self.ema = price
+        else:
+            self.ema = (1.0 - self.alpha) * self.ema + self.alpha * price
+        self.value = self.ema if self.count >= self.window else NAN
+        return self.value
+
+
+class StreamingRSI:
+    """RSI Уайлдера с обновлением O(1); совпадает с ta.momentum.RSIIndicator"""
+
+    __slots__ = ('window', 'alpha', 'count', 'prev_close', 'avg_up', 'avg_down', 'value')
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.alpha = 1.0 / window
+        self.count = 0
+        self.prev_close = NAN
+        self.avg_up = 0.0
+        self.avg_down = 0.0
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        # Первый бар дает нулевые up/down (как diff().where(...) в ta)
+        diff = close - self.prev_close if self.count else 0.0
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        self.prev_close = close
+        self.count += 1
+
+        if self.count == 1:
+            self.avg_up, self.avg_down = up, down
+        else:
+            self.avg_up = (1.0 - self.alpha) * self.avg_up + self.alpha * up
+            self.avg_down = (1.0 - self.alpha) * self.avg_down + self.alpha * down
+
+        if self.count < self.window:
+            self.value = NAN
+        elif self.avg_down == 0:
+            self.value = 100.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self.avg_up / self.avg_down)
+        return self.value
+
+
+class StreamingMACD:
+    """MACD с обновлением O(1); совпадает с ta.trend.MACD"""
+
+    __slots__ = ('ema_fast', 'ema_slow', 'ema_signal', 'macd', 'signal', 'histogram')
+
+    def __init__(self, window_fast: int = 12, window_slow: int = 26, window_sign: int = 9):
+        self.ema_fast = StreamingEMA(window_fast)
+        self.ema_slow = StreamingEMA(window_slow)
+        self.ema_signal = StreamingEMA(window_sign)
+        self.macd = NAN
+        self.signal = NAN
+        self.histogram = NAN
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        self.macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        # Сигнальная EMA стартует с первого определенного значения MACD
+        self.signal = self.ema_signal.update(self.macd) if not math.isnan(self.macd) else NAN
+        self.histogram = self.macd - self.signal
+        return self.macd, self.signal, self.histogram
+
+
+class StreamingATR:
+    """ATR с обновлением O(1); совпадает с ta.volatility.AverageTrueRange (0 до заполнения окна)"""
+
+    __slots__ = ('window', 'count', 'prev_close', 'tr_sum', 'value')
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.count = 0
+        self.prev_close = NAN
+        self.tr_sum = 0.0
+        self.value = 0.0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.count:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        else:
+            true_range = high - low
+        self.prev_close = close
+        self.count += 1
+
+        if self.count < self.window:
+            self.tr_sum += true_range
+        elif self.count == self.window:
+            self.value = (self.tr_sum + true_range) / self.window
+        else:
+            self.value = (self.value * (self.window - 1) + true_range) / self.window
+        return self.value
+
+
+class StreamingBollinger:
+    """Полосы Боллинджера с обновлением O(1) (скользящие среднее и дисперсия, ddof=0)"""
+
+    __slots__ = ('window', 'window_dev', 'buffer', 'mean', 'ssqdm', 'upper', 'middle', 'lower')
+
+    def __init__(self, window: int = 20, window_dev: float = 2):
+        self.window = window
+        self.window_dev = window_dev
+        self.buffer = _RingBuffer(window)
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.upper = NAN
+        self.middle = NAN
+        self.lower = NAN
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        evicted = self.buffer.push(close)
+
+        # Удаление вытесненного значения и добавление нового (онлайн-формулы Уэлфорда)
+        if evicted is not None:
+            nobs = self.buffer.count - 1
+            delta = evicted - self.mean
+            self.mean -= delta / nobs
+            self.ssqdm -= (nobs + 1) * delta * delta / nobs
+        nobs = self.buffer.count
+        delta = close - self.mean
+        self.mean += delta / nobs
+        self.ssqdm += (nobs - 1) * delta * delta / nobs
+
+        if nobs < self.window:
+            return self.upper, self.middle, self.lower
+
+        std = math.sqrt(max(self.ssqdm, 0.0) / nobs)
+        self.middle = self.mean
+        self.upper = self.mean + self.window_dev * std
+        self.lower = self.mean - self.window_dev * std
+        return self.upper, self.middle, self.lower
+
+
+class StreamingStochastic:
+    """Стохастик с обновлением O(1) (амортизированно); совпадает с ta.momentum.StochasticOscillator"""
+
+    __slots__ = ('window', 'smooth_window', 'count', 'max_queue', 'min_queue',
+                 'k_buffer', 'k_sum', 'k_valid', 'k', 'd')
+
+    def __init__(self, window: int = 14, smooth_window: int = 3):
+        self.window = window
+        self.smooth_window = smooth_window
+        self.count = 0
+        # Монотонные очереди (номер бара, значение) для скользящих max(high) и min(low)
+        self.max_queue = deque()
+        self.min_queue = deque()
+        self.k_buffer = _RingBuffer(smooth_window)
+        self.k_sum = 0.0
+        self.k_valid = 0
+        self.k = NAN
+        self.d = NAN
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float]:
+        idx = self.count
+        self.count += 1
+
+        while self.max_queue and self.max_queue[-1][1] <= high:
+            self.max_queue.pop()
+        self.max_queue.append((idx, high))
+        while self.min_queue and self.min_queue[-1][1] >= low:
+            self.min_queue.pop()
+        self.min_queue.append((idx, low))
+
+        oldest = idx - self.window + 1
+        if self.max_queue[0][0] < oldest:
+            self.max_queue.popleft()
+        if self.min_queue[0][0] < oldest:
+            self.min_queue.popleft()
+
+        if self.count >= self.window:
+            highest, lowest = self.max_queue[0][1], self.min_queue[0][1]
+            price_range = highest - lowest
+            self.k = 100.0 * (close - lowest) / price_range if price_range else NAN
+        else:
+            self.k = NAN
+
+        # %D: скользящее среднее %K (NaN не учитываются, как в rolling().mean())
+        evicted = self.k_buffer.push(self.k)
+        if evicted is not None and not math.isnan(evicted):
+            self.k_sum -= evicted
+            self.k_valid -= 1
+        if not math.isnan(self.k):
+            self.k_sum += self.k
+            self.k_valid += 1
+        self.d = self.k_sum / self.k_valid if self.k_valid >= self.smooth_window else NAN
+        return self.k, self.d
+
+
+class StreamingIndicatorSet:
+    """
+    Набор потоковых индикаторов одного символа с параметрами TradingConfig.INDICATORS
+
+    Колонки latest() совпадают с MarketAnalyzer.calculate_indicators, поэтому
+    стратегии могут читать последние значения без построения DataFrame.
+    update() вызывается для закрытых свечей; повторная свеча с той же меткой
+    времени игнорируется.
+    """
+
+    __slots__ = ('ema_fast', 'ema_medium', 'ema_slow', 'ema_trend', 'rsi', 'macd',
+                 'bollinger', 'atr', 'stochastic', 'last_timestamp', 'bars')
+
+    def __init__(self, params: Dict[str, Any] = None):
+        params = params or TradingConfig.INDICATORS
+        self.ema_fast = StreamingEMA(params['ema']['fast'])
+        self.ema_medium = StreamingEMA(params['ema']['medium'])
+        self.ema_slow = StreamingEMA(params['ema']['slow'])
+        self.ema_trend = StreamingEMA(params['ema']['trend'])
+        self.rsi = StreamingRSI(params['rsi']['period'])
+        self.macd = StreamingMACD(params['macd']['fast'], params['macd']['slow'], params['macd']['signal'])
+        self.bollinger = StreamingBollinger(params['bollinger']['period'], params['bollinger']['std'])
+        self.atr = StreamingATR(params['atr']['period'])
+        self.stochastic = StreamingStochastic(params['stochastic']['k_period'], params['stochastic']['smooth_k'])
+        self.last_timestamp = None
+        self.bars = 0
+
+    def update(self, high: float, low: float, close: float, timestamp=None) -> bool:
+        """
+        Обновление по закрытой свече
+
+        Returns:
+            bool: False если свеча уже была учтена
+        """
+        if timestamp is not None and self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return False
+
+        for ema in (self.ema_fast, self.ema_medium, self.ema_slow, self.ema_trend):
+            ema.update(close)
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+        self.atr.update(high, low, close)
+        self.stochastic.update(high, low, close)
+
+        self.last_timestamp = timestamp
+        self.bars += 1
+        return True
+
+    @classmethod
+    def from_dataframe(cls, df, params: Dict[str, Any] = None) -> 'StreamingIndicatorSet':
+        """Прогрев состояния по истории свечей"""
+        indicator_set = cls(params)
+        timestamps = df['timestamp'].tolist() if 'timestamp' in df.columns else [None] * len(df)
+        for high, low, close, timestamp in zip(df['high'].to_numpy(dtype=np.float64),
+                                               df['low'].to_numpy(dtype=np.float64),
+                                               df['close'].to_numpy(dtype=np.float64),
+                                               timestamps):
+            indicator_set.update(float(high), float(low), float(close), timestamp)
+        return indicator_set
+
+    def latest(self) -> Dict[str, float]:
+        """Последние значения индикаторов"""
+        return {
+            'ema_fast': self.ema_fast.value,
+            'ema_medium': self.ema_medium.value,
+            'ema_slow': self.ema_slow.value,
+            'ema_trend': self.ema_trend.value,
+            'rsi': self.rsi.value,
+            'macd': self.macd.macd,
+            'macd_signal': self.macd.signal,
+            'macd_histogram': self.macd.histogram,
+            'bb_upper': self.bollinger.upper,
+            'bb_middle': self.bollinger.middle,
+            'bb_lower': self.bollinger.lower,
+            'atr': self.atr.value,
+            'stoch_k': self.stochastic.k,
+            'stoch_d': self.stochastic.d
+        }
@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+from config.trading_config import TradingConfig
+
+
+class TickerCache:
+    """Кэш последних цен с коротким TTL поверх DataFetcher или MarketDataFeed"""
+
+    def __init__(self, source, ttl: float = None, max_age: float = None):
+        """
+        Args:
+            source: Источник цен - объект с get_last_price (MarketDataFeed) или get_current_price (DataFetcher)
+            ttl: Сколько секунд цена считается свежей
+            max_age: Предельный возраст цены, которую можно вернуть при недоступном источнике
+        """
+        self.logger = logging.getLogger(__name__)
+        settings = TradingConfig.SIMULATION_SETTINGS
+        self.source = source
+        self.ttl = settings['ticker_ttl'] if ttl is None else ttl
+        self.max_age = settings['max_price_age'] if max_age is None else max_age
+
+        self._fetch = getattr(source, 'get_last_price', None) or source.get_current_price
+        self._prices: Dict[str, Tuple[float, float]] = {}  # symbol -> (цена, time.monotonic())
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'failures': 0}
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        """Цена символа: из кэша, если свежая, иначе из источника"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._prices.get(symbol)
+        if cached and now - cached[1] <= self.ttl:
+            self.stats['hits'] += 1
+            return cached[0]
+
+        self.stats['misses'] += 1
+        try:
+            price = self._fetch(symbol)
+        except Exception as e:
+            self.logger.warning(f"Price source failed for {symbol}: {e}")
+            price = None
+
+        if price and price > 0:
+            self.update(symbol, price)
+            return float(price)
+
+        # Источник недоступен - допускаем последнюю известную цену в пределах max_age
+        self.stats['failures'] += 1
+        if cached and now - cached[1] <= self.max_age:
+            self.stats['stale'] += 1
+            self.logger.warning(f"Using stale price for {symbol} ({now - cached[1]:.1f}s old)")
+            return cached[0]
+        return None
+
+    def update(self, symbol: str, price: float) -> None:
+        """Запись цены в кэш (например, из ответа биржи или потока)"""
+        with self._lock:
+            self._prices[symbol] = (float(price), time.monotonic())
+
+    def invalidate(self, symbol: str = None) -> None:
+        """Сброс кэша для символа или целиком"""
+        with self._lock:
+            if symbol is None:
+                self._prices.clear()
+            else:
+                self._prices.pop(symbol, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика попаданий в кэш"""
+        requests = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'symbols': len(self._prices),
+            'hit_rate': self.stats['hits'] / requests if requests else 0.0
+        }
@@ -0,0 +1,337 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+from config.trading_config import TradingConfig
+from modules.candle_store import CandleStore, interval_to_ms
+
+# Свеча во внутреннем представлении: (timestamp_ms, open, high, low, close, volume)
+Bar = Tuple[int, float, float, float, float, float]
+
+
+def normalize_interval(interval: str) -> str:
+    """Интервал ByBit для запроса к API: '1h' / '4h' из конфигурации -> '60' / '240'"""
+    interval = str(interval)
+    if interval.endswith('h') and interval[:-1].isdigit():
+        return str(int(interval[:-1]) * 60)
+    return interval
+
+
+class _Rollup:
+    """Свечи одного старшего таймфрейма: закрытые свечи и незакрытая свертка текущего интервала"""
+
+    __slots__ = ('step', 'closed', 'partial', 'skip_before', 'version', '_frame', '_frame_version')
+
+    def __init__(self, step: int, max_bars: int):
+        self.step = step
+        self.closed: deque = deque(maxlen=max_bars)
+        self.partial: Optional[List[float]] = None  # [bucket_ms, open, high, low, close, volume]
+        self.skip_before = 0  # Базовые свечи раньше первого полного интервала не сворачиваются
+        self.version = 0
+        self._frame: Optional[pd.DataFrame] = None
+        self._frame_version = -1
+
+    def fold(self, bar: Bar) -> bool:
+        """
+        Добавление закрытой базовой свечи: O(1)
+
+        Returns:
+            bool: True если свеча начала новый интервал (предыдущий закрыт)
+        """
+        ts, open_, high, low, close, volume = bar
+        if ts < self.skip_before:
+            return False
+        bucket = ts - ts % self.step
+        partial = self.partial
+        if partial is not None and partial[0] == bucket:
+            if high > partial[2]:
+                partial[2] = high
+            if low < partial[3]:
+                partial[3] = low
+            partial[4] = close
+            partial[5] += volume
+            return False
+
+        closed = partial is not None
+        if closed:
+            self.closed.append(tuple(partial))
+            self.version += 1
+        self.partial = [bucket, open_, high, low, close, volume]
+        return closed
+
+    def forming(self, last: Optional[Bar]) -> List[tuple]:
+        """Незакрытые свечи интервала с учетом последней (возможно формирующейся) базовой свечи"""
+        partial = self.partial
+        if last is None or last[0] < self.skip_before:
+            return [tuple(partial)] if partial is not None else []
+
+        ts, open_, high, low, close, volume = last
+        bucket = ts - ts % self.step
+        if partial is not None and partial[0] == bucket:
+            return [(bucket, partial[1], max(partial[2], high), min(partial[3], low), close, partial[5] + volume)]
+        rows = [tuple(partial)] if partial is not None else []
+        rows.append((bucket, open_, high, low, close, volume))
+        return rows
+
+    def closed_frame(self) -> pd.DataFrame:
+        """DataFrame закрытых свечей (пересобирается только после закрытия интервала)"""
+        if self._frame_version != self.version:
+            self._frame = _to_frame(list(self.closed))
+            self._frame_version = self.version
+        return self._frame
+
+
+def _to_frame(rows: List[tuple]) -> pd.DataFrame:
+    """Свечи из кортежей в формате CandleStore"""
+    df = pd.DataFrame(rows, columns=CandleStore.COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms', utc=True)
+    return df
+
+
+def _to_bars(df: pd.DataFrame) -> List[Bar]:
+    """Свечи DataFrame во внутреннее представление"""
+    stamps = pd.DatetimeIndex(pd.to_datetime(df['timestamp'], utc=True)).as_unit('ms').asi8
+    values = df[CandleStore.COLUMNS[1:]].to_numpy(dtype=float)
+    return [(int(ts), *map(float, row)) for ts, row in zip(stamps, values)]
+
+
+class _SymbolState:
+    """Свертки всех таймфреймов одного символа"""
+
+    __slots__ = ('rollups', 'last')
+
+    def __init__(self, rollups: Dict[str, _Rollup]):
+        self.rollups = rollups
+        self.last: Optional[Bar] = None  # Последняя базовая свеча (может обновляться на месте)
+
+
+class TimeframeAggregator:
+    """
+    Старшие таймфреймы из одного потока базовых свечей (например, 1m -> 5m/15m/1h)
+
+    Каждая новая базовая свеча закрывает предыдущую, и та сворачивается во все таймфреймы
+    за O(1): обновляются high/low/close/volume текущего интервала, а при переходе границы
+    интервала (UTC, как у ByBit) свеча интервала переносится в ограниченный max_bars буфер.
+    Последняя базовая свеча может еще формироваться - она учитывается только при чтении.
+
+    История старших таймфреймов до начала базового окна загружается один раз через REST
+    (history_fetcher.get_kline), дальше свечи строятся только из базового ряда. Интервал,
+    начатый до первой базовой свечи, из нее не собирается (он был бы неполным).
+    """
+
+    def __init__(self, timeframes: List[str], base_interval: str = None, max_bars: int = None,
+                 history_fetcher=None):
+        """
+        Args:
+            timeframes: Интервалы для построения ('5', '15', '1h', ...)
+            base_interval: Интервал базового ряда
+            max_bars: Максимум свечей на символ/таймфрейм
+            history_fetcher: DataFetcher для начальной загрузки истории (None - без истории)
+        """
+        self.logger = logging.getLogger(__name__)
+        settings = TradingConfig.TIMEFRAME_SETTINGS
+
+        self.base_interval = str(base_interval or settings.get('base_interval', '1'))
+        self.base_step = interval_to_ms(self.base_interval)
+        self.max_bars = max_bars or settings.get('max_bars', 500)
+        self.history_fetcher = history_fetcher
+
+        self.steps: Dict[str, int] = {}
+        for interval in dict.fromkeys(str(tf) for tf in timeframes):
+            if interval in ('W', 'M'):
+                raise ValueError(f"Interval {interval} is not aligned to UTC buckets and cannot be aggregated")
+            step = interval_to_ms(interval)
+            if step < self.base_step or step % self.base_step:
+                raise ValueError(f"Interval {interval} is not a multiple of base interval {self.base_interval}")
+            self.steps[interval] = step
+
+        self._states: Dict[str, _SymbolState] = {}
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'base_bars': 0,
+            'closed_bars': 0,
+            'seeds': 0,
+            'history_fetches': 0,
+            'late_updates': 0
+        }
+
+        self.logger.info(f"TimeframeAggregator initialized ({self.base_interval} -> {', '.join(self.steps)})")
+
+    def _get_symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            if symbol not in self._symbol_locks:
+                self._symbol_locks[symbol] = threading.Lock()
+            return self._symbol_locks[symbol]
+
+    # ------------------------------------------------------------------
+    # Обновление
+    # ------------------------------------------------------------------
+
+    def seed(self, symbol: str, base_df: pd.DataFrame) -> None:
+        """Построение всех таймфреймов из окна базовых свечей (с загрузкой истории до окна)"""
+        with self._get_symbol_lock(symbol):
+            self._seed(symbol, base_df)
+
+    def _seed(self, symbol: str, base_df: pd.DataFrame) -> None:
+        bars = _to_bars(base_df)
+        if not bars:
+            return
+        first_ts = bars[0][0]
+
+        rollups = {}
+        for interval, step in self.steps.items():
+            rollup = _Rollup(step, self.max_bars)
+            rollup.skip_before = -(-first_ts // step) * step  # Начало первого полного интервала
+            if step > self.base_step:
+                rollup.closed.extend(self._fetch_history(symbol, interval, rollup.skip_before))
+            rollups[interval] = rollup
+
+        state = _SymbolState(rollups)
+        for bar in bars[:-1]:
+            for rollup in rollups.values():
+                rollup.fold(bar)
+        state.last = bars[-1]
+
+        with self._lock:
+            self._states[symbol] = state
+        self.stats['seeds'] += 1
+        self.stats['base_bars'] += len(bars)
+
+    def _fetch_history(self, symbol: str, interval: str, before_ms: int) -> List[Bar]:
+        """Закрытые свечи таймфрейма до before_ms через REST"""
+        if self.history_fetcher is None or not TradingConfig.TIMEFRAME_SETTINGS.get('seed_from_history', True):
+            return []
+        step = self.steps[interval]
+        try:
+            df = self.history_fetcher.get_kline(
+                symbol=symbol,
+                interval=normalize_interval(interval),
+                start_time=before_ms - self.max_bars * step,
+                end_time=before_ms - 1,
+                limit=min(self.max_bars, 1000)
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to fetch {interval} history for {symbol}: {e}")
+            return []
+
+        self.stats['history_fetches'] += 1
+        if df is None or df.empty:
+            return []
+        return [bar for bar in _to_bars(df) if bar[0] < before_ms]
+
+    def update(self, symbol: str, bar: Dict[str, Any]) -> List[str]:
+        """
+        Новая или обновленная базовая свеча (из websocket или REST)
+
+        Args:
+            bar: Словарь с ключами timestamp, open, high, low, close, volume
+
+        Returns:
+            List[str]: Таймфреймы, интервал которых закрылся (пусто, если символ еще не построен)
+        """
+        ts = pd.Timestamp(bar['timestamp'])
+        ts = ts.tz_localize('UTC') if ts.tzinfo is None else ts
+        values = (int(ts.as_unit('ms').value), *(float(bar[c]) for c in CandleStore.COLUMNS[1:]))
+
+        with self._get_symbol_lock(symbol):
+            state = self._states.get(symbol)
+            if state is None:
+                return []
+            return self._apply(state, values)
+
+    def _apply(self, state: _SymbolState, bar: Bar) -> List[str]:
+        last = state.last
+        if last is not None and bar[0] <= last[0]:
+            if bar[0] == last[0]:
+                state.last = bar  # Формирующаяся свеча обновляется на месте
+            else:
+                self.stats['late_updates'] += 1  # Свеча уже свернута в старшие таймфреймы
+            return []
+
+        closed = []
+        if last is not None:
+            for interval, rollup in state.rollups.items():
+                if rollup.fold(last):
+                    closed.append(interval)
+        state.last = bar
+        self.stats['base_bars'] += 1
+        self.stats['closed_bars'] += len(closed)
+        return closed
+
+    def sync(self, symbol: str, base_df: Optional[pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Догоняющее обновление из окна базовых свечей (CandleStore / MarketDataFeed)
+
+        Сворачиваются только свечи начиная с последней учтенной; если окно с ней не
+        пересекается (пропущены свечи), символ строится заново.
+
+        Returns:
+            Dict[str, DataFrame]: Свечи по таймфреймам
+        """
+        if base_df is None or base_df.empty:
+            return self.get_view(symbol)
+
+        with self._get_symbol_lock(symbol):
+            state = self._states.get(symbol)
+            stamps = pd.DatetimeIndex(pd.to_datetime(base_df['timestamp'], utc=True)).as_unit('ms').asi8
+
+            if state is None or state.last is None or stamps[0] > state.last[0]:
+                if state is not None:
+                    self.logger.warning(f"Gap in base candles for {symbol}, rebuilding timeframes")
+                self._seed(symbol, base_df)
+            else:
+                start = int(np.searchsorted(stamps, state.last[0], side='left'))
+                for bar in _to_bars(base_df.iloc[start:]):
+                    self._apply(state, bar)
+
+        return self.get_view(symbol)
+
+    # ------------------------------------------------------------------
+    # Чтение
+    # ------------------------------------------------------------------
+
+    def get_candles(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """Свечи таймфрейма: закрытые и текущая (последняя строка может еще формироваться)"""
+        interval = str(interval)
+        with self._get_symbol_lock(symbol):
+            state = self._states.get(symbol)
+            if state is None or interval not in state.rollups:
+                return None
+            rollup = state.rollups[interval]
+            closed = rollup.closed_frame()
+            forming = rollup.forming(state.last)
+
+        if not forming:
+            return closed.copy()
+        df = pd.concat([closed, _to_frame(forming)], ignore_index=True) if len(closed) else _to_frame(forming)
+        if len(df) > self.max_bars:
+            df = df.iloc[-self.max_bars:].reset_index(drop=True)
+        return df
+
+    def get_view(self, symbol: str) -> Dict[str, pd.DataFrame]:
+        """Свечи символа по всем таймфреймам"""
+        view = {}
+        for interval in self.steps:
+            df = self.get_candles(symbol, interval)
+            if df is not None:
+                view[interval] = df
+        return view
+
+    def reset(self, symbol: str = None) -> None:
+        """Сброс построенных свечей (символ будет построен заново при следующем sync)"""
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                self._states.pop(symbol, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'symbols': len(self._states),
+            'timeframes': list(self.steps)
+        }
@@ -0,0 +1,216 @@
+import json
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+
+class _Record:
+    """Доступ к полям записи как к словарю (record['pnl'], record.get('fees'))"""
+
+    __slots__ = ()
+
+    @classmethod
+    def field_names(cls) -> List[str]:
+        return [f.name for f in fields(cls)]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Запись из словаря (лишние ключи игнорируются, отсутствующие - значения по умолчанию)"""
+        return cls(**{name: data[name] for name in cls.field_names() if name in data})
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.field_names()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def keys(self) -> List[str]:
+        return self.field_names()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.field_names()}
+
+
+@dataclass(slots=True)
+class TradeRecord(_Record):
+    """Закрытая сделка (PerformanceTracker)"""
+    id: int
+    symbol: str
+    direction: str
+    entry_price: float
+    exit_price: float
+    size: float
+    pnl: float
+    net_pnl: float
+    fees: float
+    slippage: float
+    roi: float
+    position_value: float
+    duration: Any
+    timestamp: Any
+    entry_time: Any
+    exit_time: Any
+
+
+@dataclass(slots=True)
+class OrderRecord(_Record):
+    """Размещенный ордер (OrderManager.order_history)"""
+    order_id: str
+    symbol: str
+    side: str
+    quantity: float
+    price: Optional[float]
+    order_type: str
+    stop_loss: Optional[float]
+    take_profit: Optional[float]
+    status: str
+    timestamp: str
+    client_order_id: Optional[str] = None
+    simulated: bool = False
+    filled_qty: Optional[float] = None
+
+
+class TradeLedger:
+    """
+    Журнал записей с ограниченным окном в памяти
+
+    Последние window записей хранятся объектами со __slots__, более старые пачкой
+    выгружаются в JSON lines (spill_path) или отбрасываются, если данные уже хранятся
+    в другом месте (например, в PerformanceStore). len() - общее число записей,
+    индексация и итерация - по окну в памяти. Счетчики count_fields ведутся по всем
+    записям, числовые столбцы окна доступны массивами NumPy (column / to_frame).
+    """
+
+    def __init__(self, record_type, window: Optional[int] = None, spill_path: str = None,
+                 count_fields: Sequence[str] = ()):
+        """
+        Args:
+            record_type: Класс записи (TradeRecord, OrderRecord)
+            window: Записей в памяти (None - без ограничения)
+            spill_path: Файл для выгрузки старых записей (None - отбрасывать)
+            count_fields: Поля, по значениям которых ведутся счетчики всех записей
+        """
+        self.logger = logging.getLogger(__name__)
+        self.record_type = record_type
+        self.window = window
+        self.spill_path = Path(spill_path) if spill_path else None
+        self._records: List[Any] = []
+        self._evicted = 0
+        self._counts = {name: Counter() for name in count_fields}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._lock = threading.RLock()
+
+    def append(self, record) -> Any:
+        """Добавление записи (объект record_type или словарь)"""
+        if not isinstance(record, self.record_type):
+            record = self.record_type.from_dict(record)
+        with self._lock:
+            self._records.append(record)
+            for name, counter in self._counts.items():
+                counter[getattr(record, name)] += 1
+            self._trim()
+        return record
+
+    def extend(self, records: Iterable) -> None:
+        for record in records:
+            self.append(record)
+
+    def _trim(self) -> None:
+        """Выгрузка старых записей пачкой (окно + четверть), чтобы не писать на каждую запись"""
+        if self.window is None or len(self._records) <= self.window + max(self.window // 4, 1):
+            return
+
+        evicted = self._records[:-self.window] if self.window else self._records[:]
+        self._records = self._records[len(evicted):]
+        self._evicted += len(evicted)
+        for name, column in list(self._columns.items()):
+            self._columns[name] = column[len(evicted):] if len(column) >= len(evicted) else column[:0]
+
+        if self.spill_path is not None:
+            try:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(r.to_dict(), ensure_ascii=False, default=str) + "\n"
+                                 for r in evicted)
+            except Exception as e:
+                self.logger.error(f"Error spilling {len(evicted)} records to {self.spill_path}: {e}")
+
+    def __len__(self) -> int:
+        return self._evicted + len(self._records)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator:
+        return iter(list(self._records))
+
+    def __getitem__(self, index):
+        return self._records[index]
+
+    @property
+    def in_memory(self) -> int:
+        """Записей в окне"""
+        return len(self._records)
+
+    @property
+    def evicted(self) -> int:
+        """Записей, вытесненных из памяти"""
+        return self._evicted
+
+    def counts(self, field: str) -> Dict[Any, int]:
+        """Количество всех записей (включая вытесненные) по значениям поля из count_fields"""
+        return dict(self._counts[field])
+
+    def column(self, field: str, dtype=float) -> np.ndarray:
+        """
+        Столбец окна массивом NumPy
+
+        Массив кэшируется и дополняется только новыми записями.
+        """
+        with self._lock:
+            cached = self._columns.get(field)
+            built = 0 if cached is None else len(cached)
+            if built < len(self._records):
+                tail = np.fromiter((getattr(r, field) for r in self._records[built:]), dtype=dtype,
+                                   count=len(self._records) - built)
+                cached = tail if cached is None else np.concatenate([cached, tail])
+                self._columns[field] = cached
+            return cached if cached is not None else np.empty(0, dtype=dtype)
+
+    def to_frame(self, include_spilled: bool = False) -> pd.DataFrame:
+        """Записи таблицей (по умолчанию только окно в памяти)"""
+        names = self.record_type.field_names()
+        rows = list(self.read_spilled()) if include_spilled else []
+        rows.extend(r.to_dict() for r in self._records)
+        return pd.DataFrame(rows, columns=names)
+
+    def read_spilled(self) -> Iterator[Dict[str, Any]]:
+        """Выгруженные записи (значения в виде после JSON)"""
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        with open(self.spill_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def clear(self) -> None:
+        """Удаление всех записей, счетчиков и файла выгрузки"""
+        with self._lock:
+            self._records = []
+            self._evicted = 0
+            self._columns.clear()
+            for counter in self._counts.values():
+                counter.clear()
+            if self.spill_path is not None and self.spill_path.exists():
+                self.spill_path.unlink()
@@ -7,18 +7,115 @@ import pandas as pd
 from pathlib import Path
 import threading
 import time
+from config.trading_config import TradingConfig
+from modules.async_logging import get_log_pipeline, echo
+
+
+class DiaryJournal:
+    """
+    Журнал событий дневника (JSON lines, только дозапись)
+
+    Каждое событие - одна строка {"seq", "type", "ts", "data"}. Строка сразу сбрасывается
+    в ОС (переживает падение процесса), fsync выполняется пачками: после fsync_every событий
+    или если с прошлого fsync прошло fsync_interval секунд.
+    """
+
+    def __init__(self, path: Path, fsync_every: int = 16, fsync_interval: float = 1.0):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.fsync_every = max(1, int(fsync_every))
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, event: Dict[str, Any]) -> None:
+        """Дозапись события"""
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            self._pending += 1
+
+            if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def read(self) -> List[Dict[str, Any]]:
+        """
+        Чтение событий журнала
+
+        Оборванная последняя строка (падение во время записи) отбрасывается и обрезается,
+        чтобы следующая дозапись начиналась с новой строки.
+        """
+        if not self.path.exists():
+            return []
+
+        events = []
+        valid_size = 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                try:
+                    if not raw.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    events.append(json.loads(raw.decode('utf-8')))
+                except ValueError:
+                    self.logger.warning(f"Dropping torn journal tail in {self.path} at byte {valid_size}")
+                    break
+                valid_size += len(raw)
+
+        if valid_size < self.path.stat().st_size:
+            with self._lock:
+                self.close()
+                with open(self.path, 'r+b') as f:
+                    f.truncate(valid_size)
+        return events
+
+    def sync(self) -> None:
+        """Принудительный fsync накопленных событий"""
+        with self._lock:
+            self._sync()
+
+    def truncate(self) -> None:
+        """Очистка журнала после записи снимка"""
+        with self._lock:
+            self.close()
+            if self.path.exists():
+                open(self.path, 'w').close()
+
+    def close(self) -> None:
+        """Закрытие файла с fsync (вызывать под блокировкой или из одного потока)"""
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def _sync(self) -> None:
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
 
 
 class TradingDiary:
     """Дневник трейдинга для отслеживания ежедневной торговой активности"""
 
-    def __init__(self):
-        """Инициализация дневника трейдинга"""
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Инициализация дневника трейдинга
+
+        Args:
+            settings: Переопределение TradingConfig.DIARY_SETTINGS
+        """
         # Настройка специального логгера для дневника
         self.logger = self._setup_diary_logger()
+        self.settings = {**TradingConfig.DIARY_SETTINGS, **(settings or {})}
 
         # Создаем директорию для дневника
-        self.diary_dir = Path("data/diary")
+        self.diary_dir = Path(self.settings['diary_dir'])
         self.diary_dir.mkdir(parents=True, exist_ok=True)
 
         # Создаем директорию для логов дневника
@@ -56,6 +153,11 @@ class TradingDiary:
             'daily_return_pct': 0.0
         }
 
+        # Журнал событий текущего дня: снимок diary_<дата>.json + события после него
+        self.journal = None
+        self.journal_seq = 0
+        self._events_since_snapshot = 0
+
         # Загружаем данные текущего дня если они есть
         self._load_daily_data()
 
@@ -69,22 +171,15 @@ class TradingDiary:
         logger = logging.getLogger("trading_diary")
         logger.setLevel(logging.INFO)
 
-        # Очищаем существующие обработчики
-        logger.handlers.clear()
-
         # Создаем директорию для логов дневника
         diary_logs_dir = Path("logs/trading_diary")
         diary_logs_dir.mkdir(parents=True, exist_ok=True)
 
-        # Файловый обработчик для дневника
+        # Файловый обработчик для дневника (существующие обработчики заменяются записью через очередь)
         log_file = diary_logs_dir / f"diary_log_{datetime.now().strftime('%Y%m%d')}.log"
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setFormatter(
-            logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        )
-        logger.addHandler(file_handler)
-
-        return logger
+        pipeline = get_log_pipeline()
+        return pipeline.attach(logger, pipeline.file_handler(
+            log_file, logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')))
 
     def _start_periodic_logging(self):
         """Запуск периодического логирования каждые 6 часов"""
@@ -159,12 +254,15 @@ class TradingDiary:
 
             # Проверяем, новый ли это день
             if self.current_date != date.today():
-                self._save_daily_data()  # Сохраняем предыдущий день
+                self._write_snapshot()  # Сохраняем предыдущий день
                 self._start_new_day()
 
             self.daily_data['start_balance'] = initial_balance
             self.daily_data['current_balance'] = initial_balance
             self.daily_data['session_start'] = datetime.now().isoformat()
+            self._save_daily_data('session_started', {
+                key: self.daily_data[key] for key in ('start_balance', 'current_balance', 'session_start')
+            })
 
             # Логируем начало сессии
             self.logger.info(f"📅 ТОРГОВАЯ СЕССИЯ НАЧАТА: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
@@ -213,15 +311,15 @@ class TradingDiary:
                 self.logger.info(f"   🎯 Тейк-профит: ${take_profit:.4f}")
 
             self.logger.info(f"Position opened: {symbol} {direction} {size} @ {entry_price}")
-            print(f"\n📈 Позиция открыта:")
-            print(f"   🎯 {symbol} | {direction} | Размер: {size}")
-            print(f"   💵 Цена входа: ${entry_price:.4f}")
+            echo("\n📈 Позиция открыта:")
+            echo("   🎯 %s | %s | Размер: %s", symbol, direction, size)
+            echo("   💵 Цена входа: $%.4f", entry_price)
             if stop_loss:
-                print(f"   🛑 Стоп-лосс: ${stop_loss:.4f}")
+                echo("   🛑 Стоп-лосс: $%.4f", stop_loss)
             if take_profit:
-                print(f"   🎯 Тейк-профит: ${take_profit:.4f}")
+                echo("   🎯 Тейк-профит: $%.4f", take_profit)
 
-            self._save_daily_data()
+            self._save_daily_data('position_opened', {'position': position})
 
         except Exception as e:
             self.logger.error(f"Error logging position opened: {e}")
@@ -300,15 +398,20 @@ class TradingDiary:
 
             # Выводим информацию
             profit_emoji = "💚" if pnl > 0 else "❤️"
-            print(f"\n📉 Позиция закрыта:")
-            print(f"   🎯 {symbol} | {position['direction']}")
-            print(f"   💵 Цена выхода: ${close_price:.4f}")
-            print(f"   {profit_emoji} P&L: ${pnl:.2f} (комиссия: ${fees:.2f})")
-            print(f"   📊 ROI: {trade['roi_pct']:.2f}%")
-            print(f"   ⏱️ Длительность: {trade['duration']}")
-            print(f"   💰 Текущий баланс: ${self.current_balance:.2f}")
-
-            self._save_daily_data()
+            echo("\n📉 Позиция закрыта:")
+            echo("   🎯 %s | %s", symbol, position['direction'])
+            echo("   💵 Цена выхода: $%.4f", close_price)
+            echo("   %s P&L: $%.2f (комиссия: $%.2f)", profit_emoji, pnl, fees)
+            echo("   📊 ROI: %.2f%%", trade['roi_pct'])
+            echo("   ⏱️ Длительность: %s", trade['duration'])
+            echo("   💰 Текущий баланс: $%.2f", self.current_balance)
+
+            self._save_daily_data('position_closed', {
+                'position': position,
+                'trade': trade,
+                'current_balance': self.current_balance,
+                'daily_stats': self.daily_data['daily_stats']
+            })
 
         except Exception as e:
             self.logger.error(f"Error logging position closed: {e}")
@@ -354,8 +457,11 @@ class TradingDiary:
                 if self.session_start_balance > 0 else 0
             )
 
-            # Сохраняем данные
-            self._save_daily_data()
+            # Сохраняем данные (конец сессии - всегда полный снимок)
+            self._save_daily_data('session_ended', {
+                key: self.daily_data[key]
+                for key in ('session_end', 'end_balance', 'daily_return', 'daily_return_pct')
+            }, snapshot=True)
 
             # Генерируем отчет
             report = self._generate_daily_report()
@@ -503,38 +609,179 @@ class TradingDiary:
             self.logger.error(f"Error generating daily report: {e}")
             return {}
 
-    def _save_daily_data(self) -> None:
-        """Сохранение данных дня"""
+    def _save_daily_data(self, event_type: str = None, data: Dict[str, Any] = None,
+                         snapshot: bool = False) -> None:
+        """
+        Сохранение данных дня
+
+        При включенном журнале событие дописывается в diary_<дата>.jsonl, а полный снимок
+        diary_<дата>.json пишется раз в snapshot_every событий (или при snapshot=True).
+        Без журнала снимок перезаписывается на каждое событие.
+        """
         try:
-            filename = f"diary_{self.current_date.isoformat()}.json"
-            filepath = self.diary_dir / filename
+            if not self.settings['journal'] or event_type is None:
+                self._write_snapshot()
+                return
 
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.daily_data, f, indent=2, ensure_ascii=False, default=str)
+            self.journal_seq += 1
+            self.journal.append({
+                'seq': self.journal_seq,
+                'type': event_type,
+                'ts': datetime.now().isoformat(),
+                'data': data or {}
+            })
+            self._events_since_snapshot += 1
+
+            if snapshot or self._events_since_snapshot >= self.settings['snapshot_every']:
+                self._write_snapshot()
 
         except Exception as e:
             self.logger.error(f"Error saving daily data: {e}")
 
+    def _write_snapshot(self) -> None:
+        """Атомарная запись снимка дня, обновление индекса и очистка журнала"""
+        try:
+            filepath = self._day_path(self.current_date)
+            self.daily_data['journal_seq'] = self.journal_seq
+
+            tmp_path = filepath.with_suffix('.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.daily_data, f, indent=2, ensure_ascii=False, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+
+            self._update_index(self.daily_data)
+
+            # Снимок содержит journal_seq: падение до очистки журнала не приведет к повтору событий
+            if self.journal is not None:
+                self.journal.truncate()
+            self._events_since_snapshot = 0
+
+        except Exception as e:
+            self.logger.error(f"Error writing diary snapshot: {e}")
+
+    def _open_journal(self) -> None:
+        """Журнал событий текущего дня"""
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = None
+        if self.settings['journal']:
+            self.journal = DiaryJournal(self.diary_dir / f"diary_{self.current_date.isoformat()}.jsonl",
+                                        fsync_every=self.settings['fsync_every'],
+                                        fsync_interval=self.settings['fsync_interval'])
+
+    def _apply_event(self, event: Dict[str, Any]) -> None:
+        """Повтор события журнала над данными дня (восстановление после падения)"""
+        event_type = event.get('type')
+        data = event.get('data', {})
+
+        if event_type in ('session_started', 'session_ended'):
+            self.daily_data.update(data)
+        elif event_type == 'position_opened':
+            self.daily_data['positions'].append(data['position'])
+        elif event_type == 'position_closed':
+            position = data['position']
+            for i, pos in enumerate(self.daily_data['positions']):
+                if pos.get('id') == position.get('id'):
+                    self.daily_data['positions'][i] = position
+                    break
+            else:
+                self.daily_data['positions'].append(position)
+            self.daily_data['trades'].append(data['trade'])
+            self.daily_data['current_balance'] = data['current_balance']
+            self.daily_data['daily_stats'] = data['daily_stats']
+        else:
+            self.logger.warning(f"Unknown diary journal event: {event_type}")
+
     def _load_daily_data(self) -> None:
-        """Загрузка данных текущего дня"""
+        """Загрузка данных текущего дня: снимок + повтор событий журнала после него"""
         try:
-            filename = f"diary_{self.current_date.isoformat()}.json"
-            filepath = self.diary_dir / filename
+            filepath = self._day_path(self.current_date)
 
             if filepath.exists():
                 with open(filepath, 'r', encoding='utf-8') as f:
                     loaded_data = json.load(f)
                     self.daily_data.update(loaded_data)
-
+            self.journal_seq = self.daily_data.get('journal_seq', 0)
+
+            self._open_journal()
+            replayed = 0
+            if self.journal is not None:
+                for event in self.journal.read():
+                    if event.get('seq', 0) <= self.journal_seq:
+                        continue  # Уже в снимке
+                    self._apply_event(event)
+                    self.journal_seq = event['seq']
+                    replayed += 1
+
+            if filepath.exists() or replayed:
                 # Восстанавливаем текущий баланс
                 self.current_balance = self.daily_data.get('current_balance', 0.0)
                 self.session_start_balance = self.daily_data.get('start_balance', 0.0)
 
                 self.logger.info(f"Loaded daily data for {self.current_date}")
 
+            if replayed:
+                self.logger.info(f"Replayed {replayed} diary journal events")
+                self._write_snapshot()
+
         except Exception as e:
             self.logger.error(f"Error loading daily data: {e}")
 
+    def _day_path(self, day: date) -> Path:
+        """Снимок дня"""
+        return self.diary_dir / f"diary_{day.isoformat()}.json"
+
+    def _day_summary(self, day_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Итоги дня для индекса (без позиций и сделок)"""
+        stats = day_data.get('daily_stats', {})
+        return {
+            'date': day_data['date'],
+            'start_balance': day_data.get('start_balance', 0.0),
+            'end_balance': day_data.get('end_balance', 0.0),
+            'daily_return': day_data.get('daily_return', 0.0),
+            'daily_return_pct': day_data.get('daily_return_pct', 0.0),
+            'total_trades': stats.get('total_trades', 0),
+            'winning_trades': stats.get('winning_trades', 0),
+            'win_rate': stats.get('win_rate', 0.0),
+            'total_pnl': stats.get('total_pnl', 0.0),
+            'total_fees': stats.get('total_fees', 0.0)
+        }
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Индекс итогов дней diary_index.json"""
+        index_path = self.diary_dir / "diary_index.json"
+        if not index_path.exists():
+            return {}
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Diary index unreadable, rebuilding from snapshots: {e}")
+            return {}
+
+    def _update_index(self, day_data: Dict[str, Any]) -> None:
+        """Обновление итогов дня в индексе"""
+        index = self._load_index()
+        index[day_data['date']] = self._day_summary(day_data)
+
+        index_path = self.diary_dir / "diary_index.json"
+        tmp_path = index_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, index_path)
+
+    def _read_day(self, day: date) -> Optional[Dict[str, Any]]:
+        """Данные дня: текущий день из памяти, прошлые - из снимков"""
+        if day == self.current_date:
+            return self.daily_data
+        filepath = self._day_path(day)
+        if not filepath.exists():
+            return None
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
     def _start_new_day(self) -> None:
         """Начало нового торгового дня"""
         self.current_date = date.today()
@@ -565,6 +812,10 @@ class TradingDiary:
             'daily_return_pct': 0.0
         }
 
+        self.journal_seq = 0
+        self._events_since_snapshot = 0
+        self._open_journal()
+
         self.logger.info(f"Started new trading day: {self.current_date}")
 
     def get_weekly_summary(self) -> Dict[str, Any]:
@@ -579,15 +830,12 @@ class TradingDiary:
 
             current_date = start_date
             while current_date <= end_date:
-                filename = f"diary_{current_date.isoformat()}.json"
-                filepath = self.diary_dir / filename
+                day_data = self._read_day(current_date)
 
-                if filepath.exists():
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        day_data = json.load(f)
-                        weekly_data.append(day_data)
-                        total_return += day_data.get('daily_return', 0.0)
-                        total_trades += day_data.get('daily_stats', {}).get('total_trades', 0)
+                if day_data is not None:
+                    weekly_data.append(day_data)
+                    total_return += day_data.get('daily_return', 0.0)
+                    total_trades += day_data.get('daily_stats', {}).get('total_trades', 0)
 
                 current_date += timedelta(days=1)
 
@@ -646,28 +894,18 @@ class TradingDiary:
 
             diary_records = []
 
+            # Итоги дней из индекса; дни до появления индекса читаются из снимков
+            index = self._load_index()
+
             current_date = start_date
             while current_date <= end_date:
-                filename = f"diary_{current_date.isoformat()}.json"
-                filepath = self.diary_dir / filename
-
-                if filepath.exists():
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        day_data = json.load(f)
-
-                        record = {
-                            'date': day_data['date'],
-                            'start_balance': day_data.get('start_balance', 0.0),
-                            'end_balance': day_data.get('end_balance', 0.0),
-                            'daily_return': day_data.get('daily_return', 0.0),
-                            'daily_return_pct': day_data.get('daily_return_pct', 0.0),
-                            'total_trades': day_data.get('daily_stats', {}).get('total_trades', 0),
-                            'winning_trades': day_data.get('daily_stats', {}).get('winning_trades', 0),
-                            'win_rate': day_data.get('daily_stats', {}).get('win_rate', 0.0),
-                            'total_pnl': day_data.get('daily_stats', {}).get('total_pnl', 0.0),
-                            'total_fees': day_data.get('daily_stats', {}).get('total_fees', 0.0)
-                        }
-                        diary_records.append(record)
+                record = index.get(current_date.isoformat())
+                if record is None or current_date == self.current_date:
+                    day_data = self._read_day(current_date)
+                    record = self._day_summary(day_data) if day_data is not None else None
+
+                if record is not None:
+                    diary_records.append(record)
 
                 current_date += timedelta(days=1)
 
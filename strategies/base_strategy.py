@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
 import logging
 import os
-from typing import Dict, Optional, Any, List, Tuple
+import threading
+from typing import Callable, Dict, Optional, Any, List, Tuple
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from config.trading_config import TradingConfig
+from modules.indicator_engine import get_indicator_engine
+from modules.async_logging import get_log_pipeline
 
 
 class BaseStrategy(ABC):
@@ -52,11 +55,22 @@ class BaseStrategy(ABC):
         self.cache = {}
         self.cache_timeout = 60  # секунд
 
+        # Общий движок индикаторов (расчет один раз на символ и бар для всех стратегий)
+        self.indicator_engine = get_indicator_engine()
+
         # Состояние стратегии
         self.is_active = True
         self.last_signal_time = None
         self.signal_cooldown = self.config.get('signal_cooldown', 30)  # секунд между сигналами
 
+        # Часы стратегии для cooldown, возраста сигналов и времени в позиции
+        # (бэктест подставляет время симуляции вместо реального)
+        self.clock: Callable[[], datetime] = datetime.now
+
+        # execute() вызывается для нескольких пар параллельно (пул потоков TradingBot):
+        # проверка cooldown с отметкой сигнала и статистика меняются под блокировкой
+        self._state_lock = threading.RLock()
+
         self.logger.info(f"Strategy {self.name} initialized successfully")
 
     def _setup_logger(self) -> logging.Logger:
@@ -64,22 +78,15 @@ class BaseStrategy(ABC):
         logger = logging.getLogger(f"strategy.{self.name}")
         logger.setLevel(logging.INFO)
 
-        # Очищаем существующие обработчики
-        logger.handlers.clear()
-
         # Создаем директорию для логов
         log_dir = "logs/strategies"
         os.makedirs(log_dir, exist_ok=True)
 
-        # Файловый обработчик
+        # Файловый обработчик (существующие обработчики заменяются записью через очередь)
         log_file = os.path.join(log_dir, f"{self.name}_{datetime.now().strftime('%Y%m%d')}.log")
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setFormatter(
-            logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        )
-        logger.addHandler(file_handler)
-
-        return logger
+        pipeline = get_log_pipeline()
+        return pipeline.attach(logger, pipeline.file_handler(
+            log_file, logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')))
 
     def _merge_configs(self, strategy_config: Dict[str, Any]) -> Dict[str, Any]:
         """Объединение конфигурации стратегии с глобальной"""
@@ -140,7 +147,7 @@ class BaseStrategy(ABC):
                 signal_time = datetime.fromtimestamp(signal['timestamp'])
 
             max_age = self.config.get('max_signal_age', 60)
-            if (datetime.now() - signal_time).total_seconds() > max_age:
+            if (self.now() - signal_time).total_seconds() > max_age:
                 self.logger.warning("Signal too old")
                 return False
 
@@ -157,7 +164,7 @@ class BaseStrategy(ABC):
 
             # Проверка cooldown между сигналами
             if self.last_signal_time:
-                time_since_last = (datetime.now() - self.last_signal_time).total_seconds()
+                time_since_last = (self.now() - self.last_signal_time).total_seconds()
                 if time_since_last < self.signal_cooldown:
                     self.logger.debug(f"Signal cooldown active: {time_since_last}s < {self.signal_cooldown}s")
                     return False
@@ -168,6 +175,31 @@ class BaseStrategy(ABC):
             self.logger.error(f"Error validating signal: {e}")
             return False
 
+    def now(self) -> datetime:
+        """Текущее время по часам стратегии"""
+        return self.clock()
+
+    def _is_signal_cooldown_active(self) -> bool:
+        """Проверка cooldown между сигналами"""
+        if not self.last_signal_time:
+            return False
+
+        time_since_last = (self.now() - self.last_signal_time).total_seconds()
+        return time_since_last < self.signal_cooldown
+
+    def _claim_signal(self) -> bool:
+        """
+        Атомарная проверка cooldown и отметка времени сигнала
+
+        Returns:
+            bool: True если сигнал можно выдать (cooldown не активен)
+        """
+        with self._state_lock:
+            if self._is_signal_cooldown_active():
+                return False
+            self.last_signal_time = self.now()
+            return True
+
     def calculate_position_size(self, signal: Dict[str, Any], account_balance: float,
                                 symbol: str = None) -> float:
         """
@@ -282,7 +314,7 @@ class BaseStrategy(ABC):
                     entry_time = datetime.fromisoformat(entry_time)
 
                 max_time = self.config.get('max_position_time', 24 * 3600)  # 24 часа
-                if (datetime.now() - entry_time).total_seconds() > max_time:
+                if (self.now() - entry_time).total_seconds() > max_time:
                     return True, "max_time"
 
             # Проверка максимального убытка
@@ -301,6 +333,35 @@ class BaseStrategy(ABC):
             self.logger.error(f"Error checking position close conditions: {e}")
             return True, "error"
 
+    def get_indicator_specs(self) -> Dict[str, Tuple]:
+        """
+        Индикаторы, необходимые стратегии
+
+        Returns:
+            Dict: {'column': (indicator, params[, output])} для IndicatorEngine
+        """
+        return {}
+
+    def compute_indicators(self, df: pd.DataFrame, symbol: str = None) -> pd.DataFrame:
+        """DataFrame со свечами и объявленными индикаторами (из общего кэша движка)"""
+        return self.indicator_engine.attach(df, self.get_indicator_specs(), symbol)
+
+    def preload_signals(self, symbol: str, df: pd.DataFrame) -> bool:
+        """
+        Предрасчет сигналов по всей истории символа (бэктест)
+
+        Вызывается после IndicatorEngine.preload() с тем же DataFrame.
+        Стратегии с векторным режимом переопределяют метод.
+
+        Returns:
+            bool: True если стратегия будет брать сигналы из предрасчета
+        """
+        return False
+
+    def release_signals(self, symbol: str = None) -> None:
+        """Удаление предрасчитанных сигналов (символа или всех)"""
+        pass
+
     def calculate_volatility(self, data: pd.DataFrame, window: int = 20) -> float:
         """
         Расчет волатильности
@@ -330,43 +391,8 @@ class BaseStrategy(ABC):
             trade_result: Результат сделки
         """
         try:
-            profit = trade_result.get('pnl', 0)
-
-            self.stats['total_trades'] += 1
-            self.stats['last_trade_time'] = datetime.now()
-
-            if profit > 0:
-                self.stats['winning_trades'] += 1
-                self.stats['total_profit'] += profit
-                self.stats['consecutive_wins'] += 1
-                self.stats['consecutive_losses'] = 0
-                self.stats['max_consecutive_wins'] = max(
-                    self.stats['max_consecutive_wins'],
-                    self.stats['consecutive_wins']
-                )
-                self.stats['max_profit'] = max(self.stats['max_profit'], profit)
-            else:
-                self.stats['losing_trades'] += 1
-                self.stats['total_loss'] += abs(profit)
-                self.stats['consecutive_losses'] += 1
-                self.stats['consecutive_wins'] = 0
-                self.stats['max_consecutive_losses'] = max(
-                    self.stats['max_consecutive_losses'],
-                    self.stats['consecutive_losses']
-                )
-
-            # Обновление производных метрик
-            if self.stats['total_trades'] > 0:
-                self.stats['win_rate'] = (self.stats['winning_trades'] / self.stats['total_trades']) * 100
-
-            if self.stats['winning_trades'] > 0:
-                self.stats['avg_win'] = self.stats['total_profit'] / self.stats['winning_trades']
-
-            if self.stats['losing_trades'] > 0:
-                self.stats['avg_loss'] = self.stats['total_loss'] / self.stats['losing_trades']
-
-            if self.stats['total_loss'] > 0:
-                self.stats['profit_factor'] = self.stats['total_profit'] / self.stats['total_loss']
+            with self._state_lock:
+                self._update_stats(trade_result)
 
             self.logger.info(f"Stats updated: {self.stats['total_trades']} trades, "
                              f"{self.stats['win_rate']:.1f}% win rate")
@@ -374,6 +400,46 @@ class BaseStrategy(ABC):
         except Exception as e:
             self.logger.error(f"Error updating stats: {e}")
 
+    def _update_stats(self, trade_result: Dict[str, Any]) -> None:
+        """Пересчет статистики по результату сделки (вызывается под _state_lock)"""
+        profit = trade_result.get('pnl', 0)
+
+        self.stats['total_trades'] += 1
+        self.stats['last_trade_time'] = datetime.now()
+
+        if profit > 0:
+            self.stats['winning_trades'] += 1
+            self.stats['total_profit'] += profit
+            self.stats['consecutive_wins'] += 1
+            self.stats['consecutive_losses'] = 0
+            self.stats['max_consecutive_wins'] = max(
+                self.stats['max_consecutive_wins'],
+                self.stats['consecutive_wins']
+            )
+            self.stats['max_profit'] = max(self.stats['max_profit'], profit)
+        else:
+            self.stats['losing_trades'] += 1
+            self.stats['total_loss'] += abs(profit)
+            self.stats['consecutive_losses'] += 1
+            self.stats['consecutive_wins'] = 0
+            self.stats['max_consecutive_losses'] = max(
+                self.stats['max_consecutive_losses'],
+                self.stats['consecutive_losses']
+            )
+
+        # Обновление производных метрик
+        if self.stats['total_trades'] > 0:
+            self.stats['win_rate'] = (self.stats['winning_trades'] / self.stats['total_trades']) * 100
+
+        if self.stats['winning_trades'] > 0:
+            self.stats['avg_win'] = self.stats['total_profit'] / self.stats['winning_trades']
+
+        if self.stats['losing_trades'] > 0:
+            self.stats['avg_loss'] = self.stats['total_loss'] / self.stats['losing_trades']
+
+        if self.stats['total_loss'] > 0:
+            self.stats['profit_factor'] = self.stats['total_profit'] / self.stats['total_loss']
+
     def get_performance_summary(self) -> Dict[str, Any]:
         """Получение сводки производительности стратегии"""
         try:
@@ -58,8 +58,7 @@ class BreakoutStrategy(BaseStrategy):
             # Проверка пробоя
             breakout_signal = self._check_breakout(data, levels)
 
-            if breakout_signal and breakout_signal['confidence'] >= self.MIN_CONFIDENCE:
-                self.last_signal_time = datetime.now()
+            if breakout_signal and breakout_signal['confidence'] >= self.MIN_CONFIDENCE and self._claim_signal():
                 return breakout_signal
 
             return None
@@ -132,7 +131,7 @@ class BreakoutStrategy(BaseStrategy):
                     'breakout_strength': breakout_strength_up,
                     'volume_confirmation': volume_ratio,
                     'level_strength': levels['resistance_strength'],
-                    'timestamp': datetime.now()
+                    'timestamp': self.now()
                 }
 
             # Проверка пробоя поддержки (медвежий сигнал)
@@ -152,7 +151,7 @@ class BreakoutStrategy(BaseStrategy):
                     'breakout_strength': breakout_strength_down,
                     'volume_confirmation': volume_ratio,
                     'level_strength': levels['support_strength'],
-                    'timestamp': datetime.now()
+                    'timestamp': self.now()
                 }
 
             return None
@@ -227,7 +226,7 @@ class BreakoutStrategy(BaseStrategy):
                 'take_profit': take_profit,
                 'confidence': signal['confidence'],
                 'breakout_type': signal.get('breakout_type'),
-                'timestamp': datetime.now()
+                'timestamp': self.now()
             }
 
         except Exception as e:
@@ -245,7 +244,7 @@ class BreakoutStrategy(BaseStrategy):
                 if isinstance(entry_time, str):
                     entry_time = datetime.fromisoformat(entry_time)
 
-                time_in_position = (datetime.now() - entry_time).total_seconds()
+                time_in_position = (self.now() - entry_time).total_seconds()
                 if time_in_position > self.BREAKOUT_TIMEOUT:
                     return {
                         'action': 'CLOSE',
@@ -301,5 +300,5 @@ class BreakoutStrategy(BaseStrategy):
         if not self.last_signal_time:
             return False
 
-        time_since_last = (datetime.now() - self.last_signal_time).total_seconds()
+        time_since_last = (self.now() - self.last_signal_time).total_seconds()
         return time_since_last < self.SIGNAL_COOLDOWN
\ No newline at end of file
@@ -1,9 +1,9 @@
 import logging
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, Optional
-from datetime import datetime
-import ta
+from typing import Dict, Any, Optional, Tuple
 from strategies.base_strategy import BaseStrategy
+from modules.indicator_engine import is_window_independent
 
 
 class CustomStrategy(BaseStrategy):
@@ -112,15 +112,20 @@ class CustomStrategy(BaseStrategy):
         # Статистика
         self.last_signal_time = None
 
-        self.logger.info(f"CustomStrategy initialized with user configuration")
-        self.logger.info(f"Enabled indicators: RSI={self.RSI_ENABLED}, MACD={self.MACD_ENABLED}, "
-                         f"EMA={self.EMA_ENABLED}, BB={self.BB_ENABLED}, Volume={self.VOLUME_ENABLED}, "
-                         f"Stoch={self.STOCH_ENABLED}, ATR={self.ATR_ENABLED}")
+        # Предрасчитанные сигналы бэктеста: symbol -> {колонка: массив по всей истории}
+        self._signal_matrices: Dict[str, Dict[str, np.ndarray]] = {}
+        # Колонки для окон бэктеста: (symbol, длина окна) -> (колонки, рекурсивные индикаторы без ядра)
+        self._window_signals: Dict[Tuple[str, int], Tuple[Dict[str, np.ndarray], Dict[str, Tuple]]] = {}
+
+        self.logger.info("CustomStrategy initialized with user configuration")
+        self.logger.info("Enabled indicators: RSI=%s, MACD=%s, EMA=%s, BB=%s, Volume=%s, Stoch=%s, ATR=%s",
+                         self.RSI_ENABLED, self.MACD_ENABLED, self.EMA_ENABLED, self.BB_ENABLED, self.VOLUME_ENABLED,
+                         self.STOCH_ENABLED, self.ATR_ENABLED)
 
     def generate_signal(self, data: pd.DataFrame, symbol: str = None) -> Optional[Dict[str, Any]]:
         """Генерация торгового сигнала на основе пользовательских настроек"""
         try:
-            signals = self.generate_signals(data)
+            signals = self.generate_signals(data, symbol)
             if not signals:
                 return None
 
@@ -134,7 +139,7 @@ class CustomStrategy(BaseStrategy):
                 return {
                     'action': 'BUY',
                     'entry_price': signals.get('close'),
-                    'timestamp': datetime.now(),
+                    'timestamp': self.now(),
                     'confidence': long_score / self._get_max_conditions(),
                     'reasons': long_reasons
                 }
@@ -145,7 +150,7 @@ class CustomStrategy(BaseStrategy):
                 return {
                     'action': 'SELL',
                     'entry_price': signals.get('close'),
-                    'timestamp': datetime.now(),
+                    'timestamp': self.now(),
                     'confidence': short_score / self._get_max_conditions(),
                     'reasons': short_reasons
                 }
@@ -153,143 +158,146 @@ class CustomStrategy(BaseStrategy):
             return None
 
         except Exception as e:
-            self.logger.error(f"Error generating signal: {e}")
+            self.logger.error("Error generating signal: %s", e)
             return None
 
     def execute(self, symbol: str, market_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Выполнение пользовательской стратегии"""
         try:
-            self.logger.info(f"Executing custom strategy for {symbol}")
+            self.logger.info("Executing custom strategy for %s", symbol)
 
             df = market_data.get('df')
             if df is None or len(df) < 50:
-                self.logger.warning(f"Insufficient data for {symbol}. Length: {len(df) if df is not None else 0}")
+                self.logger.warning("Insufficient data for %s. Length: %s", symbol, len(df) if df is not None else 0)
                 return None
 
             # Проверяем наличие position_manager
             if self.position_manager is None:
-                self.logger.warning(f"Position manager is None for {symbol}, treating as no position")
+                self.logger.warning("Position manager is None for %s, treating as no position", symbol)
                 current_position = None
             else:
                 current_position = self.position_manager.get_position_status(symbol)
 
-            self.logger.debug(f"Current position for {symbol}: {current_position is not None}")
+            self.logger.debug("Current position for %s: %s", symbol, current_position is not None)
 
-            signals = self.generate_signals(df)
+            signals = self.generate_signals(df, symbol, market_data.get('bounds'))
             if not signals:
-                self.logger.warning(f"No signals generated for {symbol} - failed to calculate indicators")
+                self.logger.warning("No signals generated for %s - failed to calculate indicators", symbol)
                 return None
 
             # Детальное логирование сигналов
-            self.logger.info(f"Generated signals for {symbol}:")
-            self.logger.info(f"  RSI: {signals.get('rsi', 0):.1f}")
-            self.logger.info(f"  Volume Ratio: {signals.get('volume_ratio', 0):.2f}")
-            self.logger.info(f"  MACD: {signals.get('macd', 0):.6f}")
-            self.logger.info(f"  MACD Signal: {signals.get('macd_signal', 0):.6f}")
-            self.logger.info(f"  EMA Fast: {signals.get('ema_fast', 0):.2f}")
-            self.logger.info(f"  EMA Slow: {signals.get('ema_slow', 0):.2f}")
-            self.logger.info(f"  Current Price: ${signals.get('close', 0):.4f}")
+            self.logger.info("Generated signals for %s:", symbol)
+            self.logger.info("  RSI: %.1f", signals.get('rsi', 0))
+            self.logger.info("  Volume Ratio: %.2f", signals.get('volume_ratio', 0))
+            self.logger.info("  MACD: %.6f", signals.get('macd', 0))
+            self.logger.info("  MACD Signal: %.6f", signals.get('macd_signal', 0))
+            self.logger.info("  EMA Fast: %.2f", signals.get('ema_fast', 0))
+            self.logger.info("  EMA Slow: %.2f", signals.get('ema_slow', 0))
+            self.logger.info("  Current Price: $%.4f", signals.get('close', 0))
 
             if current_position:
-                self.logger.info(f"Existing position found for {symbol}, checking exit conditions")
+                self.logger.info("Existing position found for %s, checking exit conditions", symbol)
                 return self.process_exit_signals(symbol, signals, current_position, df)
             else:
-                self.logger.info(f"No existing position for {symbol}, checking entry conditions")
+                self.logger.info("No existing position for %s, checking entry conditions", symbol)
                 return self.process_entry_signals(symbol, signals, market_data)
 
         except Exception as e:
-            self.logger.error(f"Error executing custom strategy for {symbol}: {e}", exc_info=True)
+            self.logger.error("Error executing custom strategy for %s: %s", symbol, e, exc_info=True)
             return None
 
-    def generate_signals(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Генерация сигналов на основе пользовательских настроек"""
+    def get_indicator_specs(self) -> Dict[str, Tuple]:
+        """Индикаторы включенные в пользовательских настройках"""
+        specs = {}
+        if self.RSI_ENABLED:
+            specs['rsi'] = ('rsi', {'window': self.RSI_PERIOD})
+        if self.MACD_ENABLED:
+            macd_params = {'window_fast': self.MACD_FAST, 'window_slow': self.MACD_SLOW,
+                           'window_sign': self.MACD_SIGNAL}
+            specs['macd'] = ('macd', macd_params, 'macd')
+            specs['macd_signal'] = ('macd', macd_params, 'signal')
+            specs['macd_histogram'] = ('macd', macd_params, 'histogram')
+        if self.EMA_ENABLED:
+            specs['ema_fast'] = ('ema', {'window': self.EMA_FAST})
+            specs['ema_slow'] = ('ema', {'window': self.EMA_SLOW})
+            specs['ema_trend'] = ('ema', {'window': self.EMA_TREND})
+        if self.BB_ENABLED:
+            bb_params = {'window': self.BB_PERIOD, 'window_dev': self.BB_STD}
+            specs['bb_upper'] = ('bollinger', bb_params, 'upper')
+            specs['bb_lower'] = ('bollinger', bb_params, 'lower')
+            specs['bb_middle'] = ('bollinger', bb_params, 'middle')
+        if self.VOLUME_ENABLED:
+            specs['volume_sma'] = ('sma', {'column': 'volume', 'window': self.VOLUME_SMA_PERIOD})
+        if self.STOCH_ENABLED:
+            stoch_params = {'window': self.STOCH_K_PERIOD, 'smooth_window': self.STOCH_SMOOTH_K}
+            specs['stoch_k'] = ('stochastic', stoch_params, 'k')
+            specs['stoch_d'] = ('stochastic', stoch_params, 'd')
+        if self.ATR_ENABLED:
+            specs['atr'] = ('atr', {'window': self.ATR_PERIOD})
+        return specs
+
+    def generate_signals(self, df: pd.DataFrame, symbol: str = None,
+                         bounds: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        """
+        Генерация сигналов на основе пользовательских настроек
+
+        Args:
+            df: Окно свечей
+            symbol: Символ
+            bounds: Положение окна (start, stop) в предзагруженной истории, если оно
+                известно вызывающему (бэктест); иначе ищется через IndicatorEngine.locate()
+        """
         try:
-            self.logger.debug(f"Generating signals for DataFrame with {len(df)} rows")
+            self.logger.debug("Generating signals for DataFrame with %s rows", len(df))
 
             required_cols = ['open', 'high', 'low', 'close', 'volume']
             if not all(col in df.columns for col in required_cols):
-                self.logger.error(f"Missing required columns in DataFrame")
+                self.logger.error("Missing required columns in DataFrame")
                 return {}
 
-            df_copy = df.copy()
+            preloaded = self._preloaded_signals(df, symbol, bounds)
+            if preloaded is not None:
+                return preloaded
 
             self.logger.debug("Calculating technical indicators...")
+            df_copy = self.compute_indicators(df, symbol)
             signals = {}
 
             # RSI
             if self.RSI_ENABLED:
-                self.logger.debug(f"Calculating RSI with period {self.RSI_PERIOD}")
-                df_copy['rsi'] = ta.momentum.RSIIndicator(df_copy['close'], window=self.RSI_PERIOD).rsi()
                 signals['rsi'] = df_copy['rsi'].iloc[-1]
                 signals['rsi_prev'] = df_copy['rsi'].iloc[-2] if len(df_copy) > 1 else 50
 
             # MACD
             if self.MACD_ENABLED:
-                self.logger.debug(f"Calculating MACD with periods {self.MACD_FAST}/{self.MACD_SLOW}/{self.MACD_SIGNAL}")
-                macd_indicator = ta.trend.MACD(df_copy['close'],
-                                               window_fast=self.MACD_FAST,
-                                               window_slow=self.MACD_SLOW,
-                                               window_sign=self.MACD_SIGNAL)
-                df_copy['macd'] = macd_indicator.macd()
-                df_copy['macd_signal'] = macd_indicator.macd_signal()
-                df_copy['macd_histogram'] = macd_indicator.macd_diff()
-
                 signals['macd'] = df_copy['macd'].iloc[-1]
                 signals['macd_signal'] = df_copy['macd_signal'].iloc[-1]
                 signals['macd_histogram'] = df_copy['macd_histogram'].iloc[-1]
 
             # EMA
             if self.EMA_ENABLED:
-                self.logger.debug(f"Calculating EMA with periods {self.EMA_FAST}/{self.EMA_SLOW}/{self.EMA_TREND}")
-                df_copy['ema_fast'] = ta.trend.EMAIndicator(df_copy['close'], window=self.EMA_FAST).ema_indicator()
-                df_copy['ema_slow'] = ta.trend.EMAIndicator(df_copy['close'], window=self.EMA_SLOW).ema_indicator()
-                df_copy['ema_trend'] = ta.trend.EMAIndicator(df_copy['close'], window=self.EMA_TREND).ema_indicator()
-
                 signals['ema_fast'] = df_copy['ema_fast'].iloc[-1]
                 signals['ema_slow'] = df_copy['ema_slow'].iloc[-1]
                 signals['ema_trend'] = df_copy['ema_trend'].iloc[-1]
 
             # Bollinger Bands
             if self.BB_ENABLED:
-                bollinger = ta.volatility.BollingerBands(df_copy['close'],
-                                                         window=self.BB_PERIOD,
-                                                         window_dev=self.BB_STD)
-                df_copy['bb_upper'] = bollinger.bollinger_hband()
-                df_copy['bb_lower'] = bollinger.bollinger_lband()
-                df_copy['bb_middle'] = bollinger.bollinger_mavg()
-
                 signals['bb_upper'] = df_copy['bb_upper'].iloc[-1]
                 signals['bb_lower'] = df_copy['bb_lower'].iloc[-1]
                 signals['bb_middle'] = df_copy['bb_middle'].iloc[-1]
 
             # Volume
             if self.VOLUME_ENABLED:
-                self.logger.debug(f"Calculating Volume with SMA period {self.VOLUME_SMA_PERIOD}")
-                df_copy['volume_sma'] = df_copy['volume'].rolling(window=self.VOLUME_SMA_PERIOD).mean()
                 df_copy['volume_ratio'] = df_copy['volume'] / df_copy['volume_sma']
-
                 signals['volume_ratio'] = df_copy['volume_ratio'].iloc[-1]
 
             # Stochastic
             if self.STOCH_ENABLED:
-                stoch = ta.momentum.StochasticOscillator(df_copy['high'], df_copy['low'], df_copy['close'],
-                                                         window=self.STOCH_K_PERIOD,
-                                                         smooth_window=self.STOCH_SMOOTH_K)
-                df_copy['stoch_k'] = stoch.stoch()
-                df_copy['stoch_d'] = stoch.stoch_signal()
-
                 signals['stoch_k'] = df_copy['stoch_k'].iloc[-1]
                 signals['stoch_d'] = df_copy['stoch_d'].iloc[-1]
 
             # ATR
             if self.ATR_ENABLED:
-                df_copy['atr'] = ta.volatility.AverageTrueRange(
-                    high=df_copy['high'],
-                    low=df_copy['low'],
-                    close=df_copy['close'],
-                    window=self.ATR_PERIOD
-                ).average_true_range()
-
                 signals['atr'] = df_copy['atr'].iloc[-1]
 
             # Базовые данные
@@ -301,16 +309,231 @@ class CustomStrategy(BaseStrategy):
             # Фильтруем NaN значения
             signals = {k: v for k, v in signals.items() if pd.notna(v)}
 
-            self.logger.debug(f"Generated {len(signals)} valid signals")
-            self.logger.debug(
-                f"Key signals: RSI={signals.get('rsi', 0):.1f}, Volume={signals.get('volume_ratio', 0):.2f}")
+            self.logger.debug("Generated %s valid signals", len(signals))
+            self.logger.debug("Key signals: RSI=%.1f, Volume=%.2f",
+                              signals.get('rsi', 0), signals.get('volume_ratio', 0))
 
             return signals
 
         except Exception as e:
-            self.logger.error(f"Error generating custom signals: {e}", exc_info=True)
+            self.logger.error("Error generating custom signals: %s", e, exc_info=True)
             return {}
 
+    def _signal_columns(self, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Значения generate_signals для каждой свечи (NaN не отфильтрованы, порядок ключей тот же)"""
+        columns = {}
+        n = len(frame)
+
+        def column(name: str) -> np.ndarray:
+            return frame[name].to_numpy(dtype=np.float64)
+
+        def previous(values: np.ndarray, first: np.ndarray) -> np.ndarray:
+            # Значение предыдущей свечи; для первой - как в generate_signals при окне из одной свечи
+            prev = np.empty(n, dtype=np.float64)
+            prev[1:] = values[:-1]
+            prev[:1] = first
+            return prev
+
+        if self.RSI_ENABLED:
+            columns['rsi'] = column('rsi')
+            columns['rsi_prev'] = previous(columns['rsi'], np.array([50.0]))
+        if self.MACD_ENABLED:
+            for name in ('macd', 'macd_signal', 'macd_histogram'):
+                columns[name] = column(name)
+        if self.EMA_ENABLED:
+            for name in ('ema_fast', 'ema_slow', 'ema_trend'):
+                columns[name] = column(name)
+        if self.BB_ENABLED:
+            for name in ('bb_upper', 'bb_lower', 'bb_middle'):
+                columns[name] = column(name)
+        if self.VOLUME_ENABLED:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                columns['volume_ratio'] = column('volume') / column('volume_sma')
+        if self.STOCH_ENABLED:
+            columns['stoch_k'] = column('stoch_k')
+            columns['stoch_d'] = column('stoch_d')
+        if self.ATR_ENABLED:
+            columns['atr'] = column('atr')
+
+        columns['close'] = column('close')
+        columns['close_prev'] = previous(columns['close'], columns['close'][:1])
+        columns['high'] = column('high')
+        columns['low'] = column('low')
+        return columns
+
+    def generate_signal_matrix(self, df: pd.DataFrame, symbol: str = None) -> pd.DataFrame:
+        """
+        Векторный расчет условий входа по всем свечам сразу
+
+        Строка i совпадает с _check_long_entry_conditions / _check_short_entry_conditions
+        для generate_signals(df.iloc[:i + 1]): те же пороги, веса, порядок суммирования
+        и правила пропуска условий при отсутствующих (NaN) значениях.
+
+        Args:
+            df: Свечи [open, high, low, close, volume]
+            symbol: Символ (ключ кэша индикаторов)
+
+        Returns:
+            DataFrame: значения сигналов, условия long_*/short_* (bool),
+            long_score/short_score (сумма весов) и long_valid/short_valid
+        """
+        columns = self._signal_columns(self.compute_indicators(df, symbol))
+        n = len(df)
+
+        def present(*names: str) -> np.ndarray:
+            mask = np.ones(n, dtype=bool)
+            for name in names:
+                mask &= ~np.isnan(columns[name])
+            return mask
+
+        disabled = np.zeros(n, dtype=bool)
+        conditions = {}
+        with np.errstate(invalid='ignore'):
+            if self.RSI_ENABLED:
+                rsi = columns['rsi']
+                rsi_prev = np.where(np.isnan(columns['rsi_prev']), 50.0, columns['rsi_prev'])
+                conditions['rsi'] = (
+                    present('rsi') & ((rsi < self.RSI_OVERSOLD_UPPER) | ((rsi > rsi_prev) & (rsi < 50))),
+                    present('rsi') & ((rsi > self.RSI_OVERBOUGHT_LOWER) | ((rsi < rsi_prev) & (rsi > 50))),
+                    self.RSI_WEIGHT)
+            if self.MACD_ENABLED:
+                macd, signal, histogram = columns['macd'], columns['macd_signal'], columns['macd_histogram']
+                ready = present('macd', 'macd_signal', 'macd_histogram')
+                conditions['macd'] = (
+                    ready & ((macd > signal) | (histogram > self.MACD_THRESHOLD)),
+                    ready & ((macd < signal) | (histogram < -self.MACD_THRESHOLD)),
+                    self.MACD_WEIGHT)
+            if self.EMA_ENABLED:
+                fast, slow, trend, close = (columns['ema_fast'], columns['ema_slow'],
+                                            columns['ema_trend'], columns['close'])
+                ready = present('ema_fast', 'ema_slow', 'ema_trend', 'close')
+                conditions['ema'] = (
+                    ready & ((fast > slow) | (close > trend)),
+                    ready & ((fast < slow) | (close < trend)),
+                    self.EMA_WEIGHT)
+            if self.BB_ENABLED:
+                close, close_prev = columns['close'], columns['close_prev']
+                upper, lower, middle = columns['bb_upper'], columns['bb_lower'], columns['bb_middle']
+                conditions['bb'] = (
+                    present('bb_lower', 'bb_middle', 'close', 'close_prev')
+                    & (((close > lower) & (close_prev <= lower)) | (close > middle)),
+                    present('bb_upper', 'bb_middle', 'close', 'close_prev')
+                    & (((close < upper) & (close_prev >= upper)) | (close < middle)),
+                    self.BB_WEIGHT)
+            if self.VOLUME_ENABLED:
+                volume_ok = present('volume_ratio') & (columns['volume_ratio'] > self.MIN_VOLUME_RATIO)
+                conditions['volume'] = (volume_ok, volume_ok, self.VOLUME_WEIGHT)
+            if self.STOCH_ENABLED:
+                k, d = columns['stoch_k'], columns['stoch_d']
+                ready = present('stoch_k', 'stoch_d')
+                conditions['stoch'] = (
+                    ready & ((k < self.STOCH_OVERSOLD) | ((k > d) & (k < 70))),
+                    ready & ((k > self.STOCH_OVERBOUGHT) | ((k < d) & (k > 30))),
+                    self.STOCH_WEIGHT)
+
+        matrix = dict(columns)
+        long_score = np.zeros(n, dtype=np.float64)
+        short_score = np.zeros(n, dtype=np.float64)
+        # Порядок суммирования весов как в скалярных проверках (побитовое совпадение сумм)
+        for name in ('rsi', 'macd', 'ema', 'bb', 'volume', 'stoch'):
+            long_cond, short_cond, weight = conditions.get(name, (disabled, disabled, 0.0))
+            matrix[f'long_{name}'] = long_cond
+            matrix[f'short_{name}'] = short_cond
+            long_score = long_score + np.where(long_cond, weight, 0.0)
+            short_score = short_score + np.where(short_cond, weight, 0.0)
+
+        matrix['long_score'] = long_score
+        matrix['short_score'] = short_score
+        matrix['long_valid'] = long_score >= self.MIN_CONDITIONS_REQUIRED
+        matrix['short_valid'] = short_score >= self.MIN_CONDITIONS_REQUIRED
+        return pd.DataFrame(matrix, index=df.index)
+
+    def preload_signals(self, symbol: str, df: pd.DataFrame) -> bool:
+        """
+        Матрица сигналов по всей истории; окна бэктеста берут из нее строку вместо расчета
+
+        Из матрицы берутся только значения индикаторов с конечным окном и цены;
+        рекурсивные индикаторы (RSI, MACD, EMA, ATR) зависят от начала окна и берутся
+        из оконных ядер IndicatorEngine (_window_signal_columns).
+        """
+        try:
+            if self.indicator_engine.locate(df, symbol) != (0, len(df)):
+                self.logger.debug("History for %s is not preloaded in IndicatorEngine, signals not cached", symbol)
+                return False
+            columns = self._signal_columns(self.compute_indicators(df, symbol))
+            self._signal_matrices[symbol] = columns
+            return True
+        except Exception as e:
+            self.logger.error("Error preloading signals for %s: %s", symbol, e)
+            return False
+
+    def release_signals(self, symbol: str = None) -> None:
+        """Удаление матриц сигналов (символа или всех)"""
+        if symbol is None:
+            self._signal_matrices.clear()
+            self._window_signals.clear()
+        else:
+            self._signal_matrices.pop(symbol, None)
+            for key in [key for key in self._window_signals if key[0] == symbol]:
+                del self._window_signals[key]
+
+    def _window_signal_columns(self, symbol: str,
+                               length: int) -> Tuple[Dict[str, np.ndarray], Dict[str, Tuple]]:
+        """
+        Колонки сигналов для окон из length свечей (считаются один раз на символ и длину окна)
+
+        Индикаторы с конечным окном и цены берутся из матрицы, рекурсивные - из значений
+        по каждому окну (IndicatorEngine.window_values), совпадающих с расчетом по самому окну.
+
+        Returns:
+            Tuple: (колонки по всей истории, рекурсивные индикаторы без ядра - считаются по окну)
+        """
+        key = (symbol, length)
+        if key not in self._window_signals:
+            columns = dict(self._signal_matrices[symbol])
+            fallback = {}
+            for column, spec in self.get_indicator_specs().items():
+                if is_window_independent(spec[0]):
+                    continue
+                windows = self.indicator_engine.window_values(symbol, spec[0], spec[1], length)
+                if windows is None:
+                    fallback[column] = spec
+                    continue
+                last, prev = windows[spec[2] if len(spec) > 2 else 'value']
+                columns[column] = last
+                if f'{column}_prev' in columns:
+                    columns[f'{column}_prev'] = prev
+            self._window_signals[key] = (columns, fallback)
+        return self._window_signals[key]
+
+    def _preloaded_signals(self, df: pd.DataFrame, symbol: str,
+                           bounds: Optional[Tuple[int, int]] = None) -> Optional[Dict[str, Any]]:
+        """Сигналы последней свечи окна из предрасчитанной матрицы (None - считать обычным путем)"""
+        if symbol is None or symbol not in self._signal_matrices:
+            return None
+        if bounds is None:
+            bounds = self.indicator_engine.locate(df, symbol)
+        # Окно из одной свечи не имеет предыдущих значений в истории - считается обычным путем
+        if bounds is None or bounds[1] - bounds[0] < 2:
+            return None
+        row = bounds[1] - 1
+        columns, fallback = self._window_signal_columns(symbol, bounds[1] - bounds[0])
+
+        # Рекурсивные индикаторы без оконного ядра считаются по самому окну, как в торговле
+        live = {}
+        if fallback:
+            for column, series in self.indicator_engine.compute(df, fallback, symbol).items():
+                values = series.to_numpy(dtype=np.float64)
+                live[column] = values[-1]
+                live[f'{column}_prev'] = values[-2]
+
+        signals = {}
+        for name, values in columns.items():
+            value = live[name] if name in live else values[row]
+            if value == value:  # NaN фильтруется, как в generate_signals
+                signals[name] = value
+        return signals
+
     def _get_max_conditions(self) -> int:
         """Получить максимальное количество условий на основе включенных индикаторов"""
         max_conditions = 0
@@ -328,7 +551,7 @@ class CustomStrategy(BaseStrategy):
             conditions_met = 0
             reasons = []
 
-            self.logger.debug(f"Checking long entry conditions with {len(signals)} signals")
+            self.logger.debug("Checking long entry conditions with %s signals", len(signals))
 
             # 1. RSI условие
             if self.RSI_ENABLED and 'rsi' in signals:
@@ -339,12 +562,13 @@ class CustomStrategy(BaseStrategy):
                         rsi < self.RSI_OVERSOLD_UPPER or
                         (rsi > rsi_prev and rsi < 50)
                 )
-                self.logger.debug(f"RSI check: {rsi:.1f} (prev={rsi_prev:.1f}) -> {'✅' if rsi_bullish else '❌'}")
+                self.logger.debug("RSI check: %.1f (prev=%.1f) -> %s", rsi, rsi_prev, '✅' if rsi_bullish else '❌')
                 if rsi_bullish:
                     conditions_met += self.RSI_WEIGHT
                     reasons.append("RSI_BULLISH")
                 else:
-                    self.logger.debug(f"RSI condition failed: {rsi:.1f} not < {self.RSI_OVERSOLD_UPPER} and not rising")
+                    self.logger.debug("RSI condition failed: %.1f not < %s and not rising",
+                                      rsi, self.RSI_OVERSOLD_UPPER)
 
             # 2. MACD условие
             if self.MACD_ENABLED and all(k in signals for k in ['macd', 'macd_signal', 'macd_histogram']):
@@ -352,14 +576,13 @@ class CustomStrategy(BaseStrategy):
                         signals['macd'] > signals['macd_signal'] or
                         signals['macd_histogram'] > self.MACD_THRESHOLD
                 )
-                self.logger.debug(
-                    f"MACD check: {signals['macd']:.6f} vs {signals['macd_signal']:.6f} -> {'✅' if macd_bullish else '❌'}")
+                self.logger.debug("MACD check: %.6f vs %.6f -> %s",
+                                  signals['macd'], signals['macd_signal'], '✅' if macd_bullish else '❌')
                 if macd_bullish:
                     conditions_met += self.MACD_WEIGHT
                     reasons.append("MACD_BULLISH")
                 else:
-                    self.logger.debug(
-                        f"MACD condition failed: {signals['macd']:.6f} not > {signals['macd_signal']:.6f}")
+                    self.logger.debug("MACD condition failed: %.6f not > %.6f", signals['macd'], signals['macd_signal'])
 
             # 3. EMA тренд
             if self.EMA_ENABLED and all(k in signals for k in ['ema_fast', 'ema_slow', 'ema_trend', 'close']):
@@ -367,13 +590,13 @@ class CustomStrategy(BaseStrategy):
                         signals['ema_fast'] > signals['ema_slow'] or
                         signals['close'] > signals['ema_trend']
                 )
-                self.logger.debug(
-                    f"EMA check: fast={signals['ema_fast']:.2f} vs slow={signals['ema_slow']:.2f} -> {'✅' if ema_bullish else '❌'}")
+                self.logger.debug("EMA check: fast=%.2f vs slow=%.2f -> %s",
+                                  signals['ema_fast'], signals['ema_slow'], '✅' if ema_bullish else '❌')
                 if ema_bullish:
                     conditions_met += self.EMA_WEIGHT
                     reasons.append("EMA_BULLISH")
                 else:
-                    self.logger.debug(f"EMA condition failed: fast not > slow and price not > trend")
+                    self.logger.debug("EMA condition failed: fast not > slow and price not > trend")
 
             # 4. Bollinger Bands
             if self.BB_ENABLED and all(k in signals for k in ['bb_lower', 'bb_middle', 'close', 'close_prev']):
@@ -385,19 +608,19 @@ class CustomStrategy(BaseStrategy):
                     conditions_met += self.BB_WEIGHT
                     reasons.append("BB_BULLISH")
                 else:
-                    self.logger.debug(f"BB condition failed: no bounce or above middle")
+                    self.logger.debug("BB condition failed: no bounce or above middle")
 
             # 5. Объем
             if self.VOLUME_ENABLED and 'volume_ratio' in signals:
                 volume_ok = signals['volume_ratio'] > self.MIN_VOLUME_RATIO
-                self.logger.debug(
-                    f"Volume check: {signals['volume_ratio']:.2f} vs {self.MIN_VOLUME_RATIO} -> {'✅' if volume_ok else '❌'}")
+                self.logger.debug("Volume check: %.2f vs %s -> %s",
+                                  signals['volume_ratio'], self.MIN_VOLUME_RATIO, '✅' if volume_ok else '❌')
                 if volume_ok:
                     conditions_met += self.VOLUME_WEIGHT
                     reasons.append("VOLUME_OK")
                 else:
-                    self.logger.debug(
-                        f"Volume condition failed: {signals['volume_ratio']:.2f} not > {self.MIN_VOLUME_RATIO}")
+                    self.logger.debug("Volume condition failed: %.2f not > %s",
+                                      signals['volume_ratio'], self.MIN_VOLUME_RATIO)
 
             # 6. Stochastic
             if self.STOCH_ENABLED and all(k in signals for k in ['stoch_k', 'stoch_d']):
@@ -405,24 +628,24 @@ class CustomStrategy(BaseStrategy):
                         signals['stoch_k'] < self.STOCH_OVERSOLD or
                         (signals['stoch_k'] > signals['stoch_d'] and signals['stoch_k'] < 70)
                 )
-                self.logger.debug(
-                    f"Stoch check: K={signals['stoch_k']:.1f}, D={signals['stoch_d']:.1f} -> {'✅' if stoch_bullish else '❌'}")
+                self.logger.debug("Stoch check: K=%.1f, D=%.1f -> %s",
+                                  signals['stoch_k'], signals['stoch_d'], '✅' if stoch_bullish else '❌')
                 if stoch_bullish:
                     conditions_met += self.STOCH_WEIGHT
                     reasons.append("STOCH_BULLISH")
                 else:
-                    self.logger.debug(f"Stoch condition failed: not oversold and no bullish cross")
+                    self.logger.debug("Stoch condition failed: not oversold and no bullish cross")
 
             is_valid = conditions_met >= self.MIN_CONDITIONS_REQUIRED
             reason_str = ", ".join(reasons) if reasons else "NONE"
 
-            self.logger.info(f"LONG ANALYSIS: {conditions_met:.1f}/{self.MIN_CONDITIONS_REQUIRED} conditions met. "
-                             f"Valid: {'✅ YES' if is_valid else '❌ NO'}. Reasons: {reason_str}")
+            self.logger.info("LONG ANALYSIS: %.1f/%s conditions met. Valid: %s. Reasons: %s",
+                             conditions_met, self.MIN_CONDITIONS_REQUIRED, '✅ YES' if is_valid else '❌ NO', reason_str)
 
             return is_valid, int(conditions_met), reason_str
 
         except Exception as e:
-            self.logger.error(f"Error checking long conditions: {e}")
+            self.logger.error("Error checking long conditions: %s", e)
             return False, 0, "ERROR"
 
     def _check_short_entry_conditions(self, signals: Dict[str, Any]) -> tuple[bool, int, str]:
@@ -431,7 +654,7 @@ class CustomStrategy(BaseStrategy):
             conditions_met = 0
             reasons = []
 
-            self.logger.debug(f"Checking short entry conditions with {len(signals)} signals")
+            self.logger.debug("Checking short entry conditions with %s signals", len(signals))
 
             # 1. RSI условие
             if self.RSI_ENABLED and 'rsi' in signals:
@@ -442,13 +665,13 @@ class CustomStrategy(BaseStrategy):
                         rsi > self.RSI_OVERBOUGHT_LOWER or
                         (rsi < rsi_prev and rsi > 50)
                 )
-                self.logger.debug(f"RSI check: {rsi:.1f} (prev={rsi_prev:.1f}) -> {'✅' if rsi_bearish else '❌'}")
+                self.logger.debug("RSI check: %.1f (prev=%.1f) -> %s", rsi, rsi_prev, '✅' if rsi_bearish else '❌')
                 if rsi_bearish:
                     conditions_met += self.RSI_WEIGHT
                     reasons.append("RSI_BEARISH")
                 else:
-                    self.logger.debug(
-                        f"RSI condition failed: {rsi:.1f} not > {self.RSI_OVERBOUGHT_LOWER} and not falling")
+                    self.logger.debug("RSI condition failed: %.1f not > %s and not falling",
+                                      rsi, self.RSI_OVERBOUGHT_LOWER)
 
             # 2. MACD условие
             if self.MACD_ENABLED and all(k in signals for k in ['macd', 'macd_signal', 'macd_histogram']):
@@ -456,14 +679,13 @@ class CustomStrategy(BaseStrategy):
                         signals['macd'] < signals['macd_signal'] or
                         signals['macd_histogram'] < -self.MACD_THRESHOLD
                 )
-                self.logger.debug(
-                    f"MACD check: {signals['macd']:.6f} vs {signals['macd_signal']:.6f} -> {'✅' if macd_bearish else '❌'}")
+                self.logger.debug("MACD check: %.6f vs %.6f -> %s",
+                                  signals['macd'], signals['macd_signal'], '✅' if macd_bearish else '❌')
                 if macd_bearish:
                     conditions_met += self.MACD_WEIGHT
                     reasons.append("MACD_BEARISH")
                 else:
-                    self.logger.debug(
-                        f"MACD condition failed: {signals['macd']:.6f} not < {signals['macd_signal']:.6f}")
+                    self.logger.debug("MACD condition failed: %.6f not < %.6f", signals['macd'], signals['macd_signal'])
 
             # 3. EMA тренд
             if self.EMA_ENABLED and all(k in signals for k in ['ema_fast', 'ema_slow', 'ema_trend', 'close']):
@@ -471,13 +693,13 @@ class CustomStrategy(BaseStrategy):
                         signals['ema_fast'] < signals['ema_slow'] or
                         signals['close'] < signals['ema_trend']
                 )
-                self.logger.debug(
-                    f"EMA check: fast={signals['ema_fast']:.2f} vs slow={signals['ema_slow']:.2f} -> {'✅' if ema_bearish else '❌'}")
+                self.logger.debug("EMA check: fast=%.2f vs slow=%.2f -> %s",
+                                  signals['ema_fast'], signals['ema_slow'], '✅' if ema_bearish else '❌')
                 if ema_bearish:
                     conditions_met += self.EMA_WEIGHT
                     reasons.append("EMA_BEARISH")
                 else:
-                    self.logger.debug(f"EMA condition failed: fast not < slow and price not < trend")
+                    self.logger.debug("EMA condition failed: fast not < slow and price not < trend")
 
             # 4. Bollinger Bands
             if self.BB_ENABLED and all(k in signals for k in ['bb_upper', 'bb_middle', 'close', 'close_prev']):
@@ -489,19 +711,19 @@ class CustomStrategy(BaseStrategy):
                     conditions_met += self.BB_WEIGHT
                     reasons.append("BB_BEARISH")
                 else:
-                    self.logger.debug(f"BB condition failed: no rejection or below middle")
+                    self.logger.debug("BB condition failed: no rejection or below middle")
 
             # 5. Объем
             if self.VOLUME_ENABLED and 'volume_ratio' in signals:
                 volume_ok = signals['volume_ratio'] > self.MIN_VOLUME_RATIO
-                self.logger.debug(
-                    f"Volume check: {signals['volume_ratio']:.2f} vs {self.MIN_VOLUME_RATIO} -> {'✅' if volume_ok else '❌'}")
+                self.logger.debug("Volume check: %.2f vs %s -> %s",
+                                  signals['volume_ratio'], self.MIN_VOLUME_RATIO, '✅' if volume_ok else '❌')
                 if volume_ok:
                     conditions_met += self.VOLUME_WEIGHT
                     reasons.append("VOLUME_OK")
                 else:
-                    self.logger.debug(
-                        f"Volume condition failed: {signals['volume_ratio']:.2f} not > {self.MIN_VOLUME_RATIO}")
+                    self.logger.debug("Volume condition failed: %.2f not > %s",
+                                      signals['volume_ratio'], self.MIN_VOLUME_RATIO)
 
             # 6. Stochastic
             if self.STOCH_ENABLED and all(k in signals for k in ['stoch_k', 'stoch_d']):
@@ -509,36 +731,36 @@ class CustomStrategy(BaseStrategy):
                         signals['stoch_k'] > self.STOCH_OVERBOUGHT or
                         (signals['stoch_k'] < signals['stoch_d'] and signals['stoch_k'] > 30)
                 )
-                self.logger.debug(
-                    f"Stoch check: K={signals['stoch_k']:.1f}, D={signals['stoch_d']:.1f} -> {'✅' if stoch_bearish else '❌'}")
+                self.logger.debug("Stoch check: K=%.1f, D=%.1f -> %s",
+                                  signals['stoch_k'], signals['stoch_d'], '✅' if stoch_bearish else '❌')
                 if stoch_bearish:
                     conditions_met += self.STOCH_WEIGHT
                     reasons.append("STOCH_BEARISH")
                 else:
-                    self.logger.debug(f"Stoch condition failed: not overbought and no bearish cross")
+                    self.logger.debug("Stoch condition failed: not overbought and no bearish cross")
 
             is_valid = conditions_met >= self.MIN_CONDITIONS_REQUIRED
             reason_str = ", ".join(reasons) if reasons else "NONE"
 
-            self.logger.info(f"SHORT ANALYSIS: {conditions_met:.1f}/{self.MIN_CONDITIONS_REQUIRED} conditions met. "
-                             f"Valid: {'✅ YES' if is_valid else '❌ NO'}. Reasons: {reason_str}")
+            self.logger.info("SHORT ANALYSIS: %.1f/%s conditions met. Valid: %s. Reasons: %s",
+                             conditions_met, self.MIN_CONDITIONS_REQUIRED, '✅ YES' if is_valid else '❌ NO', reason_str)
 
             return is_valid, int(conditions_met), reason_str
 
         except Exception as e:
-            self.logger.error(f"Error checking short conditions: {e}")
+            self.logger.error("Error checking short conditions: %s", e)
             return False, 0, "ERROR"
 
     def _calculate_trade_parameters(self, entry_price: float, atr: float, direction: str) -> Dict[str, float]:
         """Расчет параметров сделки на основе пользовательских настроек"""
         try:
             if entry_price <= 0:
-                self.logger.error(f"Неверная цена входа: {entry_price}")
+                self.logger.error("Неверная цена входа: %s", entry_price)
                 return {'stop_loss': 0.0, 'take_profit': 0.0}
 
             # Если ATR = 0, используем процентный метод
             if atr <= 0:
-                self.logger.warning(f"ATR = 0, используем процентный метод")
+                self.logger.warning("ATR = 0, используем процентный метод")
                 if direction == 'BUY':
                     return {
                         'stop_loss': entry_price * (1 - 0.03),  # 3% стоп-лосс
@@ -561,7 +783,7 @@ class CustomStrategy(BaseStrategy):
                 calculated_stop_loss = entry_price + atr_sl_distance
                 calculated_take_profit = entry_price - atr_tp_distance
             else:
-                self.logger.error(f"Unknown direction: {direction}")
+                self.logger.error("Unknown direction: %s", direction)
                 return {'stop_loss': 0.0, 'take_profit': 0.0}
 
             # Ограничения для безопасности
@@ -585,16 +807,16 @@ class CustomStrategy(BaseStrategy):
             if risk > 0:
                 rr_ratio = reward / risk
                 if rr_ratio < 1.5:  # Минимум 1.5:1
-                    self.logger.warning(f"Плохое R:R соотношение: {rr_ratio:.2f}")
+                    self.logger.warning("Плохое R:R соотношение: %.2f", rr_ratio)
                     return {'stop_loss': 0.0, 'take_profit': 0.0}
 
-            self.logger.info(f"📊 Параметры сделки {direction}:")
-            self.logger.info(f"   💵 Вход: ${entry_price:.4f}")
-            self.logger.info(
-                f"   🛑 Стоп: ${calculated_stop_loss:.4f} ({abs(entry_price - calculated_stop_loss) / entry_price * 100:.1f}%)")
-            self.logger.info(
-                f"   🎯 Цель: ${calculated_take_profit:.4f} ({abs(calculated_take_profit - entry_price) / entry_price * 100:.1f}%)")
-            self.logger.info(f"   📊 R:R: {reward / risk:.2f}:1")
+            self.logger.info("📊 Параметры сделки %s:", direction)
+            self.logger.info("   💵 Вход: $%.4f", entry_price)
+            self.logger.info("   🛑 Стоп: $%.4f (%.1f%%)",
+                             calculated_stop_loss, abs(entry_price - calculated_stop_loss) / entry_price * 100)
+            self.logger.info("   🎯 Цель: $%.4f (%.1f%%)",
+                             calculated_take_profit, abs(calculated_take_profit - entry_price) / entry_price * 100)
+            self.logger.info("   📊 R:R: %.2f:1", reward / risk)
 
             return {
                 'stop_loss': round(calculated_stop_loss, 8),
@@ -602,39 +824,41 @@ class CustomStrategy(BaseStrategy):
             }
 
         except Exception as e:
-            self.logger.error(f"Error calculating trade parameters: {e}")
+            self.logger.error("Error calculating trade parameters: %s", e)
             return {'stop_loss': 0.0, 'take_profit': 0.0}
 
     def process_entry_signals(self, symbol: str, signals: Dict[str, Any], market_data: Dict[str, Any]) -> Optional[
         Dict[str, Any]]:
         """Обработка сигналов для открытия новой позиции"""
         try:
-            self.logger.info(f"Processing entry signals for {symbol}")
+            self.logger.info("Processing entry signals for %s", symbol)
 
             current_price = signals.get('close')
             atr = signals.get('atr', 0)
             account_balance = market_data.get('account_balance')
 
             if not all([current_price, account_balance]):
-                self.logger.warning(f"Отсутствуют данные для {symbol}: цена={current_price}, баланс={account_balance}")
+                self.logger.warning("Отсутствуют данные для %s: цена=%s, баланс=%s",
+                                    symbol, current_price, account_balance)
                 return None
 
             position_size = self.calculate_position_size(account_balance, current_price)
             if position_size <= 0:
-                self.logger.warning(f"Invalid position size {position_size} for {symbol}")
+                self.logger.warning("Invalid position size %s for %s", position_size, symbol)
                 return None
 
-            self.logger.info(f"🎯 ПОПЫТКА ОТКРЫТЬ ПОЗИЦИЮ для {symbol}:")
-            self.logger.info(f"   💰 Баланс: ${account_balance:.2f}")
-            self.logger.info(f"   📊 Размер позиции: {position_size}")
-            self.logger.info(f"   💵 Цена входа: ${current_price:.4f}")
+            self.logger.info("🎯 ПОПЫТКА ОТКРЫТЬ ПОЗИЦИЮ для %s:", symbol)
+            self.logger.info("   💰 Баланс: $%.2f", account_balance)
+            self.logger.info("   📊 Размер позиции: %s", position_size)
+            self.logger.info("   💵 Цена входа: $%.4f", current_price)
 
             # Проверяем условия для лонга
             long_valid, long_score, long_reasons = self._check_long_entry_conditions(signals)
-            self.logger.info(f"Long entry check for {symbol}: valid={long_valid}, score={long_score}")
+            self.logger.info("Long entry check for %s: valid=%s, score=%s", symbol, long_valid, long_score)
 
             if long_valid:
-                self.logger.info(f"CUSTOM LONG signal for {symbol}: {long_score} conditions. Reasons: {long_reasons}")
+                self.logger.info("CUSTOM LONG signal for %s: %s conditions. Reasons: %s",
+                                 symbol, long_score, long_reasons)
 
                 if atr > 0:
                     trade_params = self._calculate_trade_parameters(current_price, atr, 'BUY')
@@ -656,18 +880,18 @@ class CustomStrategy(BaseStrategy):
                         'atr': atr,
                         'confidence': long_score / self._get_max_conditions(),
                         'reasons': long_reasons,
-                        'timestamp': datetime.now()
+                        'timestamp': self.now()
                     }
                 else:
-                    self.logger.warning(f"Long signal for {symbol} failed: invalid trade parameters")
+                    self.logger.warning("Long signal for %s failed: invalid trade parameters", symbol)
 
             # Проверяем условия для шорта
             short_valid, short_score, short_reasons = self._check_short_entry_conditions(signals)
-            self.logger.info(f"Short entry check for {symbol}: valid={short_valid}, score={short_score}")
+            self.logger.info("Short entry check for %s: valid=%s, score=%s", symbol, short_valid, short_score)
 
             if short_valid:
-                self.logger.info(
-                    f"CUSTOM SHORT signal for {symbol}: {short_score} conditions. Reasons: {short_reasons}")
+                self.logger.info("CUSTOM SHORT signal for %s: %s conditions. Reasons: %s",
+                                 symbol, short_score, short_reasons)
 
                 if atr > 0:
                     trade_params = self._calculate_trade_parameters(current_price, atr, 'SELL')
@@ -689,18 +913,18 @@ class CustomStrategy(BaseStrategy):
                         'atr': atr,
                         'confidence': short_score / self._get_max_conditions(),
                         'reasons': short_reasons,
-                        'timestamp': datetime.now()
+                        'timestamp': self.now()
                     }
                 else:
-                    self.logger.warning(f"Short signal for {symbol} failed: invalid trade parameters")
+                    self.logger.warning("Short signal for %s failed: invalid trade parameters", symbol)
 
-            self.logger.info(
-                f"No valid entry signal for {symbol}: Long={long_valid}({long_score}), Short={short_valid}({short_score})")
+            self.logger.info("No valid entry signal for %s: Long=%s(%s), Short=%s(%s)",
+                             symbol, long_valid, long_score, short_valid, short_score)
 
             return None
 
         except Exception as e:
-            self.logger.error(f"Error processing entry signals for {symbol}: {e}", exc_info=True)
+            self.logger.error("Error processing entry signals for %s: %s", symbol, e, exc_info=True)
             return None
 
     def process_exit_signals(self, symbol: str, signals: Dict[str, Any], position: Dict[str, Any], df: pd.DataFrame) -> \
@@ -726,7 +950,7 @@ class CustomStrategy(BaseStrategy):
                             'size': position.get('size'),
                             'reason': 'emergency_rsi_exit',
                             'exit_price': current_price,
-                            'timestamp': datetime.now()
+                            'timestamp': self.now()
                         }
                     # Обычный выход из прибыльного лонга
                     elif rsi > self.PROFIT_EXIT_RSI_LONG:
@@ -738,7 +962,7 @@ class CustomStrategy(BaseStrategy):
                                 'size': position.get('size'),
                                 'reason': 'profit_rsi_exit',
                                 'exit_price': current_price,
-                                'timestamp': datetime.now()
+                                'timestamp': self.now()
                             }
 
                 elif direction == 'SELL':
@@ -750,7 +974,7 @@ class CustomStrategy(BaseStrategy):
                             'size': position.get('size'),
                             'reason': 'emergency_rsi_exit',
                             'exit_price': current_price,
-                            'timestamp': datetime.now()
+                            'timestamp': self.now()
                         }
                     # Обычный выход из прибыльного шорта
                     elif rsi < self.PROFIT_EXIT_RSI_SHORT:
@@ -762,13 +986,13 @@ class CustomStrategy(BaseStrategy):
                                 'size': position.get('size'),
                                 'reason': 'profit_rsi_exit',
                                 'exit_price': current_price,
-                                'timestamp': datetime.now()
+                                'timestamp': self.now()
                             }
 
             return None
 
         except Exception as e:
-            self.logger.error(f"Error processing exit signals for {symbol}: {e}", exc_info=True)
+            self.logger.error("Error processing exit signals for %s: %s", symbol, e, exc_info=True)
             return None
 
     def calculate_position_size(self, account_balance: float, current_price: float) -> float:
@@ -777,10 +1001,10 @@ class CustomStrategy(BaseStrategy):
             # Используем fallback баланс если API не работает
             if account_balance <= 0:
                 account_balance = 1100.0  # Fallback баланс
-                self.logger.warning(f"Используем fallback баланс: ${account_balance}")
+                self.logger.warning("Используем fallback баланс: $%s", account_balance)
 
             if current_price <= 0:
-                self.logger.error(f"Неверная цена: {current_price}")
+                self.logger.error("Неверная цена: %s", current_price)
                 return 0.0
 
             # Безопасный расчет размера позиции
@@ -793,24 +1017,24 @@ class CustomStrategy(BaseStrategy):
             max_position_value = 50.0  # Максимум $50 на позицию
             if position_size * current_price > max_position_value:
                 position_size = max_position_value / current_price
-                self.logger.info(f"   ⚠️ Размер ограничен до $50: {position_size:.8f}")
+                self.logger.info("   ⚠️ Размер ограничен до $50: %.8f", position_size)
 
-            self.logger.info(f"📊 Расчет позиции:")
-            self.logger.info(f"   💰 Баланс: ${account_balance:.2f}")
-            self.logger.info(f"   🎯 Риск: {self.RISK_PER_TRADE * 100:.1f}% = ${risk_amount:.2f}")
-            self.logger.info(f"   💵 Цена: ${current_price:.4f}")
-            self.logger.info(f"   📏 Размер: {position_size:.8f}")
+            self.logger.info("📊 Расчет позиции:")
+            self.logger.info("   💰 Баланс: $%.2f", account_balance)
+            self.logger.info("   🎯 Риск: %.1f%% = $%.2f", self.RISK_PER_TRADE * 100, risk_amount)
+            self.logger.info("   💵 Цена: $%.4f", current_price)
+            self.logger.info("   📏 Размер: %.8f", position_size)
 
             # Минимальные и максимальные размеры
             position_size = max(0.001, min(position_size, 10.0))  # От 0.001 до 10
 
             final_value = position_size * current_price
-            self.logger.info(f"   💵 Итоговая стоимость: ${final_value:.2f}")
+            self.logger.info("   💵 Итоговая стоимость: $%.2f", final_value)
 
             return round(position_size, 8)
 
         except Exception as e:
-            self.logger.error(f"Error calculating position size: {e}")
+            self.logger.error("Error calculating position size: %s", e)
             return 0.0
 
     def _is_signal_cooldown_active(self) -> bool:
@@ -818,7 +1042,7 @@ class CustomStrategy(BaseStrategy):
         if not self.last_signal_time:
             return False
 
-        time_since_last = (datetime.now() - self.last_signal_time).total_seconds()
+        time_since_last = (self.now() - self.last_signal_time).total_seconds()
         return time_since_last < self.SIGNAL_COOLDOWN
 
     def update_trailing_stop(self, position: Dict[str, Any], current_price: float) -> float:
@@ -847,5 +1071,5 @@ class CustomStrategy(BaseStrategy):
                 return min(new_stop, current_stop)  # Стоп может только опускаться
 
         except Exception as e:
-            self.logger.error(f"Error updating trailing stop: {e}")
+            self.logger.error("Error updating trailing stop: %s", e)
             return position.get('stop_loss', 0.0)
\ No newline at end of file
@@ -4,7 +4,6 @@
 from strategies.base_strategy import BaseStrategy
 import pandas as pd
 from typing import Dict, Any, Optional
-from datetime import datetime
 
 
 class ExampleStrategy(BaseStrategy):
@@ -26,7 +25,7 @@ class ExampleStrategy(BaseStrategy):
             return {
                 'action': 'BUY',
                 'entry_price': current_price,
-                'timestamp': datetime.now(),
+                'timestamp': self.now(),
                 'confidence': 0.7
             }
 
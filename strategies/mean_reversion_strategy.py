@@ -1,9 +1,7 @@
 import logging
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
-from datetime import datetime
-import ta
+from typing import Dict, Any, Optional, Tuple
 from strategies.base_strategy import BaseStrategy
 
 
@@ -59,7 +57,7 @@ class MeanReversionStrategy(BaseStrategy):
                 return None
 
             # Расчет индикаторов
-            indicators = self._calculate_mean_reversion_indicators(data)
+            indicators = self._calculate_mean_reversion_indicators(data, symbol)
             if not indicators:
                 return None
 
@@ -70,8 +68,7 @@ class MeanReversionStrategy(BaseStrategy):
             # Генерация сигнала
             signal = self._generate_mean_reversion_signal(indicators)
 
-            if signal and signal['confidence'] >= self.MIN_CONFIDENCE:
-                self.last_signal_time = datetime.now()
+            if signal and signal['confidence'] >= self.MIN_CONFIDENCE and self._claim_signal():
                 return signal
 
             return None
@@ -80,29 +77,25 @@ class MeanReversionStrategy(BaseStrategy):
             self.logger.error(f"Error generating mean reversion signal: {e}")
             return None
 
-    def _calculate_mean_reversion_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def get_indicator_specs(self) -> Dict[str, Tuple]:
+        """Индикаторы возврата к среднему: обычные и экстремальные Bollinger Bands, RSI, EMA тренда"""
+        bb_params = {'window': self.BB_PERIOD, 'window_dev': self.BB_STD}
+        bb_extreme_params = {'window': self.BB_PERIOD, 'window_dev': self.BB_EXTREME_STD}
+        return {
+            'bb_upper': ('bollinger', bb_params, 'upper'),
+            'bb_lower': ('bollinger', bb_params, 'lower'),
+            'bb_middle': ('bollinger', bb_params, 'middle'),
+            'bb_upper_extreme': ('bollinger', bb_extreme_params, 'upper'),
+            'bb_lower_extreme': ('bollinger', bb_extreme_params, 'lower'),
+            'rsi': ('rsi', {'window': self.RSI_PERIOD}),
+            'ema_20': ('ema', {'window': 20}),
+            'ema_50': ('ema', {'window': 50})
+        }
+
+    def _calculate_mean_reversion_indicators(self, df: pd.DataFrame, symbol: str = None) -> Dict[str, Any]:
         """Расчет индикаторов для стратегии возврата к среднему"""
         try:
-            df_calc = df.copy()
-
-            # Bollinger Bands
-            bb = ta.volatility.BollingerBands(df_calc['close'], window=self.BB_PERIOD, window_dev=self.BB_STD)
-            df_calc['bb_upper'] = bb.bollinger_hband()
-            df_calc['bb_lower'] = bb.bollinger_lband()
-            df_calc['bb_middle'] = bb.bollinger_mavg()
-
-            # Экстремальные Bollinger Bands
-            bb_extreme = ta.volatility.BollingerBands(df_calc['close'], window=self.BB_PERIOD,
-                                                      window_dev=self.BB_EXTREME_STD)
-            df_calc['bb_upper_extreme'] = bb_extreme.bollinger_hband()
-            df_calc['bb_lower_extreme'] = bb_extreme.bollinger_lband()
-
-            # RSI
-            df_calc['rsi'] = ta.momentum.RSIIndicator(df_calc['close'], window=self.RSI_PERIOD).rsi()
-
-            # EMA для определения тренда
-            df_calc['ema_20'] = ta.trend.EMAIndicator(df_calc['close'], window=20).ema_indicator()
-            df_calc['ema_50'] = ta.trend.EMAIndicator(df_calc['close'], window=50).ema_indicator()
+            df_calc = self.compute_indicators(df, symbol)
 
             # Расстояние от средней
             df_calc['distance_from_mean'] = (df_calc['close'] - df_calc['bb_middle']) / df_calc['bb_middle']
@@ -180,7 +173,7 @@ class MeanReversionStrategy(BaseStrategy):
                         'confidence': min(confidence, 1.0),
                         'reasons': ', '.join(reasons),
                         'mean_distance': distance_from_mean,
-                        'timestamp': datetime.now()
+                        'timestamp': self.now()
                     }
 
             # Сигнал на продажу (цена у верхней границы)
@@ -205,7 +198,7 @@ class MeanReversionStrategy(BaseStrategy):
                         'confidence': min(confidence, 1.0),
                         'reasons': ', '.join(reasons),
                         'mean_distance': distance_from_mean,
-                        'timestamp': datetime.now()
+                        'timestamp': self.now()
                     }
 
             return None
@@ -220,7 +213,8 @@ class MeanReversionStrategy(BaseStrategy):
             current_price = df['close'].iloc[-1]
 
             # Расчет BB для проверки возврата к средней
-            bb_middle = ta.volatility.BollingerBands(df['close'], window=self.BB_PERIOD).bollinger_mavg().iloc[-1]
+            bb_middle = self.indicator_engine.get(
+                df, 'bollinger', {'window': self.BB_PERIOD, 'window_dev': 2}, symbol)['middle'].iloc[-1]
 
             direction = position.get('direction', '')
             entry_price = position.get('entry_price', 0)
@@ -254,5 +248,5 @@ class MeanReversionStrategy(BaseStrategy):
         if not self.last_signal_time:
             return False
 
-        time_since_last = (datetime.now() - self.last_signal_time).total_seconds()
+        time_since_last = (self.now() - self.last_signal_time).total_seconds()
         return time_since_last < self.SIGNAL_COOLDOWN
\ No newline at end of file
@@ -1,9 +1,7 @@
 import logging
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
-from datetime import datetime
-import ta
+from typing import Dict, Any, Optional, Tuple
 from strategies.base_strategy import BaseStrategy
 
 
@@ -57,15 +55,14 @@ class MomentumStrategy(BaseStrategy):
                 return None
 
             # Расчет индикаторов импульса
-            indicators = self._calculate_momentum_indicators(data)
+            indicators = self._calculate_momentum_indicators(data, symbol)
             if not indicators:
                 return None
 
             # Проверка импульса
             momentum_signal = self._check_momentum_conditions(indicators)
 
-            if momentum_signal and momentum_signal['confidence'] >= self.MIN_CONFIDENCE:
-                self.last_signal_time = datetime.now()
+            if momentum_signal and momentum_signal['confidence'] >= self.MIN_CONFIDENCE and self._claim_signal():
                 return momentum_signal
 
             return None
@@ -74,39 +71,32 @@ class MomentumStrategy(BaseStrategy):
             self.logger.error(f"Error generating momentum signal: {e}")
             return None
 
-    def _calculate_momentum_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def get_indicator_specs(self) -> Dict[str, Tuple]:
+        """Индикаторы стратегии импульса"""
+        macd_params = {'window_fast': self.MACD_FAST, 'window_slow': self.MACD_SLOW, 'window_sign': self.MACD_SIGNAL}
+        return {
+            'rsi': ('rsi', {'window': self.RSI_PERIOD}),
+            'macd': ('macd', macd_params, 'macd'),
+            'macd_signal': ('macd', macd_params, 'signal'),
+            'macd_histogram': ('macd', macd_params, 'histogram'),
+            'volume_sma': ('sma', {'column': 'volume', 'window': 20}),
+            'roc': ('roc', {'window': 10}),
+            'williams_r': ('williams_r', {'lbp': 14})
+        }
+
+    def _calculate_momentum_indicators(self, df: pd.DataFrame, symbol: str = None) -> Dict[str, Any]:
         """Расчет индикаторов импульса"""
         try:
-            df_calc = df.copy()
+            # RSI, MACD, ROC, Williams %R и SMA объема - из общего движка индикаторов
+            df_calc = self.compute_indicators(df, symbol)
 
             # Импульс цены
             df_calc['momentum'] = df_calc['close'].pct_change(self.MOMENTUM_PERIOD) * 100
             df_calc['momentum_sma'] = df_calc['momentum'].rolling(5).mean()
 
-            # RSI
-            df_calc['rsi'] = ta.momentum.RSIIndicator(df_calc['close'], window=self.RSI_PERIOD).rsi()
-
-            # MACD
-            macd = ta.trend.MACD(df_calc['close'],
-                                 window_fast=self.MACD_FAST,
-                                 window_slow=self.MACD_SLOW,
-                                 window_sign=self.MACD_SIGNAL)
-            df_calc['macd'] = macd.macd()
-            df_calc['macd_signal'] = macd.macd_signal()
-            df_calc['macd_histogram'] = macd.macd_diff()
-
             # Объем
-            df_calc['volume_sma'] = df_calc['volume'].rolling(20).mean()
             df_calc['volume_ratio'] = df_calc['volume'] / df_calc['volume_sma']
 
-            # Rate of Change (ROC)
-            df_calc['roc'] = ta.momentum.ROCIndicator(df_calc['close'], window=10).roc()
-
-            # Williams %R
-            df_calc['williams_r'] = ta.momentum.WilliamsRIndicator(
-                df_calc['high'], df_calc['low'], df_calc['close'], lbp=14
-            ).williams_r()
-
             last_idx = -1
             return {
                 'close': df_calc['close'].iloc[last_idx],
@@ -177,7 +167,7 @@ class MomentumStrategy(BaseStrategy):
                         'reasons': ', '.join(reasons),
                         'momentum_strength': momentum,
                         'volume_confirmation': volume_ratio,
-                        'timestamp': datetime.now()
+                        'timestamp': self.now()
                     }
 
             # Медвежий импульс
@@ -211,7 +201,7 @@ class MomentumStrategy(BaseStrategy):
                         'reasons': ', '.join(reasons),
                         'momentum_strength': momentum,
                         'volume_confirmation': volume_ratio,
-                        'timestamp': datetime.now()
+                        'timestamp': self.now()
                     }
 
             return None
@@ -272,7 +262,7 @@ class MomentumStrategy(BaseStrategy):
                 'take_profit': take_profit,
                 'confidence': signal['confidence'],
                 'momentum_strength': signal.get('momentum_strength'),
-                'timestamp': datetime.now()
+                'timestamp': self.now()
             }
 
         except Exception as e:
@@ -329,5 +319,5 @@ class MomentumStrategy(BaseStrategy):
         if not self.last_signal_time:
             return False
 
-        time_since_last = (datetime.now() - self.last_signal_time).total_seconds()
+        time_since_last = (self.now() - self.last_signal_time).total_seconds()
         return time_since_last < self.SIGNAL_COOLDOWN
\ No newline at end of file
@@ -1,9 +1,8 @@
 import logging
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
-import ta
 from strategies.base_strategy import BaseStrategy
 
 
@@ -57,7 +56,7 @@ class ScalpingStrategy(BaseStrategy):
                 return None
 
             # Расчет быстрых индикаторов
-            indicators = self._calculate_scalping_indicators(data)
+            indicators = self._calculate_scalping_indicators(data, symbol)
             if not indicators:
                 return None
 
@@ -68,8 +67,7 @@ class ScalpingStrategy(BaseStrategy):
             # Генерация сигналов
             signal = self._generate_scalping_signal(indicators)
 
-            if signal and signal['confidence'] >= self.MIN_CONFIDENCE:
-                self.last_signal_time = datetime.now()
+            if signal and signal['confidence'] >= self.MIN_CONFIDENCE and self._claim_signal():
                 return signal
 
             return None
@@ -78,26 +76,22 @@ class ScalpingStrategy(BaseStrategy):
             self.logger.error(f"Error generating scalping signal: {e}")
             return None
 
-    def _calculate_scalping_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def get_indicator_specs(self) -> Dict[str, Tuple]:
+        """Быстрые индикаторы для скальпинга"""
+        return {
+            'ema_fast': ('ema', {'window': self.EMA_FAST}),
+            'ema_slow': ('ema', {'window': self.EMA_SLOW}),
+            'rsi': ('rsi', {'window': self.RSI_PERIOD}),
+            'stoch_k': ('stochastic', {'window': self.STOCH_PERIOD, 'smooth_window': 3}, 'k'),
+            'volume_sma': ('sma', {'column': 'volume', 'window': 10})
+        }
+
+    def _calculate_scalping_indicators(self, df: pd.DataFrame, symbol: str = None) -> Dict[str, Any]:
         """Расчет быстрых индикаторов для скальпинга"""
         try:
-            df_calc = df.copy()
-
-            # Быстрые EMA
-            df_calc['ema_fast'] = ta.trend.EMAIndicator(df_calc['close'], window=self.EMA_FAST).ema_indicator()
-            df_calc['ema_slow'] = ta.trend.EMAIndicator(df_calc['close'], window=self.EMA_SLOW).ema_indicator()
-
-            # Быстрый RSI
-            df_calc['rsi'] = ta.momentum.RSIIndicator(df_calc['close'], window=self.RSI_PERIOD).rsi()
-
-            # Быстрый Stochastic
-            stoch = ta.momentum.StochasticOscillator(
-                df_calc['high'], df_calc['low'], df_calc['close'], window=self.STOCH_PERIOD
-            )
-            df_calc['stoch_k'] = stoch.stoch()
+            df_calc = self.compute_indicators(df, symbol)
 
             # Объем
-            df_calc['volume_sma'] = df_calc['volume'].rolling(10).mean()
             df_calc['volume_ratio'] = df_calc['volume'] / df_calc['volume_sma']
 
             # Волатильность
@@ -175,7 +169,7 @@ class ScalpingStrategy(BaseStrategy):
                             'entry_price': current_price,
                             'confidence': min(confidence, 1.0),
                             'reasons': ', '.join(reasons),
-                            'timestamp': datetime.now()
+                            'timestamp': self.now()
                         }
 
             elif ema_fast < ema_slow and current_price < ema_fast:
@@ -198,7 +192,7 @@ class ScalpingStrategy(BaseStrategy):
                             'entry_price': current_price,
                             'confidence': min(confidence, 1.0),
                             'reasons': ', '.join(reasons),
-                            'timestamp': datetime.now()
+                            'timestamp': self.now()
                         }
 
             return None
@@ -258,7 +252,7 @@ class ScalpingStrategy(BaseStrategy):
                 'stop_loss': stop_loss,
                 'take_profit': take_profit,
                 'confidence': signal['confidence'],
-                'timestamp': datetime.now()
+                'timestamp': self.now()
             }
 
         except Exception as e:
@@ -278,7 +272,7 @@ class ScalpingStrategy(BaseStrategy):
                 if isinstance(entry_time, str):
                     entry_time = datetime.fromisoformat(entry_time)
 
-                time_in_position = (datetime.now() - entry_time).total_seconds()
+                time_in_position = (self.now() - entry_time).total_seconds()
                 if time_in_position > self.MAX_POSITION_TIME:
                     return {
                         'action': 'CLOSE',
@@ -344,5 +338,5 @@ class ScalpingStrategy(BaseStrategy):
         if not self.last_signal_time:
             return False
 
-        time_since_last = (datetime.now() - self.last_signal_time).total_seconds()
+        time_since_last = (self.now() - self.last_signal_time).total_seconds()
         return time_since_last < self.SIGNAL_COOLDOWN
\ No newline at end of file
@@ -3,7 +3,6 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
-import ta
 from strategies.base_strategy import BaseStrategy
 
 
@@ -68,13 +67,13 @@ class SmartMoneyStrategy(BaseStrategy):
                 return None
 
             # Расчет индикаторов
-            signals = self._calculate_enhanced_indicators(data)
+            signals = self._calculate_enhanced_indicators(data, symbol)
             if not signals:
                 self.logger.warning(f"Failed to calculate indicators for {symbol}")
                 return None
 
             # Анализ рыночной структуры
-            market_structure = self._analyze_market_structure(data)
+            market_structure = self._analyze_market_structure(data, symbol)
             self.logger.debug(f"Market structure for {symbol}: {market_structure.get('structure', 'UNKNOWN')}")
 
             # Проверка фильтров
@@ -93,9 +92,11 @@ class SmartMoneyStrategy(BaseStrategy):
             best_signal = self._select_best_signal(long_signal, short_signal)
 
             if best_signal and best_signal['confidence'] >= self.MIN_CONFIDENCE:
+                if not self._claim_signal():
+                    self.logger.debug(f"Signal cooldown active for {symbol}")
+                    return None
                 self.logger.info(
                     f"High quality signal generated for {symbol}: {best_signal['action']} with confidence {best_signal['confidence']:.2%}")
-                self.last_signal_time = datetime.now()
                 self.signal_history.append(best_signal)
                 return best_signal
             elif best_signal:
@@ -108,55 +109,42 @@ class SmartMoneyStrategy(BaseStrategy):
             self.logger.error(f"Error generating signal: {e}")
             return None
 
-    def _calculate_enhanced_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def get_indicator_specs(self) -> Dict[str, Tuple]:
+        """Индикаторы Smart Money: RSI, MACD, EMA 9/21/50/200, BB, ATR, Stochastic, Williams %R"""
+        macd_params = {'window_fast': 12, 'window_slow': 26, 'window_sign': 9}
+        bb_params = {'window': 20, 'window_dev': 2}
+        stoch_params = {'window': 14, 'smooth_window': 3}
+        return {
+            'rsi': ('rsi', {'window': 14}),
+            'macd': ('macd', macd_params, 'macd'),
+            'macd_signal': ('macd', macd_params, 'signal'),
+            'macd_histogram': ('macd', macd_params, 'histogram'),
+            'ema_9': ('ema', {'window': 9}),
+            'ema_21': ('ema', {'window': 21}),
+            'ema_50': ('ema', {'window': 50}),
+            'ema_200': ('ema', {'window': 200}),
+            'bb_upper': ('bollinger', bb_params, 'upper'),
+            'bb_lower': ('bollinger', bb_params, 'lower'),
+            'bb_middle': ('bollinger', bb_params, 'middle'),
+            'volume_sma': ('sma', {'column': 'volume', 'window': 20}),
+            'atr': ('atr', {'window': 14}),
+            'stoch_k': ('stochastic', stoch_params, 'k'),
+            'stoch_d': ('stochastic', stoch_params, 'd'),
+            'williams_r': ('williams_r', {'lbp': 14})
+        }
+
+    def _calculate_enhanced_indicators(self, df: pd.DataFrame, symbol: str = None) -> Dict[str, Any]:
         """Расчет улучшенных индикаторов"""
         try:
-            df_calc = df.copy()
-
-            # Основные индикаторы
-            df_calc['rsi'] = ta.momentum.RSIIndicator(df_calc['close'], window=14).rsi()
-
-            # MACD с улучшенными параметрами
-            macd = ta.trend.MACD(df_calc['close'], window_fast=12, window_slow=26, window_sign=9)
-            df_calc['macd'] = macd.macd()
-            df_calc['macd_signal'] = macd.macd_signal()
-            df_calc['macd_histogram'] = macd.macd_diff()
-
-            # EMA для трендового анализа
-            df_calc['ema_9'] = ta.trend.EMAIndicator(df_calc['close'], window=9).ema_indicator()
-            df_calc['ema_21'] = ta.trend.EMAIndicator(df_calc['close'], window=21).ema_indicator()
-            df_calc['ema_50'] = ta.trend.EMAIndicator(df_calc['close'], window=50).ema_indicator()
-            df_calc['ema_200'] = ta.trend.EMAIndicator(df_calc['close'], window=200).ema_indicator()
+            df_calc = self.compute_indicators(df, symbol)
 
             # Bollinger Bands
-            bb = ta.volatility.BollingerBands(df_calc['close'], window=20, window_dev=2)
-            df_calc['bb_upper'] = bb.bollinger_hband()
-            df_calc['bb_lower'] = bb.bollinger_lband()
-            df_calc['bb_middle'] = bb.bollinger_mavg()
             df_calc['bb_squeeze'] = (df_calc['bb_upper'] - df_calc['bb_lower']) / df_calc['bb_middle']
 
             # Volume анализ
-            df_calc['volume_sma'] = df_calc['volume'].rolling(20).mean()
             df_calc['volume_ratio'] = df_calc['volume'] / df_calc['volume_sma']
             df_calc['volume_surge'] = df_calc['volume_ratio'] > 2.0
 
-            # ATR для волатильности
-            df_calc['atr'] = ta.volatility.AverageTrueRange(
-                df_calc['high'], df_calc['low'], df_calc['close'], window=14
-            ).average_true_range()
-
-            # Stochastic
-            stoch = ta.momentum.StochasticOscillator(
-                df_calc['high'], df_calc['low'], df_calc['close'], window=14
-            )
-            df_calc['stoch_k'] = stoch.stoch()
-            df_calc['stoch_d'] = stoch.stoch_signal()
-
-            # Williams %R
-            df_calc['williams_r'] = ta.momentum.WilliamsRIndicator(
-                df_calc['high'], df_calc['low'], df_calc['close'], lbp=14
-            ).williams_r()
-
             # Momentum
             df_calc['momentum'] = df_calc['close'].pct_change(10) * 100
 
@@ -198,14 +186,14 @@ class SmartMoneyStrategy(BaseStrategy):
                 'williams_r': df_calc['williams_r'].iloc[last_idx],
                 'momentum': df_calc['momentum'].iloc[last_idx],
 
-                'timestamp': datetime.now()
+                'timestamp': self.now()
             }
 
         except Exception as e:
             self.logger.error(f"Error calculating indicators: {e}")
             return {}
 
-    def _analyze_market_structure(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_market_structure(self, df: pd.DataFrame, symbol: str = None) -> Dict[str, Any]:
         """Анализ рыночной структуры (Smart Money Concepts)"""
         try:
             if len(df) < 50:
@@ -247,7 +235,7 @@ class SmartMoneyStrategy(BaseStrategy):
                 'structure': structure,
                 'strength': strength,
                 'volume_confirmation': volume_confirmation,
-                'trend_direction': self._get_trend_direction(df)
+                'trend_direction': self._get_trend_direction(df, symbol)
             }
 
         except Exception as e:
@@ -271,16 +259,16 @@ class SmartMoneyStrategy(BaseStrategy):
             self.logger.error(f"Error analyzing volume structure: {e}")
             return 0.0
 
-    def _get_trend_direction(self, df: pd.DataFrame) -> str:
+    def _get_trend_direction(self, df: pd.DataFrame, symbol: str = None) -> str:
         """Определение направления тренда"""
         try:
             if len(df) < 50:
                 return "UNKNOWN"
 
             # Анализ EMA
-            ema_9 = ta.trend.EMAIndicator(df['close'], window=9).ema_indicator().iloc[-1]
-            ema_21 = ta.trend.EMAIndicator(df['close'], window=21).ema_indicator().iloc[-1]
-            ema_50 = ta.trend.EMAIndicator(df['close'], window=50).ema_indicator().iloc[-1]
+            ema_9 = self.indicator_engine.get(df, 'ema', {'window': 9}, symbol)['value'].iloc[-1]
+            ema_21 = self.indicator_engine.get(df, 'ema', {'window': 21}, symbol)['value'].iloc[-1]
+            ema_50 = self.indicator_engine.get(df, 'ema', {'window': 50}, symbol)['value'].iloc[-1]
 
             current_price = df['close'].iloc[-1]
 
@@ -331,7 +319,7 @@ class SmartMoneyStrategy(BaseStrategy):
 
             # Фильтр времени (избегаем новостные часы)
             if self.NEWS_TIME_FILTER:
-                current_hour = datetime.now().hour
+                current_hour = self.now().hour
                 # Избегаем 14:30-16:30 UTC (US market open)
                 if 14 <= current_hour <= 16:
                     self.logger.debug(f"Time filter failed: hour={current_hour} in news time")
@@ -456,7 +444,7 @@ class SmartMoneyStrategy(BaseStrategy):
                     'confidence': min(confidence_score, 1.0),
                     'conditions_met': conditions_met,
                     'reasons': ', '.join(reasons),
-                    'timestamp': datetime.now(),
+                    'timestamp': self.now(),
                     'market_structure': structure
                 }
             else:
@@ -554,7 +542,7 @@ class SmartMoneyStrategy(BaseStrategy):
                     'confidence': min(confidence_score, 1.0),
                     'conditions_met': conditions_met,
                     'reasons': ', '.join(reasons),
-                    'timestamp': datetime.now(),
+                    'timestamp': self.now(),
                     'market_structure': structure
                 }
 
@@ -591,7 +579,7 @@ class SmartMoneyStrategy(BaseStrategy):
         if not self.last_signal_time:
             return False
 
-        time_since_last = (datetime.now() - self.last_signal_time).total_seconds()
+        time_since_last = (self.now() - self.last_signal_time).total_seconds()
         return time_since_last < self.SIGNAL_COOLDOWN
 
     def _calculate_smart_money_levels(self, signals: Dict[str, Any], direction: str) -> Dict[str, float]:
@@ -704,7 +692,7 @@ class SmartMoneyStrategy(BaseStrategy):
                 'reasons': signal['reasons'],
                 'risk_reward_ratio': levels.get('risk_reward_ratio', 0),
                 'market_structure': signal.get('market_structure', 'UNKNOWN'),
-                'timestamp': datetime.now()
+                'timestamp': self.now()
             }
 
         except Exception as e:
@@ -745,7 +733,7 @@ class SmartMoneyStrategy(BaseStrategy):
 
             # Анализ разворотных сигналов
             if len(df) >= 20:
-                rsi = ta.momentum.RSIIndicator(df['close'], window=14).rsi().iloc[-1]
+                rsi = self.indicator_engine.get(df, 'rsi', {'window': 14}, symbol)['value'].iloc[-1]
 
                 if direction == 'BUY' and rsi > 80:  # Сильная перекупленность
                     return {
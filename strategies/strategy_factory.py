@@ -1,19 +1,73 @@
 """
 Фабрика стратегий для создания экземпляров стратегий на основе пользовательского выбора
+
+Модули стратегий импортируются при первом использовании: реестр хранит пути
+"модуль:Класс", а сторонние пакеты могут добавить стратегии через entry points
+группы "trading_bot.strategies" (name = "package.module:StrategyClass").
 """
 
+import importlib
 import logging
+import threading
+from importlib.metadata import entry_points
 from typing import Dict, Any, Optional
 
-# Импорт всех доступных стратегий
-from strategies.custom_strategy import CustomStrategy
-from strategies.smart_money_strategy import SmartMoneyStrategy
-from strategies.trend_following_strategy import TrendFollowingStrategy
-from strategies.scalping_strategy import ScalpingStrategy
-from strategies.swing_strategy import SwingStrategy
-from strategies.breakout_strategy import BreakoutStrategy
-from strategies.mean_reversion_strategy import MeanReversionStrategy
-from strategies.momentum_strategy import MomentumStrategy
+ENTRY_POINT_GROUP = 'trading_bot.strategies'
+
+# Встроенные стратегии: название -> "модуль:Класс"
+STRATEGY_REGISTRY: Dict[str, str] = {
+    'custom': 'strategies.custom_strategy:CustomStrategy',
+    'smart_money': 'strategies.smart_money_strategy:SmartMoneyStrategy',
+    'trend_following': 'strategies.trend_following_strategy:TrendFollowingStrategy',
+    'scalping': 'strategies.scalping_strategy:ScalpingStrategy',
+    'swing': 'strategies.swing_strategy:SwingStrategy',
+    'breakout': 'strategies.breakout_strategy:BreakoutStrategy',
+    'mean_reversion': 'strategies.mean_reversion_strategy:MeanReversionStrategy',
+    'momentum': 'strategies.momentum_strategy:MomentumStrategy'
+}
+
+_loaded_classes: Dict[str, type] = {}
+_registry_lock = threading.Lock()
+_entry_points_loaded = False
+
+
+def register_strategy(name: str, target) -> None:
+    """Регистрация стратегии: класс или строка "модуль:Класс" (импорт при первом использовании)"""
+    with _registry_lock:
+        if isinstance(target, str):
+            STRATEGY_REGISTRY[name] = target
+            _loaded_classes.pop(name, None)
+        else:
+            STRATEGY_REGISTRY[name] = f"{target.__module__}:{target.__qualname__}"
+            _loaded_classes[name] = target
+
+
+def _discover_entry_points() -> None:
+    """Стратегии установленных пакетов (читаются только метаданные, модули не импортируются)"""
+    global _entry_points_loaded
+    with _registry_lock:
+        if _entry_points_loaded:
+            return
+        _entry_points_loaded = True
+        try:
+            for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+                # Встроенные названия не переопределяются
+                STRATEGY_REGISTRY.setdefault(entry_point.name, entry_point.value)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Strategy entry points unavailable: {e}")
+
+
+def _load_strategy_class(name: str) -> type:
+    """Класс стратегии по названию (импорт модуля при первом обращении)"""
+    with _registry_lock:
+        strategy_class = _loaded_classes.get(name)
+        if strategy_class is None:
+            module_name, _, class_name = STRATEGY_REGISTRY[name].partition(':')
+            strategy_class = importlib.import_module(module_name)
+            for attribute in class_name.split('.'):
+                strategy_class = getattr(strategy_class, attribute)
+            _loaded_classes[name] = strategy_class
+        return strategy_class
 
 
 class StrategyFactory:
@@ -21,20 +75,15 @@ class StrategyFactory:
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        _discover_entry_points()
 
-        # Маппинг названий стратегий к классам
-        self.strategy_classes = {
-            'custom': CustomStrategy,
-            'smart_money': SmartMoneyStrategy,
-            'trend_following': TrendFollowingStrategy,
-            'scalping': ScalpingStrategy,
-            'swing': SwingStrategy,
-            'breakout': BreakoutStrategy,
-            'mean_reversion': MeanReversionStrategy,
-            'momentum': MomentumStrategy
-        }
+        self.logger.info(f"StrategyFactory initialized with {len(STRATEGY_REGISTRY)} available strategies")
 
-        self.logger.info("StrategyFactory initialized with 8 available strategies")
+    def get_strategy_class(self, strategy_name: str) -> Optional[type]:
+        """Класс стратегии (None для неизвестного названия)"""
+        if strategy_name not in STRATEGY_REGISTRY:
+            return None
+        return _load_strategy_class(strategy_name)
 
     def create_strategy(self, strategy_name: str, market_analyzer, position_manager,
                         user_config: Dict[str, Any] = None):
@@ -51,13 +100,13 @@ class StrategyFactory:
             Экземпляр стратегии или None при ошибке
         """
         try:
-            if strategy_name not in self.strategy_classes:
+            if strategy_name not in STRATEGY_REGISTRY:
                 self.logger.error(f"Unknown strategy: {strategy_name}")
-                available = ', '.join(self.strategy_classes.keys())
+                available = ', '.join(STRATEGY_REGISTRY.keys())
                 self.logger.error(f"Available strategies: {available}")
                 return None
 
-            strategy_class = self.strategy_classes[strategy_name]
+            strategy_class = _load_strategy_class(strategy_name)
 
             # Для пользовательской стратегии передаем конфигурацию
             if strategy_name == 'custom':
@@ -78,19 +127,18 @@ class StrategyFactory:
 
     def get_available_strategies(self) -> Dict[str, str]:
         """Получить список доступных стратегий"""
-        return list(self.strategy_classes.keys())
+        return list(STRATEGY_REGISTRY.keys())
 
     def validate_strategy_name(self, strategy_name: str) -> bool:
         """Проверить корректность названия стратегии"""
-        return strategy_name in self.strategy_classes
+        return strategy_name in STRATEGY_REGISTRY
 
     def get_strategy_info(self, strategy_name: str) -> Optional[Dict[str, Any]]:
         """Получить информацию о стратегии"""
-        if strategy_name not in self.strategy_classes:
+        strategy_class = self.get_strategy_class(strategy_name)
+        if strategy_class is None:
             return None
 
-        strategy_class = self.strategy_classes[strategy_name]
-
         # Базовая информация
         info = {
             'name': strategy_name,
@@ -4,7 +4,10 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import pandas as pd
 import numpy as np
+from config.trading_config import TradingConfig
+from modules.backtester import Backtester
 from strategies.base_strategy import BaseStrategy
+from modules.async_logging import get_log_pipeline
 
 
 class StrategyValidator:
@@ -35,22 +38,15 @@ class StrategyValidator:
         logger = logging.getLogger("strategy_validator")
         logger.setLevel(logging.INFO)
 
-        # Очищаем существующие обработчики
-        logger.handlers.clear()
-
         # Создаем директорию для логов
         log_dir = "logs/validation"
         os.makedirs(log_dir, exist_ok=True)
 
-        # Файловый обработчик
+        # Файловый обработчик (существующие обработчики заменяются записью через очередь)
         log_file = os.path.join(log_dir, f"validation_{datetime.now().strftime('%Y%m%d')}.log")
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setFormatter(
-            logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        )
-        logger.addHandler(file_handler)
-
-        return logger
+        pipeline = get_log_pipeline()
+        return pipeline.attach(logger, pipeline.file_handler(
+            log_file, logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')))
 
     def validate_strategy(self,
                           strategy: BaseStrategy,
@@ -414,6 +410,20 @@ class StrategyValidator:
                 elif successful_executions >= 6:
                     score += 1
 
+            # Бэктест на тестовых свечах (сделки, доходность, просадка)
+            df = data.get('df')
+            if df is not None and 'timestamp' in df.columns and len(df) > TradingConfig.BACKTEST_SETTINGS['window']:
+                backtest = Backtester(strategy, {'record_equity': False}).run({data.get('symbol', 'TEST'): df})
+                if backtest.get('success'):
+                    result.setdefault('performance_metrics', {})['backtest'] = {
+                        'bars': backtest['bars'],
+                        'trades': backtest['trades'],
+                        'return_pct': backtest['return_pct'],
+                        'win_rate': backtest['metrics'].get('win_rate', 0),
+                        'profit_factor': backtest['metrics'].get('profit_factor', 0),
+                        'bars_per_second': backtest['bars_per_second']
+                    }
+
             result['test_results']['performance_score'] = score
 
         except Exception as e:
@@ -1,9 +1,7 @@
 import logging
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
-from datetime import datetime
-import ta
+from typing import Dict, Any, Optional, Tuple
 from strategies.base_strategy import BaseStrategy
 
 
@@ -59,7 +57,7 @@ class SwingStrategy(BaseStrategy):
                 return None
 
             # Расчет индикаторов
-            indicators = self._calculate_swing_indicators(data)
+            indicators = self._calculate_swing_indicators(data, symbol)
             if not indicators:
                 return None
 
@@ -73,8 +71,7 @@ class SwingStrategy(BaseStrategy):
             # Генерация сигнала
             signal = self._generate_swing_signal(indicators, trend_analysis)
 
-            if signal and signal['confidence'] >= self.MIN_CONFIDENCE:
-                self.last_signal_time = datetime.now()
+            if signal and signal['confidence'] >= self.MIN_CONFIDENCE and self._claim_signal():
                 return signal
 
             return None
@@ -83,31 +80,23 @@ class SwingStrategy(BaseStrategy):
             self.logger.error(f"Error generating swing signal: {e}")
             return None
 
-    def _calculate_swing_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def get_indicator_specs(self) -> Dict[str, Tuple]:
+        """Индикаторы свинг-стратегии: EMA (тренд), RSI, MACD (подтверждение), ADX (сила тренда)"""
+        macd_params = {'window_fast': self.MACD_FAST, 'window_slow': self.MACD_SLOW, 'window_sign': self.MACD_SIGNAL}
+        return {
+            'ema_fast': ('ema', {'window': self.EMA_FAST}),
+            'ema_slow': ('ema', {'window': self.EMA_SLOW}),
+            'ema_trend': ('ema', {'window': self.EMA_TREND}),
+            'rsi': ('rsi', {'window': self.RSI_PERIOD}),
+            'macd': ('macd', macd_params, 'macd'),
+            'macd_signal': ('macd', macd_params, 'signal'),
+            'adx': ('adx', {'window': 14})
+        }
+
+    def _calculate_swing_indicators(self, df: pd.DataFrame, symbol: str = None) -> Dict[str, Any]:
         """Расчет индикаторов для свинг-трейдинга"""
         try:
-            df_calc = df.copy()
-
-            # EMA для трендового анализа
-            df_calc['ema_fast'] = ta.trend.EMAIndicator(df_calc['close'], window=self.EMA_FAST).ema_indicator()
-            df_calc['ema_slow'] = ta.trend.EMAIndicator(df_calc['close'], window=self.EMA_SLOW).ema_indicator()
-            df_calc['ema_trend'] = ta.trend.EMAIndicator(df_calc['close'], window=self.EMA_TREND).ema_indicator()
-
-            # RSI для перекупленности/перепроданности
-            df_calc['rsi'] = ta.momentum.RSIIndicator(df_calc['close'], window=self.RSI_PERIOD).rsi()
-
-            # MACD для подтверждения тренда
-            macd = ta.trend.MACD(df_calc['close'],
-                                 window_fast=self.MACD_FAST,
-                                 window_slow=self.MACD_SLOW,
-                                 window_sign=self.MACD_SIGNAL)
-            df_calc['macd'] = macd.macd()
-            df_calc['macd_signal'] = macd.macd_signal()
-
-            # ADX для силы тренда
-            df_calc['adx'] = ta.trend.ADXIndicator(
-                df_calc['high'], df_calc['low'], df_calc['close'], window=14
-            ).adx()
+            df_calc = self.compute_indicators(df, symbol)
 
             # Поддержка и сопротивление
             df_calc['resistance'] = df_calc['high'].rolling(20).max()
@@ -202,7 +191,7 @@ class SwingStrategy(BaseStrategy):
                         'entry_price': current_price,
                         'confidence': min(confidence, 1.0),
                         'reasons': ', '.join(reasons),
-                        'timestamp': datetime.now()
+                        'timestamp': self.now()
                     }
 
             elif trend['direction'] == 'BEARISH':
@@ -227,7 +216,7 @@ class SwingStrategy(BaseStrategy):
                         'entry_price': current_price,
                         'confidence': min(confidence, 1.0),
                         'reasons': ', '.join(reasons),
-                        'timestamp': datetime.now()
+                        'timestamp': self.now()
                     }
 
             return None
@@ -241,5 +230,5 @@ class SwingStrategy(BaseStrategy):
         if not self.last_signal_time:
             return False
 
-        time_since_last = (datetime.now() - self.last_signal_time).total_seconds()
+        time_since_last = (self.now() - self.last_signal_time).total_seconds()
         return time_since_last < self.SIGNAL_COOLDOWN
\ No newline at end of file
@@ -1,9 +1,7 @@
 import logging
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
-from datetime import datetime
-import ta
+from typing import Dict, Any, Optional, Tuple
 from strategies.base_strategy import BaseStrategy
 
 
@@ -45,7 +43,7 @@ class TrendFollowingStrategy(BaseStrategy):
                 return None
 
             # Расчет индикаторов
-            indicators = self._calculate_trend_indicators(data)
+            indicators = self._calculate_trend_indicators(data, symbol)
             if not indicators:
                 return None
 
@@ -68,35 +66,27 @@ class TrendFollowingStrategy(BaseStrategy):
             self.logger.error(f"Error generating trend signal: {e}")
             return None
 
-    def _calculate_trend_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def get_indicator_specs(self) -> Dict[str, Tuple]:
+        """Индикаторы тренда: EMA, ADX, MACD (стандартные 12/26/9), SMA объема, ATR"""
+        return {
+            'ema_fast': ('ema', {'window': self.EMA_FAST}),
+            'ema_slow': ('ema', {'window': self.EMA_SLOW}),
+            'ema_trend': ('ema', {'window': self.EMA_TREND}),
+            'adx': ('adx', {'window': self.ADX_PERIOD}),
+            'macd': ('macd', {}, 'macd'),
+            'macd_signal': ('macd', {}, 'signal'),
+            'volume_sma': ('sma', {'column': 'volume', 'window': 20}),
+            'atr': ('atr', {'window': 14})
+        }
+
+    def _calculate_trend_indicators(self, df: pd.DataFrame, symbol: str = None) -> Dict[str, Any]:
         """Расчет индикаторов тренда"""
         try:
-            df_calc = df.copy()
-
-            # EMA
-            df_calc['ema_fast'] = ta.trend.EMAIndicator(df_calc['close'], window=self.EMA_FAST).ema_indicator()
-            df_calc['ema_slow'] = ta.trend.EMAIndicator(df_calc['close'], window=self.EMA_SLOW).ema_indicator()
-            df_calc['ema_trend'] = ta.trend.EMAIndicator(df_calc['close'], window=self.EMA_TREND).ema_indicator()
-
-            # ADX для силы тренда
-            df_calc['adx'] = ta.trend.ADXIndicator(
-                df_calc['high'], df_calc['low'], df_calc['close'], window=self.ADX_PERIOD
-            ).adx()
-
-            # MACD
-            macd = ta.trend.MACD(df_calc['close'])
-            df_calc['macd'] = macd.macd()
-            df_calc['macd_signal'] = macd.macd_signal()
+            df_calc = self.compute_indicators(df, symbol)
 
             # Volume
-            df_calc['volume_sma'] = df_calc['volume'].rolling(20).mean()
             df_calc['volume_ratio'] = df_calc['volume'] / df_calc['volume_sma']
 
-            # ATR
-            df_calc['atr'] = ta.volatility.AverageTrueRange(
-                df_calc['high'], df_calc['low'], df_calc['close'], window=14
-            ).average_true_range()
-
             last_idx = -1
             return {
                 'close': df_calc['close'].iloc[last_idx],
@@ -182,7 +172,7 @@ class TrendFollowingStrategy(BaseStrategy):
                 'confidence': min(confidence, 1.0),
                 'trend_strength': trend['strength'],
                 'volume_confirmation': volume_ratio,
-                'timestamp': datetime.now()
+                'timestamp': self.now()
             }
 
         except Exception as e:
@@ -215,7 +205,7 @@ class TrendFollowingStrategy(BaseStrategy):
                 'confidence': min(confidence, 1.0),
                 'trend_strength': trend['strength'],
                 'volume_confirmation': volume_ratio,
-                'timestamp': datetime.now()
+                'timestamp': self.now()
             }
 
         except Exception as e:
@@ -249,9 +239,7 @@ class TrendFollowingStrategy(BaseStrategy):
                 return None
 
             # Расчет уровней
-            atr = ta.volatility.AverageTrueRange(
-                df['high'], df['low'], df['close'], window=14
-            ).average_true_range().iloc[-1]
+            atr = self.indicator_engine.get(df, 'atr', {'window': 14}, symbol)['value'].iloc[-1]
 
             entry_price = signal['entry_price']
 
@@ -278,7 +266,7 @@ class TrendFollowingStrategy(BaseStrategy):
                 'take_profit': take_profit,
                 'confidence': signal['confidence'],
                 'atr': atr,
-                'timestamp': datetime.now()
+                'timestamp': self.now()
             }
 
         except Exception as e:
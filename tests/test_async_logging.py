@@ -0,0 +1,105 @@
+import io
+import logging
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from modules.async_logging import BatchingFileHandler, LogPipeline
+
+FORMATTER = logging.Formatter('%(levelname)s - %(message)s')
+
+
+class TestLogPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pipelines = []
+
+    def tearDown(self):
+        for pipeline in self.pipelines:
+            pipeline.stop()
+            for handlers in pipeline.routes.values():
+                for handler in handlers:
+                    handler.close()
+        self.tmp_dir.cleanup()
+
+    def make_pipeline(self, **settings) -> LogPipeline:
+        pipeline = LogPipeline({'async': True, 'quiet_console': False, **settings})
+        self.pipelines.append(pipeline)
+        return pipeline
+
+    def make_logger(self, name: str) -> logging.Logger:
+        logger = logging.getLogger(f"test_async_logging.{name}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        self.addCleanup(logger.handlers.clear)
+        return logger
+
+    def test_records_written_by_listener_thread(self):
+        """Запись форматируется и пишется фоновым потоком, маршруты логгеров не смешиваются"""
+        pipeline = self.make_pipeline()
+        orders_log, positions_log = Path(self.tmp_dir.name, 'orders.log'), Path(self.tmp_dir.name, 'positions.log')
+        orders = pipeline.attach(self.make_logger('orders'), pipeline.file_handler(orders_log, FORMATTER))
+        positions = pipeline.attach(self.make_logger('positions'), pipeline.file_handler(positions_log, FORMATTER))
+
+        writer_threads = []
+
+        class Probe:
+            def __str__(self):
+                writer_threads.append(threading.current_thread())
+                return 'BTCUSDT'
+
+        orders.info("Order placed for %s", Probe())
+        positions.warning("Position %s closed at %.2f", 'ETHUSDT', 101.5)
+        orders.debug("below logger level")
+        self.assertTrue(pipeline.flush())
+
+        self.assertEqual(orders_log.read_text(encoding='utf-8'), "INFO - Order placed for BTCUSDT\n")
+        self.assertEqual(positions_log.read_text(encoding='utf-8'), "WARNING - Position ETHUSDT closed at 101.50\n")
+        self.assertEqual(writer_threads, [pipeline.listener._thread])
+        self.assertEqual(pipeline.get_stats()['handled'], 2)
+
+    def test_batching_file_handler(self):
+        """Буфер файла сбрасывается раз в flush_every записей"""
+        path = Path(self.tmp_dir.name, 'batch.log')
+        handler = BatchingFileHandler(path, flush_every=3)
+        handler.setFormatter(FORMATTER)
+        record = logging.LogRecord('x', logging.INFO, __file__, 1, "line", (), None)
+        try:
+            handler.handle(record)
+            handler.handle(record)
+            self.assertEqual(path.read_text(encoding='utf-8'), "")
+            handler.handle(record)
+            self.assertEqual(path.read_text(encoding='utf-8').count("line"), 3)
+            handler.handle(record)
+            handler.force_flush()
+            self.assertEqual(path.read_text(encoding='utf-8').count("line"), 4)
+        finally:
+            handler.close()
+
+    def test_quiet_console(self):
+        """Тихий режим: echo() ничего не выводит, консоль получает только WARNING и выше"""
+        stream = io.StringIO()
+        pipeline = self.make_pipeline(quiet_console=True)
+        logger = pipeline.attach(self.make_logger('quiet'), pipeline.console_handler(FORMATTER, stream))
+        pipeline.echo("📋 Strategy result for %s: %s", 'BTCUSDT', 'OPEN')
+        logger.info("cycle started")
+        logger.error("order rejected")
+        pipeline.flush()
+        self.assertEqual(stream.getvalue(), "ERROR - order rejected\n")
+        self.assertEqual(pipeline.get_stats()['handled'], 2)
+
+    def test_sync_mode_attaches_handlers_directly(self):
+        """async=False: обработчики подключаются к логгеру, поток записи не запускается"""
+        stream = io.StringIO()
+        pipeline = self.make_pipeline(**{'async': False})
+        logger = pipeline.attach(self.make_logger('sync'), pipeline.console_handler(FORMATTER, stream))
+        logger.info("written at once %d", 1)
+        self.assertEqual(stream.getvalue(), "INFO - written at once 1\n")
+        self.assertIsNone(pipeline.listener._thread)
+        handler = pipeline.file_handler(Path(self.tmp_dir.name, 'a.log'), FORMATTER)
+        handler.close()
+        self.assertNotIsInstance(handler, BatchingFileHandler)
+
+
+if __name__ == '__main__':
+    unittest.main()
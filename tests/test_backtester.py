@@ -0,0 +1,125 @@
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from modules.backtester import Backtester
+from modules.performance_tracker import PerformanceTracker
+from strategies.base_strategy import BaseStrategy
+
+
+def make_candles(count: int = 120, price: float = 100.0) -> pd.DataFrame:
+    """Плоские 5m свечи; отдельные бары правятся в тестах"""
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=count, freq='5min', tz='UTC'),
+        'open': np.full(count, price),
+        'high': np.full(count, price),
+        'low': np.full(count, price),
+        'close': np.full(count, price),
+        'volume': np.full(count, 10.0)
+    })
+
+
+class ScriptedStrategy(BaseStrategy):
+    """Покупка на каждой свече без позиции с фиксированными SL/TP и штатной проверкой cooldown"""
+
+    def __init__(self, cooldown: int):
+        super().__init__("ScriptedStrategy", {'signal_cooldown': cooldown})
+        self.position_manager = None
+        self.signal_times = []
+
+    def generate_signal(self, data, symbol=None):
+        return None
+
+    def execute(self, symbol, market_data):
+        if self.position_manager.has_position(symbol):
+            return None
+        close = float(market_data['df']['close'].iloc[-1])
+        signal = {
+            'action': 'OPEN',
+            'direction': 'BUY',
+            'entry_price': close,
+            'stop_loss': close - 5.0,
+            'take_profit': close + 2.0,
+            'size': 1.0,
+            'timestamp': self.now()
+        }
+        if not self.validate_signal(signal):
+            return None
+        self.last_signal_time = self.now()
+        self.signal_times.append(market_data['timestamp'])
+        return signal
+
+
+class TestBacktester(unittest.TestCase):
+    def setUp(self):
+        self.settings = {'window': 50, 'taker_fee': 0.001, 'slippage': 0.0005,
+                         'initial_balance': 1000.0, 'trailing_stop': False}
+
+    def test_take_profit_fill_model(self):
+        """Вход по open следующей свечи с проскальзыванием, выход по тейк-профиту, комиссии списаны"""
+        df = make_candles()
+        df.loc[60, 'high'] = 103.0
+        strategy = ScriptedStrategy(cooldown=10 ** 6)
+        tracker = PerformanceTracker()
+
+        result = Backtester(strategy, self.settings, tracker).run({'BTCUSDT': df})
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['trades'], 1)
+        trade = tracker.trades[0]
+        self.assertAlmostEqual(trade['entry_price'], 100.0 * 1.0005)
+        self.assertAlmostEqual(trade['exit_price'], 102.0 * 0.9995)
+        self.assertAlmostEqual(trade['fees'], (100.0 * 1.0005 + 102.0 * 0.9995) * 0.001)
+        self.assertEqual(trade['entry_time'], df.loc[50, 'timestamp'].to_pydatetime())
+        self.assertEqual(trade['exit_time'], df.loc[60, 'timestamp'].to_pydatetime())
+        self.assertAlmostEqual(result['final_balance'], 1000.0 + trade['net_pnl'])
+
+    def test_stop_loss_gap(self):
+        """Гэп через стоп исполняется по open свечи"""
+        df = make_candles()
+        df.loc[60, ['open', 'high', 'low', 'close']] = [90.0, 91.0, 89.0, 90.0]
+        strategy = ScriptedStrategy(cooldown=10 ** 6)
+        backtester = Backtester(strategy, self.settings)
+
+        backtester.run({'BTCUSDT': df})
+
+        trade = backtester.trades[0]
+        self.assertEqual(trade['close_reason'], 'stop_loss')
+        self.assertAlmostEqual(trade['exit_price'], 90.0 * 0.9995)
+        self.assertLess(trade['pnl'], 0)
+
+    def test_cooldown_uses_simulation_time(self):
+        """Cooldown стратегии отсчитывается по меткам свечей, а не по реальному времени"""
+        df = make_candles()
+        for i in range(51, 120, 2):
+            df.loc[i, 'high'] = 103.0
+        strategy = ScriptedStrategy(cooldown=1200)
+
+        Backtester(strategy, self.settings).run({'BTCUSDT': df})
+
+        gaps = {b - a for a, b in zip(strategy.signal_times, strategy.signal_times[1:])}
+        self.assertGreater(len(strategy.signal_times), 1)
+        self.assertEqual(min(gaps), timedelta(minutes=20))
+
+    def test_strategy_state_restored(self):
+        """После прогона стратегия получает обратно свой PositionManager, время сигнала и часы"""
+        strategy = ScriptedStrategy(cooldown=10 ** 6)
+        sentinel_manager, sentinel_time = object(), datetime(2020, 1, 1)
+        strategy.position_manager = sentinel_manager
+        strategy.last_signal_time = sentinel_time
+        clock = strategy.clock
+
+        Backtester(strategy, self.settings).run({'BTCUSDT': make_candles()})
+
+        self.assertIs(strategy.position_manager, sentinel_manager)
+        self.assertIs(strategy.last_signal_time, sentinel_time)
+        self.assertIs(strategy.clock, clock)
+
+    def test_not_enough_candles(self):
+        """Истории меньше окна - бэктест не запускается"""
+        result = Backtester(ScriptedStrategy(cooldown=0), self.settings).run({'BTCUSDT': make_candles(40)})
+        self.assertFalse(result['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()
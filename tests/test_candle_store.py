@@ -0,0 +1,98 @@
+import unittest
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from modules.candle_store import CandleStore, interval_to_ms
+
+
+class FakeFetcher:
+    """Имитация DataFetcher: отдает свечи из заранее заданного ряда до текущего момента"""
+
+    def __init__(self, bars: pd.DataFrame, limit: int = 200):
+        self.bars = bars
+        self.limit = limit
+        self.calls = []
+
+    def get_kline(self, symbol, interval, start_time, end_time):
+        self.calls.append((start_time, end_time))
+        start = pd.Timestamp(start_time, unit='s', tz='UTC')
+        end = pd.Timestamp(end_time, unit='s', tz='UTC')
+        df = self.bars[(self.bars['timestamp'] >= start) & (self.bars['timestamp'] <= end)]
+        return df.iloc[-self.limit:].reset_index(drop=True)
+
+
+def make_bars(end: datetime, count: int, minutes: int = 5) -> pd.DataFrame:
+    """Ряд свечей с шагом minutes, заканчивающийся на end"""
+    timestamps = pd.date_range(end=pd.Timestamp(end).floor(f'{minutes}min'), periods=count,
+                               freq=f'{minutes}min')
+    close = pd.Series(range(count), dtype=float) + 100
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': 10.0, 'turnover': 1000.0
+    })
+
+
+class TestCandleStore(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.now(timezone.utc)
+        self.fetcher = FakeFetcher(make_bars(self.now - timedelta(hours=1), 300))
+        self.store = CandleStore(self.fetcher, lookback=timedelta(days=1), max_bars=1000)
+
+    def test_first_call_fetches_full_window(self):
+        """Первый запрос загружает окно целиком"""
+        df = self.store.get_candles('BTCUSDT', '5')
+
+        self.assertEqual(len(df), 200)
+        self.assertEqual(list(df.columns), CandleStore.COLUMNS)
+        self.assertEqual(self.store.stats['full_fetches'], 1)
+
+    def test_second_call_fetches_only_new_bars(self):
+        """Повторный запрос загружает только свечи с последней сохраненной"""
+        first = self.store.get_candles('BTCUSDT', '5')
+        last_ts = first['timestamp'].iloc[-1]
+
+        # Последняя свеча обновилась и появилась новая
+        bars = self.fetcher.bars
+        bars.loc[bars.index[-1], 'close'] = 999.0
+        new_bar = bars.iloc[[-1]].copy()
+        new_bar['timestamp'] = last_ts + pd.Timedelta(minutes=5)
+        self.fetcher.bars = pd.concat([bars, new_bar], ignore_index=True)
+
+        df = self.store.get_candles('BTCUSDT', '5')
+
+        self.assertEqual(self.store.stats['incremental_fetches'], 1)
+        self.assertEqual(self.fetcher.calls[-1][0], int(last_ts.timestamp()))
+        self.assertEqual(len(df), 201)
+        self.assertEqual(df.loc[df['timestamp'] == last_ts, 'close'].iloc[0], 999.0)
+        self.assertTrue(df['timestamp'].is_monotonic_increasing)
+        self.assertFalse(df['timestamp'].duplicated().any())
+
+    def test_gap_triggers_full_refetch(self):
+        """Разрыв между кэшем и новыми свечами приводит к полной перезагрузке"""
+        self.store.get_candles('BTCUSDT', '5')
+        self.fetcher.limit = 1
+        self.fetcher.bars = make_bars(self.now, 300)
+
+        self.store.get_candles('BTCUSDT', '5')
+
+        self.assertEqual(self.store.stats['gaps_detected'], 1)
+        self.assertEqual(self.store.stats['full_fetches'], 2)
+
+    def test_returned_frame_is_a_copy(self):
+        """Изменения DataFrame стратегией не попадают в кэш"""
+        df = self.store.get_candles('BTCUSDT', '5')
+        df['rsi'] = 50.0
+
+        self.assertNotIn('rsi', self.store.get_candles('BTCUSDT', '5').columns)
+
+    def test_interval_to_ms(self):
+        """Перевод интервалов ByBit в миллисекунды"""
+        self.assertEqual(interval_to_ms('5'), 300_000)
+        self.assertEqual(interval_to_ms('D'), 86_400_000)
+        self.assertEqual(interval_to_ms('1h'), 3_600_000)
+        with self.assertRaises(ValueError):
+            interval_to_ms('7x')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import copy
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+from modules.backtester import Backtester
+from strategies.custom_strategy import CustomStrategy
+from user_config import UserConfig
+
+CONDITIONS = {'rsi': 'RSI', 'macd': 'MACD', 'ema': 'EMA', 'bb': 'BB', 'volume': 'VOLUME', 'stoch': 'STOCH'}
+
+
+def make_candles(count: int = 400, seed: int = 21) -> pd.DataFrame:
+    """Случайное блуждание 5m со всплесками объема и нулевыми объемами"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, count)))
+    open_ = np.r_[close[0], close[:-1]]
+    volume = rng.uniform(10, 100, count) * (1 + 4 * (rng.random(count) < 0.05))
+    volume[150:175] = 0.0
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=count, freq='5min', tz='UTC'),
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.001, count))),
+        'low': np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.001, count))),
+        'close': close,
+        'volume': volume
+    })
+
+
+def make_strategy(**overrides) -> CustomStrategy:
+    config = copy.deepcopy(UserConfig.CUSTOM_STRATEGY_CONFIG)
+    for section, values in overrides.items():
+        config[section].update(values)
+    strategy = CustomStrategy(None, None, {'CUSTOM_STRATEGY_CONFIG': config})
+    strategy.logger.setLevel(logging.WARNING)
+    return strategy
+
+
+class TestCustomSignalMatrix(unittest.TestCase):
+    def assert_matches_scalar(self, strategy: CustomStrategy, df: pd.DataFrame):
+        matrix = strategy.generate_signal_matrix(df)
+        for i in range(len(df)):
+            signals = strategy.generate_signals(df.iloc[:i + 1])
+            row = matrix.iloc[i]
+            for side, check in (('long', strategy._check_long_entry_conditions),
+                                ('short', strategy._check_short_entry_conditions)):
+                valid, score, reasons = check(signals)
+                msg = f"bar {i} {side}"
+                self.assertEqual(bool(row[f'{side}_valid']), valid, msg)
+                self.assertEqual(int(row[f'{side}_score']), score, msg)
+                for name, prefix in CONDITIONS.items():
+                    self.assertEqual(bool(row[f'{side}_{name}']),
+                                     any(r.startswith(prefix) for r in reasons.split(', ')), f"{msg} {name}")
+
+    def test_matches_scalar_path(self):
+        """Каждая строка матрицы совпадает со скалярной проверкой по окну до этой свечи"""
+        self.assert_matches_scalar(make_strategy(), make_candles())
+
+    def test_matches_scalar_path_with_disabled_indicators(self):
+        """Совпадение при отключенных индикаторах и других весах"""
+        strategy = make_strategy(macd_settings={'enabled': False}, volume_settings={'enabled': False},
+                                 rsi_settings={'weight': 1.3}, entry_conditions={'min_conditions_required': 3})
+        self.assert_matches_scalar(strategy, make_candles(250, seed=4))
+
+    def test_scores_bitwise_equal(self):
+        """Сумма весов совпадает побитово с накоплением в скалярной проверке"""
+        strategy = make_strategy(rsi_settings={'weight': 0.1}, macd_settings={'weight': 0.2},
+                                 bollinger_settings={'weight': 0.7})
+        df = make_candles(300, seed=8)
+        matrix = strategy.generate_signal_matrix(df)
+        for i in range(60, 300, 7):
+            signals = strategy.generate_signals(df.iloc[:i + 1])
+            expected = 0
+            for name, weight in (('rsi', 0.1), ('macd', 0.2), ('ema', strategy.EMA_WEIGHT),
+                                 ('bb', 0.7), ('volume', strategy.VOLUME_WEIGHT), ('stoch', strategy.STOCH_WEIGHT)):
+                if matrix[f'long_{name}'].iloc[i]:
+                    expected += weight
+            self.assertEqual(matrix['long_score'].iloc[i], expected)
+            self.assertEqual(strategy._check_long_entry_conditions(signals)[0],
+                             bool(matrix['long_valid'].iloc[i]))
+
+    def test_backtest_fast_path_identical(self):
+        """Бэктест с предрасчитанными сигналами дает те же сделки, что и скалярный"""
+        candles = {'BTCUSDT': make_candles(700, seed=1), 'ETHUSDT': make_candles(700, seed=2)}
+        settings = {'window': 100, 'record_equity': False}
+
+        fast_strategy = make_strategy()
+        fast = Backtester(fast_strategy, settings)
+        fast.run(candles)
+
+        scalar_strategy = make_strategy()
+        scalar_strategy.preload_signals = lambda symbol, df: False
+        scalar = Backtester(scalar_strategy, settings)
+        scalar.run(candles)
+
+        self.assertGreater(len(fast.trades), 0)
+        self.assertEqual(len(fast.trades), len(scalar.trades))
+        for got, want in zip(fast.trades, scalar.trades):
+            self.assertEqual(got, want)
+        self.assertEqual(fast_strategy._signal_matrices, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
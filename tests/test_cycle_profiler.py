@@ -0,0 +1,100 @@
+import json
+import tempfile
+import unittest
+import urllib.request
+from pathlib import Path
+import numpy as np
+from modules.cycle_profiler import CycleProfiler, LatencyHistogram
+
+
+def make_profiler(tmp_dir: str, **settings) -> CycleProfiler:
+    return CycleProfiler({'enabled': True, 'exporters': ['json'], 'json_path': f"{tmp_dir}/profile.json",
+                          'profile_dir': f"{tmp_dir}/profiles", 'sampler': None, **settings})
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_precision(self):
+        """Перцентили совпадают с точными в пределах точности корзин"""
+        rng = np.random.default_rng(5)
+        samples = rng.lognormal(mean=-4, sigma=1.2, size=20000)  # ~20ms, хвост до секунд
+        histogram = LatencyHistogram(max_seconds=60, sub_bits=7)
+        for value in samples:
+            histogram.record(float(value))
+
+        for q in (50, 90, 99, 99.9):
+            exact = np.percentile(samples, q) * 1000
+            self.assertAlmostEqual(histogram.percentile(q), exact, delta=exact * 0.02 + 0.001, msg=f"p{q}")
+        self.assertEqual(histogram.count, 20000)
+        self.assertAlmostEqual(histogram.snapshot()['max_ms'], samples.max() * 1000, delta=0.001)
+
+    def test_bucket_bounds_cover_values(self):
+        """Каждое значение попадает в корзину, диапазон которой его содержит"""
+        histogram = LatencyHistogram(max_seconds=10, sub_bits=5)
+        for value in [0, 1, 31, 32, 33, 63, 64, 1000, 123_456, 9_999_999]:
+            lower, upper = histogram._bucket_bounds(histogram._index(value))
+            self.assertTrue(lower <= value < upper, value)
+
+
+class TestCycleProfiler(unittest.TestCase):
+    def test_records_only_inside_cycle(self):
+        """Этапы вне цикла (бэктест, утилиты) не записываются"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            profiler = make_profiler(tmp_dir)
+            with profiler.stage('indicators', 'BTCUSDT'):
+                pass
+            self.assertEqual(profiler.get_snapshot(), {})
+
+            with profiler.cycle(1):
+                profiler.record('fetch', 0.25, 'BTCUSDT')
+                with profiler.stage('indicators', 'BTCUSDT'):
+                    pass
+
+            snapshot = profiler.get_snapshot()
+            self.assertEqual(snapshot['fetch']['BTCUSDT']['count'], 1)
+            self.assertAlmostEqual(snapshot['fetch']['BTCUSDT']['p50_ms'], 250.0, delta=250 * 0.02)
+            self.assertEqual(snapshot['indicators']['BTCUSDT']['count'], 1)
+            self.assertEqual(snapshot['cycle']['all']['count'], 1)
+
+            saved = json.loads(Path(tmp_dir, 'profile.json').read_text(encoding='utf-8'))
+            self.assertEqual(saved['cycles'], 1)
+            self.assertIn('fetch', saved['stages'])
+
+    def test_prometheus_export(self):
+        """Текстовый формат Prometheus через HTTP endpoint"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            profiler = make_profiler(tmp_dir, exporters=['prometheus'])
+            with profiler.cycle(1):
+                profiler.record('strategy', 0.01, 'ETHUSDT')
+
+            self.assertTrue(profiler.start_http_server(port=0, host='127.0.0.1'))
+            try:
+                port = profiler._server.server_address[1]
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                    body = response.read().decode('utf-8')
+            finally:
+                profiler.stop()
+
+            self.assertIn('trading_bot_stage_latency_seconds{stage="strategy",symbol="ETHUSDT",quantile="0.99"}',
+                          body)
+            self.assertIn('trading_bot_stage_latency_seconds_count{stage="cycle",symbol="all"} 1', body)
+            self.assertIn('trading_bot_cycles_total 1', body)
+            self.assertFalse(Path(tmp_dir, 'profile.json').exists())
+
+    def test_slow_cycle_profile(self):
+        """Медленный цикл сохраняется профилем cProfile, быстрый - нет"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            profiler = make_profiler(tmp_dir, sampler='cprofile', slow_cycle_threshold=0.05, max_profiles=1)
+            with profiler.cycle(1):
+                pass
+            self.assertFalse(Path(tmp_dir, 'profiles').exists())
+
+            for number in (2, 3):
+                with profiler.cycle(number):
+                    sum(i * i for i in range(400_000))
+            profiles = list(Path(tmp_dir, 'profiles').glob('cycle_*.prof'))
+            self.assertEqual(profiler.slow_cycles, 2)
+            self.assertEqual(len(profiles), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
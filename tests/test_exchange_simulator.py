@@ -0,0 +1,139 @@
+import unittest
+import numpy as np
+import pandas as pd
+from modules.data_fetcher import DataFetcher
+from modules.exchange_simulator import SimulatedExchange
+from modules.order_manager import OrderManager
+from modules.rate_limiter import RateLimiter
+
+
+def make_candles(closes, start='2024-01-01') -> pd.DataFrame:
+    """Свечи 5m с заданными закрытиями и диапазоном +-1%"""
+    closes = np.asarray(closes, dtype=float)
+    opens = np.r_[closes[0], closes[:-1]]
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=len(closes), freq='5min', tz='UTC'),
+        'open': opens,
+        'high': np.maximum(opens, closes) * 1.01,
+        'low': np.minimum(opens, closes) * 0.99,
+        'close': closes,
+        'volume': np.full(len(closes), 1000.0)
+    })
+
+
+def make_exchange(closes=None, **settings) -> SimulatedExchange:
+    closes = [100.0] * 50 if closes is None else closes
+    return SimulatedExchange({'BTCUSDT': make_candles(closes)}, '5',
+                             {'warmup_bars': 10, 'spread': 0.0002, **settings})
+
+
+def make_limiter() -> RateLimiter:
+    return RateLimiter(limits={name: {'rate': 1000, 'capacity': 1000} for name in ('market', 'account', 'trade')},
+                       buffer=0.0)
+
+
+class TestSimulatedExchange(unittest.TestCase):
+    def test_data_fetcher_over_simulator(self):
+        """DataFetcher получает свечи, цену, стакан и баланс без сети"""
+        exchange = SimulatedExchange({'BTCUSDT': SimulatedExchange.synthetic_candles(300, '5', 50000.0, seed=3)},
+                                     '5', {'warmup_bars': 100})
+        fetcher = DataFetcher(client=exchange, rate_limiter=make_limiter())
+
+        server_time = fetcher.get_server_time()
+        df = fetcher.get_kline('BTCUSDT', '5', int(server_time.timestamp()) - 86400, int(server_time.timestamp()))
+        self.assertEqual(len(df), 100)
+        self.assertEqual(fetcher.get_current_price('BTCUSDT'), df['close'].iloc[-1])
+
+        book = fetcher.get_order_book('BTCUSDT', limit=5)
+        self.assertEqual(len(book['bids']), 5)
+        self.assertLess(book['bids'][0][0], book['asks'][0][0])
+        self.assertEqual(fetcher.get_account_balance(), 10000.0)
+
+        exchange.advance(3)
+        self.assertEqual(len(fetcher.get_kline('BTCUSDT', '5', 0, int(server_time.timestamp()) + 86400)), 103)
+
+    def test_kline_aggregation(self):
+        """Интервал, кратный базовому, собирается из базовых свечей"""
+        exchange = make_exchange(list(range(100, 130)), warmup_bars=30)
+        rows = exchange.get_kline(symbol='BTCUSDT', interval='15', limit=2)['result']['list']
+        # От новых к старым: последняя 15m свеча - закрытия 127..129
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(float(rows[0][4]), 129.0)
+        self.assertEqual(float(rows[0][1]), 126.0)
+        self.assertEqual(float(rows[0][5]), 3000.0)
+        self.assertEqual(exchange.get_kline(symbol='BTCUSDT', interval='7')['retCode'], 10001)
+
+    def test_market_order_and_position(self):
+        """Рыночный ордер исполняется по стакану и открывает позицию, reduce-only ее закрывает"""
+        exchange = make_exchange()
+        response = exchange.place_order(symbol='BTCUSDT', side='BUY', orderType='Market', qty='2')
+        self.assertEqual(response['retCode'], 0)
+
+        position = exchange.get_positions(symbol='BTCUSDT')['result']['list'][0]
+        self.assertEqual(position['side'], 'Buy')
+        self.assertAlmostEqual(float(position['avgPrice']), 100.01)
+
+        self.assertEqual(exchange.place_order(symbol='BTCUSDT', side='BUY', orderType='Market', qty='1',
+                                              reduceOnly=True)['retCode'], 110017)
+        exchange.place_order(symbol='BTCUSDT', side='SELL', orderType='Market', qty='5', reduceOnly=True)
+        self.assertEqual(exchange.get_positions(symbol='BTCUSDT')['result']['list'][0]['size'], '0.0')
+        # Потери на спреде и комиссиях
+        self.assertLess(exchange.balance, 10000.0)
+
+    def test_limit_order_fills_on_advance(self):
+        """Лимитный ордер ждет в очереди и исполняется, когда свеча доходит до цены"""
+        exchange = make_exchange([100.0] * 15 + [97.0] * 10)
+        exchange.place_order(symbol='BTCUSDT', side='Buy', orderType='Limit', qty='1', price='98')
+        self.assertEqual(len(exchange.get_open_orders(symbol='BTCUSDT')['result']['list']), 1)
+
+        exchange.advance(5)
+        self.assertEqual(len(exchange.get_open_orders(symbol='BTCUSDT')['result']['list']), 1)
+        exchange.advance()
+        self.assertEqual(exchange.get_open_orders(symbol='BTCUSDT')['result']['list'], [])
+        order = exchange.get_order_history(symbol='BTCUSDT')['result']['list'][0]
+        self.assertEqual(order['orderStatus'], 'Filled')
+        self.assertLessEqual(float(order['avgPrice']), 98.0)
+
+    def test_stop_loss_trigger_and_amend(self):
+        """Стоп-лосс из ордера срабатывает на свече, перенос стопа через amend_order"""
+        exchange = make_exchange([100.0] * 15 + [95.0] * 10)
+        order_id = exchange.place_order(symbol='BTCUSDT', side='Buy', orderType='Market', qty='1',
+                                        stopLoss='90')['result']['orderId']
+        self.assertEqual(exchange.amend_order(symbol='BTCUSDT', orderId=order_id, stopLoss='97')['retCode'], 0)
+
+        exchange.advance(6)
+        self.assertEqual(exchange.stats['stop_triggers'], 1)
+        self.assertEqual(exchange.get_positions(symbol='BTCUSDT')['result']['list'][0]['size'], '0.0')
+        self.assertAlmostEqual(exchange.balance, 10000.0 - 3.01 - (100.01 + 97.0) * 0.00055, places=6)
+
+    def test_rejections(self):
+        """Ошибки ByBit: повтор orderLinkId, недостаток средств, неизвестный символ"""
+        exchange = make_exchange(initial_balance=100.0)
+        self.assertEqual(exchange.place_order(symbol='BTCUSDT', side='Buy', orderType='Market', qty='0.1',
+                                              orderLinkId='a')['retCode'], 0)
+        self.assertEqual(exchange.place_order(symbol='BTCUSDT', side='Buy', orderType='Market', qty='0.1',
+                                              orderLinkId='a')['retCode'], 110072)
+        self.assertEqual(exchange.place_order(symbol='BTCUSDT', side='Buy', orderType='Market',
+                                              qty='10')['retCode'], 110007)
+        self.assertEqual(exchange.get_tickers(symbol='DOGEUSDT')['retCode'], 10001)
+
+    def test_order_manager_over_simulator(self):
+        """OrderManager размещает, отслеживает и отменяет ордера на симуляторе"""
+        exchange = make_exchange()
+        manager = OrderManager(exchange, rate_limiter=make_limiter())
+        try:
+            market = manager.place_order('BTCUSDT', 'BUY', 0.5, client_order_id='entry-1')
+            limit = manager.place_order('BTCUSDT', 'BUY', 0.5, price=90.0)
+            self.assertTrue(market['success'] and limit['success'])
+
+            manager.update_orders_status()
+            self.assertEqual(list(manager.open_orders), [limit['order_id']])
+            self.assertTrue(manager.cancel_order('BTCUSDT', limit['order_id']))
+            self.assertTrue(manager.close_position('BTCUSDT', 'SELL', 0.5)['success'])
+        finally:
+            manager.shutdown()
+        self.assertEqual(exchange.get_stats()['open_positions'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from modules.history_store import KlineHistoryStore
+from modules.history_downloader import HistoricalDownloader
+
+STEP = 300_000  # 5m
+START = 1_700_000_100_000 - 1_700_000_100_000 % STEP
+
+
+def make_bars(start_ms: int, count: int) -> pd.DataFrame:
+    """Свечи 5m в формате DataFetcher.get_kline"""
+    timestamps = start_ms + np.arange(count, dtype=np.int64) * STEP
+    close = 100.0 + np.arange(count, dtype=np.float64)
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(timestamps, unit='ms', utc=True),
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 5.0
+    })
+
+
+class FakeFetcher:
+    """Имитация DataFetcher поверх заранее заданного ряда свечей"""
+
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+        self.calls = []
+
+    def get_kline(self, symbol, interval, start_time, end_time, limit=200):
+        self.calls.append((start_time, end_time, limit))
+        start = pd.Timestamp(start_time, unit='ms', tz='UTC')
+        end = pd.Timestamp(end_time, unit='ms', tz='UTC')
+        df = self.bars[(self.bars['timestamp'] >= start) & (self.bars['timestamp'] <= end)]
+        return df.iloc[-limit:].reset_index(drop=True) if not df.empty else None
+
+
+class TestKlineHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = KlineHistoryStore(self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_append_and_range_read(self):
+        """Дозапись по порядку и чтение диапазона"""
+        bars = make_bars(START, 100)
+        self.assertEqual(self.store.write('BTCUSDT', '5', bars.iloc[:60]), 60)
+        self.assertEqual(self.store.write('BTCUSDT', '5', bars.iloc[60:]), 40)
+
+        df = self.store.read('BTCUSDT', '5', START + 10 * STEP, START + 19 * STEP)
+        self.assertEqual(len(df), 10)
+        pd.testing.assert_frame_equal(df, bars.iloc[10:20].reset_index(drop=True), check_dtype=False)
+        self.assertEqual(self.store.get_info('BTCUSDT', '5')['count'], 100)
+
+    def test_overlapping_write_merges(self):
+        """Пересекающиеся и более ранние данные сливаются без дубликатов"""
+        bars = make_bars(START, 100)
+        self.store.write('BTCUSDT', '5', bars.iloc[50:])
+        updated = bars.iloc[:60].copy()
+        updated.loc[55, 'close'] = 999.0
+
+        self.assertEqual(self.store.write('BTCUSDT', '5', updated), 50)
+
+        timestamps, values = self.store.read_arrays('BTCUSDT', '5')
+        self.assertEqual(len(timestamps), 100)
+        self.assertTrue(np.all(np.diff(timestamps) == STEP))
+        self.assertEqual(values[55, 3], 999.0)
+
+    def test_find_gaps(self):
+        """Поиск пропусков внутри истории и на границах диапазона"""
+        bars = make_bars(START, 100)
+        self.store.write('BTCUSDT', '5', pd.concat([bars.iloc[10:40], bars.iloc[50:90]]))
+
+        gaps = self.store.find_gaps('BTCUSDT', '5', START, START + 99 * STEP)
+        self.assertEqual(gaps, [
+            (START, START + 9 * STEP),
+            (START + 40 * STEP, START + 49 * STEP),
+            (START + 90 * STEP, START + 99 * STEP)
+        ])
+
+
+class TestHistoricalDownloader(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.fetcher = FakeFetcher(make_bars(START, 2500))
+        self.downloader = HistoricalDownloader(self.fetcher, KlineHistoryStore(self.tmp_dir), page_size=1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_paginated_download(self):
+        """Диапазон длиннее лимита загружается страницами по 1000 свечей"""
+        result = self.downloader.download('BTCUSDT', '5', START, START + 2499 * STEP)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['pages'], 3)
+        self.assertEqual(result['bars_written'], 2500)
+        self.assertEqual(result['remaining_gaps'], [])
+
+    def test_resume_fetches_only_missing(self):
+        """Повторная загрузка запрашивает только отсутствующие участки"""
+        self.downloader.download('BTCUSDT', '5', START, START + 1499 * STEP)
+        self.fetcher.calls.clear()
+
+        result = self.downloader.download('BTCUSDT', '5', START, START + 2499 * STEP)
+
+        self.assertEqual(result['pages'], 1)
+        self.assertEqual(self.fetcher.calls[0][0], START + 1500 * STEP)
+        self.assertEqual(self.downloader.store.get_info('BTCUSDT', '5')['count'], 2500)
+
+
+if __name__ == '__main__':
+    unittest.main()
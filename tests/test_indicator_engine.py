@@ -0,0 +1,136 @@
+import unittest
+import numpy as np
+import pandas as pd
+import ta
+from modules.indicator_engine import IndicatorEngine
+
+
+def make_candles(count: int = 300, seed: int = 7) -> pd.DataFrame:
+    """Случайное блуждание 5m"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=count, freq='5min', tz='UTC'),
+        'open': close + rng.normal(0, 0.2, count),
+        'high': close + np.abs(rng.normal(0, 1, count)),
+        'low': close - np.abs(rng.normal(0, 1, count)),
+        'close': close,
+        'volume': rng.uniform(10, 100, count)
+    })
+
+
+class TestIndicatorEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = IndicatorEngine()
+        self.df = make_candles()
+        self.specs = {
+            'ema_fast': ('ema', {'window': 9}),
+            'rsi': ('rsi', {'window': 14}),
+            'macd': ('macd', {}, 'macd'),
+            'macd_signal': ('macd', {}, 'signal'),
+            'atr': ('atr', {'window': 14}),
+            'volume_sma': ('sma', {'column': 'volume', 'window': 20})
+        }
+
+    def test_values_match_ta(self):
+        """Значения совпадают с прямыми вызовами ta"""
+        df = self.engine.attach(self.df, self.specs, 'BTCUSDT')
+        macd = ta.trend.MACD(self.df['close'])
+
+        pd.testing.assert_series_equal(
+            df['ema_fast'], ta.trend.EMAIndicator(self.df['close'], window=9).ema_indicator(), check_names=False)
+        pd.testing.assert_series_equal(
+            df['rsi'], ta.momentum.RSIIndicator(self.df['close'], window=14).rsi(), check_names=False)
+        pd.testing.assert_series_equal(df['macd'], macd.macd(), check_names=False)
+        pd.testing.assert_series_equal(df['macd_signal'], macd.macd_signal(), check_names=False)
+        pd.testing.assert_series_equal(
+            df['atr'],
+            ta.volatility.AverageTrueRange(self.df['high'], self.df['low'], self.df['close'],
+                                           window=14).average_true_range(),
+            check_names=False)
+        pd.testing.assert_series_equal(
+            df['volume_sma'], self.df['volume'].rolling(20).mean(), check_names=False)
+        self.assertNotIn('rsi', self.df.columns)
+
+    def test_shared_outputs_computed_once(self):
+        """Повторный запрос на том же баре берется из кэша, MACD считается один раз"""
+        self.engine.compute(self.df, self.specs, 'BTCUSDT')
+        self.assertEqual(self.engine.stats['misses'], 5)
+
+        self.engine.compute(self.df.copy(), self.specs, 'BTCUSDT')
+        self.assertEqual(self.engine.stats['misses'], 5)
+        self.assertEqual(self.engine.stats['hits'], 7)
+
+    def test_forming_bar_update_invalidates(self):
+        """Изменение формирующейся свечи или новая свеча пересчитывают индикатор"""
+        first = self.engine.get(self.df, 'rsi', {'window': 14}, 'BTCUSDT')['value']
+
+        updated = self.df.copy()
+        updated.loc[updated.index[-1], 'close'] += 5
+        second = self.engine.get(updated, 'rsi', {'window': 14}, 'BTCUSDT')['value']
+        self.assertEqual(self.engine.stats['misses'], 2)
+        self.assertGreater(second.iloc[-1], first.iloc[-1])
+
+        self.engine.get(make_candles(301), 'rsi', {'window': 14}, 'BTCUSDT')
+        self.assertEqual(self.engine.stats['misses'], 3)
+
+    def test_symbols_cached_separately(self):
+        """Кэш раздельный по символам"""
+        self.engine.get(self.df, 'ema', {'window': 9}, 'BTCUSDT')
+        self.engine.get(self.df, 'ema', {'window': 9}, 'ETHUSDT')
+        self.assertEqual(self.engine.stats['misses'], 2)
+
+        self.engine.clear('BTCUSDT')
+        self.assertEqual(self.engine.get_stats()['entries'], 1)
+
+    def test_preloaded_windows_match_live(self):
+        """Окна предзагруженной истории дают те же значения, что и расчет по окну в торговле"""
+        history = make_candles(1200, seed=3)
+        specs = {
+            **self.specs,
+            'ema_trend': ('ema', {'window': 200}),
+            'adx': ('adx', {'window': 14}),
+            'bb_upper': ('bollinger', {'window': 20, 'window_dev': 2}, 'upper'),
+            'stoch_d': ('stochastic', {'window': 14, 'smooth_window': 3}, 'd'),
+            'roc': ('roc', {'window': 12}),
+            'williams_r': ('williams_r', {'lbp': 14})
+        }
+        self.engine.preload('BTCUSDT', history)
+
+        for stop in (200, 650, 1200):
+            window = history.iloc[stop - 200:stop]
+            preloaded = self.engine.attach(window, specs, 'BTCUSDT')
+            live = IndicatorEngine().attach(window, specs, 'BTCUSDT')
+            for column in specs:
+                np.testing.assert_allclose(preloaded[column].to_numpy(), live[column].to_numpy(),
+                                           rtol=1e-9, atol=1e-9, err_msg=f"{column} at bar {stop}")
+
+        # Индикаторы с конечным окном берутся из предзагрузки, рекурсивные - считаются по окну
+        self.engine.release('BTCUSDT')
+        self.assertEqual(self.engine.get_stats()['entries'], 6)  # ema x2, rsi, macd, atr, adx
+
+    def test_window_values_match_window_calculation(self):
+        """Оконные ядра побитово совпадают с расчетом рекурсивного индикатора по самому окну"""
+        history = make_candles(700, seed=5)
+        history.loc[300:320, 'close'] = history.loc[300, 'close']  # плоский участок: ewm без изменений
+        self.engine.preload('BTCUSDT', history)
+        cases = [('ema', {'window': 21}), ('ema', {'window': 200}), ('rsi', {'window': 14}),
+                 ('macd', {'window_fast': 12, 'window_slow': 26, 'window_sign': 9}), ('atr', {'window': 14})]
+
+        for indicator, params in cases:
+            windows = self.engine.window_values('BTCUSDT', indicator, params, 200)
+            self.assertTrue(np.isnan(windows[next(iter(windows))][0][198]))
+            for stop in (200, 321, 517, 700):
+                live = IndicatorEngine().get(history.iloc[stop - 200:stop], indicator, params)
+                for output, (last, prev) in windows.items():
+                    values = live[output].to_numpy()
+                    np.testing.assert_array_equal(last[stop - 1], values[-1], err_msg=f"{indicator} {output} {stop}")
+                    np.testing.assert_array_equal(prev[stop - 1], values[-2], err_msg=f"{indicator} {output} {stop}")
+
+        self.assertIsNone(self.engine.window_values('BTCUSDT', 'adx', {'window': 14}, 200))
+        self.assertIsNone(self.engine.window_values('ETHUSDT', 'ema', {'window': 21}, 200))
+        self.engine.release('BTCUSDT')
+
+
+if __name__ == '__main__':
+    unittest.main()
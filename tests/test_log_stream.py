@@ -0,0 +1,102 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from modules.log_stream import JsonLinesFormatter, LogStreamAnalyzer, find_logs, parse_text_line
+
+
+def event_line(time: str, level: str, message: str, **fields) -> str:
+    return json.dumps({'time': time, 'level': level, 'logger': 'trading_bot', 'message': message, **fields}) + '\n'
+
+
+class TestLogStream(unittest.TestCase):
+    def test_json_formatter_extra_fields(self):
+        """Поля extra попадают в JSON событие"""
+        record = logging.LogRecord('trading_bot', logging.INFO, __file__, 1, "Processed %d/%d pairs",
+                                   (3, 5), None)
+        record.event = 'cycle_finished'
+        record.duration = 1.5
+        event = json.loads(JsonLinesFormatter().format(record))
+        self.assertEqual(event['message'], "Processed 3/5 pairs")
+        self.assertEqual(event['level'], 'INFO')
+        self.assertEqual(event['event'], 'cycle_finished')
+        self.assertEqual(event['duration'], 1.5)
+        self.assertNotIn('args', event)
+
+    def test_parse_text_line(self):
+        """Старые текстовые логи разбираются в те же события"""
+        event = parse_text_line("2024-01-01 12:00:00,123 - trading_bot - INFO - Strategy result for BTCUSDT: OPEN\n")
+        self.assertEqual(event['time'], '2024-01-01 12:00:00')
+        self.assertEqual((event['event'], event['symbol'], event['action']), ('strategy_result', 'BTCUSDT', 'OPEN'))
+
+        event = parse_text_line("2024-01-01 12:00:05 - trading_bot - INFO - Processed 4/5 pairs in 12.50s")
+        self.assertEqual((event['pairs'], event['total_pairs'], event['duration']), (4, 5, 12.5))
+        self.assertIsNone(parse_text_line("Traceback (most recent call last):"))
+
+    def test_incremental_reads_only_appended_lines(self):
+        """Повторный анализ продолжает с сохраненного смещения, недописанная строка откладывается"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log = Path(tmp_dir, 'trading_20240101.jsonl')
+            index = Path(tmp_dir, '.log_index.json')
+            log.write_text(event_line('2024-01-01 12:00:00', 'INFO', 'Trading cycle started', event='cycle_started') +
+                           event_line('2024-01-01 12:00:01', 'INFO', 'r', event='strategy_result',
+                                      symbol='BTCUSDT', action='OPEN') +
+                           '{"time": "2024-01-01 12:00:02", "lev')
+
+            summary = LogStreamAnalyzer(index_path=str(index)).analyze([log])
+            self.assertEqual(summary.records, 2)
+            offset = json.loads(index.read_text())[str(log.resolve())]['offset']
+            self.assertLess(offset, log.stat().st_size)
+
+            with open(log, 'a', encoding='utf-8') as f:
+                f.write('el": "ERROR", "message": "API error"}\n')
+                f.write(event_line('2024-01-01 12:00:03', 'INFO', 'done', event='cycle_finished',
+                                   pairs=5, total_pairs=5, duration=3.0))
+
+            summary = LogStreamAnalyzer(index_path=str(index)).analyze([log])
+            self.assertEqual(summary.records, 4)
+            self.assertEqual(summary.levels['ERROR'], 1)
+            self.assertEqual(summary.action_count('OPEN'), 1)
+            self.assertEqual(summary.cycle_count, 1)
+            self.assertEqual(summary.fast_cycles, 1)
+
+    def test_rewritten_file_resets_index(self):
+        """Перезаписанный файл с тем же именем анализируется заново"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log = Path(tmp_dir, 'trading_20240101.jsonl')
+            analyzer = LogStreamAnalyzer(index_path=str(Path(tmp_dir, '.log_index.json')))
+            log.write_text(''.join(event_line('2024-01-01 12:00:00', 'INFO', f"m{i}") for i in range(5)))
+            self.assertEqual(analyzer.analyze([log]).records, 5)
+
+            log.write_text(''.join(event_line('2024-01-02 12:00:00', 'WARNING', f"n{i}") for i in range(8)))
+            summary = analyzer.analyze([log])
+            self.assertEqual(summary.records, 8)
+            self.assertEqual(summary.levels['INFO'], 0)
+
+    def test_tail_and_merge_across_files(self):
+        """Хвост читается с конца блоками, сводки файлов складываются; .jsonl вытесняет .log той же даты"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            old_log = Path(tmp_dir, 'trading_20240101.log')
+            old_log.write_text(''.join(f"2024-01-01 12:00:{i:02d} - trading_bot - INFO - "
+                                       f"Strategy result for ETHUSDT: CLOSE\n" for i in range(30)))
+            Path(tmp_dir, 'trading_20240102.log').write_text("ignored\n")
+            new_log = Path(tmp_dir, 'trading_20240102.jsonl')
+            new_log.write_text(''.join(event_line('2024-01-02 12:00:00', 'INFO', f"m{i}", event='strategy_result',
+                                                  symbol='BTCUSDT', action='OPEN') for i in range(100)))
+
+            logs = find_logs(tmp_dir)
+            self.assertEqual(logs, [old_log, new_log])
+
+            tail = LogStreamAnalyzer.tail(new_log, 7, block_size=64)
+            self.assertEqual([event['message'] for event in tail], [f"m{i}" for i in range(93, 100)])
+
+            summary = LogStreamAnalyzer().analyze(logs)
+            self.assertEqual(summary.records, 130)
+            self.assertEqual(summary.symbol_actions['ETHUSDT']['CLOSE'], 30)
+            self.assertEqual(summary.action_count('OPEN'), 100)
+            self.assertEqual(len(summary.recent_signals), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
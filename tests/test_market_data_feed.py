@@ -0,0 +1,108 @@
+import unittest
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from modules.candle_store import CandleStore
+from modules.market_data_feed import MarketDataFeed
+from modules.market_data_replay import ReplayWebSocket
+
+STEP = pd.Timedelta(minutes=5)
+
+
+def make_bars(end: pd.Timestamp, count: int) -> pd.DataFrame:
+    """Свечи 5m, заканчивающиеся на end"""
+    timestamps = pd.date_range(end=end, periods=count, freq='5min')
+    close = 100.0 + np.arange(count, dtype=np.float64)
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0
+    })
+
+
+class FakeFetcher:
+    """Имитация DataFetcher для REST fallback"""
+
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+        self.kline_calls = 0
+        self.price_calls = 0
+
+    def get_kline(self, symbol, interval, start_time, end_time, limit=200):
+        self.kline_calls += 1
+        start = pd.Timestamp(start_time, unit='s', tz='UTC')
+        end = pd.Timestamp(end_time, unit='s', tz='UTC')
+        df = self.bars[(self.bars['timestamp'] >= start) & (self.bars['timestamp'] <= end)]
+        return df.iloc[-limit:].reset_index(drop=True)
+
+    def get_current_price(self, symbol):
+        self.price_calls += 1
+        return 1.0
+
+    def get_order_book(self, symbol, limit=25):
+        return None
+
+
+class TestMarketDataFeed(unittest.TestCase):
+    def setUp(self):
+        last_closed = pd.Timestamp(datetime.now(timezone.utc)).floor('5min') - 4 * STEP
+        history = make_bars(last_closed, 100)
+        self.fetcher = FakeFetcher(history)
+        self.store = CandleStore(self.fetcher, lookback=timedelta(days=1))
+
+        # Поток продолжает историю: следующие 3 свечи
+        live = make_bars(last_closed + 3 * STEP, 3)
+        live[['open', 'high', 'low', 'close']] += 1000
+        self.replay = ReplayWebSocket.from_klines({'BTCUSDT': live}, '5')
+        self.feed = MarketDataFeed(self.fetcher, self.store, ['BTCUSDT'], '5',
+                                   ws_factory=lambda: self.replay, orderbook_depth=50, stale_after=30)
+        self.assertTrue(self.feed.start())
+
+    def tearDown(self):
+        self.feed.stop()
+
+    def test_stream_updates_candles_without_rest(self):
+        """Свечи из потока попадают в историю без REST запросов"""
+        calls_before = self.fetcher.kline_calls
+        self.replay.replay()
+
+        df = self.feed.get_candles('BTCUSDT')
+
+        self.assertEqual(self.fetcher.kline_calls, calls_before)
+        self.assertEqual(len(df), 103)
+        self.assertEqual(df['close'].iloc[-1], 1102.0)
+        self.assertEqual(self.feed.get_last_price('BTCUSDT'), 1102.0)
+        self.assertEqual(self.fetcher.price_calls, 0)
+
+    def test_candle_close_event(self):
+        """Закрытие свечи будит ожидающий цикл"""
+        self.replay.replay(limit=2)
+        self.assertEqual(self.feed.wait_for_candle_close(timeout=0.01), ['BTCUSDT'])
+        self.assertEqual(self.feed.wait_for_candle_close(timeout=0.01), [])
+
+    def test_disconnect_falls_back_to_rest_and_reconnects(self):
+        """При обрыве данные идут через REST, после переподключения история догружается"""
+        self.replay.disconnect()
+        self.assertFalse(self.feed.is_healthy())
+
+        calls_before = self.fetcher.kline_calls
+        self.assertIsNotNone(self.feed.get_candles('BTCUSDT'))
+        self.assertEqual(self.fetcher.kline_calls, calls_before + 1)
+
+        self.feed.ws_factory = ReplayWebSocket
+        self.assertTrue(self.feed.ensure_connected())
+        self.assertEqual(self.feed.stats['reconnects'], 1)
+        self.feed.get_candles('BTCUSDT')
+        self.assertEqual(self.feed.stats['backfills'], 2)
+
+    def test_gap_in_stream_triggers_backfill(self):
+        """Свеча после пропуска не применяется, история догружается через REST"""
+        self.replay.messages = self.replay.messages[3:]
+        self.replay.replay()
+
+        calls_before = self.fetcher.kline_calls
+        self.feed.get_candles('BTCUSDT')
+        self.assertEqual(self.fetcher.kline_calls, calls_before + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from modules.backtester import Backtester
+from modules.market_analyzer import MarketAnalyzer
+from modules.optimizer import ParameterOptimizer, apply_params, apply_strategy_params
+from strategies.custom_strategy import CustomStrategy
+from strategies.scalping_strategy import ScalpingStrategy
+from user_config import UserConfig
+
+
+def make_candles(count: int = 300, seed: int = 5) -> pd.DataFrame:
+    """Случайное блуждание 5m"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, count))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=count, freq='5min', tz='UTC'),
+        'open': close + rng.normal(0, 0.1, count),
+        'high': close + np.abs(rng.normal(0, 0.4, count)),
+        'low': close - np.abs(rng.normal(0, 0.4, count)),
+        'close': close,
+        'volume': rng.uniform(10, 100, count)
+    })
+
+
+class TestParameterOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.optimizer = ParameterOptimizer('custom', UserConfig.CUSTOM_STRATEGY_CONFIG,
+                                            backtest_settings={'window': 100},
+                                            settings={'workers': 2, 'min_trades': 0, 'grid_points': 3})
+        self.space = {'rsi_settings.period': [10, 14], 'atr_settings.stop_loss_multiplier': (1.0, 3.0)}
+
+    def test_apply_params(self):
+        """Параметры подставляются по пути, исходная конфигурация не меняется"""
+        config = apply_params(UserConfig.CUSTOM_STRATEGY_CONFIG, {'rsi_settings.period': 7})
+        self.assertEqual(config['rsi_settings']['period'], 7)
+        self.assertEqual(UserConfig.CUSTOM_STRATEGY_CONFIG['rsi_settings']['period'], 14)
+
+    def test_apply_params_rejects_unknown_path(self):
+        """Путь, которого нет в конфигурации на любом уровне, отклоняется, а не создается"""
+        for path in ('rsi_settings.perod', 'rsi_setings.period', 'rsi_settings.period.value'):
+            with self.assertRaises(ValueError):
+                apply_params(UserConfig.CUSTOM_STRATEGY_CONFIG, {path: 7})
+        self.assertNotIn('perod', UserConfig.CUSTOM_STRATEGY_CONFIG['rsi_settings'])
+
+        result = self.optimizer.optimize({'BTCUSDT': make_candles(200)}, {'rsi_settings.perod': [7, 10]},
+                                         method='grid')
+        self.assertEqual(result['failed'], 2)
+        self.assertIn('rsi_settings.perod', result['results'][0]['error'])
+
+    def test_grid(self):
+        """Полный перебор: списки как есть, диапазоны делятся на grid_points значений"""
+        trials = self.optimizer.grid({'a': [1, 2], 'b': (1.0, 3.0), 'c': (5, 7)})
+        self.assertEqual(len(trials), 2 * 3 * 3)
+        self.assertEqual(sorted({t['b'] for t in trials}), [1.0, 2.0, 3.0])
+        self.assertEqual(sorted({t['c'] for t in trials}), [5, 6, 7])
+
+    def test_random_within_bounds(self):
+        """Случайные точки лежат в диапазонах, целые диапазоны дают int"""
+        for params in self.optimizer.random({'a': [1, 2], 'b': (0.5, 1.5), 'c': (5, 9)}, 100):
+            self.assertIn(params['a'], [1, 2])
+            self.assertTrue(0.5 <= params['b'] <= 1.5)
+            self.assertIsInstance(params['c'], int)
+            self.assertTrue(5 <= params['c'] <= 9)
+
+    def test_bayesian_prefers_good_region(self):
+        """TPE предлагает точки рядом с лучшими испытаниями и не повторяет проверенные"""
+        space = {'x': (0.0, 10.0), 'n': [1, 2, 3]}
+        history = [({'x': x, 'n': n}, -abs(x - 8.0) - (n != 3))
+                   for x, n in zip(np.linspace(0, 10, 20), [1, 2, 3] * 7)]
+        suggestions = self.optimizer.bayesian(space, history, 4)
+
+        self.assertEqual(len(suggestions), 4)
+        self.assertGreater(np.mean([s['x'] for s in suggestions]), 5.0)
+        for params in suggestions:
+            self.assertNotIn(params, [p for p, _ in history])
+
+    def test_rank(self):
+        """Рейтинг по метрике; мало сделок и ошибки - в конце"""
+        self.optimizer.settings['min_trades'] = 5
+        results = [
+            {'success': True, 'trades': 10, 'sharpe_ratio': 0.5, 'return_pct': 1.0, 'trial': 0},
+            {'success': True, 'trades': 2, 'sharpe_ratio': 9.0, 'return_pct': 5.0, 'trial': 1},
+            {'success': False, 'trial': 2},
+            {'success': True, 'trades': 12, 'sharpe_ratio': 1.5, 'return_pct': 0.5, 'trial': 3}
+        ]
+        self.assertEqual([r['trial'] for r in self.optimizer.rank(results)][:2], [3, 0])
+
+    def test_parallel_grid_run(self):
+        """Прогон в пуле процессов совпадает с одиночным бэктестом; общая память освобождается"""
+        candles = {'BTCUSDT': make_candles()}
+        blocks, handles = ParameterOptimizer._share_candles(candles)
+        names = [name for name, _ in blocks.values()]
+        ParameterOptimizer._release_candles(handles)
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+        result = self.optimizer.optimize(candles, self.space, method='grid')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['trials'], 6)
+        self.assertEqual(result['failed'], 0)
+        self.assertEqual({tuple(r['params'].items()) for r in result['results']},
+                         {tuple(p.items()) for p in self.optimizer.grid(self.space)})
+        self.assertIsNotNone(result['best_params'])
+
+        best = result['best']
+        strategy = CustomStrategy(MarketAnalyzer(data_fetcher=None), None,
+                                  {'CUSTOM_STRATEGY_CONFIG': apply_params(UserConfig.CUSTOM_STRATEGY_CONFIG,
+                                                                          best['params'])})
+        single = Backtester(strategy, {'window': 100, 'record_equity': False}).run(candles)
+        self.assertEqual(single['trades'], best['trades'])
+        self.assertAlmostEqual(single['return_pct'], best['return_pct'])
+
+    def test_builtin_strategy_params_change_results(self):
+        """Параметры встроенной стратегии попадают в атрибуты экземпляра и меняют результат бэктеста"""
+        strategy = ScalpingStrategy(MarketAnalyzer(data_fetcher=None), None)
+        apply_strategy_params(strategy, {'STOP_LOSS_PCT': 0.02, 'RSI_PERIOD': 9.0})
+        self.assertEqual(strategy.STOP_LOSS_PCT, 0.02)
+        self.assertIsInstance(strategy.RSI_PERIOD, int)
+        with self.assertRaises(ValueError):
+            apply_strategy_params(strategy, {'rsi_settings.period': 10})
+
+        optimizer = ParameterOptimizer('scalping', backtest_settings={'window': 100},
+                                       settings={'workers': 2, 'min_trades': 0})
+        result = optimizer.optimize({'BTCUSDT': make_candles(1500)}, {'STOP_LOSS_PCT': [0.002, 0.02]},
+                                    method='grid')
+
+        self.assertEqual(result['failed'], 0)
+        returns = {r['params']['STOP_LOSS_PCT']: r['return_pct'] for r in result['results']}
+        self.assertGreater(min(r['trades'] for r in result['results']), 0)
+        self.assertNotAlmostEqual(returns[0.002], returns[0.02])
+
+        rejected = optimizer.optimize({'BTCUSDT': make_candles(200)}, {'rsi_settings.period': [10]}, method='grid')
+        self.assertEqual(rejected['failed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
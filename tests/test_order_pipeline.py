@@ -0,0 +1,248 @@
+import threading
+import time
+import unittest
+from unittest import mock
+from config.trading_config import TradingConfig
+from modules.order_manager import OrderManager
+from modules.position_manager import PositionManager
+from modules.rate_limiter import RateLimiter
+
+
+class FakeClient:
+    """Клиент ByBit: place_order ждет события release, статусы ордеров - постранично"""
+
+    testnet = False
+
+    def __init__(self, open_orders=None, history=None):
+        self.release = threading.Event()
+        self.placed = []
+        self.active = 0
+        self.max_active = 0
+        self.open_order_pages = open_orders or []
+        self.history = history or []
+        self.status_calls = []
+        self.orders_by_link = {}  # orderLinkId -> ордер на бирже
+        self.fail_place = False
+        self._lock = threading.Lock()
+
+    def place_order(self, **params):
+        with self._lock:
+            self.placed.append(params)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.release.wait(5)
+        with self._lock:
+            self.active -= 1
+        if self.fail_place:
+            raise ConnectionError("Read timed out")
+        return {'retCode': 0, 'result': {'orderId': f"oid-{len(self.placed)}"}}
+
+    def _find_by_link(self, params):
+        order = self.orders_by_link.get(params['orderLinkId'])
+        return {'retCode': 0, 'result': {'list': [order] if order else []}}
+
+    def get_open_orders(self, **params):
+        if 'orderLinkId' in params:
+            return self._find_by_link(params)
+        self.status_calls.append(('realtime', params))
+        page = int(params.get('cursor') or 0)
+        next_cursor = str(page + 1) if page + 1 < len(self.open_order_pages) else ''
+        return {'retCode': 0, 'result': {'list': self.open_order_pages[page], 'nextPageCursor': next_cursor}}
+
+    def get_order_history(self, **params):
+        if 'orderLinkId' in params:
+            return self._find_by_link(params)
+        self.status_calls.append(('history', params))
+        return {'retCode': 0, 'result': {'list': self.history}}
+
+
+class FakeRiskManager:
+    def validate_position(self, symbol, signal):
+        return True
+
+
+def make_manager(client: FakeClient) -> OrderManager:
+    limiter = RateLimiter(limits={'trade': {'rate': 1000, 'capacity': 1000},
+                                  'account': {'rate': 1000, 'capacity': 1000}}, buffer=0.0)
+    return OrderManager(client, rate_limiter=limiter)
+
+
+class TestOrderPipeline(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.manager = make_manager(self.client)
+
+    def tearDown(self):
+        self.client.release.set()
+        self.manager.shutdown()
+
+    def test_duplicate_close_rejected_while_in_flight(self):
+        """Повторное закрытие позиции, пока первое в полете, не уходит на биржу"""
+        first = self.manager.submit_close('BTCUSDT', 'SELL', 0.01)
+        duplicate = self.manager.submit_close('BTCUSDT', 'SELL', 0.01)
+
+        result = duplicate.result(timeout=1)
+        self.assertFalse(result['success'])
+        self.assertTrue(result['duplicate'])
+
+        self.client.release.set()
+        self.assertTrue(first.result(timeout=5)['success'])
+        self.assertEqual(len(self.client.placed), 1)
+        self.assertEqual(self.manager.pipeline_stats['duplicates'], 1)
+
+        # После ответа биржи новое закрытие отправляется с новым orderLinkId
+        second = self.manager.submit_close('BTCUSDT', 'SELL', 0.01).result(timeout=5)
+        self.assertTrue(second['success'])
+        self.assertNotEqual(self.client.placed[0]['orderLinkId'], self.client.placed[1]['orderLinkId'])
+        self.assertEqual(self.manager.get_in_flight(), [])
+
+    def test_explicit_client_order_id(self):
+        """Явный client order ID передается как orderLinkId и защищает от повторной отправки"""
+        first = self.manager.submit_close('ETHUSDT', 'BUY', 0.1, client_order_id='exit-eth-1')
+        duplicate = self.manager.submit_close('SOLUSDT', 'BUY', 1.0, client_order_id='exit-eth-1')
+        other_symbol = self.manager.submit_close('SOLUSDT', 'BUY', 1.0)
+
+        self.assertTrue(duplicate.result(timeout=1)['duplicate'])
+        self.client.release.set()
+        self.assertEqual(first.result(timeout=5)['client_order_id'], 'exit-eth-1')
+        self.assertTrue(other_symbol.result(timeout=5)['success'])
+        self.assertEqual(self.client.placed[0]['orderLinkId'], 'exit-eth-1')
+        self.assertEqual(len(self.client.placed), 2)
+
+    def test_latency_stats(self):
+        """Задержки подтверждения собираются по типам операций"""
+        self.client.release.set()
+        for symbol in ('BTCUSDT', 'ETHUSDT', 'SOLUSDT'):
+            self.manager.submit_close(symbol, 'SELL', 0.01).result(timeout=5)
+
+        stats = self.manager.get_latency_stats()['close']
+        self.assertEqual(stats['count'], 3)
+        self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+        self.assertLessEqual(stats['p99_ms'], stats['max_ms'])
+
+    def test_batched_status_update(self):
+        """Статусы всех ордеров - по страницам realtime и одной странице history"""
+        self.client.open_order_pages = [
+            [{'orderId': 'a', 'orderStatus': 'New'}, {'orderId': 'x', 'orderStatus': 'New'}],
+            [{'orderId': 'b', 'orderStatus': 'PartiallyFilled'}]
+        ]
+        self.client.history = [{'orderId': 'c', 'orderStatus': 'Filled'}]
+        for order_id in ('a', 'b', 'c', 'd'):
+            self.manager.open_orders[order_id] = {'symbol': 'BTCUSDT', 'status': 'NEW'}
+
+        self.manager.update_orders_status()
+
+        self.assertEqual([call[0] for call in self.client.status_calls], ['realtime', 'realtime', 'history'])
+        self.assertEqual(self.manager.open_orders['a']['status'], 'New')
+        self.assertEqual(self.manager.open_orders['b']['status'], 'PartiallyFilled')
+        self.assertNotIn('c', self.manager.open_orders)
+        self.assertNotIn('d', self.manager.open_orders)
+
+    def test_rate_recovers_after_hit(self):
+        """Успешные ответы торговых и account эндпоинтов восстанавливают скорость после rate limit"""
+        limiter = RateLimiter(limits={'trade': {'rate': 100, 'capacity': 100, 'recovery_step': 30},
+                                      'account': {'rate': 100, 'capacity': 100, 'recovery_step': 30}},
+                              buffer=0.0, cooldown=0.0)
+        manager = OrderManager(self.client, rate_limiter=limiter)
+        self.client.release.set()
+        try:
+            limiter.report_rate_limited('trade')
+            limiter.report_rate_limited('account')
+            self.assertEqual(limiter.buckets['trade'].rate, 50)
+            self.assertEqual(limiter.buckets['account'].rate, 50)
+
+            manager.submit_close('BTCUSDT', 'SELL', 0.01).result(timeout=5)
+            self.assertEqual(limiter.buckets['trade'].rate, 80)
+            manager.submit_close('ETHUSDT', 'SELL', 0.01).result(timeout=5)
+            self.assertEqual(limiter.buckets['trade'].rate, 100)
+
+            manager.open_orders['a'] = {'symbol': 'BTCUSDT', 'status': 'NEW'}
+            self.client.open_order_pages = [[{'orderId': 'a', 'orderStatus': 'New'}]]
+            manager.update_orders_status()
+            self.assertGreater(limiter.buckets['account'].rate, 50)
+        finally:
+            manager.shutdown()
+
+    def test_open_timeout_reconciled_from_future(self):
+        """Ответ, пришедший после result_timeout, открывает позицию при сверке"""
+        position_manager = PositionManager(FakeRiskManager(), self.manager)
+        signal = {'direction': 'BUY', 'size': 0.01, 'entry_price': 100.0, 'stop_loss': 98.0, 'take_profit': 104.0}
+
+        with mock.patch.dict(TradingConfig.ORDER_PIPELINE_SETTINGS, {'result_timeout': 0.05}):
+            self.assertTrue(position_manager.open_position('BTCUSDT', signal))
+        self.assertEqual(position_manager.positions, {})
+        self.assertEqual(len(position_manager.pending_orders), 1)
+        self.assertFalse(position_manager.open_position('BTCUSDT', signal))
+
+        self.assertEqual(position_manager.reconcile_pending_orders(), {})
+        self.client.release.set()
+        client_order_id = self.client.placed[0]['orderLinkId']
+        self._wait_until(lambda: client_order_id not in self.manager.get_in_flight())
+
+        self.assertEqual(position_manager.reconcile_pending_orders(), {client_order_id: True})
+        self.assertEqual(position_manager.positions['BTCUSDT']['order_id'], 'oid-1')
+        self.assertEqual(position_manager.pending_orders, {})
+
+    def test_open_timeout_reconciled_by_client_order_id(self):
+        """Ошибка сети после таймаута не отменяет ордер: статус берется с биржи по orderLinkId"""
+        position_manager = PositionManager(FakeRiskManager(), self.manager)
+        signal = {'direction': 'SELL', 'size': 0.01, 'entry_price': 100.0}
+        self.client.fail_place = True
+
+        with mock.patch.dict(TradingConfig.ORDER_PIPELINE_SETTINGS, {'result_timeout': 0.05}):
+            self.assertTrue(position_manager.open_position('ETHUSDT', signal))
+        client_order_id = self.client.placed[0]['orderLinkId']
+        self.client.release.set()
+        self._wait_until(lambda: client_order_id not in self.manager.get_in_flight())
+
+        self.client.orders_by_link[client_order_id] = {
+            'orderId': 'oid-eth', 'symbol': 'ETHUSDT', 'orderStatus': 'PartiallyFilled', 'cumExecQty': '0.004'}
+        self.assertEqual(position_manager.reconcile_pending_orders(), {})
+
+        self.client.orders_by_link[client_order_id].update(orderStatus='PartiallyFilledCanceled', avgPrice='99.9')
+        self.assertEqual(position_manager.reconcile_pending_orders(), {client_order_id: True})
+        self.assertEqual(position_manager.positions['ETHUSDT']['size'], 0.004)
+        self.assertEqual(position_manager.positions['ETHUSDT']['order_id'], 'oid-eth')
+
+    def test_unfilled_timeout_dropped(self):
+        """Ордер, которого биржа не знает после ошибки конвейера, снимается со сверки без позиции"""
+        position_manager = PositionManager(FakeRiskManager(), self.manager)
+        self.client.fail_place = True
+
+        with mock.patch.dict(TradingConfig.ORDER_PIPELINE_SETTINGS, {'result_timeout': 0.05}):
+            position_manager.open_position('SOLUSDT', {'direction': 'BUY', 'size': 1.0, 'entry_price': 100.0})
+        client_order_id = self.client.placed[0]['orderLinkId']
+        self.client.release.set()
+        self._wait_until(lambda: client_order_id not in self.manager.get_in_flight())
+
+        self.assertEqual(position_manager.reconcile_pending_orders(), {client_order_id: False})
+        self.assertEqual(position_manager.positions, {})
+        self.assertEqual(position_manager.pending_orders, {})
+
+    @staticmethod
+    def _wait_until(condition, timeout: float = 5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_close_all_positions_in_parallel(self):
+        """PositionManager отправляет закрытия всех позиций одновременно"""
+        position_manager = PositionManager(FakeRiskManager(), self.manager)
+        for symbol in ('BTCUSDT', 'ETHUSDT', 'SOLUSDT'):
+            position_manager.positions[symbol] = {'direction': 'BUY', 'size': 0.01, 'entry_price': 100.0}
+
+        closer = threading.Thread(target=lambda: setattr(self, 'results',
+                                                         position_manager.close_all_positions('test')))
+        closer.start()
+        while len(self.client.placed) < 3 and closer.is_alive():
+            threading.Event().wait(0.01)
+        self.client.release.set()
+        closer.join(5)
+
+        self.assertEqual(self.client.max_active, 3)
+        self.assertEqual(self.results, {'BTCUSDT': True, 'ETHUSDT': True, 'SOLUSDT': True})
+        self.assertEqual(position_manager.positions, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
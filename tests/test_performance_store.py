@@ -0,0 +1,109 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+import pandas as pd
+from modules.performance_store import PerformanceStore
+from modules.performance_tracker import PerformanceTracker
+
+
+def make_trades(count: int, start: datetime = datetime(2024, 1, 1, 9, 0)):
+    for i in range(count):
+        pnl = 10.0 if i % 3 else -6.0
+        yield {
+            'symbol': 'BTCUSDT' if i % 2 else 'ETHUSDT',
+            'direction': 'BUY',
+            'entry_price': 100.0,
+            'exit_price': 100.0 + pnl,
+            'size': 1.0,
+            'pnl': pnl,
+            'fees': 0.5,
+            'duration': timedelta(minutes=30),
+            'timestamp': start + timedelta(hours=6 * i)
+        }
+
+
+class TestPerformanceStore(unittest.TestCase):
+    def test_reload_matches_in_memory_state(self):
+        """Трекер, загруженный из базы, совпадает с трекером, в который писались сделки"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, 'trades.db')
+            tracker = PerformanceTracker(store=PerformanceStore(path))
+            for trade in make_trades(25):
+                tracker.log_trade(trade)
+            tracker.save_performance_data()
+
+            reloaded = PerformanceTracker(store=PerformanceStore(path))
+            self.assertEqual(len(reloaded.trades), 25)
+            self.assertEqual(reloaded.symbol_performance, tracker.symbol_performance)
+            self.assertEqual(reloaded.daily_stats, tracker.daily_stats)
+            self.assertEqual(reloaded.trades[-1]['duration'], timedelta(minutes=30))
+
+            expected = tracker.get_performance_metrics()
+            actual = reloaded.get_performance_metrics()
+            for key in ('total_pnl', 'win_rate', 'best_trade', 'worst_trade', 'max_drawdown_pct',
+                        'max_consecutive_wins', 'max_consecutive_losses', 'current_streak', 'sharpe_ratio'):
+                self.assertEqual(actual[key], expected[key], key)
+
+            # Новые сделки продолжают нумерацию
+            reloaded.log_trade(next(make_trades(1, datetime(2024, 2, 1))))
+            self.assertEqual(reloaded.trades[-1]['id'], 26)
+            self.assertEqual(reloaded.store.get_meta('performance_metrics')['total_trades'], 25)
+
+    def test_batched_writes_and_wal(self):
+        """Сделки пишутся пачками, база в режиме WAL с индексами по symbol/времени"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = PerformanceStore(Path(tmp_dir, 'trades.db'), {'flush_interval': 3600})
+            tracker = PerformanceTracker(store=store)
+            for trade in make_trades(5):
+                tracker.log_trade(trade)
+            self.assertEqual(store.count_trades(), 0)
+            for trade in make_trades(15, datetime(2024, 2, 1)):
+                tracker.log_trade(trade)
+            self.assertEqual(store.count_trades(), 20)  # flush_every
+            tracker.flush()
+            self.assertEqual(store.count_trades(), 20)
+
+            conn = sqlite3.connect(str(store.path))
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            plan = ' '.join(str(row) for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM trades WHERE symbol = 'BTCUSDT' AND ts >= 0"))
+            self.assertIn('idx_trades_symbol_ts', plan)
+            conn.close()
+
+    def test_range_summary(self):
+        """Агрегаты по символу и диапазону времени запросом к базе"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = PerformanceStore(Path(tmp_dir, 'trades.db'))
+            tracker = PerformanceTracker(store=store)
+            trades = list(make_trades(12))
+            for trade in trades:
+                tracker.log_trade(trade)
+            tracker.flush()
+
+            since = datetime(2024, 1, 2)
+            selected = [t for t in trades if t['symbol'] == 'BTCUSDT' and t['timestamp'] >= since]
+            summary = store.get_summary(symbol='BTCUSDT', since=since)
+            self.assertEqual(summary['trades'], len(selected))
+            self.assertAlmostEqual(summary['net_pnl'], sum(t['pnl'] - t['fees'] for t in selected))
+            self.assertEqual(summary['wins'], len([t for t in selected if t['pnl'] - t['fees'] > 0]))
+            self.assertEqual(store.get_summary(since=datetime(2030, 1, 1))['trades'], 0)
+
+    def test_csv_import(self):
+        """Импорт старого performance_trades_*.csv в базу"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = PerformanceTracker()
+            for trade in make_trades(6):
+                source.log_trade(trade)
+            csv_path = Path(tmp_dir, 'performance_trades.csv')
+            pd.DataFrame(source.trades).to_csv(csv_path, index=False)
+
+            tracker = PerformanceTracker(store=PerformanceStore(Path(tmp_dir, 'trades.db')))
+            self.assertTrue(tracker.load_performance_data(str(csv_path)))
+            self.assertEqual(tracker.store.count_trades(), 6)
+            self.assertAlmostEqual(tracker.total_pnl, source.total_pnl)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from modules.performance_tracker import PerformanceTracker
+
+
+def random_tracker(count: int = 300, seed: int = 11) -> PerformanceTracker:
+    rng = np.random.default_rng(seed)
+    tracker = PerformanceTracker()
+    tracker.set_initial_balance(1000.0)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        entry = float(rng.uniform(50, 150))
+        pnl = float(rng.normal(0.3, 4.0))
+        tracker.log_trade({
+            'symbol': ['BTCUSDT', 'ETHUSDT', 'SOLUSDT'][i % 3],
+            'direction': 'BUY',
+            'entry_price': entry,
+            'exit_price': entry + pnl,
+            'size': 1.0,
+            'pnl': pnl,
+            'fees': 0.1,
+            'duration': timedelta(minutes=int(rng.integers(1, 600))),
+            'timestamp': start + timedelta(hours=i)
+        })
+    return tracker
+
+
+class TestIncrementalMetrics(unittest.TestCase):
+    def test_metrics_match_full_recalculation(self):
+        """Накопительные метрики совпадают с пересчетом по всем сделкам"""
+        tracker = random_tracker()
+        metrics = tracker.get_performance_metrics()
+        net = np.array([t['net_pnl'] for t in tracker.trades])
+        excess = pd.Series([t['roi'] for t in tracker.trades]) - 0.02 / 252
+
+        self.assertEqual(metrics['winning_trades'], int((net > 0).sum()))
+        self.assertAlmostEqual(metrics['avg_win'], round(net[net > 0].mean(), 2))
+        self.assertAlmostEqual(metrics['avg_loss'], round(net[net < 0].mean(), 2))
+        self.assertAlmostEqual(metrics['total_fees'], round(0.1 * len(net), 2))
+        self.assertAlmostEqual(metrics['total_volume'],
+                               round(sum(t['position_value'] for t in tracker.trades), 2))
+        self.assertAlmostEqual(metrics['sharpe_ratio'], round(np.sqrt(252) * excess.mean() / excess.std(), 2))
+        self.assertAlmostEqual(metrics['sortino_ratio'],
+                               round(np.sqrt(252) * excess.mean() / excess[excess < 0].std(), 2))
+        durations = [t['duration'].total_seconds() for t in tracker.trades]
+        self.assertEqual(metrics['avg_trade_duration'], str(timedelta(seconds=np.mean(durations))))
+
+        # Просадка по всей кривой эквити, включая последнюю точку
+        balances = np.array([p['balance'] for p in tracker.equity_curve])
+        peak = np.maximum.accumulate(balances)
+        drawdown = (peak - balances) / peak * 100
+        trough = int(np.argmax(drawdown))
+        peak_index = max(i for i in range(trough + 1) if balances[i] == peak[trough])
+        self.assertAlmostEqual(tracker.max_drawdown, drawdown.max())
+        self.assertEqual(tracker.max_drawdown_duration,
+                         tracker.equity_curve[trough]['timestamp'] - tracker.equity_curve[peak_index]['timestamp'])
+
+    def test_other_risk_free_rate_and_reset(self):
+        """Сортино с другой ставкой пересчитывается, сброс обнуляет накопители"""
+        tracker = random_tracker(50)
+        excess = pd.Series([t['roi'] for t in tracker.trades]) - 0.5 / 252
+        self.assertAlmostEqual(tracker._calculate_sortino_ratio(0.5),
+                               np.sqrt(252) * excess.mean() / excess[excess < 0].std())
+
+        tracker.reset_performance()
+        self.assertEqual(tracker.get_performance_metrics()['total_trades'], 0)
+        self.assertEqual(tracker._calculate_sharpe_ratio(), 0.0)
+        self.assertEqual(tracker.max_drawdown, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
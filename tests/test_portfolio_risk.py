@@ -0,0 +1,133 @@
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from modules.portfolio_risk import PortfolioRiskEngine
+
+START = pd.Timestamp('2024-01-01', tz='UTC')
+SETTINGS = {'ewma_lambda': 0.94, 'window': 500, 'min_observations': 30, 'max_correlation': 0.8,
+            'var_confidence': 0.99, 'horizon_bars': 1, 'max_var_fraction': 0.02, 'stale_bars': 3}
+
+
+def make_prices(count: int, symbols: int, seed: int = 0) -> np.ndarray:
+    """Цены пар: пары 0 и 1 почти совпадают, остальные независимы"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.01, (count, symbols))
+    returns[:, 1] = returns[:, 0] + rng.normal(0, 0.001, count)
+    return 100.0 * np.exp(np.cumsum(returns, axis=0))
+
+
+def frame(prices: np.ndarray, column: int, start: int = 0, end: int = None) -> pd.DataFrame:
+    """Свечи 5m пары; последняя строка - формирующаяся свеча"""
+    closes = prices[start:end, column]
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start=START + pd.Timedelta(minutes=5 * start), periods=len(closes), freq='5min'),
+        'close': closes
+    })
+
+
+class TestPortfolioRiskEngine(unittest.TestCase):
+    def setUp(self):
+        self.symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+        self.prices = make_prices(300, 3)
+
+    def make_engine(self, symbols=None) -> PortfolioRiskEngine:
+        return PortfolioRiskEngine(symbols if symbols is not None else self.symbols, settings=SETTINGS)
+
+    def test_incremental_update_matches_rebuild(self):
+        """Пошаговое EWMA обновление совпадает с пересчетом окна"""
+        incremental = self.make_engine()
+        for i, symbol in enumerate(self.symbols):
+            incremental.observe(symbol, frame(self.prices, i, end=100))
+        for end in range(101, 301):
+            for i, symbol in enumerate(self.symbols):
+                incremental.observe(symbol, frame(self.prices, i, start=end - 50, end=end))
+
+        batch = self.make_engine()
+        for i, symbol in enumerate(self.symbols):
+            batch.observe(symbol, frame(self.prices, i))
+
+        self.assertEqual(incremental.stats['rebuilds'], 3)
+        np.testing.assert_allclose(incremental.get_covariance_matrix().to_numpy(),
+                                   batch.get_covariance_matrix().to_numpy(), rtol=1e-9)
+        corr = batch.get_correlation_matrix()
+        self.assertGreater(corr.loc['BTCUSDT', 'ETHUSDT'], 0.95)
+        self.assertLess(abs(corr.loc['BTCUSDT', 'SOLUSDT']), 0.3)
+
+    def test_correlation_limit_respects_direction(self):
+        """Та же сторона коррелированной пары отклоняется, противоположная (хедж) и независимая - нет"""
+        engine = self.make_engine()
+        for i, symbol in enumerate(self.symbols):
+            engine.observe(symbol, frame(self.prices, i))
+        engine.set_position('BTCUSDT', 'BUY', 1000.0)
+
+        check = engine.check_order('ETHUSDT', 'BUY', 1000.0)
+        self.assertFalse(check['allowed'])
+        self.assertEqual(check['correlated_with'], 'BTCUSDT')
+        self.assertGreater(check['incremental_var'], 0)
+
+        hedge = engine.check_order('ETHUSDT', 'SELL', 1000.0)
+        self.assertTrue(hedge['allowed'])
+        self.assertLess(hedge['portfolio_var_after'], hedge['portfolio_var'])
+        self.assertLess(hedge['marginal_var'], 0)
+
+        self.assertTrue(engine.check_order('SOLUSDT', 'BUY', 1000.0)['allowed'])
+        engine.clear_position('BTCUSDT')
+        self.assertTrue(engine.check_order('ETHUSDT', 'BUY', 1000.0)['allowed'])
+        self.assertEqual(engine.stats['rejected'], 1)
+
+    def test_var_limit_and_warmup(self):
+        """VaR ограничен долей баланса; без истории корреляция пары не учитывается"""
+        engine = self.make_engine()
+        engine.set_position('BTCUSDT', 'BUY', 1000.0)
+        self.assertTrue(engine.check_order('ETHUSDT', 'BUY', 1000.0)['allowed'])
+
+        for i, symbol in enumerate(self.symbols):
+            engine.observe(symbol, frame(self.prices, i))
+        engine.update_balance(1000.0)
+        check = engine.check_order('SOLUSDT', 'BUY', 5000.0)
+        self.assertFalse(check['allowed'])
+        self.assertIn('VaR', check['reason'])
+        self.assertTrue(engine.check_order('SOLUSDT', 'BUY', 10.0)['allowed'])
+
+    def test_new_symbol_and_stale_symbol(self):
+        """Новая пара пересчитывает окно, отстающая пара не задерживает обновление остальных"""
+        engine = self.make_engine(symbols=[])
+        engine.observe('BTCUSDT', frame(self.prices, 0, end=200))
+        engine.observe('ETHUSDT', frame(self.prices, 1, end=200))
+        self.assertEqual(engine.symbols, ['BTCUSDT', 'ETHUSDT'])
+        self.assertEqual(engine.stats['rebuilds'], 2)
+
+        # Свеча закрыта только у BTCUSDT - ждем ETHUSDT
+        bars = engine.stats['bars']
+        engine.observe('BTCUSDT', frame(self.prices, 0, start=150, end=201))
+        self.assertEqual(engine.stats['bars'], bars)
+
+        # ETHUSDT отстала больше stale_bars свечей - BTCUSDT обновляется без нее
+        engine.observe('BTCUSDT', frame(self.prices, 0, start=150, end=261))
+        self.assertEqual(engine.stats['bars'], bars + 61)  # Свечи 199..259
+
+        engine.observe('ETHUSDT', frame(self.prices, 1, start=150, end=261))
+        self.assertEqual(engine.stats['rebuilds'], 3)
+        self.assertGreater(engine.get_correlation_matrix().loc['BTCUSDT', 'ETHUSDT'], 0.95)
+
+    def test_check_order_is_sub_millisecond(self):
+        """Проверка заявки при 60 парах занимает меньше миллисекунды"""
+        symbols = [f"PAIR{i}USDT" for i in range(60)]
+        prices = make_prices(300, 60, seed=1)
+        engine = self.make_engine(symbols)
+        for i, symbol in enumerate(symbols):
+            engine.observe(symbol, frame(prices, i))
+        for symbol in symbols[2:12]:
+            engine.set_position(symbol, 'BUY', 500.0)
+
+        engine.check_order('PAIR0USDT', 'BUY', 500.0)
+        runs = 2000
+        started = time.perf_counter()
+        for _ in range(runs):
+            engine.check_order('PAIR0USDT', 'BUY', 500.0)
+        self.assertLess((time.perf_counter() - started) / runs, 0.001)
+
+
+if __name__ == '__main__':
+    unittest.main()
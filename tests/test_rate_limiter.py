@@ -0,0 +1,70 @@
+import unittest
+import time
+from modules.rate_limiter import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        """Лимитер с маленькими лимитами для быстрых тестов"""
+        self.limiter = RateLimiter(
+            limits={
+                'market': {'rate': 20, 'capacity': 2},
+                'trade': {'rate': 10, 'capacity': 1}
+            },
+            buffer=0.0,
+            cooldown=0.2
+        )
+
+    def test_burst_without_wait(self):
+        """Запросы в пределах capacity проходят без ожидания"""
+        self.assertEqual(self.limiter.acquire('market'), 0.0)
+        self.assertEqual(self.limiter.acquire('market'), 0.0)
+
+    def test_wait_when_bucket_empty(self):
+        """После исчерпания токенов запрос ждет пополнения"""
+        self.limiter.acquire('trade')
+        start = time.monotonic()
+        wait = self.limiter.acquire('trade')
+        elapsed = time.monotonic() - start
+
+        self.assertGreater(wait, 0.05)
+        self.assertGreaterEqual(elapsed, wait * 0.9)
+
+    def test_buckets_are_independent(self):
+        """Классы эндпоинтов не расходуют токены друг друга"""
+        self.limiter.acquire('trade')
+        self.assertEqual(self.limiter.acquire('market'), 0.0)
+
+    def test_rate_limit_error_reduces_rate(self):
+        """Ошибка rate limit снижает скорость и включает паузу"""
+        self.limiter.report_rate_limited('market')
+        metrics = self.limiter.get_metrics()['market']
+
+        self.assertEqual(metrics['rate'], 10.0)
+        self.assertEqual(metrics['rate_limit_hits'], 1)
+        self.assertGreater(self.limiter.acquire('market'), 0.1)
+
+        for _ in range(100):
+            self.limiter.report_success('market')
+        self.assertEqual(self.limiter.get_metrics()['market']['rate'], 20.0)
+
+    def test_metrics(self):
+        """Метрики учитывают запросы, токены и время ожидания"""
+        for _ in range(3):
+            self.limiter.acquire('market')
+        metrics = self.limiter.get_metrics()['market']
+
+        self.assertEqual(metrics['requests'], 3)
+        self.assertEqual(metrics['tokens_used'], 3.0)
+        self.assertEqual(metrics['waited_requests'], 1)
+        self.assertGreater(metrics['total_wait_time'], 0.0)
+
+    def test_is_rate_limit_error(self):
+        """Распознавание ошибок rate limit ByBit"""
+        self.assertTrue(RateLimiter.is_rate_limit_error("10006 Too many visits!"))
+        self.assertTrue(RateLimiter.is_rate_limit_error(Exception("Rate limit exceeded")))
+        self.assertFalse(RateLimiter.is_rate_limit_error("10001 params error"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import tempfile
+import unittest
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from unittest import mock
+import strategies.strategy_factory as strategy_factory
+from strategies.strategy_factory import StrategyFactory, register_strategy
+
+MODULE_SOURCE = '''
+class LazyStrategy:
+    """Стратегия для проверки отложенного импорта"""
+
+    def __init__(self, market_analyzer, position_manager):
+        self.name = "LazyStrategy"
+        self.market_analyzer = market_analyzer
+        self.position_manager = position_manager
+'''
+
+
+class TestStrategyRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.module_name = f"lazy_strategy_{id(self)}"
+        Path(self.tmp_dir.name, f"{self.module_name}.py").write_text(MODULE_SOURCE, encoding='utf-8')
+        sys.path.insert(0, self.tmp_dir.name)
+
+        self.registry = dict(strategy_factory.STRATEGY_REGISTRY)
+        self.loaded = dict(strategy_factory._loaded_classes)
+        self.entry_points_loaded = strategy_factory._entry_points_loaded
+
+    def tearDown(self):
+        strategy_factory.STRATEGY_REGISTRY.clear()
+        strategy_factory.STRATEGY_REGISTRY.update(self.registry)
+        strategy_factory._loaded_classes.clear()
+        strategy_factory._loaded_classes.update(self.loaded)
+        strategy_factory._entry_points_loaded = self.entry_points_loaded
+        sys.path.remove(self.tmp_dir.name)
+        sys.modules.pop(self.module_name, None)
+        self.tmp_dir.cleanup()
+
+    def test_module_imported_on_first_use(self):
+        """Модуль стратегии импортируется только при создании, класс кэшируется"""
+        register_strategy('lazy', f"{self.module_name}:LazyStrategy")
+        factory = StrategyFactory()
+        self.assertTrue(factory.validate_strategy_name('lazy'))
+        self.assertIn('lazy', factory.get_available_strategies())
+        self.assertNotIn(self.module_name, sys.modules)
+
+        strategy = factory.create_strategy('lazy', market_analyzer=None, position_manager=None)
+        self.assertEqual(strategy.name, "LazyStrategy")
+        self.assertIn(self.module_name, sys.modules)
+        self.assertIs(factory.get_strategy_class('lazy'), type(strategy))
+        self.assertEqual(factory.get_strategy_info('lazy')['class_name'], 'LazyStrategy')
+
+    def test_entry_points_discovered_without_import(self):
+        """Стратегии из entry points добавляются в реестр, встроенные названия не переопределяются"""
+        strategy_factory._entry_points_loaded = False
+        discovered = [EntryPoint('plugin_lazy', f"{self.module_name}:LazyStrategy", strategy_factory.ENTRY_POINT_GROUP),
+                      EntryPoint('momentum', f"{self.module_name}:LazyStrategy", strategy_factory.ENTRY_POINT_GROUP)]
+        with mock.patch.object(strategy_factory, 'entry_points', return_value=discovered) as found:
+            factory = StrategyFactory()
+            StrategyFactory()
+        found.assert_called_once_with(group=strategy_factory.ENTRY_POINT_GROUP)
+
+        self.assertNotIn(self.module_name, sys.modules)
+        self.assertEqual(factory.get_strategy_class('plugin_lazy').__name__, 'LazyStrategy')
+        self.assertEqual(strategy_factory.STRATEGY_REGISTRY['momentum'],
+                         'strategies.momentum_strategy:MomentumStrategy')
+
+    def test_unknown_strategy(self):
+        factory = StrategyFactory()
+        self.assertIsNone(factory.get_strategy_class('missing'))
+        self.assertIsNone(factory.create_strategy('missing', None, None))
+        self.assertIsNone(factory.get_strategy_info('missing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import numpy as np
+import pandas as pd
+import ta
+from modules.market_analyzer import MarketAnalyzer
+from modules.streaming_indicators import (
+    StreamingEMA, StreamingRSI, StreamingMACD, StreamingATR,
+    StreamingBollinger, StreamingStochastic, StreamingIndicatorSet
+)
+
+
+def make_candles(count: int = 500, seed: int = 11) -> pd.DataFrame:
+    """Случайное блуждание 5m с плоскими участками (нулевые изменения цены)"""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 1, count)
+    steps[100:110] = 0.0
+    close = 100 + np.cumsum(steps)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=count, freq='5min', tz='UTC'),
+        'open': close,
+        'high': close + np.abs(rng.normal(0, 1, count)),
+        'low': close - np.abs(rng.normal(0, 1, count)),
+        'close': close,
+        'volume': rng.uniform(10, 100, count)
+    })
+
+
+def stream(indicator, *columns):
+    """Прогон индикатора по барам; список результатов update()"""
+    return [indicator.update(*values) for values in zip(*columns)]
+
+
+class TestStreamingIndicators(unittest.TestCase):
+    def setUp(self):
+        self.df = make_candles()
+        self.high = self.df['high'].tolist()
+        self.low = self.df['low'].tolist()
+        self.close = self.df['close'].tolist()
+
+    def assert_series_close(self, actual, expected):
+        np.testing.assert_allclose(np.asarray(actual, dtype=np.float64), expected.to_numpy(),
+                                   rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    def test_ema(self):
+        """EMA совпадает с ta"""
+        expected = ta.trend.EMAIndicator(self.df['close'], window=21).ema_indicator()
+        self.assert_series_close(stream(StreamingEMA(21), self.close), expected)
+
+    def test_rsi(self):
+        """RSI совпадает с ta, включая участок без изменений цены"""
+        expected = ta.momentum.RSIIndicator(self.df['close'], window=14).rsi()
+        self.assert_series_close(stream(StreamingRSI(14), self.close), expected)
+
+    def test_macd(self):
+        """MACD, сигнальная линия и гистограмма совпадают с ta"""
+        macd = ta.trend.MACD(self.df['close'], window_fast=12, window_slow=26, window_sign=9)
+        values = np.array(stream(StreamingMACD(12, 26, 9), self.close))
+        self.assert_series_close(values[:, 0], macd.macd())
+        self.assert_series_close(values[:, 1], macd.macd_signal())
+        self.assert_series_close(values[:, 2], macd.macd_diff())
+
+    def test_atr(self):
+        """ATR совпадает с ta (нули до заполнения окна)"""
+        expected = ta.volatility.AverageTrueRange(
+            self.df['high'], self.df['low'], self.df['close'], window=14).average_true_range()
+        self.assert_series_close(stream(StreamingATR(14), self.high, self.low, self.close), expected)
+
+    def test_bollinger(self):
+        """Полосы Боллинджера совпадают с ta"""
+        bb = ta.volatility.BollingerBands(self.df['close'], window=20, window_dev=2)
+        values = np.array(stream(StreamingBollinger(20, 2), self.close))
+        self.assert_series_close(values[:, 0], bb.bollinger_hband())
+        self.assert_series_close(values[:, 1], bb.bollinger_mavg())
+        self.assert_series_close(values[:, 2], bb.bollinger_lband())
+
+    def test_stochastic(self):
+        """%K и %D совпадают с ta"""
+        stoch = ta.momentum.StochasticOscillator(
+            self.df['high'], self.df['low'], self.df['close'], window=14, smooth_window=3)
+        values = np.array(stream(StreamingStochastic(14, 3), self.high, self.low, self.close))
+        self.assert_series_close(values[:, 0], stoch.stoch())
+        self.assert_series_close(values[:, 1], stoch.stoch_signal())
+
+    def test_indicator_set_matches_market_analyzer(self):
+        """Последние значения набора совпадают с MarketAnalyzer.calculate_indicators"""
+        history, last_bar = self.df.iloc[:-1], self.df.iloc[-1]
+        indicator_set = StreamingIndicatorSet.from_dataframe(history)
+
+        self.assertTrue(indicator_set.update(last_bar['high'], last_bar['low'], last_bar['close'],
+                                             last_bar['timestamp']))
+        self.assertFalse(indicator_set.update(last_bar['high'], last_bar['low'], last_bar['close'],
+                                              last_bar['timestamp']))
+
+        expected = MarketAnalyzer(data_fetcher=None).calculate_indicators(self.df, 'STREAMTEST').iloc[-1]
+        for column, value in indicator_set.latest().items():
+            self.assertAlmostEqual(value, expected[column], places=8, msg=column)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+import pandas as pd
+from modules.market_analyzer import MarketAnalyzer
+
+
+def make_candles(count: int, seed: int = 3) -> pd.DataFrame:
+    """Случайное блуждание с округлением цен (повторяющиеся экстремумы и касания)"""
+    rng = np.random.default_rng(seed)
+    close = np.round(100 + np.cumsum(rng.normal(0, 0.3, count)), 1)
+    return pd.DataFrame({
+        'open': close,
+        'high': close + np.round(np.abs(rng.normal(0, 0.2, count)), 1),
+        'low': close - np.round(np.abs(rng.normal(0, 0.2, count)), 1),
+        'close': close,
+        'volume': 1.0
+    }, index=pd.date_range('2024-01-01', periods=count, freq='5min', tz='UTC'))
+
+
+def reference_levels(df: pd.DataFrame, lookback: int, window: int = 5, tolerance: float = 0.001):
+    """Побарный поиск уровней (прежняя реализация) для сверки"""
+    recent = df.tail(lookback)
+    lows, highs = recent['low'], recent['high']
+    full_touches = lookback * 0.2
+    levels = []
+    for i in range(window, len(recent) - window):
+        low, high = lows.iloc[i], highs.iloc[i]
+        if low <= lows.iloc[i - window:i].min() and low <= lows.iloc[i + 1:i + window + 1].min():
+            touches = len(recent[abs(lows - low) / low <= tolerance])
+            levels.append((i, 0, 'SUPPORT', low, min(touches / full_touches, 1.0), recent.index[i]))
+        if high >= highs.iloc[i - window:i].max() and high >= highs.iloc[i + 1:i + window + 1].max():
+            touches = len(recent[abs(highs - high) / high <= tolerance])
+            levels.append((i, 1, 'RESISTANCE', high, min(touches / full_touches, 1.0), recent.index[i]))
+    levels.sort(key=lambda x: (-x[4], -x[0], x[1]))
+    return [level[2:] for level in levels[:5]]
+
+
+class TestSupportResistance(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = MarketAnalyzer(data_fetcher=None)
+
+    def test_matches_reference(self):
+        """Уровни совпадают с побарной реализацией"""
+        for lookback in (50, 300, 2000):
+            df = make_candles(2500, seed=lookback)
+            expected = reference_levels(df, lookback)
+            actual = [(level['type'], level['price'], level['strength'], level['timestamp'])
+                      for level in self.analyzer._find_support_resistance(df, lookback)]
+            self.assertEqual(len(actual), len(expected))
+            for got, want in zip(actual, expected):
+                self.assertEqual(got[0], want[0])
+                self.assertAlmostEqual(got[1], want[1])
+                self.assertAlmostEqual(got[2], want[2])
+                self.assertEqual(got[3], want[3])
+
+    def test_long_lookback_prefers_recent_levels(self):
+        """На длинном lookback сила не насыщается, равные по силе уровни - самые свежие"""
+        df = make_candles(2500, seed=7)
+        strengths = [level['strength'] for level in self.analyzer._find_support_resistance(df, 2000)]
+        self.assertLess(max(strengths), 1.0)
+
+        # Периодичная цена: все экстремумы одинаковы и касаются уровня одинаковое число раз
+        count = 1000
+        close = 100 + np.round(np.sin(2 * np.pi * np.arange(count) / 20), 3)
+        periodic = pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1.0},
+                                index=pd.date_range('2024-01-01', periods=count, freq='5min', tz='UTC'))
+        levels = self.analyzer._find_support_resistance(periodic, count)
+
+        self.assertEqual(len({level['strength'] for level in levels}), 1)
+        self.assertEqual([level['timestamp'] for level in levels], list(periodic.index[[985, 975, 965, 955, 945]]))
+        self.assertEqual([level['type'] for level in levels],
+                         ['RESISTANCE', 'SUPPORT', 'RESISTANCE', 'SUPPORT', 'RESISTANCE'])
+
+    def test_insufficient_data(self):
+        """Данных меньше lookback - уровней нет"""
+        self.assertEqual(self.analyzer._find_support_resistance(make_candles(40), 50), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+from unittest import mock
+from modules.fill_model import FillModel
+from modules.order_manager import OrderManager
+from modules.rate_limiter import RateLimiter
+from modules.ticker_cache import TickerCache
+
+
+class FakeFetcher:
+    """DataFetcher: считает запросы цены, может вернуть None (источник недоступен)"""
+
+    def __init__(self, price=100.0):
+        self.price = price
+        self.calls = 0
+
+    def get_current_price(self, symbol):
+        self.calls += 1
+        return self.price
+
+
+class TestnetClient:
+    testnet = True
+
+
+NO_LATENCY = {'latency_ms': (0.0, 0.0), 'seed': 1}
+
+
+def make_manager(fetcher, fill_settings=None) -> OrderManager:
+    limiter = RateLimiter(limits={'trade': {'rate': 1000, 'capacity': 1000}}, buffer=0.0)
+    return OrderManager(TestnetClient(), rate_limiter=limiter,
+                        price_source=TickerCache(fetcher, ttl=60),
+                        fill_model=FillModel({**NO_LATENCY, **(fill_settings or {})}))
+
+
+class TestTickerCache(unittest.TestCase):
+    def test_ttl_and_stale_fallback(self):
+        """Свежая цена берется из кэша, при недоступном источнике - последняя в пределах max_age"""
+        fetcher = FakeFetcher(100.0)
+        cache = TickerCache(fetcher, ttl=5, max_age=60)
+
+        with mock.patch('modules.ticker_cache.time.monotonic', return_value=1000.0):
+            self.assertEqual(cache.get_price('BTCUSDT'), 100.0)
+            self.assertEqual(cache.get_price('BTCUSDT'), 100.0)
+        self.assertEqual(fetcher.calls, 1)
+
+        fetcher.price = None
+        with mock.patch('modules.ticker_cache.time.monotonic', return_value=1010.0):
+            self.assertEqual(cache.get_price('BTCUSDT'), 100.0)
+        with mock.patch('modules.ticker_cache.time.monotonic', return_value=1100.0):
+            self.assertIsNone(cache.get_price('BTCUSDT'))
+        self.assertEqual(cache.get_stats()['stale'], 1)
+
+    def test_prefers_stream_source(self):
+        """MarketDataFeed используется через get_last_price"""
+        feed = mock.Mock(spec=['get_last_price'])
+        feed.get_last_price.return_value = 42.0
+        self.assertEqual(TickerCache(feed).get_price('SOLUSDT'), 42.0)
+
+
+class TestFillModel(unittest.TestCase):
+    def test_slippage_against_trade(self):
+        """Проскальзывание всегда против сделки и в заданных границах"""
+        model = FillModel({**NO_LATENCY, 'slippage': 'uniform', 'slippage_min': 0.001, 'slippage_max': 0.002})
+        for _ in range(50):
+            buy = model.fill('BTCUSDT', 'BUY', 1.0, 100.0)
+            sell = model.fill('BTCUSDT', 'SELL', 1.0, 100.0)
+            self.assertTrue(100.1 <= buy['price'] <= 100.2)
+            self.assertTrue(99.8 <= sell['price'] <= 99.9)
+
+    def test_partial_fills(self):
+        """Частичное исполнение не меньше min_fill_ratio"""
+        model = FillModel({**NO_LATENCY, 'partial_fill_probability': 1.0, 'min_fill_ratio': 0.6})
+        fill = model.fill('BTCUSDT', 'BUY', 10.0, 100.0)
+        self.assertTrue(fill['partial'])
+        self.assertTrue(6.0 <= fill['filled_qty'] < 10.0)
+
+    def test_unknown_distribution(self):
+        """Неизвестное распределение проскальзывания - ошибка конфигурации"""
+        with self.assertRaises(ValueError):
+            FillModel({'slippage': 'cauchy'})
+
+
+class TestOrderManagerSimulation(unittest.TestCase):
+    def test_orders_share_price_source(self):
+        """Ордера в TESTNET не создают DataFetcher и берут цену из общего кэша"""
+        fetcher = FakeFetcher(2500.0)
+        manager = make_manager(fetcher, {'slippage': 'fixed', 'slippage_min': 0.001})
+        try:
+            with mock.patch('modules.data_fetcher.DataFetcher') as data_fetcher:
+                opened = manager.place_order('ETHUSDT', 'BUY', 0.5)
+                closed = manager.close_position('ETHUSDT', 'SELL', 0.5)
+            data_fetcher.assert_not_called()
+        finally:
+            manager.shutdown()
+
+        self.assertEqual(fetcher.calls, 1)
+        self.assertAlmostEqual(opened['price'], 2502.5)
+        self.assertAlmostEqual(closed['price'], 2497.5)
+        self.assertEqual(opened['filled_qty'], 0.5)
+
+    def test_no_price_rejects_order(self):
+        """Без цены ордер отклоняется, вместо подстановки фиксированной цены"""
+        manager = make_manager(FakeFetcher(None))
+        try:
+            result = manager.place_order('ETHUSDT', 'BUY', 0.5)
+        finally:
+            manager.shutdown()
+        self.assertFalse(result['success'])
+        self.assertEqual(manager.open_orders, {})
+
+    def test_partial_fill_closes_order(self):
+        """Частично исполненный ордер отражается в статусе и снимается при обновлении"""
+        manager = make_manager(FakeFetcher(100.0), {'partial_fill_probability': 1.0})
+        try:
+            result = manager.place_order('ETHUSDT', 'BUY', 1.0)
+            status = manager.get_order_status('ETHUSDT', result['order_id'])
+            manager.update_orders_status()
+        finally:
+            manager.shutdown()
+        self.assertLess(result['filled_qty'], 1.0)
+        self.assertEqual(status['status'], 'PARTIALLY_FILLED_CANCELED')
+        self.assertEqual(status['filled_qty'], result['filled_qty'])
+        self.assertEqual(manager.open_orders, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
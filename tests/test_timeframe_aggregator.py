@@ -0,0 +1,115 @@
+import unittest
+import numpy as np
+import pandas as pd
+from modules.timeframe_aggregator import TimeframeAggregator, normalize_interval
+
+START = pd.Timestamp('2024-01-01 00:03', tz='UTC')  # Окно начинается внутри 5m/15m/1h интервалов
+
+
+def make_bars(start: pd.Timestamp, count: int, minutes: int = 1, seed: int = 0) -> pd.DataFrame:
+    """Случайное блуждание цены с шагом minutes"""
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0, 1, count))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start=start, periods=count, freq=f'{minutes}min'),
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.random(count),
+        'low': np.minimum(open_, close) - rng.random(count),
+        'close': close,
+        'volume': rng.random(count) * 10
+    })
+
+
+def resample(df: pd.DataFrame, minutes: int) -> pd.DataFrame:
+    """Эталон: pandas resample по UTC"""
+    result = df.set_index('timestamp').resample(f'{minutes}min').agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    return result.dropna().reset_index()
+
+
+class FakeFetcher:
+    """Имитация DataFetcher: история старших таймфреймов"""
+
+    def __init__(self, bars: dict):
+        self.bars = bars
+        self.calls = []
+
+    def get_kline(self, symbol, interval, start_time, end_time, limit=200):
+        self.calls.append(interval)
+        df = self.bars[interval]
+        start = pd.Timestamp(start_time, unit='ms', tz='UTC')
+        end = pd.Timestamp(end_time, unit='ms', tz='UTC')
+        return df[(df['timestamp'] >= start) & (df['timestamp'] <= end)].iloc[-limit:].reset_index(drop=True)
+
+
+class TestTimeframeAggregator(unittest.TestCase):
+    def setUp(self):
+        self.base = make_bars(START, 300)
+        self.aggregator = TimeframeAggregator(['1', '5', '15', '1h'], base_interval='1', max_bars=500)
+
+    def assert_matches_resample(self, view: dict, base: pd.DataFrame):
+        for interval, minutes in (('5', 5), ('15', 15), ('1h', 60)):
+            expected = resample(base, minutes)
+            # Первый интервал окна неполный и не собирается из базовых свечей
+            expected = expected[expected['timestamp'] >= base['timestamp'].iloc[0].ceil(f'{minutes}min')]
+            pd.testing.assert_frame_equal(view[interval].reset_index(drop=True), expected.reset_index(drop=True),
+                                          check_dtype=False, check_index_type=False)
+
+    def test_matches_pandas_resample(self):
+        """Старшие таймфреймы совпадают с resample, последний интервал - формирующийся"""
+        view = self.aggregator.sync('BTCUSDT', self.base)
+        self.assert_matches_resample(view, self.base)
+        pd.testing.assert_frame_equal(view['1'], self.base, check_dtype=False)
+        self.assertEqual(normalize_interval('1h'), '60')
+
+    def test_incremental_sync_and_forming_bar(self):
+        """Догоняющее обновление сворачивает только новые свечи, формирующаяся свеча обновляется на месте"""
+        self.aggregator.sync('BTCUSDT', self.base.iloc[:200])
+        forming = self.base.iloc[200:201].copy()
+        forming[['high', 'close']] = [500.0, 499.0]
+        view = self.aggregator.sync('BTCUSDT', pd.concat([self.base.iloc[150:200], forming]))
+        self.assertEqual(view['5']['high'].iloc[-1], 500.0)
+        self.assertEqual(view['5']['close'].iloc[-1], 499.0)
+
+        base_bars = self.aggregator.stats['base_bars']
+        view = self.aggregator.sync('BTCUSDT', self.base.iloc[100:])
+        self.assert_matches_resample(view, self.base)
+        self.assertEqual(self.aggregator.stats['base_bars'] - base_bars, 99)
+        self.assertEqual(self.aggregator.stats['seeds'], 1)
+
+    def test_update_reports_closed_timeframes(self):
+        """Интервал закрывается, когда в старший таймфрейм сворачивается свеча следующего интервала"""
+        self.aggregator.sync('BTCUSDT', self.base.iloc[:117])  # Последняя свеча 01:59
+        self.assertEqual(self.aggregator.update('BTCUSDT', self.base.iloc[117].to_dict()), ['1'])
+        self.assertEqual(self.aggregator.update('BTCUSDT', self.base.iloc[118].to_dict()), ['1', '5', '15', '1h'])
+        self.assertEqual(self.aggregator.update('BTCUSDT', self.base.iloc[100].to_dict()), [])
+        self.assertEqual(self.aggregator.stats['late_updates'], 1)
+        self.assertEqual(self.aggregator.update('ETHUSDT', self.base.iloc[0].to_dict()), [])
+
+    def test_gap_rebuilds_from_history(self):
+        """Разрыв в базовом ряду - перестроение, история до окна загружается через REST"""
+        fetcher = FakeFetcher({'5': resample(make_bars(START - pd.Timedelta(hours=10), 1000, seed=1), 5),
+                               '15': resample(make_bars(START - pd.Timedelta(hours=10), 1000, seed=2), 15),
+                               '60': resample(make_bars(START - pd.Timedelta(hours=10), 1000, seed=3), 60)})
+        aggregator = TimeframeAggregator(['5', '15', '1h'], base_interval='1', max_bars=50, history_fetcher=fetcher)
+        aggregator.sync('BTCUSDT', self.base.iloc[:100])
+        self.assertEqual(sorted(fetcher.calls), ['15', '5', '60'])
+
+        view = aggregator.sync('BTCUSDT', self.base.iloc[200:])
+        self.assertEqual(aggregator.stats['seeds'], 2)
+        self.assertEqual(len(view['5']), 50)
+        first_complete = self.base['timestamp'].iloc[200].ceil('5min')
+        history = view['5'][view['5']['timestamp'] < first_complete]
+        self.assertTrue((history['timestamp'].diff().dropna() == pd.Timedelta(minutes=5)).all())
+        self.assertEqual(view['5']['timestamp'].iloc[-1], self.base['timestamp'].iloc[-1].floor('5min'))
+
+    def test_rejects_unaligned_interval(self):
+        with self.assertRaises(ValueError):
+            TimeframeAggregator(['W'], base_interval='1')
+        with self.assertRaises(ValueError):
+            TimeframeAggregator(['3'], base_interval='5')
+
+
+if __name__ == '__main__':
+    unittest.main()
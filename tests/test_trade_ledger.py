@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+from config.trading_config import TradingConfig
+from modules.performance_store import PerformanceStore
+from modules.performance_tracker import PerformanceTracker
+from modules.trade_ledger import TradeLedger, OrderRecord, TradeRecord
+
+
+def make_order(i: int) -> dict:
+    return {'order_id': f"O{i}", 'symbol': 'BTCUSDT', 'side': 'Buy', 'quantity': 0.1 * (i + 1),
+            'price': 100.0 + i, 'order_type': 'Market', 'stop_loss': None, 'take_profit': None,
+            'status': 'FILLED' if i % 4 else 'NEW', 'timestamp': f"2024-01-01T00:{i % 60:02d}:00",
+            'simulated': i % 2 == 0, 'extra': 'ignored'}
+
+
+class TestTradeLedger(unittest.TestCase):
+    def test_window_spill_and_counts(self):
+        """Старые записи выгружаются пачкой, счетчики и len() учитывают всю историю"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spill = Path(tmp_dir, 'orders.jsonl')
+            ledger = TradeLedger(OrderRecord, window=8, spill_path=str(spill), count_fields=('status', 'simulated'))
+            for i in range(10):
+                ledger.append(make_order(i))
+            self.assertEqual(ledger.in_memory, 10)  # Порог: окно + четверть
+            self.assertFalse(spill.exists())
+
+            for i in range(10, 40):
+                ledger.append(make_order(i))
+            self.assertEqual(len(ledger), 40)
+            self.assertLessEqual(ledger.in_memory, 10)
+            self.assertEqual(ledger[-1]['order_id'], 'O39')
+            self.assertEqual(ledger.counts('status'), {'NEW': 10, 'FILLED': 30})
+            self.assertEqual(ledger.counts('simulated')[True], 20)
+
+            spilled = list(ledger.read_spilled())
+            self.assertEqual(len(spilled), ledger.evicted)
+            self.assertEqual(spilled[0]['order_id'], 'O0')
+            frame = ledger.to_frame(include_spilled=True)
+            self.assertEqual(frame['order_id'].tolist(), [f"O{i}" for i in range(40)])
+
+            ledger.clear()
+            self.assertEqual(len(ledger), 0)
+            self.assertFalse(spill.exists())
+
+    def test_column_cache_follows_window(self):
+        """Числовой столбец окна дополняется новыми записями и сдвигается при вытеснении"""
+        ledger = TradeLedger(OrderRecord, window=4)
+        for i in range(5):
+            ledger.append(make_order(i))
+        np.testing.assert_allclose(ledger.column('price'), [100, 101, 102, 103, 104])
+
+        ledger.append(make_order(5))  # Вытеснение без файла выгрузки - записи отбрасываются
+        np.testing.assert_allclose(ledger.column('price'), [102, 103, 104, 105])
+        self.assertEqual(len(ledger), 6)
+
+    def test_record_dict_access(self):
+        """Запись со __slots__ читается как словарь"""
+        record = OrderRecord.from_dict(make_order(1))
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual(record['symbol'], 'BTCUSDT')
+        self.assertIsNone(record.get('client_order_id'))
+        self.assertEqual(record.get('missing', 'x'), 'x')
+        with self.assertRaises(KeyError):
+            record['missing']
+        self.assertNotIn('extra', record.to_dict())
+
+    def test_tracker_window_with_store(self):
+        """С хранилищем трекер держит в памяти окно сделок, метрики считаются по всей истории"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            settings = TradingConfig.PERFORMANCE_SETTINGS
+            original = settings['trade_window']
+            settings['trade_window'] = 10
+            try:
+                tracker = PerformanceTracker(store=PerformanceStore(Path(tmp_dir, 'trades.db')))
+                for i in range(50):
+                    tracker.log_trade({'symbol': 'BTCUSDT', 'entry_price': 100.0, 'exit_price': 101.0, 'size': 1.0,
+                                       'pnl': 1.0 if i % 2 else -1.0, 'duration': timedelta(minutes=5),
+                                       'timestamp': datetime(2024, 1, 1) + timedelta(hours=i)})
+                tracker.flush()
+                self.assertIsInstance(tracker.trades[-1], TradeRecord)
+                self.assertLessEqual(tracker.trades.in_memory, 12)
+                self.assertEqual(tracker.get_performance_metrics()['total_trades'], 50)
+
+                reloaded = PerformanceTracker(store=PerformanceStore(Path(tmp_dir, 'trades.db')))
+                self.assertEqual(len(reloaded.trades), 50)
+                self.assertLessEqual(reloaded.trades.in_memory, 12)
+                self.assertEqual(reloaded.get_performance_metrics()['winning_trades'], 25)
+            finally:
+                settings['trade_window'] = original
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import logging
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from config.trading_config import TradingConfig
+from main import TradingBot
+from modules.market_analyzer import MarketAnalyzer
+from strategies.momentum_strategy import MomentumStrategy
+from tests.test_backtester import make_candles
+
+
+class TestConcurrentPairs(unittest.TestCase):
+    def setUp(self):
+        self.position_manager = Mock()
+        self.position_manager.get_position_status.return_value = None
+        self.strategy = MomentumStrategy(MarketAnalyzer(data_fetcher=None), self.position_manager)
+
+        # Бот без подключения к бирже: только то, что нужно параллельной обработке пар
+        self.bot = TradingBot.__new__(TradingBot)
+        self.bot.strategy = self.strategy
+        self.bot.logger = logging.getLogger('test.trading_cycle')
+        self.bot.profiler = Mock()
+        self.bot.get_market_data = lambda symbol, balance: {'df': make_candles(60), 'symbol': symbol,
+                                                            'account_balance': balance}
+        self.handled = {}
+        self.bot._handle_strategy_result = lambda symbol, result: self.handled.__setitem__(symbol, result)
+
+    def test_two_pairs_signal_in_same_cycle(self):
+        """Две пары с сигналом в одном цикле: cooldown стратегии пропускает один вход, как последовательная обработка"""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def momentum_conditions(indicators):
+            # Обе пары уже прошли начальную проверку cooldown в generate_signal
+            barrier.wait()
+            return {'action': 'BUY', 'entry_price': 100.0, 'confidence': 1.0}
+
+        pairs = {'BTCUSDT': {}, 'ETHUSDT': {}}
+        with patch.dict(TradingConfig.TRADING_PAIRS, pairs, clear=True), \
+                patch.dict(TradingConfig.CONCURRENCY_SETTINGS, {'max_workers': 2}), \
+                patch.object(self.strategy, '_calculate_momentum_indicators', return_value={'rsi': 60.0}), \
+                patch.object(self.strategy, '_check_momentum_conditions', side_effect=momentum_conditions), \
+                patch.object(self.strategy, '_calculate_momentum_position_size', return_value=0.1):
+            processed = self.bot._process_pairs_concurrently(1000.0, {})
+
+        self.assertEqual(processed, 2)
+        opened = [symbol for symbol, result in self.handled.items() if result and result['action'] == 'OPEN']
+        self.assertEqual(len(opened), 1)
+        self.assertIsNotNone(self.strategy.last_signal_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
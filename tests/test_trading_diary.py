@@ -0,0 +1,99 @@
+import json
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+import pandas as pd
+from modules.trading_diary import TradingDiary
+
+
+def make_diary(tmp_dir: str, **settings) -> TradingDiary:
+    return TradingDiary({'diary_dir': tmp_dir, 'fsync_every': 1, **settings})
+
+
+def trade_round(diary: TradingDiary, symbol: str, pnl: float) -> None:
+    diary.log_position_opened(symbol, 'BUY', 1.0, 100.0, stop_loss=98.0)
+    diary.log_position_closed(symbol, 100.0 + pnl, pnl, fees=0.1, close_reason='take_profit')
+
+
+class TestTradingDiaryJournal(unittest.TestCase):
+    def test_journal_replay_after_crash(self):
+        """События между снимками восстанавливаются из журнала"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            diary = make_diary(tmp_dir, snapshot_every=100)
+            diary.start_trading_session(1000.0)
+            trade_round(diary, 'BTCUSDT', 5.0)
+            diary.log_position_opened('ETHUSDT', 'SELL', 2.0, 50.0)
+
+            snapshot_path = Path(tmp_dir, f"diary_{date.today().isoformat()}.json")
+            self.assertFalse(snapshot_path.exists())
+            journal = Path(tmp_dir, f"diary_{date.today().isoformat()}.jsonl").read_text(encoding='utf-8')
+            self.assertEqual(len(journal.splitlines()), 4)
+
+            # "Падение": новый экземпляр без end_trading_session
+            recovered = make_diary(tmp_dir)
+            self.assertEqual(recovered.current_balance, 1004.9)
+            self.assertEqual(recovered.daily_data['daily_stats']['total_trades'], 1)
+            self.assertEqual([p['status'] for p in recovered.daily_data['positions']], ['CLOSED', 'OPEN'])
+            self.assertEqual(recovered.journal_seq, 4)
+            # Восстановленное состояние сразу сохранено снимком, журнал очищен
+            self.assertTrue(snapshot_path.exists())
+            self.assertEqual(recovered.journal.read(), [])
+
+    def test_snapshot_every_and_no_double_apply(self):
+        """Снимок через snapshot_every событий; события до journal_seq снимка не повторяются"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            diary = make_diary(tmp_dir, snapshot_every=3)
+            diary.start_trading_session(1000.0)
+            diary.log_position_opened('BTCUSDT', 'BUY', 1.0, 100.0)
+            journal_path = diary.journal.path
+            stale_journal = journal_path.read_text(encoding='utf-8')
+
+            diary.log_position_closed('BTCUSDT', 103.0, 3.0)
+            self.assertEqual(journal_path.read_text(encoding='utf-8'), '')
+
+            # Падение между записью снимка и очисткой журнала
+            journal_path.write_text(stale_journal, encoding='utf-8')
+            recovered = make_diary(tmp_dir)
+            self.assertEqual(len(recovered.daily_data['positions']), 1)
+            self.assertEqual(len(recovered.daily_data['trades']), 1)
+            self.assertEqual(recovered.current_balance, 1003.0)
+
+    def test_torn_tail_is_dropped(self):
+        """Оборванная последняя строка журнала отбрасывается"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            diary = make_diary(tmp_dir)
+            diary.start_trading_session(500.0)
+            diary.log_position_opened('BTCUSDT', 'BUY', 1.0, 100.0)
+            diary.journal.close()
+            with open(diary.journal.path, 'a', encoding='utf-8') as f:
+                f.write('{"seq": 3, "type": "position_clo')
+
+            recovered = make_diary(tmp_dir)
+            self.assertEqual(recovered.journal_seq, 2)
+            self.assertEqual(len(recovered.daily_data['positions']), 1)
+            self.assertEqual(recovered.session_start_balance, 500.0)
+
+    def test_export_and_weekly_summary(self):
+        """Экспорт CSV из индекса итогов дней, недельная сводка включает текущий день из памяти"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            diary = make_diary(tmp_dir)
+            diary.start_trading_session(1000.0)
+            trade_round(diary, 'BTCUSDT', 4.0)
+            trade_round(diary, 'ETHUSDT', -2.0)
+
+            summary = diary.get_weekly_summary()
+            self.assertEqual(summary['total_trades'], 2)
+            self.assertEqual(summary['trading_days'], 1)
+
+            diary.end_trading_session()
+            index = json.loads(Path(tmp_dir, 'diary_index.json').read_text(encoding='utf-8'))
+            self.assertEqual(index[date.today().isoformat()]['total_trades'], 2)
+
+            exported = pd.read_csv(diary.export_diary_to_csv(days=7))
+            self.assertEqual(len(exported), 1)
+            self.assertAlmostEqual(exported['total_pnl'].iloc[0], 1.8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -557,7 +557,10 @@ class UserConfig:
         'performance': {
             'cache_enabled': True,
             'cache_timeout': 60,
-            'parallel_processing': False,
+            'parallel_processing': False,  # Параллельная обработка торговых пар в цикле
+            'max_workers': 4,  # Количество потоков для параллельной обработки
+            'websocket_feed': False,  # Потоковые данные через websocket (цикл по закрытию свечи)
+            'multi_timeframe': False,  # Все таймфреймы из одной подписки на 1m свечи
             'memory_limit_mb': 512
         },
 
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный прогон бота против локального симулятора биржи (без обращений к ByBit)
+
+Полный путь торгового цикла: DataFetcher -> стратегия -> PositionManager -> OrderManager,
+где вместо pybit HTTP работает SimulatedExchange. Каждый цикл биржа сдвигается на одну свечу.
+
+Пример:
+    python utils/benchmark_exchange_sim.py --synthetic 3000 --symbols BTCUSDT ETHUSDT
+    python utils/benchmark_exchange_sim.py --days 30 --latency-ms 20
+"""
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+# Добавляем корневую папку в путь
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.trading_config import TradingConfig
+from user_config import UserConfig
+from modules.exchange_simulator import SimulatedExchange
+from modules.history_store import KlineHistoryStore
+from modules.data_fetcher import DataFetcher
+from modules.market_analyzer import MarketAnalyzer
+from modules.risk_manager import RiskManager
+from modules.order_manager import OrderManager
+from modules.position_manager import PositionManager
+from modules.rate_limiter import RateLimiter
+from strategies.strategy_factory import StrategyFactory
+
+
+def build_exchange(args) -> SimulatedExchange:
+    """Биржа на синтетических свечах или на локальной истории"""
+    settings = {'latency_ms': args.latency_ms}
+    if args.synthetic:
+        candles = {
+            symbol: SimulatedExchange.synthetic_candles(args.synthetic, args.interval,
+                                                        start_price=100.0 * (i + 1), seed=i)
+            for i, symbol in enumerate(args.symbols)
+        }
+        return SimulatedExchange(candles, args.interval, settings)
+
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(days=args.days)
+    return SimulatedExchange.from_history(KlineHistoryStore(), args.symbols, args.interval,
+                                          int(start_time.timestamp()), int(end_time.timestamp()), settings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Прогон бота против симулятора биржи")
+    parser.add_argument('--strategy', default=UserConfig.SELECTED_STRATEGY, help="Стратегия (как в StrategyFactory)")
+    parser.add_argument('--symbols', nargs='+', default=list(UserConfig.get_enabled_pairs()), help="Торговые пары")
+    parser.add_argument('--interval', default=TradingConfig.TIMEFRAMES['primary'], help="Интервал ByBit")
+    parser.add_argument('--days', type=int, default=30, help="Глубина локальной истории в днях")
+    parser.add_argument('--synthetic', type=int, default=0, help="Свечей синтетической истории (вместо локальной)")
+    parser.add_argument('--cycles', type=int, default=None, help="Максимум циклов")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Задержка каждого запроса к бирже")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    try:
+        exchange = build_exchange(args)
+    except ValueError:
+        print("❌ Нет свечей. Запустите utils/download_history.py или укажите --synthetic")
+        return
+
+    # Собственный лимитер без ограничений: измеряется пропускная способность бота, а не лимиты ByBit
+    limiter = RateLimiter(limits={name: {'rate': 1e6, 'capacity': 1e6} for name in TradingConfig.RATE_LIMITS},
+                          buffer=0.0)
+    data_fetcher = DataFetcher(client=exchange, rate_limiter=limiter)
+    order_manager = OrderManager(exchange, rate_limiter=limiter)
+    position_manager = PositionManager(RiskManager(), order_manager)
+
+    user_config = {'CUSTOM_STRATEGY_CONFIG': UserConfig.CUSTOM_STRATEGY_CONFIG} if args.strategy == 'custom' else None
+    strategy = StrategyFactory().create_strategy(args.strategy, MarketAnalyzer(data_fetcher),
+                                                 position_manager, user_config)
+    if strategy is None:
+        print(f"❌ Не удалось создать стратегию {args.strategy}")
+        return
+
+    symbols = [s for s in args.symbols if s in exchange.symbols]
+    print(f"🧪 {args.strategy} против симулятора: {', '.join(symbols)} | интервал {args.interval}")
+
+    cycles = 0
+    started = time.perf_counter()
+    while args.cycles is None or cycles < args.cycles:
+        server_time = data_fetcher.get_server_time()
+        balance = data_fetcher.get_account_balance() or 0.0
+
+        for symbol in symbols:
+            df = data_fetcher.get_kline(symbol, args.interval,
+                                        int((server_time - timedelta(days=1)).timestamp()),
+                                        int(server_time.timestamp()))
+            if df is None or df.empty:
+                continue
+
+            # Позиция могла закрыться стопом на бирже
+            if position_manager.has_position(symbol) and data_fetcher.get_position_info(symbol) is None:
+                position_manager.positions.pop(symbol, None)
+
+            result = strategy.execute(symbol, {'df': df, 'symbol': symbol, 'account_balance': balance,
+                                               'timestamp': server_time})
+            if result and result.get('action') == 'OPEN':
+                position_manager.open_position(symbol, result)
+            elif position_manager.has_position(symbol):
+                position_manager.update_trailing_stop(symbol, float(df['close'].iloc[-1]))
+
+        order_manager.update_orders_status()
+        cycles += 1
+        if not exchange.advance():
+            break
+
+    duration = time.perf_counter() - started
+    order_manager.shutdown()
+
+    stats = exchange.get_stats()
+    requests = sum(stats['calls'].values())
+    print(f"\n⏱️  {cycles} циклов за {duration:.1f}с ({cycles / duration:.1f} циклов/с, "
+          f"{cycles * len(symbols) / duration:.0f} пар/с)")
+    print(f"📡 Запросов к бирже: {requests} ({requests / duration:.0f}/с)")
+    for method, count in sorted(stats['calls'].items(), key=lambda item: -item[1]):
+        print(f"   {method}: {count}")
+    print(f"📋 Ордеров: {stats['orders']} | исполнений: {stats['fills']} | отклонено: {stats['rejected']} "
+          f"| стопов: {stats['stop_triggers']}")
+    print(f"💰 Баланс: ${stats['balance']:.2f} | эквити: ${stats['equity']:.2f} | комиссии: ${stats['fees']:.2f}")
+
+    for kind, latency in order_manager.get_latency_stats().items():
+        print(f"🚀 {kind}: p50 {latency['p50_ms']:.1f}ms / p99 {latency['p99_ms']:.1f}ms (n={latency['count']})")
+
+
+if __name__ == "__main__":
+    main()
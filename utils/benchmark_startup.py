@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Замер времени запуска бота: от старта интерпретатора до готовности к первому торговому циклу
+
+Каждый прогон - отдельный процесс `python -X importtime`, который импортирует main и создает
+TradingBot (без start(): сетевые запросы первого цикла не входят в замер). Выводятся медианы
+этапов, самые дорогие импорты и сумма собственного времени импорта по пакетам. Код возврата 1,
+если медиана полного времени больше цели TradingConfig.STARTUP_SETTINGS['target_seconds'].
+
+Запуск создает logs/ и data/ как обычный старт бота. Если API ключи не заданы, для замера
+подставляются фиктивные (инициализация не обращается к бирже при connection_check=False).
+
+Пример:
+    python utils/benchmark_startup.py
+    python utils/benchmark_startup.py --runs 5 --top 30 --target 2.5
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+
+# Добавляем корневую папку в путь
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.trading_config import TradingConfig
+
+ROOT = Path(__file__).parent.parent
+RESULT_MARKER = 'STARTUP_BENCHMARK '
+
+# Выполняется в дочернем процессе
+CHILD_SCRIPT = f"""
+import json, os, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+bot = main.TradingBot()
+initialized = time.perf_counter()
+sys.stdout.write('\\n{RESULT_MARKER}' + json.dumps({{'import': imported - started, 'init': initialized - imported}}) + '\\n')
+sys.stdout.flush()
+os._exit(0)  # Без остановки бота и фоновых потоков: они не входят в замер
+"""
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def run_once(python: str, env: dict) -> dict:
+    """Один запуск: этапы (сек) и строки -X importtime"""
+    started = time.perf_counter()
+    completed = subprocess.run([python, '-X', 'importtime', '-c', CHILD_SCRIPT], cwd=ROOT, env=env,
+                               capture_output=True, text=True, encoding='utf-8', errors='replace')
+    wall = time.perf_counter() - started
+
+    result_lines = [line for line in completed.stdout.splitlines() if line.startswith(RESULT_MARKER)]
+    if not result_lines:
+        tail = '\n'.join((completed.stdout + completed.stderr).strip().splitlines()[-15:])
+        raise RuntimeError(f"TradingBot startup failed (exit code {completed.returncode}):\n{tail}")
+
+    stages = json.loads(result_lines[-1][len(RESULT_MARKER):])
+    stages['total'] = wall
+    stages['interpreter'] = max(0.0, wall - stages['import'] - stages['init'])
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return {'stages': stages, 'imports': imports}
+
+
+def print_import_breakdown(imports: list, top: int) -> None:
+    """Самые дорогие модули (накопительно) и собственное время по пакетам"""
+    print(f"\n📦 ИМПОРТЫ: {len(imports)} модулей")
+    print(f"   Самые дорогие (накопительно, мс):")
+    for name, own_us, cumulative_us, depth in sorted(imports, key=lambda item: -item[2])[:top]:
+        print(f"   {cumulative_us / 1000:8.1f}  {'  ' * min(depth, 6)}{name}")
+
+    by_package = defaultdict(int)
+    for name, own_us, _, _ in imports:
+        by_package[name.split('.')[0]] += own_us
+    print(f"\n   По пакетам (собственное время, мс):")
+    for package, own_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"   {own_us / 1000:8.1f}  {package}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер времени запуска торгового бота")
+    parser.add_argument('--runs', type=int, default=3, help="Количество запусков (медиана)")
+    parser.add_argument('--top', type=int, default=20, help="Строк в разбивке импортов")
+    parser.add_argument('--target', type=float, default=TradingConfig.STARTUP_SETTINGS['target_seconds'],
+                        help="Цель для полного времени запуска (сек)")
+    parser.add_argument('--python', default=sys.executable, help="Интерпретатор")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not TradingConfig.API_KEY or not TradingConfig.API_SECRET:
+        env.setdefault('BYBIT_API_KEY', 'startup-benchmark')
+        env.setdefault('BYBIT_API_SECRET', 'startup-benchmark')
+
+    print("🚀 ЗАМЕР ЗАПУСКА БОТА")
+    print("=" * 50)
+
+    runs = []
+    for i in range(args.runs):
+        try:
+            run = run_once(args.python, env)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(2)
+        runs.append(run)
+        stages = run['stages']
+        print(f"   #{i + 1}: {stages['total']:.2f}s (импорт {stages['import']:.2f}s, "
+              f"инициализация {stages['init']:.2f}s)")
+
+    print(f"\n⏱️  МЕДИАНА ({len(runs)} запусков):")
+    for stage in ('interpreter', 'import', 'init', 'total'):
+        print(f"   {stage:<12} {statistics.median(run['stages'][stage] for run in runs):.3f}s")
+
+    print_import_breakdown(runs[-1]['imports'], args.top)
+
+    total = statistics.median(run['stages']['total'] for run in runs)
+    if total > args.target:
+        print(f"\n❌ Запуск {total:.2f}s больше цели {args.target:.2f}s")
+        sys.exit(1)
+    print(f"\n✅ Запуск {total:.2f}s в пределах цели {args.target:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Загрузка истории свечей в локальное хранилище (data/history)
+
+Пример:
+    python utils/download_history.py --symbols BTCUSDT ETHUSDT --interval 5 --days 90
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+# Добавляем корневую папку в путь
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.trading_config import TradingConfig
+from modules.data_fetcher import DataFetcher
+from modules.history_downloader import HistoricalDownloader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Загрузка истории свечей ByBit")
+    parser.add_argument('--symbols', nargs='+', default=TradingConfig.TRADING_PAIRS, help="Торговые пары")
+    parser.add_argument('--interval', default=TradingConfig.TIMEFRAMES['primary'], help="Интервал ByBit")
+    parser.add_argument('--days', type=int, default=30, help="Глубина истории в днях")
+    parser.add_argument('--no-resume', action='store_true', help="Загрузить диапазон заново")
+    args = parser.parse_args()
+
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(days=args.days)
+
+    print(f"📥 Загрузка истории: {', '.join(args.symbols)} | интервал {args.interval} | {args.days} дней")
+
+    downloader = HistoricalDownloader(DataFetcher())
+
+    for symbol in args.symbols:
+        result = downloader.download(
+            symbol, args.interval,
+            start_time=int(start_time.timestamp()),
+            end_time=int(end_time.timestamp()),
+            resume=not args.no_resume
+        )
+        if 'error' in result:
+            print(f"❌ {symbol}: {result['error']}")
+            continue
+
+        info = downloader.store.get_info(symbol, args.interval)
+        status = "✅" if result['success'] and not result['remaining_gaps'] else "⚠️"
+        print(f"{status} {symbol}: +{result['bars_written']} свечей за {result['pages']} запросов "
+              f"({result['duration']:.1f}с), всего в хранилище {info['count']}, "
+              f"пропусков: {len(result['remaining_gaps'])}")
+
+
+if __name__ == "__main__":
+    main()
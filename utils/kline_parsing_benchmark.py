@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк разбора свечей в DataFetcher.get_kline
+
+Сравнивает прежний построчный разбор (list of dicts + sort_values)
+с векторизованным DataFetcher._parse_klines на ответах из 200 и 1000 свечей.
+"""
+
+import sys
+import timeit
+import logging
+from pathlib import Path
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Добавляем корневую папку в путь
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.data_fetcher import DataFetcher
+
+
+def make_payload(rows: int, interval_ms: int = 300_000) -> list:
+    """Ответ ByBit result.list: строки от новых к старым, все значения - строки"""
+    rng = np.random.default_rng(42)
+    start = 1_700_000_000_000
+    close = 30000 + np.cumsum(rng.normal(0, 20, rows))
+    payload = []
+    for i in range(rows):
+        c = close[i]
+        payload.append([
+            str(start + i * interval_ms), f"{c - 5:.2f}", f"{c + 10:.2f}", f"{c - 10:.2f}",
+            f"{c:.2f}", f"{abs(rng.normal(100, 10)):.3f}", f"{c * 100:.4f}"
+        ])
+    return payload[::-1]
+
+
+def legacy_parse(klines: list) -> pd.DataFrame:
+    """Прежняя реализация разбора из get_kline"""
+    df_data = []
+    for kline in klines:
+        try:
+            df_data.append({
+                'timestamp': datetime.fromtimestamp(int(kline[0]) / 1000, tz=timezone.utc),
+                'open': float(kline[1]),
+                'high': float(kline[2]),
+                'low': float(kline[3]),
+                'close': float(kline[4]),
+                'volume': float(kline[5])
+            })
+        except (ValueError, IndexError):
+            continue
+
+    df = pd.DataFrame(df_data)
+    return df.sort_values('timestamp').reset_index(drop=True)
+
+
+def run_benchmark(sizes=(200, 1000), repeat: int = 7, number: int = 50):
+    """Запуск бенчмарка и проверка совпадения результатов"""
+    logging.disable(logging.CRITICAL)
+
+    # Разбор не использует клиент - создаем объект без подключения к бирже
+    fetcher = DataFetcher.__new__(DataFetcher)
+    fetcher.logger = logging.getLogger('benchmark')
+
+    print("⏱️  БЕНЧМАРК РАЗБОРА СВЕЧЕЙ")
+    print("=" * 60)
+    print(f"{'rows':>6} | {'legacy, ms':>12} | {'vectorized, ms':>15} | {'speedup':>8}")
+    print("-" * 60)
+
+    results = {}
+    for rows in sizes:
+        payload = make_payload(rows)
+
+        legacy_df = legacy_parse(payload)
+        fast_df = fetcher._parse_klines(payload)
+        pd.testing.assert_frame_equal(legacy_df, fast_df, check_dtype=False)
+
+        legacy_time = min(timeit.repeat(lambda: legacy_parse(payload), repeat=repeat, number=number)) / number
+        fast_time = min(timeit.repeat(lambda: fetcher._parse_klines(payload), repeat=repeat, number=number)) / number
+
+        results[rows] = {'legacy': legacy_time, 'vectorized': fast_time, 'speedup': legacy_time / fast_time}
+        print(f"{rows:>6} | {legacy_time * 1000:>12.3f} | {fast_time * 1000:>15.3f} | "
+              f"{legacy_time / fast_time:>7.1f}x")
+
+    print("=" * 60)
+    print("✅ Результаты обоих способов совпадают")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,219 +1,153 @@
 #!/usr/bin/env python3
 """
 Анализатор логов для выявления проблем и паттернов
+
+Читает журнал событий logs/trading_YYYYMMDD.jsonl (или текстовый .log для старых дней)
+за один потоковый проход. Смещения сохраняются в logs/.log_index.json, поэтому повторный
+запуск на растущем логе читает только новые строки.
+
+Пример:
+    python utils/log_analyzer.py                 # сегодняшний лог
+    python utils/log_analyzer.py --all           # все дни в logs/
+    python utils/log_analyzer.py logs/trading_20240101.log --full
 """
 
-import re
+import sys
+import argparse
 from datetime import datetime
-from collections import Counter
 from pathlib import Path
 
+# Добавляем корневую папку в путь
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.log_stream import LogStreamAnalyzer, LogSummary, find_logs
+
 
 class LogAnalyzer:
     """Анализатор логов торгового бота"""
 
-    def __init__(self, log_file: str = None):
+    def __init__(self, log_file: str = None, log_dir: str = "logs"):
         if log_file is None:
-            log_file = f"logs/trading_{datetime.now().strftime('%Y%m%d')}.log"
-        self.log_file = Path(log_file)
-
-    def analyze_logs(self):
+            today = datetime.now().strftime('%Y%m%d')
+            events_file = Path(log_dir) / f"trading_{today}.jsonl"
+            log_file = events_file if events_file.exists() else Path(log_dir) / f"trading_{today}.log"
+        self.log_files = [Path(log_file)]
+        self.engine = LogStreamAnalyzer(index_path=str(Path(log_dir) / ".log_index.json"))
+
+    @classmethod
+    def for_all_days(cls, log_dir: str = "logs") -> 'LogAnalyzer':
+        """Анализатор по всем дням в log_dir"""
+        analyzer = cls(log_dir=log_dir)
+        analyzer.log_files = find_logs(log_dir)
+        return analyzer
+
+    def analyze_logs(self, incremental: bool = True):
         """Полный анализ логов"""
-        if not self.log_file.exists():
-            print(f"❌ Лог файл не найден: {self.log_file}")
+        missing = [path for path in self.log_files if not path.exists()]
+        if missing or not self.log_files:
+            print(f"❌ Лог файл не найден: {missing[0] if missing else 'logs/'}")
             return
 
         print("📊 АНАЛИЗ ЛОГОВ ТОРГОВОГО БОТА")
         print("=" * 50)
+        print(f"📄 Файлов: {len(self.log_files)} ({self.log_files[0].name} - {self.log_files[-1].name})")
 
-        with open(self.log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        summary = self.engine.analyze(self.log_files, incremental=incremental)
 
-        # Основная статистика
-        self._analyze_basic_stats(lines)
+        self._analyze_basic_stats(summary)
+        self._analyze_errors(summary)
+        self._analyze_signals(summary)
+        self._analyze_performance(summary)
+        self._provide_recommendations(summary)
 
-        # Анализ ошибок
-        self._analyze_errors(lines)
-
-        # Анализ сигналов
-        self._analyze_signals(lines)
+    def _analyze_basic_stats(self, summary: LogSummary):
+        """Базовая статистика"""
+        print("\n📈 БАЗОВАЯ СТАТИСТИКА:")
 
-        # Анализ производительности
-        self._analyze_performance(lines)
+        print(f"   Всего записей: {summary.records}")
+        print(f"   INFO: {summary.levels['INFO']}")
+        print(f"   ERROR: {summary.levels['ERROR']}")
+        print(f"   WARNING: {summary.levels['WARNING']}")
 
-        # Рекомендации
-        self._provide_recommendations(lines)
+        print(f"   Торговых циклов: {summary.events['cycle_started']}")
+        print(f"   Завершенных циклов: {summary.cycle_count}")
 
-    def _analyze_basic_stats(self, lines):
-        """Базовая статистика"""
-        print("\n📈 БАЗОВАЯ СТАТИСТИКА:")
+        if summary.cycle_count:
+            print(f"   Среднее время цикла: {summary.avg_cycle:.2f}с")
+            print(f"   Мин/Макс время: {summary.cycle_min:.2f}с / {summary.cycle_max:.2f}с")
 
-        total_lines = len(lines)
-        info_lines = len([l for l in lines if ' - INFO - ' in l])
-        error_lines = len([l for l in lines if ' - ERROR - ' in l])
-        warning_lines = len([l for l in lines if ' - WARNING - ' in l])
-
-        print(f"   Всего записей: {total_lines}")
-        print(f"   INFO: {info_lines}")
-        print(f"   ERROR: {error_lines}")
-        print(f"   WARNING: {warning_lines}")
-
-        # Анализ циклов
-        cycle_starts = len([l for l in lines if 'Trading cycle started' in l])
-        processed_pairs = len([l for l in lines if 'Processed 4/4 pairs' in l])
-
-        print(f"   Торговых циклов: {cycle_starts}")
-        print(f"   Завершенных циклов: {processed_pairs}")
-
-        if processed_pairs > 0:
-            # Анализ времени выполнения
-            times = []
-            for line in lines:
-                if 'Processed 4/4 pairs in' in line:
-                    match = re.search(r'in (\d+\.\d+)s', line)
-                    if match:
-                        times.append(float(match.group(1)))
-
-            if times:
-                avg_time = sum(times) / len(times)
-                print(f"   Среднее время цикла: {avg_time:.2f}с")
-                print(f"   Мин/Макс время: {min(times):.2f}с / {max(times):.2f}с")
-
-    def _analyze_errors(self, lines):
+    def _analyze_errors(self, summary: LogSummary):
         """Анализ ошибок"""
         print("\n🚨 АНАЛИЗ ОШИБОК:")
 
-        errors = [l for l in lines if ' - ERROR - ' in l]
-
-        if not errors:
+        total_errors = sum(summary.error_types.values())
+        if not total_errors:
             print("   ✅ Ошибок не найдено")
             return
 
-        # Группировка ошибок
-        error_types = Counter()
-        for error in errors:
-            if 'account balance' in error.lower():
-                error_types['Account Balance Error'] += 1
-            elif 'api' in error.lower():
-                error_types['API Error'] += 1
-            elif 'connection' in error.lower():
-                error_types['Connection Error'] += 1
-            else:
-                error_types['Other Error'] += 1
-
-        print(f"   Всего ошибок: {len(errors)}")
-        for error_type, count in error_types.most_common():
+        print(f"   Всего ошибок: {total_errors}")
+        for error_type, count in summary.error_types.most_common():
             print(f"   {error_type}: {count}")
 
-        # Показываем последние ошибки
         print(f"\n   📋 Последние ошибки:")
-        for error in errors[-3:]:
-            timestamp = error.split(' - ')[0]
-            message = error.split(' - ERROR - ')[1].strip()
+        for timestamp, message in list(summary.recent_errors)[-3:]:
             print(f"      {timestamp}: {message}")
 
-    def _analyze_signals(self, lines):
+    def _analyze_signals(self, summary: LogSummary):
         """Анализ торговых сигналов"""
         print("\n🎯 АНАЛИЗ ТОРГОВЫХ СИГНАЛОВ:")
 
-        # Подсчет сигналов OPEN
-        open_signals = [l for l in lines if 'Strategy result for' in l and ': OPEN' in l]
-
-        # Группировка по парам
-        pair_signals = Counter()
-        for signal in open_signals:
-            for pair in ['ETHUSDT', 'SOLUSDT', 'BTCUSDT', 'DOGEUSDT']:
-                if pair in signal:
-                    pair_signals[pair] += 1
-                    break
-
-        print(f"   Всего OPEN сигналов: {len(open_signals)}")
+        open_signals = summary.action_count('OPEN')
+        print(f"   Всего OPEN сигналов: {open_signals}")
 
+        pair_signals = {symbol: actions['OPEN'] for symbol, actions in summary.symbol_actions.items()
+                        if actions['OPEN']}
         if pair_signals:
             print(f"   По парам:")
-            for pair, count in pair_signals.most_common():
+            for pair, count in sorted(pair_signals.items(), key=lambda item: -item[1]):
                 print(f"      {pair}: {count} сигналов")
         else:
             print("   ❌ Сигналы OPEN не найдены")
 
-        # Анализ частоты сигналов
-        if open_signals:
-            # Извлекаем временные метки
-            timestamps = []
-            for signal in open_signals:
-                time_str = signal.split(' - ')[0]
-                try:
-                    timestamp = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S')
-                    timestamps.append(timestamp)
-                except:
-                    pass
-
-            if len(timestamps) > 1:
-                time_diff = (timestamps[-1] - timestamps[0]).total_seconds()
-                frequency = len(timestamps) / (time_diff / 60)  # сигналов в минуту
-                print(f"   Частота сигналов: {frequency:.2f} сигналов/мин")
-
-    def _analyze_performance(self, lines):
+        frequency = summary.signal_frequency()
+        if frequency is not None:
+            print(f"   Частота сигналов: {frequency:.2f} сигналов/мин")
+
+    def _analyze_performance(self, summary: LogSummary):
         """Анализ производительности"""
         print("\n⚡ АНАЛИЗ ПРОИЗВОДИТЕЛЬНОСТИ:")
 
-        # Анализ времени выполнения циклов
-        execution_times = []
-        for line in lines:
-            if 'Processed 4/4 pairs in' in line:
-                match = re.search(r'in (\d+\.\d+)s', line)
-                if match:
-                    execution_times.append(float(match.group(1)))
-
-        if execution_times:
-            avg_time = sum(execution_times) / len(execution_times)
-            print(f"   Среднее время цикла: {avg_time:.2f}с")
+        if summary.cycle_count:
+            print(f"   Среднее время цикла: {summary.avg_cycle:.2f}с")
+            print(f"   Быстрые циклы (<{LogSummary.FAST_CYCLE:.0f}с): {summary.fast_cycles}")
+            print(f"   Медленные циклы (>{LogSummary.SLOW_CYCLE:.0f}с): {summary.slow_cycles}")
 
-            # Классификация производительности
-            fast_cycles = len([t for t in execution_times if t < 10])
-            slow_cycles = len([t for t in execution_times if t > 30])
-
-            print(f"   Быстрые циклы (<10с): {fast_cycles}")
-            print(f"   Медленные циклы (>30с): {slow_cycles}")
-
-            if slow_cycles > fast_cycles:
+            if summary.slow_cycles > summary.fast_cycles:
                 print("   ⚠️ Много медленных циклов - возможны проблемы с API")
 
-        # Анализ баланса
-        balance_lines = [l for l in lines if 'Account balance:' in l]
-        if balance_lines:
-            print(f"   Проверок баланса: {len(balance_lines)}")
-            # Извлекаем последний баланс
-            last_balance_line = balance_lines[-1]
-            match = re.search(r'\$(\d+\.\d+)', last_balance_line)
-            if match:
-                balance = float(match.group(1))
-                print(f"   Последний баланс: ${balance:.2f}")
-
-    def _provide_recommendations(self, lines):
+        if summary.events['balance']:
+            print(f"   Проверок баланса: {summary.events['balance']}")
+            print(f"   Последний баланс: ${summary.last_balance:.2f}")
+
+    def _provide_recommendations(self, summary: LogSummary):
         """Рекомендации по улучшению"""
         print("\n💡 РЕКОМЕНДАЦИИ ПО УЛУЧШЕНИЮ:")
 
-        errors = [l for l in lines if ' - ERROR - ' in l]
-        open_signals = [l for l in lines if 'Strategy result for' in l and ': OPEN' in l]
+        open_signals = summary.action_count('OPEN')
+        close_signals = summary.action_count('CLOSE')
 
-        # Проблема с балансом
-        balance_errors = [e for e in errors if 'account balance' in e.lower()]
-        if balance_errors:
+        if summary.error_types['Account Balance Error']:
             print("   🔧 Исправить ошибку получения баланса:")
             print("      - Проверить API ключи")
             print("      - Добавить fallback для testnet")
 
-        # Слишком много сигналов OPEN
-        if len(open_signals) > 50:
+        if open_signals > 50:
             print("   ⚠️ Слишком много OPEN сигналов:")
             print("      - Увеличить min_conditions_required")
             print("      - Добавить cooldown между сигналами")
             print("      - Ужесточить фильтры")
 
-        # Нет реальных сделок
-        close_signals = [l for l in lines if 'Strategy result for' in l and ': CLOSE' in l]
-        if len(open_signals) > 0 and len(close_signals) == 0:
+        if open_signals > 0 and close_signals == 0:
             print("   🎯 Много OPEN, но нет CLOSE сигналов:")
             print("      - Проверить логику закрытия позиций")
             print("      - Добавить таймауты для позиций")
@@ -222,9 +156,15 @@ class LogAnalyzer:
 
 def main():
     """Главная функция"""
-    analyzer = LogAnalyzer()
-    analyzer.analyze_logs()
+    parser = argparse.ArgumentParser(description="Анализ логов торгового бота")
+    parser.add_argument('log_file', nargs='?', default=None, help="Файл лога (.jsonl или .log)")
+    parser.add_argument('--all', action='store_true', help="Все дни в logs/")
+    parser.add_argument('--full', action='store_true', help="Без индекса смещений (полный перечет)")
+    args = parser.parse_args()
+
+    analyzer = LogAnalyzer.for_all_days() if args.all else LogAnalyzer(args.log_file)
+    analyzer.analyze_logs(incremental=not args.full)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
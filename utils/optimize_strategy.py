@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Подбор параметров CUSTOM_STRATEGY_CONFIG параллельными бэктестами
+
+Пример:
+    python utils/optimize_strategy.py --symbols BTCUSDT ETHUSDT --days 60 --method bayesian --trials 80
+    python utils/optimize_strategy.py --method grid --metric sortino_ratio --output data/optimization.json
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+# Добавляем корневую папку в путь
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.trading_config import TradingConfig
+from user_config import UserConfig
+from modules.history_store import KlineHistoryStore
+from modules.backtester import Backtester
+from modules.optimizer import ParameterOptimizer
+
+# Пространство поиска: путь в CUSTOM_STRATEGY_CONFIG -> список значений или диапазон (min, max)
+SEARCH_SPACE = {
+    'rsi_settings.period': [7, 10, 14, 21],
+    'ema_settings.fast_period': (5, 15),
+    'ema_settings.slow_period': (18, 40),
+    'atr_settings.stop_loss_multiplier': (1.0, 3.0),
+    'atr_settings.take_profit_multiplier': (1.5, 4.0),
+    'volume_settings.min_ratio': (0.5, 1.5)
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Подбор параметров пользовательской стратегии")
+    parser.add_argument('--symbols', nargs='+', default=list(UserConfig.get_enabled_pairs()), help="Торговые пары")
+    parser.add_argument('--interval', default=TradingConfig.TIMEFRAMES['primary'], help="Интервал ByBit")
+    parser.add_argument('--days', type=int, default=30, help="Глубина истории в днях")
+    parser.add_argument('--method', choices=['grid', 'random', 'bayesian'],
+                        default=TradingConfig.OPTIMIZER_SETTINGS['method'])
+    parser.add_argument('--trials', type=int, default=TradingConfig.OPTIMIZER_SETTINGS['n_trials'])
+    parser.add_argument('--metric', choices=['sharpe_ratio', 'sortino_ratio'],
+                        default=TradingConfig.OPTIMIZER_SETTINGS['metric'])
+    parser.add_argument('--workers', type=int, default=None, help="Процессов (по умолчанию по числу ядер)")
+    parser.add_argument('--top', type=int, default=10, help="Сколько лучших результатов показать")
+    parser.add_argument('--output', help="Сохранить все результаты в JSON")
+    args = parser.parse_args()
+
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(days=args.days)
+    candles = Backtester.load_candles(KlineHistoryStore(), args.symbols, args.interval,
+                                      int(start_time.timestamp()), int(end_time.timestamp()))
+    if not candles:
+        print("❌ Нет сохраненной истории. Сначала запустите utils/download_history.py")
+        return
+
+    optimizer = ParameterOptimizer('custom', UserConfig.CUSTOM_STRATEGY_CONFIG,
+                                   settings={'metric': args.metric, 'workers': args.workers})
+    print(f"🔍 Подбор параметров ({args.method}, метрика {args.metric}): {', '.join(candles)}")
+
+    result = optimizer.optimize(candles, SEARCH_SPACE, args.method, args.trials)
+    if not result['success']:
+        print(f"❌ {result['error']}")
+        return
+
+    print(f"\n⏱️  {result['trials']} испытаний на {result['workers']} процессах за {result['duration']:.1f}с "
+          f"(ошибок: {result['failed']})")
+    print(f"\n🏆 ТОП-{args.top}:")
+    for place, trial in enumerate(result['results'][:args.top], 1):
+        if not trial['success']:
+            continue
+        print(f"{place:>3}. Sharpe {trial['sharpe_ratio']:>6} | Sortino {trial['sortino_ratio']:>6} | "
+              f"сделок {trial['trades']:>4} | доходность {trial['return_pct']:+.2f}% | {trial['params']}")
+
+    if result['best_params']:
+        print(f"\n✅ Лучшие параметры: {result['best_params']}")
+    else:
+        print(f"\n⚠️ Ни одно испытание не набрало {TradingConfig.OPTIMIZER_SETTINGS['min_trades']} сделок")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result['results'], f, ensure_ascii=False, indent=2, default=str)
+        print(f"💾 Результаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
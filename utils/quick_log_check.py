@@ -1,39 +1,41 @@
 #!/usr/bin/env python3
 """
 Быстрая проверка логов без загрузки больших файлов
+
+Последние записи читаются с конца файла блоками, счетчики по парам берутся
+из потоковой сводки (logs/.log_index.json - повторно читаются только новые строки).
 """
 
-import os
-from datetime import datetime
+import sys
 from pathlib import Path
 
+# Добавляем корневую папку в путь
+sys.path.append(str(Path(__file__).parent.parent))
 
-def quick_log_analysis():
-    """Быстрый анализ последних логов"""
-    print("🔍 БЫСТРЫЙ АНАЛИЗ ЛОГОВ")
-    print("=" * 40)
+from modules.log_stream import LogStreamAnalyzer, find_logs
 
-    # Найти последний лог файл
+
+def latest_log():
+    """Последний лог (журнал событий .jsonl, если есть)"""
     log_dir = Path("logs")
     if not log_dir.exists():
         print("❌ Папка logs не найдена")
-        return
+        return None
 
-    log_files = list(log_dir.glob("trading_*.log"))
+    log_files = find_logs(str(log_dir))
     if not log_files:
         print("❌ Лог файлы не найдены")
-        return
-
-    latest_log = max(log_files, key=lambda x: x.stat().st_mtime)
-    print(f"📄 Анализируем: {latest_log}")
+        return None
+    return log_files[-1]
 
-    try:
-        with open(latest_log, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
 
-        # Последние 50 строк
-        recent_lines = lines[-50:]
+def quick_log_analysis(log_file: Path):
+    """Быстрый анализ последних логов"""
+    print("🔍 БЫСТРЫЙ АНАЛИЗ ЛОГОВ")
+    print("=" * 40)
+    print(f"📄 Анализируем: {log_file}")
 
+    try:
         print(f"\n📊 ПОСЛЕДНИЕ 50 ЗАПИСЕЙ:")
         print("-" * 40)
 
@@ -41,18 +43,20 @@ def quick_log_analysis():
         close_signals = 0
         errors = 0
 
-        for line in recent_lines:
-            if 'Strategy result' in line and 'OPEN' in line:
+        for event in LogStreamAnalyzer.tail(log_file, 50):
+            line = f"{event['time']} - {event['level']} - {event['message']}"
+            action = event.get('action') if event.get('event') == 'strategy_result' else None
+            if action == 'OPEN':
                 open_signals += 1
-                print(f"📈 {line.strip()}")
-            elif 'Strategy result' in line and 'CLOSE' in line:
+                print(f"📈 {line}")
+            elif action == 'CLOSE':
                 close_signals += 1
-                print(f"📉 {line.strip()}")
-            elif 'ERROR' in line:
+                print(f"📉 {line}")
+            elif event['level'] in ('ERROR', 'CRITICAL'):
                 errors += 1
-                print(f"❌ {line.strip()}")
-            elif 'No action for' in line:
-                print(f"⏸️  {line.strip()}")
+                print(f"❌ {line}")
+            elif event.get('event') == 'no_action':
+                print(f"⏸️  {line}")
 
         print("-" * 40)
         print(f"📊 СВОДКА ПОСЛЕДНИХ ЗАПИСЕЙ:")
@@ -69,29 +73,17 @@ def quick_log_analysis():
         print(f"❌ Ошибка чтения лога: {e}")
 
 
-def check_signal_patterns():
+def check_signal_patterns(log_file: Path):
     """Проверка паттернов сигналов"""
     print(f"\n🎯 АНАЛИЗ ПАТТЕРНОВ СИГНАЛОВ:")
 
     try:
-        log_dir = Path("logs")
-        log_files = list(log_dir.glob("trading_*.log"))
-        latest_log = max(log_files, key=lambda x: x.stat().st_mtime)
-
-        with open(latest_log, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Подсчет сигналов по парам
-        pairs = ['ETHUSDT', 'SOLUSDT', 'BTCUSDT', 'DOGEUSDT']
-
-        for pair in pairs:
-            open_count = content.count(f'Strategy result for {pair}: OPEN')
-            close_count = content.count(f'Strategy result for {pair}: CLOSE')
-            no_action = content.count(f'No action for {pair}')
+        summary = LogStreamAnalyzer(index_path="logs/.log_index.json").analyze([log_file])
 
-            print(f"   {pair}: OPEN={open_count}, CLOSE={close_count}, NO_ACTION={no_action}")
+        for pair, actions in sorted(summary.symbol_actions.items()):
+            print(f"   {pair}: OPEN={actions['OPEN']}, CLOSE={actions['CLOSE']}, NO_ACTION={actions['NONE']}")
 
-            if open_count > 100 and close_count == 0:
+            if actions['OPEN'] > 100 and actions['CLOSE'] == 0:
                 print(f"      🚨 {pair}: Много OPEN, нет CLOSE - проблема с логикой!")
 
     except Exception as e:
@@ -99,5 +91,7 @@ def check_signal_patterns():
 
 
 if __name__ == "__main__":
-    quick_log_analysis()
-    check_signal_patterns()
\ No newline at end of file
+    log_file = latest_log()
+    if log_file:
+        quick_log_analysis(log_file)
+        check_signal_patterns(log_file)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Бэктест стратегии на свечах из локального хранилища (data/history)
+
+Пример:
+    python utils/download_history.py --symbols BTCUSDT ETHUSDT --interval 5 --days 90
+    python utils/run_backtest.py --strategy momentum --symbols BTCUSDT ETHUSDT --days 90
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+# Добавляем корневую папку в путь
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.trading_config import TradingConfig
+from user_config import UserConfig
+from modules.history_store import KlineHistoryStore
+from modules.market_analyzer import MarketAnalyzer
+from modules.backtester import Backtester
+from strategies.strategy_factory import StrategyFactory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бэктест стратегии на исторических свечах")
+    parser.add_argument('--strategy', default=UserConfig.SELECTED_STRATEGY, help="Стратегия (как в StrategyFactory)")
+    parser.add_argument('--symbols', nargs='+', default=list(UserConfig.get_enabled_pairs()), help="Торговые пары")
+    parser.add_argument('--interval', default=TradingConfig.TIMEFRAMES['primary'], help="Интервал ByBit")
+    parser.add_argument('--days', type=int, default=30, help="Глубина истории в днях")
+    parser.add_argument('--balance', type=float, default=TradingConfig.BACKTEST_SETTINGS['initial_balance'])
+    parser.add_argument('--window', type=int, default=TradingConfig.BACKTEST_SETTINGS['window'],
+                        help="Свечей в окне стратегии")
+    args = parser.parse_args()
+
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(days=args.days)
+
+    candles = Backtester.load_candles(KlineHistoryStore(), args.symbols, args.interval,
+                                      int(start_time.timestamp()), int(end_time.timestamp()))
+    if not candles:
+        print("❌ Нет сохраненной истории. Сначала запустите utils/download_history.py")
+        return
+
+    user_config = {'CUSTOM_STRATEGY_CONFIG': UserConfig.CUSTOM_STRATEGY_CONFIG} if args.strategy == 'custom' else None
+    strategy = StrategyFactory().create_strategy(args.strategy, MarketAnalyzer(data_fetcher=None), None, user_config)
+    if strategy is None:
+        print(f"❌ Не удалось создать стратегию {args.strategy}")
+        return
+
+    bars = sum(len(df) for df in candles.values())
+    print(f"🧪 Бэктест {args.strategy}: {', '.join(candles)} | интервал {args.interval} | {bars} свечей")
+
+    result = Backtester(strategy, {'initial_balance': args.balance, 'window': args.window}).run(candles)
+    if not result.get('success'):
+        print(f"❌ {result.get('error')}")
+        return
+
+    metrics = result['metrics']
+    print(f"\n📊 Сделок: {result['trades']}")
+    print(f"💰 Баланс: ${result['initial_balance']:.2f} -> ${result['final_balance']:.2f} "
+          f"({result['return_pct']:+.2f}%)")
+    print(f"📉 Макс. просадка: {result['max_drawdown_pct']:.2f}%")
+    print(f"🎯 Win rate: {metrics.get('win_rate', 0)}% | Profit factor: {metrics.get('profit_factor', 0)}")
+    print(f"📐 Sharpe: {metrics.get('sharpe_ratio', 0)} | Sortino: {metrics.get('sortino_ratio', 0)}")
+    print(f"💸 Комиссии: ${result['fees']:.2f}")
+    print(f"⏱️  {result['bars']} свечей за {result['duration']:.1f}с ({result['bars_per_second']:.0f} свечей/с)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """
-Простая проверка логов без использования pathlib
+Простая проверка последних логов (потоковая сводка + хвост файла)
 """
 
 import os
 import sys
-from datetime import datetime
+
+# Добавляем корневую папку в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.log_stream import LogStreamAnalyzer, find_logs
 
 
 def check_logs():
@@ -13,44 +17,28 @@ def check_logs():
     print("🔍 БЫСТРАЯ ПРОВЕРКА ЛОГОВ")
     print("=" * 50)
 
-    # Ищем файлы логов
     logs_dir = "logs"
     if not os.path.exists(logs_dir):
         print("❌ Папка logs не найдена")
         return
 
-    # Ищем последний лог файл
-    log_files = []
-    for file in os.listdir(logs_dir):
-        if file.startswith("trading_") and file.endswith(".log"):
-            log_files.append(file)
-
+    log_files = find_logs(logs_dir)
     if not log_files:
         print("❌ Файлы логов не найдены")
         return
 
-    # Берем последний файл
-    latest_log = sorted(log_files)[-1]
-    log_path = os.path.join(logs_dir, latest_log)
-
-    print(f"📄 Анализируем: {latest_log}")
+    log_path = log_files[-1]
+    print(f"📄 Анализируем: {log_path.name}")
     print("-" * 50)
 
     try:
-        with open(log_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        # Последние 30 строк
-        recent_lines = lines[-30:]
-
-        # Статистика
-        total_lines = len(lines)
-        errors = sum(1 for line in lines if "ERROR" in line)
-        open_signals = sum(1 for line in lines if "Strategy result" in line and "OPEN" in line)
-        close_signals = sum(1 for line in lines if "Strategy result" in line and "CLOSE" in line)
+        summary = LogStreamAnalyzer(index_path=os.path.join(logs_dir, ".log_index.json")).analyze([log_path])
+        errors = summary.levels['ERROR'] + summary.levels['CRITICAL']
+        open_signals = summary.action_count('OPEN')
+        close_signals = summary.action_count('CLOSE')
 
         print(f"📊 СТАТИСТИКА:")
-        print(f"   Всего записей: {total_lines}")
+        print(f"   Всего записей: {summary.records}")
         print(f"   Ошибок: {errors}")
         print(f"   OPEN сигналов: {open_signals}")
         print(f"   CLOSE сигналов: {close_signals}")
@@ -58,23 +46,21 @@ def check_logs():
 
         print("📝 ПОСЛЕДНИЕ 30 ЗАПИСЕЙ:")
         print("-" * 50)
-        for line in recent_lines:
-            line = line.strip()
-            if line:
-                # Цветовое выделение
-                if "ERROR" in line:
-                    print(f"❌ {line}")
-                elif "Strategy result" in line:
-                    if "OPEN" in line:
-                        print(f"🟢 {line}")
-                    elif "CLOSE" in line:
-                        print(f"🔴 {line}")
-                    else:
-                        print(f"⚪ {line}")
-                elif "Trading cycle started" in line:
-                    print(f"🔄 {line}")
+        for event in LogStreamAnalyzer.tail(log_path, 30):
+            line = f"{event['time']} - {event['level']} - {event['message']}"
+            if event['level'] in ('ERROR', 'CRITICAL'):
+                print(f"❌ {line}")
+            elif event.get('event') == 'strategy_result':
+                if event.get('action') == 'OPEN':
+                    print(f"🟢 {line}")
+                elif event.get('action') == 'CLOSE':
+                    print(f"🔴 {line}")
                 else:
-                    print(f"   {line}")
+                    print(f"⚪ {line}")
+            elif event.get('event') == 'cycle_started':
+                print(f"🔄 {line}")
+            else:
+                print(f"   {line}")
 
         print("\n" + "=" * 50)
 
@@ -93,4 +79,4 @@ def check_logs():
 
 
 if __name__ == "__main__":
-    check_logs()
\ No newline at end of file
+    check_logs()